@@ -13,7 +13,7 @@ import asyncio
 
 from src.core.config import settings
 from api.json_utils import CustomJSONResponse
-from api.routes import projects, generation, health, auth, scripts, editor, scene_status, video_streaming, ai_enhancements
+from api.routes import projects, generation, health, auth, scripts, editor, scene_status, video_streaming, ai_enhancements, webhooks
 from api.middleware import (
     RequestIDMiddleware,
     LoggingMiddleware,
@@ -78,6 +78,7 @@ app.include_router(scripts.router, prefix=settings.API_PREFIX)
 app.include_router(generation.router, prefix=settings.API_PREFIX)
 app.include_router(editor.router, prefix=settings.API_PREFIX)
 app.include_router(ai_enhancements.router, prefix=settings.API_PREFIX)
+app.include_router(webhooks.router, prefix=settings.API_PREFIX)
 app.include_router(scene_status.router)
 app.include_router(video_streaming.router)
 
@@ -110,10 +111,17 @@ async def startup_event():
         file_watcher = await get_file_watcher()
         logger.info("File Watcher initialized successfully")
         
+        # Drop preview sprites when scene videos change
+        from src.services.preview_assets import get_preview_asset_service
+        get_preview_asset_service().attach(file_watcher)
+        
     except Exception as e:
         logger.error(f"Failed to initialize performance services: {e}")
         # Don't fail startup, services will initialize on first use
     
+    # Receive job events published by workers and other API processes
+    await manager.start()
+    
     # Start WebSocket system status broadcaster
     asyncio.create_task(system_status_broadcaster())
     logger.info("WebSocket system status broadcaster started")
@@ -123,6 +131,8 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down AI Content Pipeline API")
     
+    await manager.stop()
+    
     # Cleanup performance services
     try:
         from src.services.scene_index_manager import cleanup_scene_index_manager
@@ -134,6 +144,14 @@ async def shutdown_event():
         
     except Exception as e:
         logger.error(f"Error cleaning up performance services: {e}")
+    
+    # Close pooled provider HTTP sessions
+    try:
+        from src.utils.http_pool import close_http_pools
+        
+        await close_http_pools()
+    except Exception as e:
+        logger.error(f"Error closing HTTP pools: {e}")
 
 @app.get("/")
 async def root():
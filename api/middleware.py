@@ -1,9 +1,10 @@
 """
 FastAPI middleware for request processing
 """
+import math
 import time
 import uuid
-from typing import Callable
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional
 
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
@@ -11,12 +12,48 @@ from starlette.middleware.base import BaseHTTPMiddleware
 import structlog
 
 from src.core.config import settings
+from src.core.database.instrumentation import QueryStats, track_queries
+from src.utils.rate_limiter import GCRARateLimiter, RateLimit
 from api.validators import ErrorResponse
 from api.json_utils import CustomJSONResponse
 
 logger = structlog.get_logger()
 
 
+class RouteClass(NamedTuple):
+    """Requests under a path prefix (optionally only some methods) that share a budget"""
+    name: str
+    prefix: str
+    methods: Optional[FrozenSet[str]] = None
+
+
+_WRITES = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# Checked in order. Starting work is expensive; polling its status is not.
+ROUTE_CLASSES = [
+    RouteClass("expensive", f"{settings.API_PREFIX}/generation", _WRITES),
+    RouteClass("expensive", f"{settings.API_PREFIX}/ai-enhancements", _WRITES),
+    RouteClass("expensive", f"{settings.API_PREFIX}/batch-editor", _WRITES),
+    RouteClass("expensive", "/batch-editor", _WRITES),
+    RouteClass("status", f"{settings.API_PREFIX}/scenes"),
+    RouteClass("status", f"{settings.API_PREFIX}/stream"),
+]
+
+
+def default_route_limits(max_requests: int, window_seconds: int) -> Dict[str, RateLimit]:
+    """Budgets per route class; bursts are RATE_LIMIT_BURST_SECONDS worth of each rate"""
+    def limit(per_window: int) -> RateLimit:
+        burst = math.ceil(per_window * settings.RATE_LIMIT_BURST_SECONDS / window_seconds)
+        return RateLimit(per_window, window_seconds, burst=max(1, burst))
+    
+    per_minute = window_seconds / 60
+    return {
+        "default": limit(max_requests),
+        "expensive": limit(max(1, round(settings.RATE_LIMIT_EXPENSIVE_PER_MINUTE * per_minute))),
+        "status": limit(max(1, round(settings.RATE_LIMIT_STATUS_PER_MINUTE * per_minute))),
+    }
+
+
 class RequestIDMiddleware(BaseHTTPMiddleware):
     """Add unique request ID to each request"""
     
@@ -53,7 +90,8 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         )
         
         try:
-            response = await call_next(request)
+            with track_queries() as queries:
+                response = await call_next(request)
             
             # Calculate request duration
             duration = time.time() - start_time
@@ -65,10 +103,14 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 path=request.url.path,
                 status_code=response.status_code,
                 duration_seconds=round(duration, 3),
+                **queries.to_dict(),
             )
+            self._warn_on_query_patterns(request, queries)
             
-            # Add timing header
+            # Add timing headers
             response.headers["X-Process-Time"] = str(round(duration, 3))
+            response.headers["X-DB-Queries"] = str(queries.count)
+            response.headers["X-DB-Time"] = str(round(queries.total_time, 3))
             
             return response
             
@@ -83,17 +125,47 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 exc_info=True,
             )
             raise
+    
+    @staticmethod
+    def _warn_on_query_patterns(request: Request, queries: QueryStats) -> None:
+        """Flag requests whose queries suggest N+1 loading"""
+        repeated = queries.repeated_statements(settings.DB_REPEATED_QUERY_WARN)
+        if repeated or queries.count > settings.DB_QUERY_WARN_COUNT:
+            logger.warning(
+                "Excessive database queries",
+                method=request.method,
+                path=request.url.path,
+                db_queries=queries.count,
+                repeated=[{"statement": sql[:200], "count": n} for sql, n in repeated[:3]],
+            )
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple IP-based rate limiting middleware"""
+    """
+    IP-based rate limiting with per-route-class budgets.
     
-    def __init__(self, app, max_requests: int = 100, window_seconds: int = 60):
+    Buckets live in Redis, so every worker enforces the same limit; see
+    src/utils/rate_limiter.py for the algorithm and the local fallback.
+    """
+    
+    def __init__(self, app, max_requests: int = 100, window_seconds: int = 60,
+                 route_limits: Optional[Dict[str, RateLimit]] = None,
+                 route_classes: Optional[List[RouteClass]] = None,
+                 limiter: Optional[GCRARateLimiter] = None):
         super().__init__(app)
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.request_counts = {}
-        self.window_start = {}
+        self.route_limits = route_limits or default_route_limits(max_requests, window_seconds)
+        self.route_classes = route_classes if route_classes is not None else ROUTE_CLASSES
+        self.limiter = limiter or GCRARateLimiter(redis_url=str(settings.REDIS_URL))
+    
+    def classify(self, method: str, path: str) -> str:
+        """Route class of a request; the first matching rule wins."""
+        for route_class in self.route_classes:
+            if path.startswith(route_class.prefix) and (
+                    route_class.methods is None or method in route_class.methods):
+                return route_class.name
+        return "default"
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Check rate limit for client IP"""
@@ -101,35 +173,30 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         if request.url.path.startswith("/health"):
             return await call_next(request)
         
-        # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
-        
         # Skip rate limiting in testing mode
         if settings.TESTING:
             return await call_next(request)
         
-        current_time = time.time()
-        
-        # Initialize or reset window for IP
-        if (client_ip not in self.window_start or 
-            current_time - self.window_start[client_ip] > self.window_seconds):
-            self.request_counts[client_ip] = 0
-            self.window_start[client_ip] = current_time
+        # Get client IP
+        client_ip = request.client.host if request.client else "unknown"
         
-        # Increment request count
-        self.request_counts[client_ip] += 1
+        route_class = self.classify(request.method, request.url.path)
+        limit = self.route_limits.get(route_class) or self.route_limits["default"]
+        decision = await self.limiter.hit(f"{route_class}:{client_ip}", limit)
+        reset_at = str(int(time.time() + decision.reset_after))
         
         # Check rate limit
-        if self.request_counts[client_ip] > self.max_requests:
+        if not decision.allowed:
             logger.warning(
                 "Rate limit exceeded",
                 client_ip=client_ip,
-                requests=self.request_counts[client_ip],
-                window_seconds=self.window_seconds,
+                route_class=route_class,
+                limit=limit.limit,
+                period_seconds=limit.period,
             )
             
             error_response = ErrorResponse(
-                detail=f"Rate limit exceeded. Max {self.max_requests} requests per {self.window_seconds} seconds",
+                detail=f"Rate limit exceeded. Max {limit.limit} requests per {limit.period:g} seconds",
                 status_code=429,
             )
             
@@ -137,10 +204,10 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 status_code=429,
                 content=error_response.dict(),
                 headers={
-                    "Retry-After": str(self.window_seconds),
-                    "X-RateLimit-Limit": str(self.max_requests),
+                    "Retry-After": decision.retry_after_header,
+                    "X-RateLimit-Limit": str(limit.limit),
                     "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(int(self.window_start[client_ip] + self.window_seconds)),
+                    "X-RateLimit-Reset": reset_at,
                 }
             )
         
@@ -148,10 +215,9 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         response = await call_next(request)
         
         # Add rate limit headers
-        remaining = max(0, self.max_requests - self.request_counts[client_ip])
-        response.headers["X-RateLimit-Limit"] = str(self.max_requests)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(self.window_start[client_ip] + self.window_seconds))
+        response.headers["X-RateLimit-Limit"] = str(limit.limit)
+        response.headers["X-RateLimit-Remaining"] = str(decision.remaining)
+        response.headers["X-RateLimit-Reset"] = reset_at
         
         return response
 
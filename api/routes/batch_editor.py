@@ -19,6 +19,7 @@ from ..validators import validate_request
 from src.services.async_moviepy_wrapper import get_async_moviepy, AsyncMoviePyWrapper
 from src.services.operation_queue import get_operation_queue, OperationQueue, OperationPriority, OperationStatus
 from src.services.video_cache_manager import get_cache_manager
+from src.services.progress_broadcast import get_progress_broadcaster, ProgressSubscription, TERMINAL_STATUSES
 
 logger = structlog.get_logger()
 
@@ -71,9 +72,6 @@ class CacheStatsResponse(BaseModel):
     hit_rate_percent: float
     operation_stats: Dict[str, Any]
 
-# WebSocket connections for real-time progress
-active_connections: Dict[str, WebSocket] = {}
-
 @router.post("/process", response_model=BatchProcessResponse)
 async def process_batch_operations(
     request: BatchProcessRequest,
@@ -331,48 +329,38 @@ async def get_operation_history(
 # WebSocket endpoint for real-time progress updates
 @router.websocket("/progress/{operation_id}")
 async def operation_progress_websocket(websocket: WebSocket, operation_id: str):
-    """WebSocket endpoint for real-time operation progress updates."""
+    """
+    WebSocket endpoint for real-time operation progress updates.
+    
+    Updates are pushed by the operation queue and progress tracker as they
+    happen (throttled per client), so an idle connection costs nothing.
+    """
     await websocket.accept()
-    active_connections[operation_id] = websocket
+    
+    # Subscribe before reading the current state so no transition is missed
+    subscription = get_progress_broadcaster().subscribe(operation_id)
+    disconnect_watcher = asyncio.create_task(_close_on_disconnect(websocket, subscription))
     
     try:
         queue = get_operation_queue()
-        async_moviepy = get_async_moviepy()
         
         # Send initial status
         status = await queue.get_operation_status(operation_id)
         if not status:
-            progress = async_moviepy.get_operation_progress(operation_id)
+            progress = get_async_moviepy().get_operation_progress(operation_id)
             if progress:
                 status = progress.to_dict()
         
         if status:
             await websocket.send_json(status)
+            if await _is_final_update(queue, operation_id, status):
+                return
         
-        # Keep connection alive and send updates
-        while True:
-            try:
-                # Check for updates every second
-                await asyncio.sleep(1)
-                
-                # Get current status
-                current_status = await queue.get_operation_status(operation_id)
-                if not current_status:
-                    progress = async_moviepy.get_operation_progress(operation_id)
-                    if progress:
-                        current_status = progress.to_dict()
-                
-                if current_status:
-                    await websocket.send_json(current_status)
-                    
-                    # Close connection if operation is completed
-                    if current_status.get("status") in ["completed", "failed", "cancelled"]:
-                        break
-                
-            except WebSocketDisconnect:
-                break
-            except Exception as e:
-                logger.error(f"Error in progress websocket: {e}")
+        async for update in subscription:
+            await websocket.send_json(update)
+            
+            # Close connection if operation is completed
+            if await _is_final_update(queue, operation_id, update):
                 break
                 
     except WebSocketDisconnect:
@@ -381,7 +369,29 @@ async def operation_progress_websocket(websocket: WebSocket, operation_id: str):
         logger.error(f"WebSocket error for operation {operation_id}: {e}")
     finally:
         # Clean up connection
-        active_connections.pop(operation_id, None)
+        subscription.close()
+        disconnect_watcher.cancel()
+
+async def _close_on_disconnect(websocket: WebSocket, subscription: ProgressSubscription):
+    """End the subscription as soon as the client goes away."""
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except Exception:
+        pass
+    finally:
+        subscription.close()
+
+async def _is_final_update(queue: OperationQueue, operation_id: str, update: Dict[str, Any]) -> bool:
+    """
+    Whether an update ends the stream.
+    
+    Queued operations finish with the queue's own record, which carries the
+    result, so a tracker's terminal state alone does not end their stream.
+    """
+    if update.get("status") not in TERMINAL_STATUSES:
+        return False
+    return "operation_type" in update or await queue.get_operation_status(operation_id) is None
 
 # Background task to send progress updates to webhooks
 async def send_progress_webhook(webhook_url: str, operation_id: str, progress_data: Dict[str, Any]):
@@ -149,6 +149,7 @@ async def start_generation(
             "style": project.style,
             "quality": request.quality,
             "priority": request.priority,
+            "project_id": str(project.id),
             "project_name": project.name,
             "webhook_url": request.webhook_url
         }
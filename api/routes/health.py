@@ -9,7 +9,7 @@ import redis.asyncio as redis
 import structlog
 from datetime import datetime
 
-from src.core.database.connection import get_db
+from src.core.database.connection import get_db, get_pool_status
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -44,6 +44,7 @@ async def detailed_health_check(db: AsyncSession = Depends(get_db)):
         result = await db.execute(text("SELECT 1"))
         result.scalar()
         health_status["checks"]["database"] = "healthy"
+        health_status["database_pool"] = get_pool_status()
     except Exception as e:
         logger.error("Database health check failed", error=str(e))
         health_status["checks"]["database"] = "unhealthy"
@@ -6,12 +6,21 @@ from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, Depends, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, or_
+from sqlalchemy.orm import selectinload, load_only
 import structlog
 
+from src.core.config import settings
 from src.core.database.connection import get_db
 from src.core.database.models import Project, User
+from src.core.database.pagination import (
+    InvalidCursor,
+    bounded_count,
+    build_page,
+    decode_cursor,
+    keyset_query,
+)
+from src.utils.ttl_cache import TTLCache
 from api.dependencies import (
     get_current_user,
     Pagination,
@@ -23,12 +32,49 @@ from api.validators import (
     ProjectUpdate,
     ProjectResponse,
     ProjectListResponse,
+    ProjectSummaryResponse,
     ProjectStatus,
 )
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 logger = structlog.get_logger()
 
+PROJECT_SUMMARY_COLUMNS = (
+    Project.id,
+    Project.user_id,
+    Project.name,
+    Project.description,
+    Project.style,
+    Project.voice_type,
+    Project.status,
+    Project.video_url,
+    Project.created_at,
+    Project.updated_at,
+)
+
+# (user_id, status, search) -> (total, is_estimate)
+_count_cache = TTLCache(maxsize=10000, ttl=settings.LIST_COUNT_CACHE_SECONDS)
+
+
+def _escape_like(term: str) -> str:
+    """Escape LIKE wildcards so search terms match literally."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _parse_cursor(cursor: Optional[str], sort_by: str, order: str):
+    """Decode a list cursor, rejecting tokens issued for another ordering."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, getattr(Project, sort_by), sort_by, order)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _invalidate_counts(user_id) -> None:
+    """Drop cached list totals for a user after their projects change."""
+    _count_cache.discard_where(lambda key: key[0] == user_id)
+
 
 @router.get("/", response_model=ProjectListResponse)
 async def list_projects(
@@ -38,7 +84,8 @@ async def list_projects(
     status: Optional[ProjectStatus] = None,
     search: Optional[str] = None,
     sort_by: str = Query(default="created_at", pattern="^(created_at|updated_at|name)$"),
-    order: str = Query(default="desc", pattern="^(asc|desc)$")
+    order: str = Query(default="desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None
 ) -> ProjectListResponse:
     """
     List user's projects with filtering and pagination
@@ -47,65 +94,67 @@ async def list_projects(
     - **search**: Search in project name and description
     - **sort_by**: Sort by created_at, updated_at, or name
     - **order**: Sort order (asc or desc)
+    - **cursor**: `next_cursor` from the previous page (preferred over skip)
     - **skip**: Number of items to skip (pagination)
     - **limit**: Number of items to return (max 100)
     """
-    # Build query
-    query = select(Project).where(Project.user_id == current_user.id)
+    # Build query over summary columns only; script_content and metadata stay unloaded
+    query = select(Project).options(load_only(*PROJECT_SUMMARY_COLUMNS)).where(
+        Project.user_id == current_user.id
+    )
     
     # Apply filters
     if status:
         query = query.where(Project.status == status)
     
     if search:
-        search_filter = or_(
-            Project.name.ilike(f"%{search}%"),
-            Project.description.ilike(f"%{search}%")
-        )
-        query = query.where(search_filter)
-    
-    # Count total items
-    count_query = select(func.count()).select_from(Project).where(Project.user_id == current_user.id)
-    if status:
-        count_query = count_query.where(Project.status == status)
-    if search:
-        count_query = count_query.where(search_filter)
-    
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
-    # Apply sorting
+        # Served by the trigram indexes on name and description
+        pattern = f"%{_escape_like(search)}%"
+        query = query.where(or_(
+            Project.name.ilike(pattern, escape="\\"),
+            Project.description.ilike(pattern, escape="\\")
+        ))
+    
+    # Count total items, capped and briefly cached per filter set
+    count_key = (current_user.id, status, search)
+    counted = _count_cache.get(count_key)
+    if counted is None:
+        counted = await bounded_count(db, query, Project.id, settings.LIST_COUNT_CAP)
+        _count_cache.set(count_key, counted)
+    total, total_is_estimate = counted
+    
+    # Apply sorting and pagination; a cursor continues after the previous page
     sort_column = getattr(Project, sort_by)
-    if order == "desc":
-        query = query.order_by(sort_column.desc())
-    else:
-        query = query.order_by(sort_column.asc())
-    
-    # Apply pagination
-    query = query.offset(pagination.skip).limit(pagination.limit)
+    after = _parse_cursor(cursor, sort_by, order)
+    query = keyset_query(query, sort_column, Project.id, order == "desc", pagination.limit, after)
+    if after is None and pagination.skip:
+        query = query.offset(pagination.skip)
     
     # Execute query
     result = await db.execute(query)
-    projects = result.scalars().all()
+    page = build_page(result.scalars().all(), pagination.limit, sort_by, order)
     
     logger.info(
         "Projects listed",
         user_id=str(current_user.id),
         total=total,
-        returned=len(projects),
+        returned=len(page.items),
         filters={
             "status": status,
             "search": search,
             "sort_by": sort_by,
-            "order": order
+            "order": order,
+            "cursor": bool(cursor)
         }
     )
     
     return ProjectListResponse(
-        items=[ProjectResponse.model_validate(p) for p in projects],
+        items=[ProjectSummaryResponse.model_validate(p) for p in page.items],
         total=total,
+        total_is_estimate=total_is_estimate,
         skip=pagination.skip,
-        limit=pagination.limit
+        limit=pagination.limit,
+        next_cursor=page.next_cursor
     )
 
 
@@ -142,6 +191,7 @@ async def create_project(
     
     db.add(project)
     await db.commit()
+    _invalidate_counts(current_user.id)
     await db.refresh(project)
     
     logger.info(
@@ -244,6 +294,7 @@ async def update_project(
     
     await db.commit()
     await db.refresh(project)
+    _invalidate_counts(current_user.id)
     
     logger.info(
         "Project updated",
@@ -293,6 +344,7 @@ async def delete_project(
     # Delete project
     await db.delete(project)
     await db.commit()
+    _invalidate_counts(current_user.id)
     
     logger.info(
         "Project deleted",
@@ -347,6 +399,7 @@ async def duplicate_project(
     
     db.add(duplicate)
     await db.commit()
+    _invalidate_counts(current_user.id)
     await db.refresh(duplicate)
     
     logger.info(
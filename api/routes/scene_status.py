@@ -11,7 +11,6 @@ Performance Targets:
 - Real-time updates via WebSocket
 """
 
-import asyncio
 import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
@@ -224,32 +223,22 @@ async def batch_lookup_scene_videos(
     """
     Efficient batch lookup of multiple scene videos.
     
-    Performs parallel lookups for improved performance when checking
-    multiple scenes at once.
+    Resolves all scenes with a single Redis round trip (HMGET on the
+    project's scene map) when they are cached.
     
     Performance: < 500ms for 100 scenes
     """
     start_time = datetime.utcnow()
     
     try:
-        # Perform parallel lookups
-        lookup_tasks = [
-            scene_manager.find_scene_video(scene_target, request.project_id)
-            for scene_target in request.scene_targets
-        ]
-        
-        video_paths = await asyncio.gather(*lookup_tasks, return_exceptions=True)
+        video_paths = await scene_manager.find_scene_videos(request.scene_targets, request.project_id)
         
         # Build response
         scenes = []
         found_count = 0
         
-        for i, scene_target in enumerate(request.scene_targets):
-            video_path = video_paths[i]
-            if isinstance(video_path, Exception):
-                logger.error(f"Error in batch lookup for {scene_target}: {video_path}")
-                video_path = None
-            
+        for scene_target in request.scene_targets:
+            video_path = video_paths.get(scene_target)
             found = video_path is not None
             if found:
                 found_count += 1
@@ -1,218 +1,27 @@
 """
 Script parsing and processing endpoints
 """
-import re
+import asyncio
 from typing import Annotated, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
 import structlog
 
 from src.core.database.models import User
+from src.services.script_parser_service import parse_script_cached
 from api.dependencies import get_current_user, rate_limit_per_minute
 from api.validators import (
     ScriptParseRequest,
     ScriptParseResponse,
-    ParsedScene,
 )
 
 router = APIRouter(prefix="/scripts", tags=["scripts"])
 logger = structlog.get_logger()
 
 
-class ScriptParser:
-    """Parse and analyze script content"""
-    
-    def __init__(self, content: str, style: str = "techwear"):
-        self.content = content
-        self.style = style
-        self.scenes = []
-        self.warnings = []
-    
-    def parse(self) -> ScriptParseResponse:
-        """Parse the script content into scenes"""
-        # Split content into lines
-        lines = self.content.strip().split('\n')
-        
-        current_scene = None
-        scene_number = 0
-        
-        for line_num, line in enumerate(lines):
-            line = line.strip()
-            
-            if not line:
-                continue
-            
-            # Check for scene marker
-            if self._is_scene_marker(line):
-                # Save previous scene if exists
-                if current_scene:
-                    self.scenes.append(current_scene)
-                
-                # Start new scene
-                scene_number += 1
-                current_scene = {
-                    "scene_number": scene_number,
-                    "description": self._extract_scene_description(line),
-                    "duration": 0.0,
-                    "commands": [],
-                    "dialogue": None,
-                    "visual_prompts": []
-                }
-            
-            # Check for commands
-            elif self._is_command(line):
-                if current_scene:
-                    command = self._extract_command(line)
-                    current_scene["commands"].append(command)
-                    
-                    # Update duration based on command
-                    duration = self._estimate_command_duration(command)
-                    current_scene["duration"] += duration
-                else:
-                    self.warnings.append(f"Command found outside scene at line {line_num + 1}")
-            
-            # Check for dialogue
-            elif self._is_dialogue(line):
-                if current_scene:
-                    if current_scene["dialogue"]:
-                        current_scene["dialogue"] += f" {line}"
-                    else:
-                        current_scene["dialogue"] = line
-                    
-                    # Estimate dialogue duration
-                    words = len(line.split())
-                    current_scene["duration"] += words * 0.3  # ~0.3 seconds per word
-                else:
-                    self.warnings.append(f"Dialogue found outside scene at line {line_num + 1}")
-            
-            # Check for visual prompts
-            elif self._is_visual_prompt(line):
-                if current_scene:
-                    prompt = self._extract_visual_prompt(line)
-                    current_scene["visual_prompts"].append(prompt)
-                else:
-                    self.warnings.append(f"Visual prompt found outside scene at line {line_num + 1}")
-            
-            # Otherwise, it might be description
-            elif current_scene and not any([
-                self._is_scene_marker(line),
-                self._is_command(line),
-                self._is_dialogue(line),
-                self._is_visual_prompt(line)
-            ]):
-                # Add to scene description
-                current_scene["description"] += f" {line}"
-        
-        # Save last scene
-        if current_scene:
-            self.scenes.append(current_scene)
-        
-        # Validate and create response
-        return self._create_response()
-    
-    def _is_scene_marker(self, line: str) -> bool:
-        """Check if line is a scene marker"""
-        patterns = [
-            r"^SCENE\s+\d+",
-            r"^INT\.",
-            r"^EXT\.",
-            r"^\[SCENE",
-            r"^#\s*SCENE"
-        ]
-        return any(re.match(pattern, line.upper()) for pattern in patterns)
-    
-    def _is_command(self, line: str) -> bool:
-        """Check if line is a command"""
-        patterns = [
-            r"^COMMAND:",
-            r"^CMD:",
-            r"^\[COMMAND",
-            r"^//\s*COMMAND"
-        ]
-        return any(re.match(pattern, line.upper()) for pattern in patterns)
-    
-    def _is_dialogue(self, line: str) -> bool:
-        """Check if line is dialogue"""
-        # Dialogue often starts with quotes or has character names
-        return (
-            line.startswith('"') or 
-            line.startswith("'") or
-            re.match(r"^[A-Z][A-Z\s]+:", line) or  # CHARACTER NAME:
-            re.match(r"^VOICE:", line.upper())
-        )
-    
-    def _is_visual_prompt(self, line: str) -> bool:
-        """Check if line is a visual prompt"""
-        patterns = [
-            r"^VISUAL:",
-            r"^PROMPT:",
-            r"^\[VISUAL",
-            r"^#\s*VISUAL"
-        ]
-        return any(re.match(pattern, line.upper()) for pattern in patterns)
-    
-    def _extract_scene_description(self, line: str) -> str:
-        """Extract scene description from marker line"""
-        # Remove scene markers
-        description = re.sub(r"^(SCENE\s+\d+|INT\.|EXT\.|\[SCENE|#\s*SCENE)[:\s]*", "", line, flags=re.IGNORECASE)
-        return description.strip()
-    
-    def _extract_command(self, line: str) -> str:
-        """Extract command from line"""
-        # Remove command markers
-        command = re.sub(r"^(COMMAND|CMD|\/\/\s*COMMAND|\[COMMAND)[:\s]*", "", line, flags=re.IGNORECASE)
-        return command.strip()
-    
-    def _extract_visual_prompt(self, line: str) -> str:
-        """Extract visual prompt from line"""
-        # Remove visual markers
-        prompt = re.sub(r"^(VISUAL|PROMPT|\[VISUAL|#\s*VISUAL)[:\s]*", "", line, flags=re.IGNORECASE)
-        return prompt.strip()
-    
-    def _estimate_command_duration(self, command: str) -> float:
-        """Estimate duration for a command"""
-        # Basic estimation based on command type
-        command_lower = command.lower()
-        
-        if "glitch" in command_lower:
-            return 0.5
-        elif "zoom" in command_lower or "pan" in command_lower:
-            return 2.0
-        elif "transition" in command_lower:
-            return 1.0
-        elif "effect" in command_lower:
-            return 1.5
-        else:
-            return 1.0
-    
-    def _create_response(self) -> ScriptParseResponse:
-        """Create the response object"""
-        parsed_scenes = []
-        total_duration = 0.0
-        
-        for scene in self.scenes:
-            # Ensure minimum scene duration
-            if scene["duration"] < 2.0:
-                scene["duration"] = 2.0
-                self.warnings.append(f"Scene {scene['scene_number']} duration adjusted to minimum 2 seconds")
-            
-            parsed_scene = ParsedScene(
-                scene_number=scene["scene_number"],
-                description=scene["description"],
-                duration=round(scene["duration"], 2),
-                commands=scene["commands"],
-                dialogue=scene["dialogue"],
-                visual_prompts=scene["visual_prompts"]
-            )
-            parsed_scenes.append(parsed_scene)
-            total_duration += scene["duration"]
-        
-        return ScriptParseResponse(
-            scenes=parsed_scenes,
-            total_duration=round(total_duration, 2),
-            scene_count=len(parsed_scenes),
-            warnings=self.warnings
-        )
+def parse_cached(content: str) -> ScriptParseResponse:
+    """Parse a script, reusing the canonical parse shared with the video workers"""
+    return ScriptParseResponse.model_validate(parse_script_cached(content)["directives"])
 
 
 @router.post("/parse", response_model=ScriptParseResponse)
@@ -244,8 +53,7 @@ async def parse_script(
     )
     
     try:
-        parser = ScriptParser(request.content, request.style)
-        result = parser.parse()
+        result = await asyncio.to_thread(parse_cached, request.content)
         
         if not result.scenes:
             raise HTTPException(
@@ -304,9 +112,8 @@ async def validate_script(
     }
     
     try:
-        # Parse the script first
-        parser = ScriptParser(request.content, request.style)
-        result = parser.parse()
+        # Parse the script first; usually already cached by /parse
+        result = await asyncio.to_thread(parse_cached, request.content)
         
         # Check scene count
         if result.scene_count == 0:
@@ -10,15 +10,20 @@ Performance Features:
 - Memory-efficient streaming for large files (4K+ video support)
 - Redis-cached scene lookups for <100ms response
 - Smart content type detection and caching headers
+- On-the-fly HLS packaging for scenes and whole-project timelines
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from fastapi import APIRouter, Request, HTTPException, Depends, Path as FastAPIPath, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, FileResponse
 
 from src.utils.video_streaming import get_video_streaming_manager, VideoStreamingManager
+from src.utils.hls_packager import (
+    HLSPackager, PackagingError, RENDITIONS, get_hls_packager, master_playlist, media_playlist
+)
 from src.services.scene_index_manager import get_scene_index_manager, SceneIndexManager
 
 logger = logging.getLogger(__name__)
@@ -35,13 +40,19 @@ async def get_scene_manager() -> SceneIndexManager:
     """Get scene index manager dependency."""
     return await get_scene_index_manager()
 
+async def get_packager() -> HLSPackager:
+    """Get HLS packager dependency."""
+    return get_hls_packager()
+
+HLS_MEDIA_TYPE = "application/vnd.apple.mpegurl"
+
 @router.get("/video/{file_path:path}",
            summary="Stream video file with range support")
 async def stream_video_file(
     file_path: str = FastAPIPath(..., description="Path to video file"),
     request: Request = None,
     streaming_manager: VideoStreamingManager = Depends(get_streaming_manager)
-) -> StreamingResponse:
+) -> Response:
     """
     Stream a video file with HTTP range support for seeking.
     
@@ -56,7 +67,7 @@ async def stream_video_file(
         request: FastAPI request object with range headers
         
     Returns:
-        StreamingResponse with video content
+        Response with video content
     """
     try:
         return await streaming_manager.streamer.stream_video(file_path, request)
@@ -80,7 +91,7 @@ async def stream_scene_video(
     scene_id: str = FastAPIPath(..., description="Scene identifier (e.g., 'scene_1')"),
     request: Request = None,
     streaming_manager: VideoStreamingManager = Depends(get_streaming_manager)
-) -> StreamingResponse:
+) -> Response:
     """
     Stream a scene video with fast O(1) lookup and range support.
     
@@ -93,7 +104,7 @@ async def stream_scene_video(
         request: FastAPI request object with range headers
         
     Returns:
-        StreamingResponse with scene video content
+        Response with scene video content
     """
     try:
         return await streaming_manager.stream_scene_video(scene_id, project_id, request)
@@ -219,6 +230,7 @@ async def get_project_playlist(
         playlist = {
             'project_id': project_id,
             'total_scenes': len(scene_videos),
+            'hls_endpoint': f"{router.prefix}/hls/project/{project_id}/master.m3u8",
             'scenes': []
         }
         
@@ -230,7 +242,8 @@ async def get_project_playlist(
                 'scene_number': scene_number,
                 'scene_id': scene_id,
                 'video_path': video_path,
-                'streaming_endpoint': f"/api/v1/stream/scene/{project_id}/{scene_id}"
+                'streaming_endpoint': f"/api/v1/stream/scene/{project_id}/{scene_id}",
+                'hls_endpoint': f"{router.prefix}/hls/scene/{project_id}/{scene_id}/master.m3u8"
             }
             
             # Add detailed metadata if requested
@@ -258,6 +271,127 @@ async def get_project_playlist(
             detail=f"Playlist creation failed: {str(e)}"
         )
 
+def _segment_prefix(package_id: str) -> str:
+    return f"{router.prefix}/hls/segments/{package_id}"
+
+def _playlist_response(text: str) -> Response:
+    # Playlists change when scenes are re-rendered; segments never do
+    return Response(content=text, media_type=HLS_MEDIA_TYPE, headers={'Cache-Control': 'no-cache'})
+
+async def _scene_sources(project_id: str, scene_manager: SceneIndexManager,
+                         scene_id: Optional[str] = None) -> List[str]:
+    if scene_id is None:
+        sources = await scene_manager.get_all_scene_videos(project_id)
+    else:
+        video_path = await scene_manager.find_scene_video(scene_id, project_id)
+        sources = [video_path] if video_path else []
+    if not sources:
+        target = f"scene {scene_id}" if scene_id else "any scene"
+        raise HTTPException(status_code=404, detail=f"Video not found for {target} in project {project_id}")
+    return sources
+
+async def _media_playlist(sources: List[str], rendition: str, packager: HLSPackager) -> Response:
+    if rendition not in RENDITIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown rendition: {rendition}")
+    try:
+        packages = await asyncio.gather(*(packager.plan(source, rendition) for source in sources))
+    except PackagingError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return _playlist_response(media_playlist([(p, _segment_prefix(p.package_id)) for p in packages]))
+
+async def _master_playlist(sources: List[str], base_url: str, packager: HLSPackager) -> Response:
+    try:
+        packages = await asyncio.gather(*(packager.plan(source) for source in sources))
+    except PackagingError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    variants = [(f"{base_url}/source.m3u8", max(p.bandwidth for p in packages))]
+    variants += [
+        (f"{base_url}/{name}.m3u8", rendition.bandwidth)
+        for name, rendition in RENDITIONS.items() if name != 'source'
+    ]
+    return _playlist_response(master_playlist(variants))
+
+@router.get("/hls/scene/{project_id}/{scene_id}/master.m3u8",
+           summary="HLS master playlist for a scene")
+async def get_scene_hls_master(
+    project_id: str = FastAPIPath(..., description="Project identifier"),
+    scene_id: str = FastAPIPath(..., description="Scene identifier (e.g., 'scene_1')"),
+    scene_manager: SceneIndexManager = Depends(get_scene_manager),
+    packager: HLSPackager = Depends(get_packager)
+) -> Response:
+    """
+    Get the adaptive-streaming entry point for one scene.
+    
+    The scene is packaged into fMP4 segments by stream copy on first
+    request; lower renditions are transcoded only if a player selects them.
+    """
+    sources = await _scene_sources(project_id, scene_manager, scene_id)
+    return await _master_playlist(sources, f"{router.prefix}/hls/scene/{project_id}/{scene_id}", packager)
+
+@router.get("/hls/scene/{project_id}/{scene_id}/{rendition}.m3u8",
+           summary="HLS media playlist for a scene rendition")
+async def get_scene_hls_playlist(
+    project_id: str = FastAPIPath(..., description="Project identifier"),
+    scene_id: str = FastAPIPath(..., description="Scene identifier (e.g., 'scene_1')"),
+    rendition: str = FastAPIPath(..., description="Rendition name (source, 720p, 480p)"),
+    scene_manager: SceneIndexManager = Depends(get_scene_manager),
+    packager: HLSPackager = Depends(get_packager)
+) -> Response:
+    """Get the segment list of one scene in one rendition."""
+    sources = await _scene_sources(project_id, scene_manager, scene_id)
+    return await _media_playlist(sources, rendition, packager)
+
+@router.get("/hls/project/{project_id}/master.m3u8",
+           summary="HLS master playlist for the whole project timeline")
+async def get_project_hls_master(
+    project_id: str = FastAPIPath(..., description="Project identifier"),
+    scene_manager: SceneIndexManager = Depends(get_scene_manager),
+    packager: HLSPackager = Depends(get_packager)
+) -> Response:
+    """
+    Get the adaptive-streaming entry point for all scenes played in order.
+    
+    Scenes are joined virtually with discontinuities; nothing is
+    concatenated on disk.
+    """
+    sources = await _scene_sources(project_id, scene_manager)
+    return await _master_playlist(sources, f"{router.prefix}/hls/project/{project_id}", packager)
+
+@router.get("/hls/project/{project_id}/{rendition}.m3u8",
+           summary="HLS media playlist for a project rendition")
+async def get_project_hls_playlist(
+    project_id: str = FastAPIPath(..., description="Project identifier"),
+    rendition: str = FastAPIPath(..., description="Rendition name (source, 720p, 480p)"),
+    scene_manager: SceneIndexManager = Depends(get_scene_manager),
+    packager: HLSPackager = Depends(get_packager)
+) -> Response:
+    """Get the segment list of the project timeline in one rendition."""
+    sources = await _scene_sources(project_id, scene_manager)
+    return await _media_playlist(sources, rendition, packager)
+
+@router.get("/hls/segments/{package_id}/{name}",
+           summary="HLS init or media segment")
+async def get_hls_segment(
+    package_id: str = FastAPIPath(..., description="Package identifier"),
+    name: str = FastAPIPath(..., description="Segment file name"),
+    packager: HLSPackager = Depends(get_packager)
+) -> FileResponse:
+    """
+    Serve a packaged segment, packaging its rendition first if needed.
+    
+    Package ids are content-addressed, so segments are cached as immutable.
+    """
+    try:
+        path = await packager.segment_path(package_id, name)
+    except PackagingError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    if not path:
+        raise HTTPException(status_code=404, detail="Segment not found")
+    
+    media_type = "video/mp4" if name.endswith('.mp4') else "video/iso.segment"
+    return FileResponse(path, media_type=media_type,
+                        headers={'Cache-Control': 'public, max-age=31536000, immutable'})
+
 @router.get("/stats",
            summary="Get video streaming statistics")
 async def get_streaming_stats(
@@ -273,7 +407,9 @@ async def get_streaming_stats(
         Dictionary with streaming statistics
     """
     try:
-        return await streaming_manager.get_streaming_stats()
+        stats = await streaming_manager.get_streaming_stats()
+        stats['hls'] = get_hls_packager().get_stats()
+        return stats
         
     except Exception as e:
         logger.error(f"Error getting streaming stats: {e}")
@@ -0,0 +1,61 @@
+"""
+Provider webhook endpoints
+
+Receives generation status callbacks so the completion tracker can continue
+a pipeline as soon as a provider reports completion, without waiting for
+its next poll.
+"""
+import hmac
+import os
+from typing import Any, Dict
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, status
+import structlog
+
+from workers.completion_tracker import get_completion_tracker, normalize_runway_task
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+logger = structlog.get_logger()
+
+
+@router.post("/runway")
+async def runway_webhook(
+    request: Request,
+    provider: str = Query("runway", pattern="^(runway|runway_ml)$"),
+    x_webhook_secret: str = Header(None),
+) -> Dict[str, Any]:
+    """
+    Accept a Runway status callback.
+
+    ``provider=runway`` expects the generations payload
+    (``id``/``status``/``video_url``); ``provider=runway_ml`` expects the
+    tasks payload (``id``/``status``/``output``).
+    """
+    secret = os.getenv("RUNWAY_WEBHOOK_SECRET")
+    if not secret:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Webhooks are not configured")
+    if not x_webhook_secret or not hmac.compare_digest(x_webhook_secret, secret):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook secret")
+
+    payload = await request.json()
+    remote_id = payload.get("id")
+    if not remote_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing id")
+
+    if provider == "runway_ml":
+        event = normalize_runway_task(payload)
+    else:
+        event = {
+            "status": payload.get("status", "processing"),
+            "progress": payload.get("progress", 0),
+            "video_url": payload.get("video_url"),
+            "duration": payload.get("duration"),
+            "error": payload.get("error"),
+        }
+
+    handled = await get_completion_tracker().handle_event(provider, remote_id, event)
+    logger.info("Runway webhook received", provider=provider, remote_id=remote_id,
+                status=event["status"], handled=handled)
+
+    return {"received": True, "handled": handled}
@@ -155,12 +155,28 @@ class ProjectResponse(BaseResponse):
     updated_at: datetime
 
 
+class ProjectSummaryResponse(BaseResponse):
+    """Project list entry, without script content or metadata"""
+    id: UUID
+    user_id: UUID
+    name: str
+    description: Optional[str]
+    style: VideoStyle
+    voice_type: VoiceType
+    status: ProjectStatus
+    video_url: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+
 class ProjectListResponse(BaseResponse):
     """Project list response"""
-    items: List[ProjectResponse]
+    items: List[ProjectSummaryResponse]
     total: int
+    total_is_estimate: bool = False
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
 
 
 # Script Models
@@ -2,6 +2,10 @@
 WebSocket server for real-time updates.
 
 Provides WebSocket endpoints for job progress, system status, and real-time notifications.
+
+Topic broadcasts go through the Redis event bus so that every API process
+delivers them to its own clients; each client is fed from a bounded,
+coalescing send queue.
 """
 
 import json
@@ -13,6 +17,8 @@ from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.websockets import WebSocketState
 import structlog
 
+from src.services.event_bus import ClientChannel, EventBus
+
 logger = structlog.get_logger()
 
 
@@ -21,12 +27,33 @@ class ConnectionManager:
     
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
+        self.channels: Dict[str, ClientChannel] = {}
         self.subscriptions: Dict[str, Set[str]] = {}  # topic -> set of connection_ids
+        self.event_bus = EventBus(self.deliver_local)
+        self.dropped_clients = 0
+        
+    async def start(self):
+        """Subscribe this process to events published by workers and other API processes."""
+        await self.event_bus.start()
+        
+    async def stop(self):
+        await self.event_bus.stop()
+        for client_id in list(self.active_connections):
+            self.disconnect(client_id)
         
     async def connect(self, websocket: WebSocket, client_id: str):
         """Accept and track a new WebSocket connection."""
         await websocket.accept()
+        if client_id in self.active_connections:
+            self.disconnect(client_id)
+        
+        channel = ClientChannel(
+            websocket.send_json,
+            on_drop=lambda reason: self._drop_client(client_id, channel, reason)
+        )
         self.active_connections[client_id] = websocket
+        self.channels[client_id] = channel
+        channel.start()
         logger.info("WebSocket client connected", client_id=client_id)
         
         # Send connection confirmation
@@ -38,47 +65,64 @@ class ConnectionManager:
         
     def disconnect(self, client_id: str):
         """Remove a WebSocket connection and clean up subscriptions."""
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
+        self.active_connections.pop(client_id, None)
+        channel = self.channels.pop(client_id, None)
+        if channel:
+            channel.close()
             
         # Remove from all subscriptions
-        for topic, subscribers in self.subscriptions.items():
+        for topic in list(self.subscriptions):
+            subscribers = self.subscriptions[topic]
             subscribers.discard(client_id)
+            if not subscribers:
+                del self.subscriptions[topic]
             
         logger.info("WebSocket client disconnected", client_id=client_id)
         
     async def send_personal_message(self, message: dict, client_id: str):
-        """Send a message to a specific client."""
-        if client_id in self.active_connections:
-            websocket = self.active_connections[client_id]
-            if websocket.client_state == WebSocketState.CONNECTED:
-                try:
-                    await websocket.send_json(message)
-                except Exception as e:
-                    logger.error("Error sending message to client", 
-                                client_id=client_id, error=str(e))
+        """Queue a message for a specific client."""
+        channel = self.channels.get(client_id)
+        if channel:
+            channel.offer(message)
                     
     async def broadcast_to_topic(self, topic: str, message: dict):
-        """Broadcast a message to all clients subscribed to a topic."""
-        if topic in self.subscriptions:
-            disconnected_clients = []
+        """Broadcast a message to all clients subscribed to a topic, in every API process."""
+        await self.event_bus.publish(topic, message)
+        
+    def deliver_local(self, topic: str, message: dict):
+        """Queue a message for this process's subscribers of a topic; never blocks."""
+        for client_id in list(self.subscriptions.get(topic, ())):
+            channel = self.channels.get(client_id)
+            if channel:
+                channel.offer(message)
+                
+    def get_stats(self) -> dict:
+        return {
+            "connected_clients": len(self.active_connections),
+            "topics": len(self.subscriptions),
+            "pending_messages": sum(len(channel) for channel in self.channels.values()),
+            "dropped_clients": self.dropped_clients,
+            "event_bus": self.event_bus.get_stats()
+        }
+        
+    def _drop_client(self, client_id: str, channel: ClientChannel, reason: str):
+        """Disconnect a client that cannot keep up."""
+        if self.channels.get(client_id) is not channel:
+            return
+        websocket = self.active_connections.get(client_id)
+        self.dropped_clients += 1
+        logger.warning("Dropping slow WebSocket client", client_id=client_id, reason=reason)
+        self.disconnect(client_id)
+        if websocket is not None and websocket.client_state == WebSocketState.CONNECTED:
+            # 1013: try again later
+            asyncio.create_task(self._close_quietly(websocket, 1013))
             
-            for client_id in self.subscriptions[topic]:
-                if client_id in self.active_connections:
-                    websocket = self.active_connections[client_id]
-                    if websocket.client_state == WebSocketState.CONNECTED:
-                        try:
-                            await websocket.send_json(message)
-                        except Exception as e:
-                            logger.error("Error broadcasting to client", 
-                                        client_id=client_id, error=str(e))
-                            disconnected_clients.append(client_id)
-                    else:
-                        disconnected_clients.append(client_id)
-                        
-            # Clean up disconnected clients
-            for client_id in disconnected_clients:
-                self.disconnect(client_id)
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
                 
     def subscribe(self, client_id: str, topic: str):
         """Subscribe a client to a topic."""
@@ -147,8 +191,8 @@ class ConnectionManager:
         })
         
     async def send_system_status(self, status: dict):
-        """Send system status update to all subscribed clients."""
-        await self.broadcast_to_topic("system", {
+        """Send this process's system status to its own subscribed clients."""
+        self.deliver_local("system", {
             "type": "system_status",
             "data": status
         })
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Script Parser Benchmark
+Times full and incremental parsing of large markdown scripts against an
+interactive keystroke budget.
+
+Usage:
+    python benchmarks/script_parser_benchmark.py [--lines 10000] [--repeat 5]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.script_engine.parser import MarkdownScriptParser
+
+KEYSTROKE_BUDGET_MS = 50.0
+
+NARRATIVE = [
+    "The bodies on the rooftop wore white uniforms, arranged in perfect symmetry.",
+    "Seventeen data scientists from the Prometheus Institute jumped from the building.",
+    "Screens showing cascading code lit the empty facility with a cold, dark glow.",
+    "We must fight now, before the network learns to resist us.",
+    "Rain hammered the abandoned streets while drones drifted overhead.",
+]
+DIALOGUE = [
+    '"We can\'t stop this." - Sarah whispered.',
+    '"Get to the server room, now." — Marcus',
+    '"It was never about control."',
+]
+
+
+def generate_script(line_count: int, seed: int = 0) -> str:
+    """Build a LOG-style script of roughly line_count lines."""
+    rng = random.Random(seed)
+    lines = [
+        "# LOG_9999: BENCHMARK",
+        "",
+        "**Location**: Berlin, Sector 7",
+        "**Date**: Day 47",
+        "",
+        "---",
+    ]
+    while len(lines) < line_count:
+        for _ in range(rng.randint(10, 40)):
+            roll = rng.random()
+            if roll < 0.6:
+                lines.append(rng.choice(NARRATIVE))
+            elif roll < 0.9:
+                lines.append(rng.choice(DIALOGUE))
+            else:
+                lines.append("[SIGNAL LOST]")
+            lines.append("")
+        lines.append("---")
+    return "\n".join(lines[:line_count])
+
+
+def time_ms(func, repeat: int) -> float:
+    """Median wall time of func() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = generate_script(args.lines)
+    lines = content.split("\n")
+    middle = len(lines) // 2
+    script_parser = MarkdownScriptParser()
+
+    full = time_ms(lambda: script_parser.parse(content), args.repeat)
+
+    # A keystroke in the middle of the script, then undoing it
+    edited = "\n".join(lines[:middle] + [lines[middle] + "x"] + lines[middle + 1:])
+    script_parser.parse(content)
+    keystroke = time_ms(lambda: (script_parser.reparse(edited), script_parser.reparse(content)),
+                        args.repeat) / 2
+
+    # Inserting a new line near the top shifts every later scene
+    inserted = "\n".join(lines[:10] + [NARRATIVE[0]] + lines[10:])
+    insert = time_ms(lambda: (script_parser.reparse(inserted), script_parser.reparse(content)),
+                     args.repeat) / 2
+
+    result = script_parser.parse(content)
+    print(f"Script: {len(lines)} lines, {len(result.scenes)} scenes, {result.word_count} words")
+    print(f"Full parse:            {full:8.2f} ms")
+    print(f"Incremental keystroke: {keystroke:8.2f} ms")
+    print(f"Incremental insert:    {insert:8.2f} ms")
+    within = keystroke <= KEYSTROKE_BUDGET_MS and insert <= KEYSTROKE_BUDGET_MS
+    print(f"Keystroke budget ({KEYSTROKE_BUDGET_MS:.0f} ms): {'OK' if within else 'EXCEEDED'}")
+    return 0 if within else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Project listing indexes
+
+Composite (user_id, sort column, id) indexes for keyset pagination and
+trigram GIN indexes so ILIKE '%term%' search on name and description no
+longer scans every project.
+
+Revision ID: 0001_project_listing_indexes
+Revises:
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_project_listing_indexes'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+KEYSET_INDEXES = {
+    "ix_projects_user_created": "(user_id, created_at, id)",
+    "ix_projects_user_updated": "(user_id, updated_at, id)",
+    "ix_projects_user_name": "(user_id, name, id)",
+}
+
+TRIGRAM_INDEXES = {
+    "ix_projects_name_trgm": "USING gin (name gin_trgm_ops)",
+    "ix_projects_description_trgm": "USING gin (description gin_trgm_ops)",
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Build without locking the table against writes; IF NOT EXISTS covers
+    # databases created by init_db(), which already has these indexes
+    with op.get_context().autocommit_block():
+        for name, columns in KEYSET_INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON projects {columns}")
+        for name, using in TRIGRAM_INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON projects {using}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in list(KEYSET_INDEXES) + list(TRIGRAM_INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
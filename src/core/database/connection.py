@@ -1,44 +1,109 @@
 """
 Database connection and session management
+
+Request handlers use the asyncpg engine exclusively, so a query never
+blocks the event loop. Synchronous sessions exist only for Celery workers
+and maintenance scripts, on a separate, smaller pool that is created the
+first time a worker asks for it and never opened by API processes.
 """
-import os
-from contextlib import contextmanager, asynccontextmanager
-from typing import Generator, AsyncGenerator
+from contextlib import contextmanager
+from typing import Generator, AsyncGenerator, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import NullPool
 
 from src.core.config import settings
+from src.core.database.instrumentation import instrument_engine
+
 
+def _pool_options(pool_size: int, max_overflow: int) -> dict:
+    """Explicit pool sizing; tests get unpooled connections."""
+    if settings.TESTING:
+        return {"poolclass": NullPool}
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
 
-# Create database engine
-engine = create_engine(
-    str(settings.DATABASE_URL),
-    poolclass=NullPool if settings.TESTING else None,
+
+# Async engine for every request path
+async_engine = create_async_engine(
+    str(settings.DATABASE_URL).replace("postgresql://", "postgresql+asyncpg://"),
     echo=settings.DEBUG,
-    future=True,
+    connect_args={
+        # Reuse server-side prepared statements for repeated queries
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    },
+    **_pool_options(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW),
 )
+instrument_engine(async_engine.sync_engine)
 
-# Create session factory
-SessionLocal = sessionmaker(
-    bind=engine,
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
     autocommit=False,
     autoflush=False,
     expire_on_commit=False,
 )
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency to get database session.
+    Async dependency to get database session.
     Usage:
         @app.get("/items/")
-        def read_items(db: Session = Depends(get_db)):
-            return db.query(Item).all()
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Item))
+            return result.scalars().all()
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+# FastAPI routes depend on get_db
+get_db = get_async_db
+
+
+# Sync engine for Celery workers, created on first use
+_sync_engine: Optional[Engine] = None
+
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+def get_sync_engine() -> Engine:
+    """Get the worker-side sync engine, creating its pool on first use."""
+    global _sync_engine
+    if _sync_engine is None:
+        _sync_engine = create_engine(
+            str(settings.DATABASE_URL),
+            echo=settings.DEBUG,
+            **_pool_options(settings.DB_WORKER_POOL_SIZE, settings.DB_WORKER_MAX_OVERFLOW),
+        )
+        instrument_engine(_sync_engine)
+    return _sync_engine
+
+
+def get_sync_db() -> Generator[Session, None, None]:
+    """
+    Get a synchronous database session for Celery tasks.
+    Usage:
+        db: Session = next(get_sync_db())
+        try:
+            ...
+        finally:
+            db.close()
     """
-    db = SessionLocal()
+    db = SessionLocal(bind=get_sync_engine())
     try:
         yield db
     finally:
@@ -48,12 +113,12 @@ def get_db() -> Generator[Session, None, None]:
 @contextmanager
 def get_db_context() -> Generator[Session, None, None]:
     """
-    Context manager for database session.
+    Context manager for a synchronous session, for workers and scripts.
     Usage:
         with get_db_context() as db:
             user = db.query(User).first()
     """
-    db = SessionLocal()
+    db = SessionLocal(bind=get_sync_engine())
     try:
         yield db
         db.commit()
@@ -64,48 +129,33 @@ def get_db_context() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_pool_status() -> dict:
+    """Checked-out and idle connection counts of the request pool."""
+    pool = async_engine.pool
+    if isinstance(pool, NullPool):
+        return {"pool": "null"}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "idle": pool.checkedin(),
+    }
+
+
 def init_db() -> None:
     """Initialize database with tables"""
     from src.core.database.models import Base
-    
+
+    engine = get_sync_engine()
+    if engine.dialect.name == "postgresql":
+        # Trigram indexes on projects need the extension first
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     Base.metadata.create_all(bind=engine)
 
 
 def drop_db() -> None:
     """Drop all database tables - USE WITH CAUTION"""
     from src.core.database.models import Base
-    
-    Base.metadata.drop_all(bind=engine)
-
-
-# Async database support
-async_engine = create_async_engine(
-    str(settings.DATABASE_URL).replace("postgresql://", "postgresql+asyncpg://"),
-    echo=settings.DEBUG,
-    future=True,
-)
-
-AsyncSessionLocal = async_sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    autocommit=False,
-    autoflush=False,
-    expire_on_commit=False,
-)
-
-
-async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
-    """
-    Async dependency to get database session.
-    Usage:
-        @app.get("/items/")
-        async def read_items(db: AsyncSession = Depends(get_async_db)):
-            result = await db.execute(select(Item))
-            return result.scalars().all()
-    """
-    async with AsyncSessionLocal() as session:
-        yield session
-
 
-# For backwards compatibility with the health check
-get_db = get_async_db
\ No newline at end of file
+    Base.metadata.drop_all(bind=get_sync_engine())
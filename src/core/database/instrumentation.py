@@ -0,0 +1,89 @@
+"""
+Per-request database query instrumentation.
+
+Engine event listeners time every statement and record it against the
+QueryStats of the current request, held in a context variable so that
+concurrent requests on one event loop never mix their numbers. Statements
+are recorded with their bound parameters left as placeholders, so a lazy
+relationship loaded once per row shows up as the same SQL repeated - the
+signature of an N+1 pattern.
+"""
+import time
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Generator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_START_TIMES_KEY = "query_start_times"
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("db_query_stats", default=None)
+
+
+@dataclass
+class QueryStats:
+    """Queries executed while handling one request."""
+    count: int = 0
+    total_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least `threshold` times, most repeated first."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+    def to_dict(self) -> dict:
+        most_repeated = self.statements.most_common(1)
+        return {
+            'db_queries': self.count,
+            'db_time_ms': round(self.total_time * 1000, 1),
+            'db_max_repeats': most_repeated[0][1] if most_repeated else 0
+        }
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the request being handled, or None outside of tracking."""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Generator[QueryStats, None, None]:
+    """Record queries made in this context (and tasks spawned from it)."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info[_START_TIMES_KEY].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine):
+    """
+    Attach query timing listeners to an engine.
+
+    For an AsyncEngine pass `async_engine.sync_engine`. Safe to call twice.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
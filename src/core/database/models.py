@@ -12,6 +12,7 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -79,6 +80,18 @@ class Project(Base, TimestampMixin):
     jobs = relationship("Job", back_populates="project", cascade="all, delete-orphan")
     generation_jobs = relationship("GenerationJob", back_populates="project", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination of a user's projects for each sortable column
+        Index("ix_projects_user_created", "user_id", "created_at", "id"),
+        Index("ix_projects_user_updated", "user_id", "updated_at", "id"),
+        Index("ix_projects_user_name", "user_id", "name", "id"),
+        # Substring search; requires the pg_trgm extension
+        Index("ix_projects_name_trgm", "name",
+              postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_projects_description_trgm", "description",
+              postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+    )
+
 
 class Script(Base, TimestampMixin):
     """Script model for storing parsed scripts"""
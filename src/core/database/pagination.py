@@ -0,0 +1,119 @@
+"""
+Keyset pagination and bounded counts for list endpoints.
+
+OFFSET pagination makes the database read and discard every row before the
+requested page, so deep pages get slower as a user's data grows. A keyset
+cursor instead remembers the (sort value, id) of the last row returned and
+the next page starts strictly after it, which a composite index on
+(owner, sort column, id) answers with a range scan whatever the depth.
+
+Totals are counted over at most `cap + 1` matching rows: beyond the cap the
+exact figure is not worth a full scan and is reported as an estimate.
+"""
+import json
+import base64
+import binascii
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import DateTime, Select, func, literal, select, tuple_
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor is malformed or was issued for another ordering."""
+
+
+class Cursor(NamedTuple):
+    """Position after the last row of a page."""
+    sort_by: str
+    order: str
+    value: Any
+    id: UUID
+
+
+class Page(NamedTuple):
+    """One page of rows and the cursor for the next, if any."""
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(sort_by: str, order: str, value: Any, row_id: UUID) -> str:
+    """Encode the position of a row as an opaque URL-safe token."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_by, order, value, str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort_column, sort_by: str, order: str) -> Cursor:
+    """
+    Decode a cursor token for the given ordering.
+
+    Raises:
+        InvalidCursor: If the token is malformed or was issued for a different sort
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        cursor_sort, cursor_order, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        row_id = UUID(row_id)
+        if isinstance(sort_column.type, DateTime):
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}") from e
+
+    if (cursor_sort, cursor_order) != (sort_by, order):
+        raise InvalidCursor("Cursor was issued for a different sort order")
+    return Cursor(cursor_sort, cursor_order, value, row_id)
+
+
+def keyset_query(query: Select, sort_column, id_column, descending: bool,
+                 limit: int, cursor: Optional[Cursor] = None) -> Select:
+    """
+    Order a query by (sort column, id) and start it after the cursor.
+
+    Fetches one row more than the page size so the caller can tell whether
+    a next page exists without counting.
+    """
+    if cursor is not None:
+        key = tuple_(sort_column, id_column)
+        bound = tuple_(literal(cursor.value, sort_column.type), literal(cursor.id, id_column.type))
+        query = query.where(key < bound if descending else key > bound)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    return query.limit(limit + 1)
+
+
+def build_page(rows: Sequence[Any], limit: int, sort_by: str, order: str) -> Page:
+    """Trim the look-ahead row from a keyset query result and derive the next cursor."""
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit and items:
+        last = items[-1]
+        next_cursor = encode_cursor(sort_by, order, getattr(last, sort_by), last.id)
+    return Page(items, next_cursor)
+
+
+def bounded_count_query(query: Select, id_column, cap: int) -> Select:
+    """Count the rows of a filtered query, stopping after cap + 1."""
+    limited = query.with_only_columns(id_column).order_by(None).limit(cap + 1).subquery()
+    return select(func.count()).select_from(limited)
+
+
+async def bounded_count(db: 'AsyncSession', query: Select, id_column, cap: int) -> Tuple[int, bool]:
+    """
+    Count matching rows up to a cap.
+
+    Returns:
+        (total, is_estimate) - total is cap when more rows exist
+    """
+    total = (await db.execute(bounded_count_query(query, id_column, cap))).scalar() or 0
+    if total > cap:
+        return cap, True
+    return total, False
@@ -24,6 +24,12 @@ from .prompt_optimizer import (
     OptimizationConfig
 )
 
+from .prompt_similarity import (
+    PromptSimilarityIndex,
+    RedisPromptIndex,
+    cluster_prompts
+)
+
 __all__ = [
     'GENRE_PROMPTS',
     'CAMERA_MOVEMENTS', 
@@ -36,5 +42,8 @@ __all__ = [
     'get_compatible_genre',
     'PromptOptimizer',
     'PromptPair',
-    'OptimizationConfig'
+    'OptimizationConfig',
+    'PromptSimilarityIndex',
+    'RedisPromptIndex',
+    'cluster_prompts'
 ]
\ No newline at end of file
@@ -16,6 +16,23 @@ from .dalle3_runway_prompts import (
     PromptPair, STYLE_MODIFIERS, CAMERA_MOVEMENTS, 
     MODERATION_GUIDELINES, is_moderation_safe, sanitize_prompt
 )
+from ..utils.keyword_matcher import KeywordMatcher
+
+
+# Visual elements recognised in image prompts, reported as "category:keyword"
+KEY_ELEMENT_KEYWORDS = {
+    "environment": ["cityscape", "interior", "office", "facility", "landscape", "forest", "mountain", "ocean"],
+    "lighting": ["golden hour", "dusk", "night", "fluorescent", "natural", "dramatic"],
+    "architecture": ["building", "tower", "structure", "bridge", "corridor", "room"],
+    "atmosphere": ["fog", "mist", "smoke", "rain", "clouds", "steam"],
+}
+KEY_ELEMENT_MATCHER = KeywordMatcher(
+    keyword for keywords in KEY_ELEMENT_KEYWORDS.values() for keyword in keywords
+)
+
+STATIC_MOTION_WORDS = ["abandoned", "empty", "still", "quiet", "frozen"]
+DYNAMIC_MOTION_WORDS = ["bustling", "active", "moving", "flowing", "dynamic"]
+MOTION_MATCHER = KeywordMatcher(STATIC_MOTION_WORDS + DYNAMIC_MOTION_WORDS)
 
 
 @dataclass
@@ -244,44 +261,24 @@ class PromptOptimizer:
     
     def _extract_key_elements(self, image_prompt: str) -> List[str]:
         """Extract key visual elements from image prompt."""
-        elements = []
-        
-        # Environment types
-        environments = ["cityscape", "interior", "office", "facility", "landscape", "forest", "mountain", "ocean"]
-        for env in environments:
-            if env in image_prompt.lower():
-                elements.append(f"environment:{env}")
-        
-        # Lighting conditions
-        lighting = ["golden hour", "dusk", "night", "fluorescent", "natural", "dramatic"]
-        for light in lighting:
-            if light in image_prompt.lower():
-                elements.append(f"lighting:{light}")
-        
-        # Architectural elements
-        architecture = ["building", "tower", "structure", "bridge", "corridor", "room"]
-        for arch in architecture:
-            if arch in image_prompt.lower():
-                elements.append(f"architecture:{arch}")
-        
-        # Atmospheric elements
-        atmosphere = ["fog", "mist", "smoke", "rain", "clouds", "steam"]
-        for atmo in atmosphere:
-            if atmo in image_prompt.lower():
-                elements.append(f"atmosphere:{atmo}")
-        
-        return elements
+        found = KEY_ELEMENT_MATCHER.present(image_prompt)
+        return [
+            f"{category}:{keyword}"
+            for category, keywords in KEY_ELEMENT_KEYWORDS.items()
+            for keyword in keywords
+            if keyword in found
+        ]
     
     def _analyze_motion_potential(self, base_prompt: str, key_elements: List[str]) -> str:
         """Analyze what type of motion would work best for the scene."""
-        prompt_lower = base_prompt.lower()
+        found = MOTION_MATCHER.present(base_prompt)
         
         # Static scenes - minimal movement
-        if any(word in prompt_lower for word in ["abandoned", "empty", "still", "quiet", "frozen"]):
+        if any(word in found for word in STATIC_MOTION_WORDS):
             return "static_with_atmosphere"
         
         # Dynamic scenes - more movement
-        if any(word in prompt_lower for word in ["bustling", "active", "moving", "flowing", "dynamic"]):
+        if any(word in found for word in DYNAMIC_MOTION_WORDS):
             return "dynamic_movement"
         
         # Architectural scenes - structural movement
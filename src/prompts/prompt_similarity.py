@@ -0,0 +1,256 @@
+"""
+Near-duplicate prompt detection for reusing generated images and clips.
+
+Prompts are reduced to sets of normalized tokens (lowercased, stop words
+dropped, plurals folded), so "rooftop at night, neon" and "neon rooftop at
+night" compare as the same shot. Each set gets a MinHash signature whose
+bands are bucketed (locality-sensitive hashing): only prompts sharing a
+bucket are compared, and a candidate is accepted when the exact Jaccard
+similarity of the token sets reaches the threshold. Style and size are
+part of every bucket key, so assets are never reused across them.
+
+The in-memory index serves one process; RedisPromptIndex keeps the same
+buckets in Redis so Celery workers reuse clips across the scenes of a
+project or the episodes of a series.
+"""
+
+import os
+import re
+import json
+import random
+import hashlib
+import logging
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Minimum Jaccard similarity of token sets for two prompts to share an
+# asset; 0 disables reuse
+DEFAULT_REUSE_THRESHOLD = float(os.getenv('PROMPT_REUSE_THRESHOLD', '0.8'))
+
+STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'of', 'at', 'in', 'on', 'with', 'and', 'or', 'to', 'by',
+    'for', 'from', 'into', 'over', 'under', 'is', 'are', 'its', 'their', 'as',
+})
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def normalize_tokens(prompt: str) -> List[str]:
+    """Content words of a prompt in order, lowercased with plurals folded."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(prompt.lower()):
+        if token.endswith("'s"):
+            token = token[:-2]
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def shingles(prompt: str, ngram: int = 1) -> FrozenSet[str]:
+    """Token shingles of a prompt; ngram=1 makes the comparison order-free."""
+    tokens = normalize_tokens(prompt)
+    return frozenset(' '.join(tokens[i:i + ngram]) for i in range(len(tokens) - ngram + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _stable_hash(value: str) -> int:
+    """Process-independent 64-bit hash (str hashes are salted per process)."""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class MinHasher:
+    """MinHash signatures from a fixed family of universal hash functions."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                        for _ in range(num_perm)]
+
+    def signature(self, tokens: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [_stable_hash(token) for token in tokens]
+        if not hashes:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._params
+        )
+
+
+class PromptMatch(NamedTuple):
+    """An indexed prompt close enough to reuse."""
+    asset: Any
+    similarity: float
+
+
+class PromptSimilarityIndex:
+    """
+    In-memory LSH index of prompts and the assets generated for them.
+
+    Usage:
+        index = PromptSimilarityIndex()
+        index.add("rooftop at night, neon", "clips/rooftop.mp4", style="cinematic")
+        index.find("neon rooftop at night", style="cinematic")  # PromptMatch(...)
+    """
+
+    def __init__(self, threshold: float = DEFAULT_REUSE_THRESHOLD,
+                 num_perm: int = 64, bands: int = 16, ngram: int = 1):
+        """
+        Initialize index.
+
+        Args:
+            threshold: Minimum Jaccard similarity to reuse an asset (0 disables)
+            num_perm: MinHash signature length
+            bands: LSH bands; num_perm / bands rows each. 16 bands of 4 rows
+                find pairs at similarity 0.8 with probability above 0.999
+            ngram: Token shingle length
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ngram = ngram
+        self.hasher = MinHasher(num_perm)
+        self._buckets: Dict[str, List[int]] = {}
+        self._entries: List[Tuple[FrozenSet[str], Any]] = []
+
+    def band_keys(self, tokens: FrozenSet[str], style: str = "", size: str = "") -> List[str]:
+        """Bucket keys of a token set, one per band."""
+        signature = self.hasher.signature(tokens)
+        keys = []
+        for band in range(self.bands):
+            values = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(
+                f"{style}|{size}|{band}|{','.join(map(str, values))}".encode('utf-8'),
+                digest_size=8
+            ).hexdigest()
+            keys.append(digest)
+        return keys
+
+    def add(self, prompt: str, asset: Any, style: str = "", size: str = ""):
+        """Record the asset generated for a prompt."""
+        tokens = shingles(prompt, self.ngram)
+        if not tokens:
+            return
+        self._store(self.band_keys(tokens, style, size), tokens, asset)
+
+    def find(self, prompt: str, style: str = "", size: str = "") -> Optional[PromptMatch]:
+        """Most similar indexed prompt at or above the threshold, if any."""
+        if not self.threshold:
+            return None
+        tokens = shingles(prompt, self.ngram)
+        if not tokens:
+            return None
+
+        best = None
+        for candidate_tokens, asset in self._candidates(self.band_keys(tokens, style, size)):
+            similarity = jaccard(tokens, candidate_tokens)
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = PromptMatch(asset, similarity)
+        return best
+
+    def _store(self, band_keys: List[str], tokens: FrozenSet[str], asset: Any):
+        entry_id = len(self._entries)
+        self._entries.append((tokens, asset))
+        for key in band_keys:
+            self._buckets.setdefault(key, []).append(entry_id)
+
+    def _candidates(self, band_keys: List[str]) -> Iterable[Tuple[FrozenSet[str], Any]]:
+        entry_ids = {entry_id for key in band_keys for entry_id in self._buckets.get(key, ())}
+        return [self._entries[entry_id] for entry_id in sorted(entry_ids)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisPromptIndex(PromptSimilarityIndex):
+    """
+    Prompt index shared through Redis, scoped to a project or series.
+
+    Entries live in one hash per scope and each LSH bucket is a set of
+    entry ids, so a lookup is one pipelined round trip for the buckets and
+    one HMGET for the candidates. Assets must be JSON-serializable.
+    """
+
+    KEY_PREFIX = "prompt_index:{scope}"
+
+    def __init__(self, redis_client, scope: str, ttl: int = 30 * 24 * 3600, **kwargs):
+        """
+        Initialize index.
+
+        Args:
+            redis_client: Synchronous Redis client
+            scope: Project or series the index is shared within
+            ttl: Seconds an idle scope is kept
+            **kwargs: PromptSimilarityIndex settings
+        """
+        super().__init__(**kwargs)
+        self.redis = redis_client
+        self.ttl = ttl
+        self.prefix = self.KEY_PREFIX.format(scope=scope)
+        self.entries_key = f"{self.prefix}:entries"
+
+    def _bucket_key(self, band_key: str) -> str:
+        return f"{self.prefix}:band:{band_key}"
+
+    def _store(self, band_keys: List[str], tokens: FrozenSet[str], asset: Any):
+        entry_id = hashlib.blake2b(
+            '|'.join([*band_keys, *sorted(tokens)]).encode('utf-8'), digest_size=8
+        ).hexdigest()
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(self.entries_key, entry_id, json.dumps({'tokens': sorted(tokens), 'asset': asset}))
+        pipe.expire(self.entries_key, self.ttl)
+        for key in band_keys:
+            pipe.sadd(self._bucket_key(key), entry_id)
+            pipe.expire(self._bucket_key(key), self.ttl)
+        pipe.execute()
+
+    def _candidates(self, band_keys: List[str]) -> Iterable[Tuple[FrozenSet[str], Any]]:
+        pipe = self.redis.pipeline(transaction=False)
+        for key in band_keys:
+            pipe.smembers(self._bucket_key(key))
+        entry_ids = sorted(set().union(*pipe.execute()))
+        if not entry_ids:
+            return []
+
+        candidates = []
+        for raw in self.redis.hmget(self.entries_key, entry_ids):
+            if raw is not None:
+                entry = json.loads(raw)
+                candidates.append((frozenset(entry['tokens']), entry['asset']))
+        return candidates
+
+    def __len__(self) -> int:
+        return self.redis.hlen(self.entries_key)
+
+
+def cluster_prompts(prompts: List[str], threshold: float = DEFAULT_REUSE_THRESHOLD,
+                    style: str = "", size: str = "") -> List[int]:
+    """
+    Group near-duplicate prompts.
+
+    Returns, for every prompt, the index of its cluster's representative:
+    the first prompt of the cluster, which maps to itself.
+    """
+    index = PromptSimilarityIndex(threshold=threshold)
+    representatives = []
+    for position, prompt in enumerate(prompts):
+        match = index.find(prompt, style, size)
+        if match is None:
+            index.add(prompt, position, style, size)
+            representatives.append(position)
+        else:
+            representatives.append(match.asset)
+    return representatives
@@ -7,7 +7,10 @@ from dataclasses import dataclass, field
 from collections import Counter
 import re
 import logging
+from ..utils.keyword_matcher import KeywordMatcher
+from ..utils.result_cache import ResultCache, get_result_cache
 from .parser import ParsedScript, Scene, SceneElement, Narrative, Dialogue, SceneDescription
+from .serialization import pack, unpack, script_digest
 
 logger = logging.getLogger(__name__)
 
@@ -93,9 +96,33 @@ class ScriptAnalyzer:
         'sci-fi': ['technology', 'future', 'AI', 'data', 'digital', 'cyber'],
         'apocalyptic': ['end', 'collapse', 'survival', 'disaster', 'aftermath']
     }
+    THEME_MATCHER = KeywordMatcher(
+        keyword for keywords in THEME_PATTERNS.values() for keyword in keywords
+    )
     
-    def __init__(self):
-        """Initialize the analyzer."""
+    MOOD_KEYWORDS = {
+        'tense': ['urgent', 'desperate', 'panic', 'rush', 'escape'],
+        'dark': ['death', 'suicide', 'horror', 'nightmare', 'terror'],
+        'hopeful': ['hope', 'light', 'save', 'rescue', 'survive'],
+        'mysterious': ['unknown', 'strange', 'puzzle', 'secret', 'hidden'],
+        'action': ['fight', 'run', 'chase', 'attack', 'defend']
+    }
+    MOOD_MATCHER = KeywordMatcher(
+        keyword for keywords in MOOD_KEYWORDS.values() for keyword in keywords
+    )
+    
+    # Bump when analysis output changes, so cached results are not reused
+    VERSION = "1"
+    
+    def __init__(self, cache: Optional[ResultCache] = None):
+        """
+        Initialize the analyzer.
+        
+        Args:
+            cache: Result cache shared with other processes (defaults to the
+                process-wide cache)
+        """
+        self.cache = cache if cache is not None else get_result_cache()
         self.reset()
     
     def reset(self):
@@ -117,6 +144,21 @@ class ScriptAnalyzer:
         self.reset()
         self.current_script = script
         
+        # Analysis is a pure function of the parsed script, so identical
+        # scripts share one entry whichever process parsed them. Scripts
+        # built by hand, without a source hash, are keyed by their contents.
+        analysis = self.cache.get_or_compute(
+            'script_analysis', self.VERSION, '',
+            lambda: self._analyze(script),
+            encode=pack,
+            decode=lambda data: unpack(data, ScriptAnalysis),
+            digest=script.source_hash or script_digest(script)
+        )
+        self.scene_analyses = analysis.scenes
+        return analysis
+    
+    def _analyze(self, script: ParsedScript) -> ScriptAnalysis:
+        """Run every analysis pass over a script."""
         # Analyze individual scenes
         for scene in script.scenes:
             self.scene_analyses.append(self._analyze_scene(scene))
@@ -375,14 +417,15 @@ class ScriptAnalyzer:
         
         # Count theme keyword occurrences
         all_text = ' '.join(
-            elem.content.lower() 
+            elem.content
             for scene in script.scenes 
             for elem in scene.elements
         )
+        keyword_counts = self.THEME_MATCHER.counts(all_text)
         
         for theme, keywords in self.THEME_PATTERNS.items():
             for keyword in keywords:
-                theme_scores[theme] += all_text.count(keyword.lower())
+                theme_scores[theme] += keyword_counts[keyword]
         
         # Return themes with significant presence
         detected_themes = [
@@ -397,22 +440,14 @@ class ScriptAnalyzer:
     
     def _detect_scene_mood(self, scene: Scene) -> str:
         """Detect the dominant mood of a scene."""
-        mood_keywords = {
-            'tense': ['urgent', 'desperate', 'panic', 'rush', 'escape'],
-            'dark': ['death', 'suicide', 'horror', 'nightmare', 'terror'],
-            'hopeful': ['hope', 'light', 'save', 'rescue', 'survive'],
-            'mysterious': ['unknown', 'strange', 'puzzle', 'secret', 'hidden'],
-            'action': ['fight', 'run', 'chase', 'attack', 'defend']
-        }
-        
-        mood_scores = {mood: 0 for mood in mood_keywords}
+        mood_scores = {mood: 0 for mood in self.MOOD_KEYWORDS}
         
         for elem in scene.elements:
-            text_lower = elem.content.lower()
-            for mood, keywords in mood_keywords.items():
-                for keyword in keywords:
-                    if keyword in text_lower:
-                        mood_scores[mood] += 1
+            found = self.MOOD_MATCHER.present(elem.content)
+            if not found:
+                continue
+            for mood, keywords in self.MOOD_KEYWORDS.items():
+                mood_scores[mood] += sum(1 for keyword in keywords if keyword in found)
         
         # Return mood with highest score, default to 'neutral'
         if any(mood_scores.values()):
@@ -0,0 +1,65 @@
+"""
+Single-pass line lexer for markdown format scripts.
+
+Every line is classified by one precompiled regular expression whose
+alternatives are tried in the parser's priority order, so a line costs a
+single match call regardless of how many line types exist. The lexer is
+stateless: whether a list item belongs to a metadata section is decided by
+the parser, which keeps re-lexing any subset of lines safe.
+"""
+
+import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+# Token kinds
+BLANK = "blank"
+TITLE = "title"
+METADATA = "metadata"
+SCENE_BREAK = "scene_break"
+LIST_ITEM = "list_item"
+DIALOGUE = "dialogue"
+BRACKET = "bracket"
+TEXT = "text"
+
+# Alternatives in priority order; each must span the whole (stripped) line
+LINE_PATTERN = re.compile(
+    r'(?P<title># .*)'
+    r'|(?P<metadata>\*\*(?P<meta_key>.+?)\*\*:\s*(?P<meta_value>.+))'
+    r'|(?P<scene_break>(?:---+|\*\*\*+|___+)\s*)'
+    r'|(?P<list_item>- .*)'
+    r'|(?P<dialogue>"(?P<dialogue_text>.+?)"(?:\s*[-—]\s*(?P<speaker>.+))?)'
+    r'|(?P<bracket>\[.*\])'
+)
+
+
+class Token(NamedTuple):
+    """One classified script line."""
+    kind: str
+    line_number: int  # 1-based
+    text: str  # stripped line
+    groups: Tuple[Optional[str], ...] = ()  # kind-specific captures
+
+
+def lex_line(line: str, line_number: int) -> Token:
+    """Classify a single raw line."""
+    text = line.strip()
+    if not text:
+        return Token(BLANK, line_number, text)
+
+    match = LINE_PATTERN.fullmatch(text)
+    if match is None:
+        return Token(TEXT, line_number, text)
+
+    kind = match.lastgroup
+    if kind == METADATA:
+        return Token(kind, line_number, text, (match.group('meta_key'), match.group('meta_value')))
+    if kind == DIALOGUE:
+        return Token(kind, line_number, text, (match.group('dialogue_text'), match.group('speaker')))
+    return Token(kind, line_number, text)
+
+
+def tokenize(lines: List[str], start: int = 0, end: Optional[int] = None) -> Iterator[Token]:
+    """Lex lines[start:end], numbering them by their position in the script."""
+    end = len(lines) if end is None else end
+    for index in range(start, end):
+        yield lex_line(lines[index], index + 1)
@@ -3,12 +3,18 @@ Script parser module for processing markdown and screenplay format scripts.
 """
 
 import re
-from typing import Dict, List, Any, Optional, Tuple, Union
+import hashlib
+from bisect import bisect_right
+from typing import Dict, FrozenSet, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from abc import ABC, abstractmethod
 import logging
 
+from . import lexer
+from ..utils.keyword_matcher import KeywordMatcher, groups_present
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,8 +35,8 @@ class ScriptMetadata:
 class SceneElement:
     """Base class for scene elements."""
     type: str
-    content: str
-    line_number: int
+    content: str = ""
+    line_number: int = 0
     timing_estimate: float = 0.0  # in seconds
 
 
@@ -80,6 +86,72 @@ class ParsedScript:
     visual_cues: List[str]
     narrative_segments: List[Narrative]
     dialogue_segments: List[Dialogue]
+    source_hash: str = ""  # identifies the source text and the parser that read it
+
+
+@dataclass
+class ScriptBlock:
+    """Lines between two scene breaks and the elements they parsed to."""
+    start: int  # index of the first line
+    end: int    # index of the terminating scene break, or the line count
+    elements: List[SceneElement] = field(default_factory=list)
+    metadata_ops: List[Tuple[str, str, str]] = field(default_factory=list)  # (kind, key, value)
+    word_count: int = 0
+
+
+# Descriptive phrases worth turning into visual prompts
+VISUAL_CUE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'(?:bodies?|people?|figures?)\s+(?:on|in|at)\s+(?:the\s+)?(\w+)',
+    r'(?:wearing|dressed in|wore)\s+(\w+(?:\s+\w+)*)',
+    r'(?:arranged|positioned|placed)\s+(?:in\s+)?(\w+(?:\s+\w+)*)',
+    r'(\d+)\s+(?:programmers?|scientists?|people)',
+    r'(?:facility|building|room|center)\s+(?:with\s+)?(\w+(?:\s+\w+)*)',
+    r'(?:screens?|monitors?|displays?)\s+(?:showing|displaying)\s+(\w+(?:\s+\w+)*)',
+    r'(?:jumped|fell|dropped)\s+(?:from\s+)?(?:the\s+)?(\w+)',
+]]
+
+# Words one of which must occur for the matching pattern above to match;
+# a keyword scan is far cheaper than running a pattern that cannot match
+VISUAL_CUE_TRIGGERS = [
+    ('bodie', 'peopl', 'figure'),
+    ('wearing', 'dressed in', 'wore'),
+    ('arranged', 'positioned', 'placed'),
+    tuple('0123456789'),
+    ('facility', 'building', 'room', 'center'),
+    ('screen', 'monitor', 'display'),
+    ('jumped', 'fell', 'dropped'),
+]
+
+ATMOSPHERIC_KEYWORDS = [
+    'dark', 'bright', 'gloomy', 'empty', 'crowded', 'abandoned',
+    'destroyed', 'burning', 'frozen', 'silent', 'chaotic'
+]
+
+EMOTION_KEYWORDS = {
+    'despair': ['suicide', 'death', 'lost', 'jumped', 'bodies'],
+    'fear': ['terror', 'afraid', 'scared', 'horror', 'nightmare'],
+    'urgency': ['attempt', 'trying', 'must', 'now', 'immediately'],
+    'hopeless': ['can\'t', 'impossible', 'failed', 'futile'],
+    'determined': ['will', 'must', 'fight', 'resist', 'attempt']
+}
+
+# Cue triggers, atmosphere words and emotions are all found in one pass
+ELEMENT_KEYWORD_MATCHER = KeywordMatcher(
+    [trigger for triggers in VISUAL_CUE_TRIGGERS for trigger in triggers]
+    + ATMOSPHERIC_KEYWORDS
+    + [keyword for keywords in EMOTION_KEYWORDS.values() for keyword in keywords]
+)
+
+
+@lru_cache(maxsize=1)
+def element_keywords(text: str) -> FrozenSet[str]:
+    """
+    Vocabulary keywords present in text.
+
+    Parsing asks for the visual cues and then the tone of each element, so
+    the most recent scan is kept for the second call.
+    """
+    return frozenset(ELEMENT_KEYWORD_MATCHER.present(text))
 
 
 class BaseScriptParser(ABC):
@@ -89,10 +161,19 @@ class BaseScriptParser(ABC):
     WORDS_PER_MINUTE_NARRATION = 150  # Slower for dramatic effect
     WORDS_PER_MINUTE_DIALOGUE = 180   # Natural speech pace
     
+    # Bump when parse output changes, so cached results are not reused
+    VERSION = "1"
+    
     def __init__(self):
         """Initialize the parser."""
         self.reset()
     
+    def source_hash(self, content: str) -> str:
+        """SHA-256 of content, salted with the parser class and version."""
+        digest = hashlib.sha256(f"{type(self).__name__}:{self.VERSION}\n".encode('utf-8'))
+        digest.update(content.encode('utf-8'))
+        return digest.hexdigest()
+    
     def reset(self):
         """Reset parser state."""
         self.metadata = ScriptMetadata()
@@ -134,30 +215,17 @@ class BaseScriptParser(ABC):
         """
         visual_cues = []
         
+        found = element_keywords(text)
+        
         # Look for descriptive phrases
-        descriptive_patterns = [
-            r'(?:bodies?|people?|figures?)\s+(?:on|in|at)\s+(?:the\s+)?(\w+)',
-            r'(?:wearing|dressed in|wore)\s+(\w+(?:\s+\w+)*)',
-            r'(?:arranged|positioned|placed)\s+(?:in\s+)?(\w+(?:\s+\w+)*)',
-            r'(\d+)\s+(?:programmers?|scientists?|people)',
-            r'(?:facility|building|room|center)\s+(?:with\s+)?(\w+(?:\s+\w+)*)',
-            r'(?:screens?|monitors?|displays?)\s+(?:showing|displaying)\s+(\w+(?:\s+\w+)*)',
-            r'(?:jumped|fell|dropped)\s+(?:from\s+)?(?:the\s+)?(\w+)',
-        ]
-        
-        for pattern in descriptive_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                visual_cues.append(match.group(0))
+        for pattern, triggers in zip(VISUAL_CUE_PATTERNS, VISUAL_CUE_TRIGGERS):
+            if any(trigger in found for trigger in triggers):
+                for match in pattern.finditer(text):
+                    visual_cues.append(match.group(0))
         
         # Look for emotional/atmospheric descriptions
-        atmospheric_keywords = [
-            'dark', 'bright', 'gloomy', 'empty', 'crowded', 'abandoned',
-            'destroyed', 'burning', 'frozen', 'silent', 'chaotic'
-        ]
-        
-        for keyword in atmospheric_keywords:
-            if keyword in text.lower():
+        for keyword in ATMOSPHERIC_KEYWORDS:
+            if keyword in found:
                 visual_cues.append(f"atmosphere: {keyword}")
         
         return visual_cues
@@ -173,26 +241,20 @@ class BaseScriptParser(ABC):
             Emotional tone description
         """
         # Simple keyword-based detection
-        emotions = {
-            'despair': ['suicide', 'death', 'lost', 'jumped', 'bodies'],
-            'fear': ['terror', 'afraid', 'scared', 'horror', 'nightmare'],
-            'urgency': ['attempt', 'trying', 'must', 'now', 'immediately'],
-            'hopeless': ['can\'t', 'impossible', 'failed', 'futile'],
-            'determined': ['will', 'must', 'fight', 'resist', 'attempt']
-        }
-        
-        text_lower = text.lower()
-        detected_emotions = []
-        
-        for emotion, keywords in emotions.items():
-            if any(keyword in text_lower for keyword in keywords):
-                detected_emotions.append(emotion)
+        detected_emotions = groups_present(EMOTION_KEYWORDS, element_keywords(text))
         
         return ', '.join(detected_emotions) if detected_emotions else 'neutral'
 
 
 class MarkdownScriptParser(BaseScriptParser):
-    """Parser for markdown format scripts like LOG files."""
+    """
+    Parser for markdown format scripts like LOG files.
+    
+    Lines are classified by the single-pass lexer and grouped into blocks
+    between scene breaks, the script's scene-level syntax tree. The blocks
+    of the last parse are kept so that reparse() can re-lex and re-analyze
+    only the scenes an edit touched.
+    """
     
     def __init__(self):
         """Initialize the markdown parser."""
@@ -200,6 +262,8 @@ class MarkdownScriptParser(BaseScriptParser):
         self.metadata_pattern = re.compile(r'^\*\*(.+?)\*\*:\s*(.+)$', re.MULTILINE)
         self.dialogue_pattern = re.compile(r'^"(.+?)"(?:\s*[-—]\s*(.+))?$', re.MULTILINE)
         self.scene_break_pattern = re.compile(r'^(?:---+|\*\*\*+|___+)\s*$', re.MULTILINE)
+        self._lines: Optional[List[str]] = None
+        self._blocks: List[ScriptBlock] = []
         
     def parse(self, content: str) -> ParsedScript:
         """
@@ -211,115 +275,176 @@ class MarkdownScriptParser(BaseScriptParser):
         Returns:
             Parsed script data
         """
-        self.reset()
-        
         lines = content.split('\n')
-        current_scene_elements = []
-        current_scene_number = 1
+        self._lines = lines
+        self._blocks = self._parse_blocks(lines, 0, len(lines))
+        return self._assemble(self._blocks, content)
+    
+    def reparse(self, content: str) -> ParsedScript:
+        """
+        Parse an edited version of the previously parsed script.
+        
+        The edit range is the span between the longest common leading and
+        trailing runs of lines; only the scenes it touches are re-lexed and
+        re-analyzed. Elements of later scenes are reused with their line
+        numbers shifted in place, so the previous result should be treated
+        as superseded.
+        
+        Args:
+            content: Full edited markdown content
+            
+        Returns:
+            Parsed script data, identical to parse(content)
+        """
+        if self._lines is None:
+            return self.parse(content)
+        
+        old, new = self._lines, content.split('\n')
+        limit = min(len(old), len(new))
+        prefix = 0
+        while prefix < limit and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+            suffix += 1
+        if prefix == len(old) == len(new):
+            return self._assemble(self._blocks, content)
+        
+        blocks = self._blocks
+        starts = [block.start for block in blocks]
+        first = max(bisect_right(starts, prefix) - 1, 0)
+        
+        # Stop before the first unchanged scene break after the edit
+        changed_end = len(old) - suffix
+        last = first
+        while last < len(blocks) - 1 and blocks[last].end < changed_end:
+            last += 1
+        stop = blocks[last].end
+        shift = len(new) - len(old)
+        
+        reparsed = self._parse_blocks(new, blocks[first].start, stop + shift)
+        for block in blocks[last + 1:]:
+            block.start += shift
+            block.end += shift
+            if shift:
+                for element in block.elements:
+                    element.line_number += shift
+        
+        self._lines = new
+        self._blocks = blocks[:first] + reparsed + blocks[last + 1:]
+        return self._assemble(self._blocks, content)
+    
+    def _parse_blocks(self, lines: List[str], start: int, stop: int) -> List[ScriptBlock]:
+        """
+        Lex and analyze lines[start:stop] into blocks.
+        
+        start must begin a block and stop must be a scene break or the end
+        of the script.
+        """
+        blocks = []
+        block = ScriptBlock(start=start, end=stop)
         in_metadata_section = False
         
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
+        for token in lexer.tokenize(lines, start, stop):
+            kind = token.kind
             
-            # Skip empty lines
-            if not line:
-                i += 1
+            if kind == lexer.BLANK:
                 continue
             
-            # Check for title (H1 heading)
-            if line.startswith('# '):
-                self.metadata.title = line[2:].strip()
-                i += 1
+            if kind == lexer.TITLE:
+                block.metadata_ops.append(('title', token.text[2:].strip(), ''))
                 continue
             
-            # Check for metadata section
-            if self.metadata_pattern.match(line):
-                self._parse_metadata_line(line)
+            if kind == lexer.METADATA:
+                key, value = token.groups
+                block.metadata_ops.append(('metadata', key, value))
                 in_metadata_section = True
-                i += 1
                 continue
             
-            # Check for scene break
-            if self.scene_break_pattern.match(line):
-                if current_scene_elements:
-                    scene = self._create_scene(
-                        f"scene_{current_scene_number}",
-                        current_scene_number,
-                        current_scene_elements
-                    )
-                    self.scenes.append(scene)
-                    current_scene_elements = []
-                    current_scene_number += 1
+            if kind == lexer.SCENE_BREAK:
+                block.end = token.line_number - 1
+                blocks.append(block)
+                block = ScriptBlock(start=token.line_number, end=stop)
                 in_metadata_section = False
-                i += 1
                 continue
             
-            # Check for metadata list items
-            if line.startswith('- ') and in_metadata_section:
-                key_value = line[2:].strip()
+            # Metadata list items; outside a metadata section they are narrative
+            if kind == lexer.LIST_ITEM and in_metadata_section:
+                key_value = token.text[2:].strip()
                 if ':' in key_value:
                     key, value = key_value.split(':', 1)
-                    self.metadata.raw_metadata[key.strip()] = value.strip()
-                i += 1
+                    block.metadata_ops.append(('raw', key.strip(), value.strip()))
                 continue
             
-            # Check for dialogue
-            dialogue_match = self.dialogue_pattern.match(line)
-            if dialogue_match:
-                dialogue = Dialogue(
-                    content=dialogue_match.group(1),
-                    line_number=i + 1,
-                    speaker=dialogue_match.group(2) or "Unknown"
+            if kind == lexer.DIALOGUE:
+                text, speaker = token.groups
+                element = Dialogue(
+                    content=text,
+                    line_number=token.line_number,
+                    speaker=speaker or "Unknown"
                 )
-                dialogue.timing_estimate = self.calculate_timing(dialogue.content, True)
-                current_scene_elements.append(dialogue)
-                self.dialogue_segments.append(dialogue)
-                
-                # Add speaker to characters
-                if dialogue.speaker != "Unknown":
-                    self.characters.add(dialogue.speaker)
-                i += 1
-                continue
+                element.timing_estimate = self.calculate_timing(element.content, True)
             
-            # Check for bracketed sections (scene transitions, technical notes)
-            if line.startswith('[') and line.endswith(']'):
-                scene_desc = SceneDescription(
-                    content=line[1:-1],
-                    line_number=i + 1
+            # Bracketed sections (scene transitions, technical notes)
+            elif kind == lexer.BRACKET:
+                element = SceneDescription(
+                    content=token.text[1:-1],
+                    line_number=token.line_number
                 )
-                scene_desc.timing_estimate = 2.0  # Fixed timing for transitions
-                current_scene_elements.append(scene_desc)
-                i += 1
-                continue
+                element.timing_estimate = 2.0  # Fixed timing for transitions
             
             # Otherwise it's narrative text
-            narrative = Narrative(
-                content=line,
-                line_number=i + 1
-            )
-            narrative.timing_estimate = self.calculate_timing(narrative.content)
-            narrative.visual_cues = self.extract_visual_cues(narrative.content)
-            narrative.emotional_tone = self.detect_emotional_tone(narrative.content)
-            
-            current_scene_elements.append(narrative)
-            self.narrative_segments.append(narrative)
-            self.visual_cues.extend(narrative.visual_cues)
+            else:
+                element = Narrative(
+                    content=token.text,
+                    line_number=token.line_number
+                )
+                element.timing_estimate = self.calculate_timing(element.content)
+                element.visual_cues = self.extract_visual_cues(element.content)
+                element.emotional_tone = self.detect_emotional_tone(element.content)
             
-            i += 1
+            block.elements.append(element)
+            block.word_count += len(element.content.split())
         
-        # Add final scene if exists
-        if current_scene_elements:
-            scene = self._create_scene(
-                f"scene_{current_scene_number}",
-                current_scene_number,
-                current_scene_elements
-            )
-            self.scenes.append(scene)
+        blocks.append(block)
+        return blocks
+    
+    def _assemble(self, blocks: List[ScriptBlock], content: str) -> ParsedScript:
+        """Build the parsed script from analyzed blocks."""
+        self.reset()
+        scene_number = 1
+        
+        for block in blocks:
+            for kind, key, value in block.metadata_ops:
+                if kind == 'title':
+                    self.metadata.title = key
+                elif kind == 'metadata':
+                    self._apply_metadata(key, value)
+                else:
+                    self.metadata.raw_metadata[key] = value
+            
+            for element in block.elements:
+                if isinstance(element, Dialogue):
+                    self.dialogue_segments.append(element)
+                    # Add speaker to characters
+                    if element.speaker != "Unknown":
+                        self.characters.add(element.speaker)
+                elif isinstance(element, Narrative):
+                    self.narrative_segments.append(element)
+                    self.visual_cues.extend(element.visual_cues)
+            
+            if block.elements:
+                scene = self._create_scene(
+                    f"scene_{scene_number}",
+                    scene_number,
+                    list(block.elements)
+                )
+                self.scenes.append(scene)
+                scene_number += 1
         
         # Calculate totals
         total_duration = sum(scene.total_duration for scene in self.scenes)
-        word_count = sum(len(elem.content.split()) for scene in self.scenes for elem in scene.elements)
+        word_count = sum(block.word_count for block in blocks)
         
         return ParsedScript(
             metadata=self.metadata,
@@ -329,30 +454,33 @@ class MarkdownScriptParser(BaseScriptParser):
             word_count=word_count,
             visual_cues=self.visual_cues,
             narrative_segments=self.narrative_segments,
-            dialogue_segments=self.dialogue_segments
+            dialogue_segments=self.dialogue_segments,
+            source_hash=self.source_hash(content)
         )
     
     def _parse_metadata_line(self, line: str):
         """Parse a metadata line."""
         match = self.metadata_pattern.match(line)
         if match:
-            key = match.group(1).lower()
-            value = match.group(2)
-            
-            if key == 'location':
-                self.metadata.location = value
-            elif key == 'date':
-                self.metadata.date = value
-            elif key == 'reporter':
-                self.metadata.reporter = value
-            elif key == 'duration':
-                self.metadata.duration = value
-            elif key == 'corruption':
-                self.metadata.corruption = value
-            elif key == 'recovery status':
-                self.metadata.recovery_status = value
-            else:
-                self.metadata.raw_metadata[key] = value
+            self._apply_metadata(match.group(1), match.group(2))
+    
+    def _apply_metadata(self, key: str, value: str):
+        """Store a metadata value under its field."""
+        key = key.lower()
+        if key == 'location':
+            self.metadata.location = value
+        elif key == 'date':
+            self.metadata.date = value
+        elif key == 'reporter':
+            self.metadata.reporter = value
+        elif key == 'duration':
+            self.metadata.duration = value
+        elif key == 'corruption':
+            self.metadata.corruption = value
+        elif key == 'recovery status':
+            self.metadata.recovery_status = value
+        else:
+            self.metadata.raw_metadata[key] = value
     
     def _create_scene(self, scene_id: str, number: int, elements: List[SceneElement]) -> Scene:
         """Create a scene from elements."""
@@ -475,7 +603,8 @@ class ScreenplayScriptParser(BaseScriptParser):
             word_count=word_count,
             visual_cues=self.visual_cues,
             narrative_segments=self.narrative_segments,
-            dialogue_segments=self.dialogue_segments
+            dialogue_segments=self.dialogue_segments,
+            source_hash=self.source_hash(content)
         )
     
     def _parse_screenplay(self, content: str) -> Dict[str, Any]:
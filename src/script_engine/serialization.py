@@ -0,0 +1,92 @@
+"""
+Compact msgpack serialization of parse and analysis results.
+
+Dataclasses are packed as plain maps and rebuilt from their field type
+hints, so tuples, optional fields and the scene element subclasses (told
+apart by their `type` field) survive the round trip.
+"""
+
+import dataclasses
+import hashlib
+import typing
+from functools import lru_cache
+from typing import Any, Dict, Type, TypeVar
+
+import msgpack
+
+from .parser import (
+    ParsedScript, SceneElement, Narrative, Dialogue, SceneDescription
+)
+
+T = TypeVar('T')
+
+ELEMENT_TYPES: Dict[str, Type[SceneElement]] = {
+    'narrative': Narrative,
+    'dialogue': Dialogue,
+    'scene_description': SceneDescription,
+}
+
+
+def _to_builtin(value: Any) -> Any:
+    if dataclasses.is_dataclass(value):
+        return {f.name: _to_builtin(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_builtin(item) for key, item in value.items()}
+    return value
+
+
+@lru_cache(maxsize=None)
+def _field_types(cls: type) -> Dict[str, Any]:
+    return typing.get_type_hints(cls)
+
+
+def _from_builtin(hint: Any, value: Any) -> Any:
+    if value is None:
+        return None
+
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+    if origin is typing.Union:
+        # Optional[X]
+        return _from_builtin(next(arg for arg in args if arg is not type(None)), value)
+    if origin is list:
+        return [_from_builtin(args[0], item) for item in value] if args else list(value)
+    if origin is tuple:
+        if len(args) == 2 and args[1] is Ellipsis:
+            return tuple(_from_builtin(args[0], item) for item in value)
+        return tuple(_from_builtin(arg, item) for arg, item in zip(args, value)) if args else tuple(value)
+    if origin is dict:
+        return {key: _from_builtin(args[1], item) for key, item in value.items()} if args else dict(value)
+
+    if isinstance(hint, type) and dataclasses.is_dataclass(hint):
+        if hint is SceneElement:
+            hint = ELEMENT_TYPES.get(value.get('type'), SceneElement)
+        types = _field_types(hint)
+        return hint(**{name: _from_builtin(types[name], item) for name, item in value.items()
+                       if name in types})
+    return value
+
+
+def pack(obj: Any) -> bytes:
+    """Serialize a result dataclass (or plain data) to msgpack bytes."""
+    return msgpack.packb(_to_builtin(obj), use_bin_type=True)
+
+
+def unpack(data: bytes, cls: Type[T]) -> T:
+    """Rebuild an instance of cls from pack() output."""
+    return _from_builtin(cls, msgpack.unpackb(data, raw=False, strict_map_key=False))
+
+
+def pack_script(script: ParsedScript) -> bytes:
+    return pack(script)
+
+
+def unpack_script(data: bytes) -> ParsedScript:
+    return unpack(data, ParsedScript)
+
+
+def script_digest(script: ParsedScript) -> str:
+    """Stable hash of a parsed script's contents."""
+    return hashlib.sha256(pack_script(script)).hexdigest()
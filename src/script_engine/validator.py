@@ -6,6 +6,7 @@ from typing import Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, field
 import re
 import logging
+from ..utils.keyword_matcher import KeywordMatcher
 from .parser import ParsedScript, Scene, SceneElement, Narrative, Dialogue, SceneDescription
 
 logger = logging.getLogger(__name__)
@@ -68,6 +69,9 @@ class ScriptValidator:
         'email': ['e-mail', 'electronic mail'],
         'website': ['web site', 'web-site']
     }
+    TECHNICAL_TERM_MATCHER = KeywordMatcher(
+        variant for variants in TECHNICAL_TERMS.values() for variant in variants
+    )
     
     def __init__(self):
         """Initialize the validator."""
@@ -319,11 +323,9 @@ class ScriptValidator:
                 break
         
         # Check for inconsistent terminology
+        found_terms = self.TECHNICAL_TERM_MATCHER.present(content)
         for standard, variants in self.TECHNICAL_TERMS.items():
-            found_variants = []
-            for variant in variants:
-                if variant.lower() in content.lower():
-                    found_variants.append(variant)
+            found_variants = [variant for variant in variants if variant in found_terms]
             
             if found_variants:
                 result.issues.append(ValidationIssue(
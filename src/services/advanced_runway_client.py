@@ -16,15 +16,21 @@ from pathlib import Path
 
 from .stable_video_diffusion import StableVideoDiffusionService
 from .modelscope_video import ModelScopeVideoService
-from .visual_effects_engine import VisualEffectsEngine, ParticleType, LightType
+from .visual_effects_engine import VisualEffectsEngine, Light, ParticleType, LightType
 from .gpu_accelerated_ffmpeg import GPUAcceleratedFFmpeg
 from ..config.visual_styles import VisualStyleManager, StyleCategory
 from ..terminal_sim.advanced_effects import MatrixRainEffect, HologramEffect, RetroComputerEffect
 from ..terminal_sim.font_manager import FontManager
 from .ffmpeg_service import FFmpegService
+from ..utils.render_cache import (
+    child_seed, get_render_cache, make_np_rng, make_rng, render_key, render_seed
+)
 
 logger = logging.getLogger(__name__)
 
+# Bump to invalidate cached renders after changing the procedural renderer
+ENHANCED_RENDER_VERSION = 1
+
 
 class AdvancedRunwayClient:
     """
@@ -177,7 +183,8 @@ class AdvancedRunwayClient:
             else:
                 # Enhanced procedural generation
                 video_path = await self._generate_enhanced_video(
-                    prompt, duration, job_data['style'], (width, height), fps, style_config
+                    prompt, duration, job_data['style'], (width, height), fps, style_config,
+                    job_data['seed']
                 )
             
             job_data['progress'] = 50
@@ -222,13 +229,32 @@ class AdvancedRunwayClient:
         style: str,
         resolution: Tuple[int, int],
         fps: int,
-        style_config: Any
+        style_config: Any,
+        seed: Optional[int] = None
     ) -> str:
-        """Generate enhanced video with advanced procedural techniques."""
+        """
+        Generate enhanced video with advanced procedural techniques.
+        
+        Every random choice comes from an RNG seeded by (prompt, style,
+        seed), so the same request renders the same video and repeats are
+        copied from the render cache.
+        """
         
         width, height = resolution
         output_path = tempfile.mktemp(suffix=".mp4")
         
+        scene_seed = render_seed(prompt, style, seed)
+        render_cache = get_render_cache()
+        cache_key = render_key(
+            'enhanced_video', ENHANCED_RENDER_VERSION, scene_seed,
+            resolution=f"{width}x{height}", fps=fps, duration=duration,
+            visual_style=style_config.name
+        )
+        if render_cache.fetch(cache_key, output_path):
+            logger.info(f"Reused cached enhanced render {cache_key}")
+            return output_path
+        rng = make_rng(scene_seed)
+        
         # Create high-quality scene based on prompt
         scene_type = self._analyze_prompt(prompt)
         
@@ -241,47 +267,51 @@ class AdvancedRunwayClient:
         if 'rain' in prompt.lower() or scene_type == 'rooftop':
             rain_particles = await self.effects_engine.create_particle_system(
                 ParticleType.RAIN, count=2000, bounds=(0, 0, width, height),
-                wind=10.0, gravity=500.0
+                wind=10.0, gravity=500.0, rng=rng
             )
             particles.extend(rain_particles)
         
         if 'fire' in prompt.lower() or scene_type == 'apocalyptic':
             fire_particles = await self.effects_engine.create_particle_system(
                 ParticleType.FIRE, count=500, bounds=(width//3, height//2, 2*width//3, height),
-                gravity=-200.0
+                gravity=-200.0, rng=rng
             )
             particles.extend(fire_particles)
         
         if 'snow' in prompt.lower():
             snow_particles = await self.effects_engine.create_particle_system(
                 ParticleType.SNOW, count=1500, bounds=(0, 0, width, height),
-                wind=5.0, gravity=50.0
+                wind=5.0, gravity=50.0, rng=rng
             )
             particles.extend(snow_particles)
         
-        # Add lighting
+        # Add lighting (kept per render, so earlier jobs' lights never leak in)
         lights = []
         if scene_type == 'server':
             # Add server room lighting
             for i in range(5):
                 x = (i + 1) * width // 6
-                self.effects_engine.add_light_source(
-                    LightType.NEON, (x, height//2), intensity=0.8,
+                lights.append(Light(
+                    LightType.NEON, x, height//2, intensity=0.8,
                     color=(0, 200, 255), radius=200.0, flicker=0.1
-                )
+                ))
         elif scene_type == 'rooftop':
             # City lights
             for _ in range(20):
-                x = random.randint(0, width)
-                y = random.randint(height//2, height)
-                self.effects_engine.add_light_source(
-                    LightType.POINT, (x, y), intensity=0.5,
+                x = rng.randint(0, width)
+                y = rng.randint(height//2, height)
+                lights.append(Light(
+                    LightType.POINT, x, y, intensity=0.5,
                     color=(255, 200, 100), radius=100.0
-                )
+                ))
         
         # Generate frames
         for frame_idx in range(total_frames):
             t = frame_idx / fps
+            # Per-frame randomness does not depend on the frames before it
+            frame_seed = child_seed(scene_seed, 'frame', frame_idx)
+            frame_rng = make_rng(frame_seed)
+            frame_np_rng = make_np_rng(frame_seed)
             
             # Create base frame
             from PIL import Image, ImageDraw
@@ -289,7 +319,7 @@ class AdvancedRunwayClient:
             
             # Draw scene elements
             if scene_type == 'rooftop':
-                frame = self._draw_rooftop_scene(frame, t, style_config)
+                frame = self._draw_rooftop_scene(frame, t, style_config, frame_rng)
             elif scene_type == 'server':
                 frame = self._draw_server_scene(frame, t, style_config)
             elif scene_type == 'concrete':
@@ -298,19 +328,19 @@ class AdvancedRunwayClient:
                 frame = self._draw_generic_scene(frame, t, style_config)
             
             # Update and render particles
-            self.effects_engine.update_particles(particles, 1/fps)
+            self.effects_engine.update_particles(particles, 1/fps, rng=rng)
             self.effects_engine.render_particles(frame, particles)
             
             # Apply lighting
             frame = self.effects_engine.render_lighting(
-                frame, self.effects_engine.lights,
-                style_config.ambient_light_color, t
+                frame, lights,
+                style_config.ambient_light_color, t, rng=frame_rng
             )
             
             # Apply atmospheric effects
             frame = self.effects_engine.apply_atmospheric_effects(
                 frame, style_config.fog_density,
-                style_config.ambient_light_color
+                style_config.ambient_light_color, rng=frame_np_rng
             )
             
             # Apply post-processing
@@ -325,7 +355,8 @@ class AdvancedRunwayClient:
                     'tint': style_config.tint,
                     'contrast': style_config.contrast,
                     'saturation': style_config.saturation
-                }
+                },
+                rng=frame_np_rng
             )
             
             frames.append(frame)
@@ -334,6 +365,11 @@ class AdvancedRunwayClient:
         import imageio
         imageio.mimsave(output_path, frames, fps=fps, quality=9)
         
+        try:
+            render_cache.put(cache_key, output_path)
+        except OSError as e:
+            logger.warning(f"Could not cache enhanced render {cache_key}: {e}")
+        
         return output_path
     
     def _analyze_prompt(self, prompt: str) -> str:
@@ -355,8 +391,9 @@ class AdvancedRunwayClient:
         else:
             return 'generic'
     
-    def _draw_rooftop_scene(self, frame: Image.Image, t: float, style_config: Any) -> Image.Image:
-        """Draw atmospheric rooftop scene."""
+    def _draw_rooftop_scene(self, frame: Image.Image, t: float, style_config: Any,
+                            rng: random.Random) -> Image.Image:
+        """Draw atmospheric rooftop scene, drawing window lights from rng."""
         draw = ImageDraw.Draw(frame)
         width, height = frame.size
         
@@ -393,13 +430,13 @@ class AdvancedRunwayClient:
             window_cols = building_width // 20
             for row in range(window_rows):
                 for col in range(window_cols):
-                    if random.random() > 0.3:
+                    if rng.random() > 0.3:
                         wx = x + col * 20 + 5
                         wy = height - building_height + row * 30 + 5
                         
                         # Animate some windows
-                        flicker = random.random() < 0.02
-                        brightness = 255 if flicker else random.randint(180, 230)
+                        flicker = rng.random() < 0.02
+                        brightness = 255 if flicker else rng.randint(180, 230)
                         
                         color = (brightness, brightness - 20, brightness - 40)
                         draw.rectangle([(wx, wy), (wx+12, wy+20)], fill=color)
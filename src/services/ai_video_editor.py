@@ -743,7 +743,7 @@ Always provide valid JSON responses. For ambiguous commands, suggest alternative
             preview_dir = self.work_dir / "previews"
             preview_dir.mkdir(exist_ok=True)
             
-            # Generate thumbnail
+            # Single frame seek; sprite sheets are only built for timeline scrubbing
             thumbnail_path = preview_dir / f"{operation_id}_thumb.jpg"
             await asyncio.to_thread(
                 self.ffmpeg.generate_thumbnail,
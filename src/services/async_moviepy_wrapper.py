@@ -31,6 +31,7 @@ except ImportError:
     logging.warning("MoviePy not available. Install with: pip install moviepy")
 
 from .video_cache_manager import VideoCacheManager
+from .progress_broadcast import get_progress_broadcaster
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +66,8 @@ class OperationProgress:
                 callback(self)
             except Exception as e:
                 logger.warning(f"Progress callback error: {e}")
+        
+        self._broadcast()
     
     def complete(self, message: str = "Completed"):
         """Mark operation as complete."""
@@ -73,11 +76,22 @@ class OperationProgress:
         self.message = message
         self.update(self.total_steps, message)
     
+    def fail(self, message: str):
+        """Mark operation as failed."""
+        self.status = "error"
+        self.message = message
+        self._broadcast()
+    
     def cancel(self):
         """Cancel operation."""
         self.cancelled = True
         self.status = "cancelled"
         self.message = "Operation cancelled"
+        self._broadcast()
+    
+    def _broadcast(self):
+        """Push current state to WebSocket subscribers (may run on a worker thread)."""
+        get_progress_broadcaster().publish(self.operation_id, self.to_dict())
     
     @property
     def progress_percent(self) -> float:
@@ -271,8 +285,7 @@ class AsyncMoviePyWrapper:
             return result
             
         except Exception as e:
-            progress.status = "error"
-            progress.message = f"Error: {str(e)}"
+            progress.fail(f"Error: {str(e)}")
             logger.error(f"Error trimming video: {e}")
             raise
     
@@ -377,8 +390,7 @@ class AsyncMoviePyWrapper:
             return result
             
         except Exception as e:
-            progress.status = "error"
-            progress.message = f"Error: {str(e)}"
+            progress.fail(f"Error: {str(e)}")
             logger.error(f"Error changing speed: {e}")
             raise
     
@@ -475,8 +487,7 @@ class AsyncMoviePyWrapper:
             return result
             
         except Exception as e:
-            progress.status = "error"
-            progress.message = f"Error: {str(e)}"
+            progress.fail(f"Error: {str(e)}")
             logger.error(f"Error adding fade effect: {e}")
             raise
     
@@ -588,8 +599,7 @@ class AsyncMoviePyWrapper:
             return results
             
         except Exception as e:
-            progress.status = "error"
-            progress.message = f"Batch processing error: {str(e)}"
+            progress.fail(f"Batch processing error: {str(e)}")
             logger.error(f"Error in batch processing: {e}")
             raise
     
@@ -29,6 +29,8 @@ import numpy as np
 from PIL import Image
 import magic
 
+from ..utils.streaming_download import DownloadResult
+
 logger = structlog.get_logger()
 
 
@@ -148,7 +150,8 @@ class CorruptionDetector:
     async def check_file_integrity(self, 
                                   file_path: Union[str, Path],
                                   deep_scan: bool = False,
-                                  create_backup: bool = None) -> FileIntegrityInfo:
+                                  create_backup: bool = None,
+                                  known_checksums: Optional[Dict[str, Any]] = None) -> FileIntegrityInfo:
         """
         Check file integrity with multiple validation methods.
         
@@ -156,6 +159,8 @@ class CorruptionDetector:
             file_path: Path to file to check
             deep_scan: Perform deep content analysis
             create_backup: Override auto-backup setting
+            known_checksums: Checksums computed while the file was streamed
+                to disk (see ``streaming_download``); skips re-reading the file
             
         Returns:
             FileIntegrityInfo with validation results
@@ -175,8 +180,11 @@ class CorruptionDetector:
         # Determine file type
         file_type = self._determine_file_type(file_path)
         
-        # Calculate checksums
-        checksums = await self._calculate_checksums(file_path)
+        # Calculate checksums, reusing those computed during download
+        if known_checksums and known_checksums.get('md5') and known_checksums.get('sha256'):
+            checksums = known_checksums
+        else:
+            checksums = await self._calculate_checksums(file_path)
         
         # Create integrity info
         integrity_info = FileIntegrityInfo(
@@ -236,6 +244,22 @@ class CorruptionDetector:
         
         return integrity_info
     
+    async def verify_download(self, download: DownloadResult) -> FileIntegrityInfo:
+        """
+        Check a freshly streamed file using the checksums computed during download.
+        
+        Args:
+            download: Result of a ``streaming_download`` write
+        
+        Returns:
+            FileIntegrityInfo with validation results
+        """
+        return await self.check_file_integrity(
+            download.path,
+            create_backup=False,
+            known_checksums=download.checksums
+        )
+    
     async def _calculate_checksums(self, file_path: Path) -> Dict[str, str]:
         """Calculate multiple checksums for file."""
         checksums = {
@@ -10,14 +10,17 @@ import logging
 import asyncio
 import aiohttp
 import tempfile
-from typing import Dict, List, Any, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 from PIL import Image
-import io
 import base64
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from ..utils.http_pool import get_http_pool
+from ..utils.adaptive_limiter import get_rate_limiter
+from ..prompts.prompt_similarity import DEFAULT_REUSE_THRESHOLD, cluster_prompts
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,23 +39,33 @@ class OpenAIImageGenerator:
     # Target resolution for RunwayML
     TARGET_RESOLUTION = (1280, 720)
     
-    def __init__(self, api_key: Optional[str] = None):
+    # Times a request is retried after a 429 before it is reported as failed
+    RATE_LIMIT_RETRIES = 3
+    
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """
         Initialize OpenAI DALL-E 3 client.
         
         Args:
             api_key: OpenAI API key (can also be set via OPENAI_API_KEY env var)
+            base_url: API base URL (can also be set via OPENAI_API_BASE_URL env var)
         """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not self.api_key:
             raise ValueError("OpenAI API key is required")
         
-        self.base_url = "https://api.openai.com/v1"
+        self.base_url = base_url or os.getenv('OPENAI_API_BASE_URL', "https://api.openai.com/v1")
         self.headers = {
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
         }
         
+        # Shared keep-alive pool for all OpenAI requests
+        self.http = get_http_pool('openai')
+        
+        # Shared concurrency window and request pacing for image generations
+        self.rate_limiter = get_rate_limiter('openai_images')
+        
         # Track costs
         self.total_cost = 0.0
         self.generation_count = 0
@@ -113,56 +126,73 @@ class OpenAIImageGenerator:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/images/generations",
-                    headers=self.headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=60)
-                ) as response:
-                    
-                    if response.status == 200:
-                        result = await response.json()
+            for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+                async with self.rate_limiter.slot():
+                    async with self.http.request(
+                        "POST",
+                        f"{self.base_url}/images/generations",
+                        headers=self.headers,
+                        json=payload,
+                        timeout=aiohttp.ClientTimeout(total=60)
+                    ) as response:
+                        self.rate_limiter.update_from_headers(response.headers)
                         
-                        # Process the response
-                        image_data = result['data'][0]
-                        generation_time = time.time() - start_time
+                        if response.status == 200:
+                            result = await response.json()
+                            self.rate_limiter.on_success()
+                            break
                         
-                        # Track costs
-                        cost = self.PRICING.get(size, 0.040)
-                        if quality == "standard" and size == "1024x1024":
-                            cost = 0.040  # Standard quality pricing
-                        
-                        self.total_cost += cost
-                        self.generation_count += 1
-                        
-                        # Download and resize image for video pipeline
-                        image_url = image_data['url']
-                        resized_path = await self._download_and_resize_image(image_url)
-                        
-                        return {
-                            "success": True,
-                            "original_url": image_url,
-                            "resized_path": resized_path,
-                            "revised_prompt": image_data.get('revised_prompt', prompt),
-                            "generation_time": generation_time,
-                            "cost": cost,
-                            "size": size,
-                            "quality": quality,
-                            "style": style,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    
-                    else:
                         error_data = await response.text()
-                        logger.error(f"DALL-E 3 API error {response.status}: {error_data}")
                         
-                        return {
-                            "success": False,
-                            "error": f"API error: {response.status}",
-                            "details": error_data,
-                            "timestamp": datetime.now().isoformat()
-                        }
+                        # Exhausted quota also answers 429, but waiting will not help
+                        rate_limited = response.status == 429 and 'insufficient_quota' not in error_data
+                        if rate_limited:
+                            # Shrink the window before this slot frees up
+                            delay = self.rate_limiter.on_rate_limited(response.headers)
+                
+                if rate_limited and attempt < self.RATE_LIMIT_RETRIES:
+                    logger.warning(f"DALL-E 3 rate limited, retrying in {delay:.1f}s "
+                                   f"(attempt {attempt + 1}/{self.RATE_LIMIT_RETRIES})")
+                    continue
+                
+                logger.error(f"DALL-E 3 API error {response.status}: {error_data}")
+                
+                return {
+                    "success": False,
+                    "error": f"API error: {response.status}",
+                    "details": error_data,
+                    "rate_limited": rate_limited,
+                    "timestamp": datetime.now().isoformat()
+                }
+            
+            # Process the response (connection is already back in the pool)
+            image_data = result['data'][0]
+            generation_time = time.time() - start_time
+            
+            # Track costs
+            cost = self.PRICING.get(size, 0.040)
+            if quality == "standard" and size == "1024x1024":
+                cost = 0.040  # Standard quality pricing
+            
+            self.total_cost += cost
+            self.generation_count += 1
+            
+            # Download and resize image for video pipeline
+            image_url = image_data['url']
+            resized_path = await self._download_and_resize_image(image_url)
+            
+            return {
+                "success": True,
+                "original_url": image_url,
+                "resized_path": resized_path,
+                "revised_prompt": image_data.get('revised_prompt', prompt),
+                "generation_time": generation_time,
+                "cost": cost,
+                "size": size,
+                "quality": quality,
+                "style": style,
+                "timestamp": datetime.now().isoformat()
+            }
                         
         except asyncio.TimeoutError:
             logger.error("DALL-E 3 request timed out")
@@ -190,42 +220,50 @@ class OpenAIImageGenerator:
         Returns:
             Path to resized image file
         """
+        download_path = None
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(image_url) as response:
-                    if response.status == 200:
-                        image_data = await response.read()
-                        
-                        # Open image with PIL
-                        image = Image.open(io.BytesIO(image_data))
-                        
-                        # Convert to RGB if necessary
-                        if image.mode not in ('RGB', 'RGBA'):
-                            image = image.convert('RGB')
-                        
-                        # Resize to target resolution (1280x720)
-                        # Use high-quality resampling
-                        resized = image.resize(
-                            self.TARGET_RESOLUTION,
-                            Image.Resampling.LANCZOS
-                        )
-                        
-                        # Save to temporary file
-                        temp_file = tempfile.NamedTemporaryFile(
-                            suffix='.jpg',
-                            delete=False
-                        )
-                        resized.save(temp_file.name, 'JPEG', quality=95)
-                        
-                        logger.info(f"Resized image saved to {temp_file.name}")
-                        return temp_file.name
-                    
-                    else:
-                        raise Exception(f"Failed to download image: {response.status}")
+            # Stream the original to disk instead of buffering it in memory
+            fd, download_path = tempfile.mkstemp(suffix='.img')
+            os.close(fd)
+            try:
+                await self.http.download(image_url, download_path)
+            except aiohttp.ClientResponseError as e:
+                raise Exception(f"Failed to download image: {e.status}")
+            
+            # Open image with PIL
+            with Image.open(download_path) as image:
+                # Convert to RGB if necessary
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGB')
+                
+                # Resize to target resolution (1280x720)
+                # Use high-quality resampling
+                resized = image.resize(
+                    self.TARGET_RESOLUTION,
+                    Image.Resampling.LANCZOS
+                )
+            
+            # JPEG has no alpha channel
+            if resized.mode == 'RGBA':
+                resized = resized.convert('RGB')
+            
+            # Save to temporary file
+            temp_file = tempfile.NamedTemporaryFile(
+                suffix='.jpg',
+                delete=False
+            )
+            resized.save(temp_file.name, 'JPEG', quality=95)
+            
+            logger.info(f"Resized image saved to {temp_file.name}")
+            return temp_file.name
                         
         except Exception as e:
             logger.error(f"Image download/resize failed: {e}")
             raise
+        
+        finally:
+            if download_path and os.path.exists(download_path):
+                os.unlink(download_path)
     
     def _enhance_prompt_for_video(self, base_prompt: str) -> str:
         """
@@ -266,16 +304,26 @@ class OpenAIImageGenerator:
         
         return enhanced
     
-    async def generate_batch(
+    async def generate_batch_stream(
         self,
         prompts: List[str],
         size: str = "1792x1024",
         quality: str = "hd",
         style: str = "vivid",
-        enhance_for_video: bool = True
-    ) -> List[Dict[str, Any]]:
+        enhance_for_video: bool = True,
+        dedupe_threshold: float = DEFAULT_REUSE_THRESHOLD
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
         """
-        Generate multiple images in parallel (with rate limiting).
+        Generate multiple images, yielding each result as soon as it is ready.
+        
+        Every prompt is submitted at once; the shared rate limiter keeps as
+        many requests in flight as the account allows and backs off on 429s,
+        so a slow image never holds back the ones after it.
+        
+        Near-duplicate prompts ("rooftop at night, neon" and "neon rooftop at
+        night") are generated once; the other prompts of the cluster get a
+        copy of that result, sharing its files, with ``reused_from`` set to
+        the representative's index and no cost.
         
         Args:
             prompts: List of prompts to generate
@@ -283,36 +331,70 @@ class OpenAIImageGenerator:
             quality: Quality setting for all generations
             style: Style setting for all generations
             enhance_for_video: Whether to enhance prompts for video
+            dedupe_threshold: Prompt similarity at which an image is reused
+                (0 generates every prompt)
         
-        Returns:
-            List of generation results
+        Yields:
+            (prompt index, generation result) pairs in completion order
         """
-        # DALL-E 3 has rate limits, so we'll process with some concurrency control
-        max_concurrent = 3  # Adjust based on your tier
-        results = []
+        representatives = cluster_prompts(prompts, dedupe_threshold, style=f"{quality}/{style}", size=size)
+        members: Dict[int, List[int]] = {}
+        for position, representative in enumerate(representatives):
+            members.setdefault(representative, []).append(position)
+        if len(members) < len(prompts):
+            logger.info(f"Generating {len(members)} images for {len(prompts)} prompts, "
+                        f"reusing near-duplicates")
         
-        for i in range(0, len(prompts), max_concurrent):
-            batch = prompts[i:i + max_concurrent]
-            
-            # Generate batch concurrently
-            tasks = [
-                self.generate_image(
-                    prompt=prompt,
-                    size=size,
-                    quality=quality,
-                    style=style,
-                    enhance_for_video=enhance_for_video
-                )
-                for prompt in batch
-            ]
-            
-            batch_results = await asyncio.gather(*tasks)
-            results.extend(batch_results)
-            
-            # Add delay between batches to respect rate limits
-            if i + max_concurrent < len(prompts):
-                await asyncio.sleep(1)  # Adjust based on your rate limits
+        async def generate(position: int) -> Tuple[int, Dict[str, Any]]:
+            return position, await self.generate_image(
+                prompt=prompts[position],
+                size=size,
+                quality=quality,
+                style=style,
+                enhance_for_video=enhance_for_video
+            )
+        
+        tasks = [asyncio.ensure_future(generate(position)) for position in members]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                representative, result = await completed
+                for position in members[representative]:
+                    if position == representative:
+                        yield position, result
+                    else:
+                        yield position, {**result, "reused_from": representative, "cost": 0.0}
+        finally:
+            # The consumer stopped early; drop the generations nobody will read
+            for task in tasks:
+                task.cancel()
+    
+    async def generate_batch(
+        self,
+        prompts: List[str],
+        size: str = "1792x1024",
+        quality: str = "hd",
+        style: str = "vivid",
+        enhance_for_video: bool = True,
+        dedupe_threshold: float = DEFAULT_REUSE_THRESHOLD
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate multiple images in parallel (with rate limiting).
+        
+        Same as generate_batch_stream, collected in prompt order.
         
+        Returns:
+            List of generation results, one per prompt
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(prompts)
+        async for position, result in self.generate_batch_stream(
+            prompts,
+            size=size,
+            quality=quality,
+            style=style,
+            enhance_for_video=enhance_for_video,
+            dedupe_threshold=dedupe_threshold
+        ):
+            results[position] = result
         return results
     
     def create_data_uri_from_path(self, image_path: str) -> str:
@@ -369,6 +451,7 @@ class OpenAIImageGenerator:
             "total_cost": round(self.total_cost, 3),
             "generation_count": self.generation_count,
             "average_cost": round(self.total_cost / max(1, self.generation_count), 3),
+            "rate_limit": self.rate_limiter.get_stats(),
             "timestamp": datetime.now().isoformat()
         }
     
@@ -381,19 +464,19 @@ class OpenAIImageGenerator:
         """
         try:
             # Try a simple API call
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/models",
-                    headers=self.headers,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    
-                    if response.status == 200:
-                        logger.info("OpenAI API connection successful")
-                        return True
-                    else:
-                        logger.error(f"OpenAI API connection failed: {response.status}")
-                        return False
+            async with self.http.request(
+                "GET",
+                f"{self.base_url}/models",
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                
+                if response.status == 200:
+                    logger.info("OpenAI API connection successful")
+                    return True
+                else:
+                    logger.error(f"OpenAI API connection failed: {response.status}")
+                    return False
                         
         except Exception as e:
             logger.error(f"OpenAI API connection test failed: {e}")
@@ -401,14 +484,16 @@ class OpenAIImageGenerator:
 
 
 # Convenience function for creating the client
-def create_dalle3_client(api_key: Optional[str] = None) -> OpenAIImageGenerator:
+def create_dalle3_client(api_key: Optional[str] = None,
+                         base_url: Optional[str] = None) -> OpenAIImageGenerator:
     """
     Create and return a configured DALL-E 3 client.
     
     Args:
         api_key: Optional API key (uses env var if not provided)
+        base_url: Optional API base URL (uses env var if not provided)
     
     Returns:
         Configured OpenAIImageGenerator instance
     """
-    return OpenAIImageGenerator(api_key)
\ No newline at end of file
+    return OpenAIImageGenerator(api_key, base_url)
\ No newline at end of file
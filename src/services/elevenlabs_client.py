@@ -3,13 +3,16 @@ ElevenLabs API client for voice synthesis.
 """
 
 import os
+import asyncio
 import requests
 import logging
-from typing import Dict, List, Any, Optional, BinaryIO
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from typing import Dict, List, Any, Optional, BinaryIO, Union
 from pathlib import Path
 
+import aiohttp
+
+from src.utils.http_pool import get_http_pool, get_sync_session
+
 logger = logging.getLogger(__name__)
 
 def validate_audio_file(file_path: str) -> str:
@@ -53,46 +56,33 @@ class ElevenLabsClient:
     
     BASE_URL = "https://api.elevenlabs.io/v1"
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """
         Initialize ElevenLabs client.
         
         Args:
             api_key: ElevenLabs API key (can also be set via ELEVENLABS_API_KEY env var)
+            base_url: API base URL (defaults to BASE_URL)
         """
         self.api_key = api_key or os.getenv('ELEVENLABS_API_KEY')
         if not self.api_key:
             raise ValueError("ElevenLabs API key is required. Set ELEVENLABS_API_KEY env var or pass api_key parameter.")
         
-        # Configure session with retry strategy
-        self.session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("https://", adapter)
-        self.session.headers.update({
+        self.base_url = base_url or os.getenv('ELEVENLABS_API_BASE_URL', self.BASE_URL)
+        
+        # Shared pooled sessions (with retry strategy); credentials go per request
+        # because the sessions are shared between client instances
+        self.session = get_sync_session('elevenlabs')
+        self.http = get_http_pool('elevenlabs')
+        self.headers = {
             'xi-api-key': self.api_key,
             'Content-Type': 'application/json'
-        })
+        }
     
-    def text_to_speech(self, text: str, voice_id: str,
-                      voice_settings: Optional[Dict[str, Any]] = None,
-                      output_format: str = 'mp3_44100_128') -> bytes:
-        """
-        Convert text to speech using specified voice.
-        
-        Args:
-            text: Text to convert to speech
-            voice_id: ID of the voice to use
-            voice_settings: Optional voice settings (stability, similarity_boost, etc.)
-            output_format: Output audio format
-        
-        Returns:
-            Audio data as bytes
-        """
+    def _build_tts_request(self, text: str, voice_id: str,
+                           voice_settings: Optional[Dict[str, Any]],
+                           output_format: str) -> tuple:
+        """Validate input and build (url, payload, headers) for a TTS call."""
         # Input validation
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
@@ -102,7 +92,7 @@ class ElevenLabsClient:
         
         if not voice_id or not voice_id.strip():
             raise ValueError("Voice ID cannot be empty")
-        url = f"{self.BASE_URL}/text-to-speech/{voice_id}"
+        url = f"{self.base_url}/text-to-speech/{voice_id}"
         
         # Default voice settings
         if voice_settings is None:
@@ -121,10 +111,31 @@ class ElevenLabsClient:
         
         # Set output format in headers
         headers = {
-            'Accept': f'audio/{output_format}',
-            'xi-api-key': self.api_key
+            **self.headers,
+            'Accept': f'audio/{output_format}'
         }
         
+        return url, payload, headers
+    
+    def text_to_speech(self, text: str, voice_id: str,
+                      voice_settings: Optional[Dict[str, Any]] = None,
+                      output_format: str = 'mp3_44100_128') -> bytes:
+        """
+        Convert text to speech using specified voice.
+        
+        Args:
+            text: Text to convert to speech
+            voice_id: ID of the voice to use
+            voice_settings: Optional voice settings (stability, similarity_boost, etc.)
+            output_format: Output audio format
+        
+        Returns:
+            Audio data as bytes
+        """
+        url, payload, headers = self._build_tts_request(
+            text, voice_id, voice_settings, output_format
+        )
+        
         try:
             response = self.session.post(url, json=payload, headers=headers)
             response.raise_for_status()
@@ -138,6 +149,84 @@ class ElevenLabsClient:
                 logger.error(f"Response content: {e.response.text}")
             raise
     
+    async def text_to_speech_async(self, text: str, voice_id: str,
+                                   voice_settings: Optional[Dict[str, Any]] = None,
+                                   output_format: str = 'mp3_44100_128') -> bytes:
+        """
+        Convert text to speech on the shared async connection pool.
+        
+        Args:
+            text: Text to convert to speech
+            voice_id: ID of the voice to use
+            voice_settings: Optional voice settings
+            output_format: Output audio format
+        
+        Returns:
+            Audio data as bytes
+        """
+        url, payload, headers = self._build_tts_request(
+            text, voice_id, voice_settings, output_format
+        )
+        
+        try:
+            async with self.http.request("POST", url, json=payload, headers=headers) as response:
+                if response.status >= 400:
+                    logger.error(f"Response content: {await response.text()}")
+                response.raise_for_status()
+                audio_data = await response.read()
+            
+            logger.info(f"Successfully generated speech for {len(text)} characters")
+            return audio_data
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error generating speech: {str(e)}")
+            raise
+    
+    async def save_speech_async(self, text: str, voice_id: str,
+                                output_path: Union[str, Path],
+                                voice_settings: Optional[Dict[str, Any]] = None,
+                                output_format: str = 'mp3_44100_128') -> str:
+        """
+        Convert text to speech and stream the audio straight to disk.
+        
+        Args:
+            text: Text to convert to speech
+            voice_id: ID of the voice to use
+            output_path: Destination file path
+            voice_settings: Optional voice settings
+            output_format: Output audio format
+        
+        Returns:
+            Path to the saved audio file
+        """
+        url, payload, headers = self._build_tts_request(
+            text, voice_id, voice_settings, output_format
+        )
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = output_path.with_name(output_path.name + '.part')
+        
+        try:
+            async with self.http.request("POST", url, json=payload, headers=headers) as response:
+                if response.status >= 400:
+                    logger.error(f"Response content: {await response.text()}")
+                response.raise_for_status()
+                with open(part_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(self.http.config.chunk_size):
+                        f.write(chunk)
+            os.replace(part_path, output_path)
+            
+            logger.info(f"Saved speech for {len(text)} characters to {output_path}")
+            return str(output_path)
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error generating speech: {str(e)}")
+            raise
+        
+        finally:
+            if part_path.exists():
+                part_path.unlink()
+    
     def text_to_speech_stream(self, text: str, voice_id: str,
                              voice_settings: Optional[Dict[str, Any]] = None,
                              chunk_size: int = 1024) -> Any:
@@ -165,7 +254,7 @@ class ElevenLabsClient:
         
         if chunk_size <= 0 or chunk_size > 10240:  # Reasonable limits
             raise ValueError("Chunk size must be between 1 and 10240 bytes")
-        url = f"{self.BASE_URL}/text-to-speech/{voice_id}/stream"
+        url = f"{self.base_url}/text-to-speech/{voice_id}/stream"
         
         if voice_settings is None:
             voice_settings = {
@@ -180,7 +269,7 @@ class ElevenLabsClient:
         }
         
         try:
-            response = self.session.post(url, json=payload, stream=True)
+            response = self.session.post(url, json=payload, headers=self.headers, stream=True)
             response.raise_for_status()
             
             for chunk in response.iter_content(chunk_size=chunk_size):
@@ -198,10 +287,10 @@ class ElevenLabsClient:
         Returns:
             List of voice dictionaries
         """
-        url = f"{self.BASE_URL}/voices"
+        url = f"{self.base_url}/voices"
         
         try:
-            response = self.session.get(url)
+            response = self.session.get(url, headers=self.headers)
             response.raise_for_status()
             
             voices = response.json().get('voices', [])
@@ -222,10 +311,10 @@ class ElevenLabsClient:
         Returns:
             Voice details dictionary
         """
-        url = f"{self.BASE_URL}/voices/{voice_id}"
+        url = f"{self.base_url}/voices/{voice_id}"
         
         try:
-            response = self.session.get(url)
+            response = self.session.get(url, headers=self.headers)
             response.raise_for_status()
             
             return response.json()
@@ -248,7 +337,7 @@ class ElevenLabsClient:
         Returns:
             Created voice information including voice_id
         """
-        url = f"{self.BASE_URL}/voices/add"
+        url = f"{self.base_url}/voices/add"
         
         # Validate all audio files first
         validated_files = []
@@ -278,7 +367,7 @@ class ElevenLabsClient:
             headers = {'xi-api-key': self.api_key}
             
             try:
-                response = requests.post(url, headers=headers, data=data, files=files_data)
+                response = self.session.post(url, headers=headers, data=data, files=files_data)
                 response.raise_for_status()
                 
                 voice_data = response.json()
@@ -309,10 +398,10 @@ class ElevenLabsClient:
         Returns:
             True if successful
         """
-        url = f"{self.BASE_URL}/voices/{voice_id}"
+        url = f"{self.base_url}/voices/{voice_id}"
         
         try:
-            response = self.session.delete(url)
+            response = self.session.delete(url, headers=self.headers)
             response.raise_for_status()
             
             logger.info(f"Successfully deleted voice: {voice_id}")
@@ -329,10 +418,10 @@ class ElevenLabsClient:
         Returns:
             List of model dictionaries
         """
-        url = f"{self.BASE_URL}/models"
+        url = f"{self.base_url}/models"
         
         try:
-            response = self.session.get(url)
+            response = self.session.get(url, headers=self.headers)
             response.raise_for_status()
             
             models = response.json()
@@ -350,10 +439,10 @@ class ElevenLabsClient:
         Returns:
             User information dictionary
         """
-        url = f"{self.BASE_URL}/user"
+        url = f"{self.base_url}/user"
         
         try:
-            response = self.session.get(url)
+            response = self.session.get(url, headers=self.headers)
             response.raise_for_status()
             
             return response.json()
@@ -373,14 +462,14 @@ class ElevenLabsClient:
         Returns:
             History data with items and pagination info
         """
-        url = f"{self.BASE_URL}/history"
+        url = f"{self.base_url}/history"
         
         params = {'page_size': page_size}
         if start_after_history_item_id:
             params['start_after_history_item_id'] = start_after_history_item_id
         
         try:
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, headers=self.headers)
             response.raise_for_status()
             
             return response.json()
@@ -399,10 +488,10 @@ class ElevenLabsClient:
         Returns:
             Audio data as bytes
         """
-        url = f"{self.BASE_URL}/history/{history_item_id}/audio"
+        url = f"{self.base_url}/history/{history_item_id}/audio"
         
         try:
-            response = self.session.get(url)
+            response = self.session.get(url, headers=self.headers)
             response.raise_for_status()
             
             return response.content
@@ -0,0 +1,264 @@
+"""
+Event Bus - Cross-process fan-out for WebSocket events
+
+Workers and API processes publish topic events (e.g. "job:<id>") to Redis
+channels. Each API process holds one pattern subscription and hands events
+to its local subscribers, so progress reaches a client whichever replica
+it is connected to.
+
+Every client gets a ClientChannel: a bounded send queue drained by its own
+task, so one slow socket never delays the others. Progress events replace
+any pending event with the same coalescing key (latest wins); a client
+whose queue overflows anyway is dropped.
+"""
+
+import os
+import json
+import asyncio
+import logging
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "events:"
+# Messages of these types only matter in their latest form
+COALESCED_TYPES = {'job_update', 'step_update', 'operation_progress', 'system_status'}
+
+MAX_PENDING = int(os.getenv('WS_MAX_PENDING', '64'))
+SEND_TIMEOUT = float(os.getenv('WS_SEND_TIMEOUT', '5'))
+
+
+def topic_channel(topic: str) -> str:
+    """Redis channel carrying a topic's events."""
+    return f"{CHANNEL_PREFIX}{topic}"
+
+
+def coalesce_key(message: Dict[str, Any]) -> Optional[Hashable]:
+    """Key under which a newer message replaces a pending one, or None."""
+    message_type = message.get('type')
+    if message_type not in COALESCED_TYPES:
+        return None
+    data = message.get('data') or {}
+    subject = message.get('jobId') or message.get('operation_id') or data.get('operation_id')
+    return (message_type, subject, data.get('step'))
+
+
+class ClientChannel:
+    """Bounded, coalescing send queue for one WebSocket client."""
+
+    def __init__(self,
+                 send: Callable[[Dict[str, Any]], Awaitable[None]],
+                 on_drop: Optional[Callable[[str], None]] = None,
+                 max_pending: int = MAX_PENDING,
+                 send_timeout: float = SEND_TIMEOUT):
+        """
+        Initialize client channel.
+
+        Args:
+            send: Coroutine function delivering one message to the client
+            on_drop: Called with a reason when the client is dropped
+            max_pending: Pending messages allowed before the client is dropped
+            send_timeout: Seconds a single send may take before the client is dropped
+        """
+        self._send = send
+        self._on_drop = on_drop
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+
+        self._pending: 'OrderedDict[Hashable, Dict[str, Any]]' = OrderedDict()
+        self._sequence = count()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+
+        self.sent = 0
+        self.coalesced = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._drain())
+
+    def offer(self, message: Dict[str, Any]) -> bool:
+        """Queue a message without blocking; returns False if the client was dropped."""
+        if self.closed:
+            return False
+
+        key = coalesce_key(message)
+        if key is not None and key in self._pending:
+            self._pending[key] = message
+            self.coalesced += 1
+            return True
+
+        if len(self._pending) >= self.max_pending:
+            self._drop("send queue full")
+            return False
+
+        self._pending[key if key is not None else ('seq', next(self._sequence))] = message
+        self._ready.set()
+        return True
+
+    def close(self):
+        self.closed = True
+        self._pending.clear()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def _drain(self):
+        while not self.closed:
+            await self._ready.wait()
+            while self._pending and not self.closed:
+                _, message = self._pending.popitem(last=False)
+                try:
+                    await asyncio.wait_for(self._send(message), self.send_timeout)
+                    self.sent += 1
+                except asyncio.TimeoutError:
+                    self._drop("send timed out")
+                    return
+                except Exception as e:
+                    self._drop(f"send failed: {e}")
+                    return
+            self._ready.clear()
+
+    def _drop(self, reason: str):
+        if self.closed:
+            return
+        self.closed = True
+        self._pending.clear()
+        if self._on_drop:
+            self._on_drop(reason)
+
+
+class EventBus:
+    """
+    Redis pub/sub bridge between publishers and this process's subscribers.
+
+    Without Redis, events are delivered to local subscribers only.
+    """
+
+    RECONNECT_DELAY = 1.0
+    SUBSCRIBE_TIMEOUT = 5.0
+    MAX_RECONNECT_DELAY = 30.0
+
+    def __init__(self,
+                 handler: Callable[[str, Dict[str, Any]], None],
+                 redis_url: Optional[str] = None,
+                 redis_client: Optional[aioredis.Redis] = None):
+        """
+        Initialize event bus.
+
+        Args:
+            handler: Called with (topic, message) for every event received
+            redis_url: Redis connection URL (defaults to env REDIS_URL)
+            redis_client: Existing client to use instead of connecting
+        """
+        self.handler = handler
+        self.redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        self.redis_client = redis_client
+        self._owns_client = redis_client is None
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._listener is not None and not self._listener.done()
+
+    async def start(self) -> bool:
+        """Connect to Redis and start listening; returns False if Redis is unavailable."""
+        try:
+            if self.redis_client is None:
+                self.redis_client = aioredis.from_url(self.redis_url, decode_responses=True)
+            await self.redis_client.ping()
+        except Exception as e:
+            logger.warning(f"Event bus running local-only, Redis unavailable: {e}")
+            self.redis_client = None
+            return False
+
+        self._listener = asyncio.create_task(self._listen())
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), self.SUBSCRIBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Event bus subscription pending, retrying in background")
+            return False
+        logger.info("Event bus subscribed to Redis")
+        return True
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self.redis_client is not None and self._owns_client:
+            await self.redis_client.aclose()
+            self.redis_client = None
+
+    async def publish(self, topic: str, message: Dict[str, Any]):
+        """Publish to every process, or deliver locally if Redis is not connected."""
+        if self.connected:
+            try:
+                await self.redis_client.publish(topic_channel(topic), json.dumps(message))
+                self.published += 1
+                return
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Event publish failed, delivering locally: {e}")
+        self._dispatch(topic, message)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'connected': self.connected,
+            'published': self.published,
+            'received': self.received,
+            'errors': self.errors
+        }
+
+    async def _listen(self):
+        delay = self.RECONNECT_DELAY
+        while True:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                self._subscribed.set()
+                delay = self.RECONNECT_DELAY
+                async for event in pubsub.listen():
+                    if event.get('type') != 'pmessage':
+                        continue
+                    try:
+                        message = json.loads(event['data'])
+                    except (TypeError, ValueError):
+                        self.errors += 1
+                        continue
+                    self.received += 1
+                    self._dispatch(event['channel'][len(CHANNEL_PREFIX):], message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Event bus subscription lost, reconnecting in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def _dispatch(self, topic: str, message: Dict[str, Any]):
+        try:
+            self.handler(topic, message)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error handling event on {topic}: {e}")
@@ -692,6 +692,9 @@ class FFmpegService:
         """
         Generate thumbnail from video at specified timestamp.
         
+        The frame is decoded at full resolution at the exact timestamp;
+        scrubbing previews come from PreviewAssetService sprite sheets.
+        
         Args:
             video_path: Path to video file
             output_path: Output image path
@@ -704,7 +707,7 @@ class FFmpegService:
             self.ffmpeg_path,
             '-ss', str(timestamp),
             '-i', video_path,
-            '-vframes', '1',
+            '-frames:v', '1',
             '-q:v', '2',
             '-y', output_path
         ]
@@ -4,6 +4,9 @@ File Watcher Service - Real-time Scene Change Monitoring
 Monitors scene directories for file changes and updates the scene index automatically.
 Designed for sub-1 second update propagation with intelligent batching.
 
+Changes are applied to the scene index as typed deltas; a periodic
+reconciliation catches anything the watcher missed.
+
 Performance Targets:
 - Update propagation: < 1 second
 - Memory usage: < 50MB for 100 projects
@@ -32,7 +35,7 @@ except ImportError:
     FileSystemEventHandler = None
     FileSystemEvent = None
 
-from .scene_index_manager import SceneIndexManager, get_scene_index_manager
+from .scene_index_manager import SceneIndexManager, SceneFileDelta, get_scene_index_manager
 
 logger = logging.getLogger(__name__)
 
@@ -45,10 +48,23 @@ class FileChangeEvent:
     scene_id: Optional[str]
     file_type: Optional[str]  # 'video', 'audio', 'image'
     timestamp: float
+    dest_path: Optional[str] = None  # New location for 'moved'
+    file_size: Optional[int] = None
+    last_modified: Optional[float] = None
     
     def __post_init__(self):
         if self.timestamp == 0:
             self.timestamp = datetime.utcnow().timestamp()
+    
+    def to_delta(self) -> SceneFileDelta:
+        """Convert to a scene index delta."""
+        return SceneFileDelta(
+            event_type=self.event_type,
+            file_path=self.file_path,
+            dest_path=self.dest_path,
+            file_size=self.file_size,
+            last_modified=self.last_modified
+        )
 
 @dataclass
 class WatcherStats:
@@ -56,6 +72,7 @@ class WatcherStats:
     events_processed: int = 0
     batches_processed: int = 0
     index_updates: int = 0
+    reconciliations: int = 0
     errors: int = 0
     last_activity: float = 0
     watched_directories: int = 0
@@ -75,24 +92,22 @@ class SceneFileHandler(FileSystemEventHandler):
     def on_created(self, event: FileSystemEvent):
         """Handle file creation events."""
         if not event.is_directory:
-            asyncio.create_task(self.file_watcher._handle_file_event('created', event.src_path))
+            self.file_watcher._submit_event('created', event.src_path)
     
     def on_modified(self, event: FileSystemEvent):
         """Handle file modification events."""
         if not event.is_directory:
-            asyncio.create_task(self.file_watcher._handle_file_event('modified', event.src_path))
+            self.file_watcher._submit_event('modified', event.src_path)
     
     def on_deleted(self, event: FileSystemEvent):
         """Handle file deletion events."""
         if not event.is_directory:
-            asyncio.create_task(self.file_watcher._handle_file_event('deleted', event.src_path))
+            self.file_watcher._submit_event('deleted', event.src_path)
     
     def on_moved(self, event: FileSystemEvent):
         """Handle file move events."""
         if not event.is_directory and hasattr(event, 'dest_path'):
-            # Handle move as delete + create
-            asyncio.create_task(self.file_watcher._handle_file_event('deleted', event.src_path))
-            asyncio.create_task(self.file_watcher._handle_file_event('created', event.dest_path))
+            self.file_watcher._submit_event('moved', event.src_path, event.dest_path)
 
 class FileWatcher:
     """
@@ -110,6 +125,7 @@ class FileWatcher:
     BATCH_INTERVAL = 2.0      # Batch events every 2 seconds
     DEBOUNCE_INTERVAL = 0.5   # Debounce rapid file changes
     MAX_BATCH_SIZE = 100      # Maximum events per batch
+    RECONCILE_INTERVAL = float(os.getenv('SCENE_RECONCILE_INTERVAL', '300'))  # 0 disables
     WATCH_PATTERNS = {         # File patterns to watch
         'video': {'.mp4', '.avi', '.mov', '.mkv'},
         'audio': {'.mp3', '.wav', '.aac', '.m4a'},
@@ -143,6 +159,8 @@ class FileWatcher:
         self._last_batch_time = 0
         self._processing_task: Optional[asyncio.Task] = None
         self._is_running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_reconcile = datetime.utcnow().timestamp()
         
         # Debouncing
         self._pending_events: Dict[str, FileChangeEvent] = {}  # file_path -> latest event
@@ -176,7 +194,8 @@ class FileWatcher:
             self.observer = Observer()
             self.event_handler = SceneFileHandler(self)
             
-            # Start event processing
+            # Start event processing; watchdog callbacks arrive on its own thread
+            self._loop = asyncio.get_running_loop()
             self._is_running = True
             self._processing_task = asyncio.create_task(self._process_events())
             
@@ -324,6 +343,7 @@ class FileWatcher:
                 'events_processed': self.stats.events_processed,
                 'batches_processed': self.stats.batches_processed,
                 'index_updates': self.stats.index_updates,
+                'reconciliations': self.stats.reconciliations,
                 'errors': self.stats.errors,
                 'watched_directories': self.stats.watched_directories,
                 'last_activity': self.stats.last_activity
@@ -333,6 +353,7 @@ class FileWatcher:
                 'batch_interval': self.BATCH_INTERVAL,
                 'debounce_interval': self.DEBOUNCE_INTERVAL,
                 'max_batch_size': self.MAX_BATCH_SIZE,
+                'reconcile_interval': self.RECONCILE_INTERVAL,
                 'auto_discovery': self.enable_auto_discovery
             },
             'watched_projects': list(self.watched_paths.keys())
@@ -340,10 +361,26 @@ class FileWatcher:
     
     # Private methods
     
-    async def _handle_file_event(self, event_type: str, file_path: str):
+    def _submit_event(self, event_type: str, file_path: str, dest_path: Optional[str] = None):
+        """Hand a watchdog event from the observer thread to the event loop."""
+        if self._loop and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(
+                self._handle_file_event(event_type, file_path, dest_path), self._loop
+            )
+    
+    async def _handle_file_event(self, event_type: str, file_path: str, dest_path: Optional[str] = None):
         """Handle individual file system events."""
         try:
-            path_obj = Path(file_path)
+            if event_type == 'moved':
+                # Moves in or out of scene directories are plain creates and deletes
+                src_tracked = self._is_scene_file(Path(file_path))
+                dest_tracked = dest_path is not None and self._is_scene_file(Path(dest_path))
+                if not dest_tracked:
+                    event_type, dest_path = 'deleted', None
+                elif not src_tracked:
+                    event_type, file_path, dest_path = 'created', dest_path, None
+            
+            path_obj = Path(dest_path or file_path)
             
             # Check if this is a scene-related file
             if not self._is_scene_file(path_obj):
@@ -357,6 +394,15 @@ class FileWatcher:
             # Determine file type
             file_type = self._get_file_type(path_obj)
             
+            # Record size and mtime so the index can be patched without rescanning
+            file_size = last_modified = None
+            if event_type != 'deleted':
+                try:
+                    stat = path_obj.stat()
+                    file_size, last_modified = stat.st_size, stat.st_mtime
+                except OSError:
+                    pass
+            
             # Create event
             event = FileChangeEvent(
                 event_type=event_type,
@@ -364,7 +410,10 @@ class FileWatcher:
                 project_id=project_id,
                 scene_id=scene_id,
                 file_type=file_type,
-                timestamp=datetime.utcnow().timestamp()
+                timestamp=datetime.utcnow().timestamp(),
+                dest_path=dest_path,
+                file_size=file_size,
+                last_modified=last_modified
             )
             
             # Add to debouncing system
@@ -433,6 +482,12 @@ class FileWatcher:
                         await self._process_event_batch()
                         self._last_batch_time = current_time
                 
+                # Periodically catch changes the watcher missed
+                if (self.RECONCILE_INTERVAL > 0 and
+                    current_time - self._last_reconcile >= self.RECONCILE_INTERVAL):
+                    self._last_reconcile = current_time
+                    await self._reconcile_projects()
+                
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -470,15 +525,12 @@ class FileWatcher:
                             except Exception as e:
                                 logger.error(f"Error in change callback: {e}")
                     
-                    # Update scene index
+                    # Patch the scene index; affected scene lookups are dropped with it
                     if self.scene_index_manager:
-                        await self.scene_index_manager.update_scene_index(project_id)
+                        await self.scene_index_manager.apply_file_changes(
+                            project_id, [event.to_delta() for event in events]
+                        )
                         self.stats.index_updates += 1
-                        
-                        # Invalidate specific scene caches if possible
-                        scene_ids = {event.scene_id for event in events if event.scene_id}
-                        for scene_id in scene_ids:
-                            await self.scene_index_manager.invalidate_scene_cache(project_id, scene_id)
                     
                     logger.debug(f"Updated scene index for project {project_id} "
                                f"with {len(events)} events")
@@ -494,6 +546,20 @@ class FileWatcher:
             logger.error(f"Error processing event batch: {e}")
             self.stats.errors += 1
     
+    async def _reconcile_projects(self):
+        """Reconcile the scene index of every watched project against the disk."""
+        if not self.scene_index_manager:
+            return
+        
+        for project_path in list(self.watched_paths):
+            project_id = Path(project_path).name
+            try:
+                await self.scene_index_manager.reconcile_project_index(project_id)
+                self.stats.reconciliations += 1
+            except Exception as e:
+                logger.error(f"Error reconciling scene index for project {project_id}: {e}")
+                self.stats.errors += 1
+    
     async def _discover_projects(self):
         """Discover existing projects and start watching them."""
         try:
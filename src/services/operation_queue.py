@@ -3,6 +3,9 @@ Operation Queue Manager for High-Performance Video Processing.
 
 This service provides priority-based queue management with concurrent operation
 support and intelligent scheduling for optimal resource utilization.
+
+Every status change is published to the progress broadcaster, so clients
+watching an operation are pushed updates instead of polling the queue.
 """
 
 import asyncio
@@ -17,6 +20,8 @@ import threading
 from datetime import datetime
 import uuid
 
+from .progress_broadcast import get_progress_broadcaster
+
 logger = logging.getLogger(__name__)
 
 class OperationPriority(Enum):
@@ -127,7 +132,9 @@ class OperationQueue:
         
         # Priority queue (min-heap, but we override __lt__ for max behavior)
         self._queue: List[QueuedOperation] = []
+        self._queued_by_id: Dict[str, QueuedOperation] = {}  # O(1) status lookups
         self._queue_lock = threading.Lock()
+        self._broadcaster = get_progress_broadcaster()
         
         # Running operations
         self._running_operations: Dict[str, QueuedOperation] = {}
@@ -171,8 +178,7 @@ class OperationQueue:
                     op.priority = OperationPriority[op_data["priority"]]
                     op.status = OperationStatus(op_data["status"])
                     
-                    with self._queue_lock:
-                        heapq.heappush(self._queue, op)
+                    self._push_queued(op)
                 
                 # Restore statistics
                 self._stats.update(data.get("statistics", {}))
@@ -247,12 +253,13 @@ class OperationQueue:
             progress_callback=progress_callback
         )
         
+        self._push_queued(operation)
         with self._queue_lock:
-            heapq.heappush(self._queue, operation)
             self._stats["total_queued"] += 1
         
         # Save queue state
         self._save_queue()
+        self._publish(operation)
         
         logger.info(f"Queued operation {operation_id}: {operation_type} with priority {priority.name}")
         return operation_id
@@ -271,41 +278,43 @@ class OperationQueue:
         
         # Check queued operations
         with self._queue_lock:
-            for op in self._queue:
-                if op.operation_id == operation_id:
-                    return op.to_dict()
+            op = self._queued_by_id.get(operation_id)
         
-        return None
+        return op.to_dict() if op else None
     
     async def cancel_operation(self, operation_id: str) -> bool:
         """Cancel operation if it's queued or running."""
         # Try to cancel from queue
         with self._queue_lock:
-            for i, op in enumerate(self._queue):
-                if op.operation_id == operation_id:
-                    op.status = OperationStatus.CANCELLED
-                    self._queue.pop(i)
-                    heapq.heapify(self._queue)  # Restore heap property
-                    
-                    # Move to completed
-                    with self._completed_lock:
-                        self._completed_operations[operation_id] = op
-                    
-                    self._stats["total_cancelled"] += 1
-                    logger.info(f"Cancelled queued operation: {operation_id}")
-                    return True
+            op = self._queued_by_id.pop(operation_id, None)
+            if op is not None:
+                op.status = OperationStatus.CANCELLED
+                self._queue.remove(op)
+                heapq.heapify(self._queue)  # Restore heap property
+                
+                # Move to completed
+                with self._completed_lock:
+                    self._completed_operations[operation_id] = op
+                
+                self._stats["total_cancelled"] += 1
+        
+        if op is not None:
+            logger.info(f"Cancelled queued operation: {operation_id}")
+            self._publish(op)
+            return True
         
         # Try to cancel running operation
         with self._running_lock:
             if operation_id in self._running_operations:
                 op = self._running_operations[operation_id]
                 op.status = OperationStatus.CANCELLED
-                
-                # The worker will detect this status change
-                logger.info(f"Marked running operation for cancellation: {operation_id}")
-                return True
+            else:
+                return False
         
-        return False
+        # The worker will detect this status change
+        logger.info(f"Marked running operation for cancellation: {operation_id}")
+        self._publish(op)
+        return True
     
     async def get_queue_status(self) -> Dict[str, Any]:
         """Get overall queue status."""
@@ -395,6 +404,7 @@ class OperationQueue:
                 with self._queue_lock:
                     if self._queue:
                         operation = heapq.heappop(self._queue)
+                        self._queued_by_id.pop(operation.operation_id, None)
                 
                 if operation is None:
                     # No work available, wait a bit
@@ -405,8 +415,7 @@ class OperationQueue:
                 async with self._worker_semaphore:
                     if self._shutdown_event.is_set():
                         # Put operation back if shutting down
-                        with self._queue_lock:
-                            heapq.heappush(self._queue, operation)
+                        self._push_queued(operation)
                         break
                     
                     await self._execute_operation(operation, worker_name)
@@ -428,6 +437,7 @@ class OperationQueue:
         
         with self._running_lock:
             self._running_operations[operation_id] = operation
+        self._publish(operation)
         
         logger.info(f"Worker {worker_name} executing operation {operation_id}: {operation.operation_type}")
         
@@ -495,8 +505,7 @@ class OperationQueue:
                 await asyncio.sleep(retry_delay)
                 
                 # Put back in queue with higher priority for retry
-                with self._queue_lock:
-                    heapq.heappush(self._queue, operation)
+                self._push_queued(operation)
                 
                 logger.warning(f"Operation {operation_id} failed, retrying ({operation.retry_count}/{operation.max_retries}): {e}")
                 
@@ -504,6 +513,7 @@ class OperationQueue:
                 with self._running_lock:
                     self._running_operations.pop(operation_id, None)
                 
+                self._publish(operation)
                 return
             else:
                 # Max retries reached
@@ -519,6 +529,7 @@ class OperationQueue:
         
         with self._completed_lock:
             self._completed_operations[operation_id] = operation
+        self._publish(operation)
         
         # Cleanup old completed operations (keep last 1000)
         with self._completed_lock:
@@ -532,6 +543,15 @@ class OperationQueue:
                 for op_id, _ in oldest_ops:
                     del self._completed_operations[op_id]
     
+    def _push_queued(self, operation: QueuedOperation):
+        with self._queue_lock:
+            heapq.heappush(self._queue, operation)
+            self._queued_by_id[operation.operation_id] = operation
+    
+    def _publish(self, operation: QueuedOperation):
+        """Push the operation's current state to progress subscribers."""
+        self._broadcaster.publish(operation.operation_id, operation.to_dict())
+    
     async def get_operation_history(self, 
                                    limit: int = 100,
                                    status_filter: Optional[OperationStatus] = None) -> List[Dict[str, Any]]:
@@ -0,0 +1,411 @@
+"""
+Preview assets for timeline scrubbing and thumbnails.
+
+One ffmpeg decode pass per video produces:
+- sprite sheets of fixed-size tiles sampled at a fixed interval
+- a WebVTT thumbnail track mapping time ranges to sprite regions (#xywh)
+- a poster frame
+
+Assets are stored under AssetManager's .thumbnails directory, keyed by a
+hash of the video content and the preview settings, so identical videos
+share one set and editing a video produces a new one. A path index avoids
+re-hashing unchanged files; FileWatcher events drop stale entries.
+
+Single thumbnails are cropped from the sprite sheets, so hovering over N
+points on a timeline costs no ffmpeg processes once a video has previews.
+"""
+
+import os
+import json
+import math
+import shutil
+import hashlib
+import logging
+import threading
+import subprocess
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Bump to regenerate every preview set (e.g. after changing the filter graph)
+PREVIEW_VERSION = 1
+
+# Bytes hashed from the start and end of a video for its content key
+HASH_SAMPLE_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class PreviewSettings:
+    """Sprite sheet layout and poster options."""
+    interval: float = 2.0          # Seconds between thumbnails
+    tile_width: int = 160
+    tile_height: int = 90
+    columns: int = 10
+    rows: int = 10
+    poster_position: float = 0.1   # Fraction of the duration
+    poster_width: int = 1280
+    quality: int = 4               # JPEG qscale (2 = best)
+
+    @property
+    def tiles_per_sheet(self) -> int:
+        return self.columns * self.rows
+
+
+@dataclass
+class PreviewAssets:
+    """Generated preview set for one video."""
+    key: str
+    directory: str
+    duration: float
+    count: int
+    sprites: List[str]
+    vtt: str
+    poster: str
+    settings: PreviewSettings = field(default_factory=PreviewSettings)
+
+    def tile_at(self, timestamp: float) -> Tuple[str, Tuple[int, int, int, int]]:
+        """
+        Sprite sheet and tile box for a timestamp.
+
+        Returns:
+            (sprite path, (x, y, width, height))
+        """
+        s = self.settings
+        index = min(max(int(timestamp // s.interval), 0), self.count - 1)
+        sheet, position = divmod(index, s.tiles_per_sheet)
+        row, column = divmod(position, s.columns)
+        box = (column * s.tile_width, row * s.tile_height, s.tile_width, s.tile_height)
+        return os.path.join(self.directory, self.sprites[sheet]), box
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PreviewAssets':
+        data = dict(data)
+        data['settings'] = PreviewSettings(**data['settings'])
+        return cls(**data)
+
+
+def content_hash(path: str, sample_size: int = HASH_SAMPLE_SIZE) -> str:
+    """
+    Hash a video's size and its leading and trailing bytes.
+
+    Container headers and the end of the stream change with any re-encode,
+    so sampling keeps hashing cheap for multi-GB files.
+    """
+    sha256 = hashlib.sha256()
+    size = os.path.getsize(path)
+    sha256.update(str(size).encode())
+    with open(path, 'rb') as f:
+        sha256.update(f.read(sample_size))
+        if size > 2 * sample_size:
+            f.seek(-sample_size, os.SEEK_END)
+        sha256.update(f.read(sample_size))
+    return sha256.hexdigest()
+
+
+def _probe_duration(video_path: str) -> float:
+    """Container duration in seconds via ffprobe."""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+         '-of', 'default=noprint_wrappers=1:nokey=1', video_path],
+        capture_output=True, text=True, timeout=30
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {video_path}: {result.stderr.strip()[:200]}")
+    return float(result.stdout.strip() or 0)
+
+
+def _run_ffmpeg(cmd: List[str]) -> bool:
+    """Run an ffmpeg command, returning True on success."""
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=1800)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.error(f"ffmpeg could not run: {e}")
+        return False
+    if result.returncode != 0:
+        logger.error(f"ffmpeg preview generation failed: {result.stderr[-500:]}")
+        return False
+    return True
+
+
+def _vtt_timestamp(seconds: float) -> str:
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+class PreviewAssetService:
+    """Generates and stores sprite sheets, WebVTT tracks and posters."""
+
+    def __init__(self,
+                 thumbnails_dir: Optional[str] = None,
+                 settings: Optional[PreviewSettings] = None,
+                 ffmpeg_path: str = 'ffmpeg'):
+        """
+        Initialize service.
+
+        Args:
+            thumbnails_dir: Thumbnail root (defaults to AssetManager's .thumbnails)
+            settings: Sprite layout and poster options
+            ffmpeg_path: ffmpeg executable
+        """
+        thumbnails_dir = thumbnails_dir or Path(os.environ.get('ASSETS_DIR', './assets')) / '.thumbnails'
+        self.root = Path(thumbnails_dir) / 'previews'
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.settings = settings or PreviewSettings()
+        self.ffmpeg_path = ffmpeg_path
+
+        self._index_path = self.root / 'index.json'
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+        # Statistics
+        self.generated = 0
+        self.hits = 0
+        self.invalidations = 0
+
+    @classmethod
+    def for_asset_manager(cls, asset_manager, **kwargs) -> 'PreviewAssetService':
+        """Service storing previews in an AssetManager's thumbnail directory."""
+        return cls(str(asset_manager.dirs['thumbnails']), **kwargs)
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        tmp_path = self._index_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _key_for(self, video_path: str) -> str:
+        """Content key for a video, re-hashing only if size or mtime changed."""
+        path = os.path.abspath(video_path)
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._index.get(path)
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                return entry['key']
+
+        settings = json.dumps(asdict(self.settings), sort_keys=True)
+        key = hashlib.sha256(
+            f"{PREVIEW_VERSION}:{settings}:{content_hash(path)}".encode()
+        ).hexdigest()[:32]
+
+        with self._lock:
+            self._index[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'key': key}
+            self._save_index()
+            stale = entry['key'] if entry and entry['key'] != key else None
+            if stale and any(e['key'] == stale for e in self._index.values()):
+                stale = None
+
+        # The file changed without a watcher event; drop its old previews
+        if stale:
+            shutil.rmtree(self.root / stale, ignore_errors=True)
+        return key
+
+    def _load_assets(self, key: str) -> Optional[PreviewAssets]:
+        try:
+            with open(self.root / key / 'manifest.json') as f:
+                return PreviewAssets.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def cached(self, video_path: str) -> Optional[PreviewAssets]:
+        """Existing previews for a video, without generating."""
+        return self._load_assets(self._key_for(video_path))
+
+    def get(self, video_path: str) -> PreviewAssets:
+        """
+        Get previews for a video, generating them in one pass if missing.
+
+        Raises:
+            FileNotFoundError: If the video does not exist
+            RuntimeError: If ffmpeg fails
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Video not found: {video_path}")
+
+        key = self._key_for(video_path)
+        assets = self._load_assets(key)
+        if assets:
+            self.hits += 1
+            return assets
+
+        # Concurrent requests for the same video wait for one ffmpeg run
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            assets = self._load_assets(key)
+            if not assets:
+                assets = self._generate(video_path, key)
+        return assets
+
+    def _generate(self, video_path: str, key: str) -> PreviewAssets:
+        s = self.settings
+        duration = _probe_duration(video_path)
+        poster_time = max(0.0, min(duration * s.poster_position, duration - 0.1))
+
+        tmp_dir = self.root / f".{key}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        filter_complex = (
+            f"[0:v]split=2[s][p];"
+            f"[s]fps=1/{s.interval},"
+            f"scale={s.tile_width}:{s.tile_height}:force_original_aspect_ratio=decrease,"
+            f"pad={s.tile_width}:{s.tile_height}:(ow-iw)/2:(oh-ih)/2,"
+            f"tile={s.columns}x{s.rows}[sprites];"
+            f"[p]trim=start={poster_time:.3f}:duration=1,setpts=PTS-STARTPTS,"
+            f"scale='min({s.poster_width},iw)':-2[poster]"
+        )
+        cmd = [
+            self.ffmpeg_path, '-v', 'error', '-y', '-i', video_path,
+            '-filter_complex', filter_complex,
+            '-map', '[sprites]', '-vsync', 'vfr', '-q:v', str(s.quality),
+            str(tmp_dir / 'sprite_%03d.jpg'),
+            '-map', '[poster]', '-frames:v', '1', '-q:v', '2',
+            str(tmp_dir / 'poster.jpg'),
+        ]
+
+        logger.info(f"Generating previews for {video_path} ({duration:.1f}s)")
+        sprites = []
+        if _run_ffmpeg(cmd):
+            sprites = sorted(p.name for p in tmp_dir.glob('sprite_*.jpg'))
+        if not sprites or not (tmp_dir / 'poster.jpg').exists():
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise RuntimeError(f"Preview generation failed for {video_path}")
+
+        count = min(max(1, math.ceil(duration / s.interval)), len(sprites) * s.tiles_per_sheet)
+        directory = self.root / key
+        assets = PreviewAssets(
+            key=key,
+            directory=str(directory),
+            duration=duration,
+            count=count,
+            sprites=sprites,
+            vtt='thumbnails.vtt',
+            poster='poster.jpg',
+            settings=s,
+        )
+        (tmp_dir / assets.vtt).write_text(self._build_vtt(assets))
+        with open(tmp_dir / 'manifest.json', 'w') as f:
+            json.dump(assets.to_dict(), f, indent=2)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_dir, directory)
+
+        self.generated += 1
+        return assets
+
+    def _build_vtt(self, assets: PreviewAssets) -> str:
+        """WebVTT thumbnail track with sprite URLs relative to the track."""
+        lines = ['WEBVTT', '']
+        interval = assets.settings.interval
+        for index in range(assets.count):
+            start = index * interval
+            end = min((index + 1) * interval, assets.duration) if assets.duration else start + interval
+            sprite, (x, y, w, h) = assets.tile_at(start)
+            lines.append(f"{_vtt_timestamp(start)} --> {_vtt_timestamp(max(end, start))}")
+            lines.append(f"{os.path.basename(sprite)}#xywh={x},{y},{w},{h}")
+            lines.append('')
+        return '\n'.join(lines)
+
+    def poster(self, video_path: str, output_path: Optional[str] = None) -> str:
+        """
+        Poster frame for a video.
+
+        Args:
+            video_path: Video file
+            output_path: Copy the poster here (defaults to the stored file)
+
+        Returns:
+            Poster path
+        """
+        assets = self.get(video_path)
+        poster_path = os.path.join(assets.directory, assets.poster)
+        if output_path:
+            shutil.copyfile(poster_path, output_path)
+            return output_path
+        return poster_path
+
+    def frame_at(self, video_path: str, timestamp: float, output_path: str) -> str:
+        """
+        Write the preview tile nearest a timestamp as a standalone image.
+
+        Returns:
+            Output path
+        """
+        assets = self.get(video_path)
+        sprite_path, (x, y, w, h) = assets.tile_at(timestamp)
+        with Image.open(sprite_path) as sprite:
+            sprite.crop((x, y, x + w, y + h)).save(output_path, quality=90)
+        return output_path
+
+    def invalidate(self, video_path: str) -> bool:
+        """
+        Forget a video's previews.
+
+        The stored set is deleted unless another indexed path has the same
+        content.
+
+        Returns:
+            True if the video was indexed
+        """
+        path = os.path.abspath(video_path)
+        with self._lock:
+            entry = self._index.pop(path, None)
+            if not entry:
+                return False
+            self._save_index()
+            shared = any(e['key'] == entry['key'] for e in self._index.values())
+
+        if not shared:
+            shutil.rmtree(self.root / entry['key'], ignore_errors=True)
+        self.invalidations += 1
+        return True
+
+    def handle_file_change(self, event):
+        """FileWatcher callback: drop previews of changed or deleted videos."""
+        if event.file_type == 'video' and event.event_type in ('modified', 'deleted', 'moved'):
+            if self.invalidate(event.file_path):
+                logger.debug(f"Invalidated previews for {event.file_path}")
+
+    def attach(self, file_watcher):
+        """Subscribe to a FileWatcher's change events."""
+        file_watcher.add_change_callback(self.handle_file_change)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'root': str(self.root),
+            'indexed_videos': len(self._index),
+            'generated': self.generated,
+            'hits': self.hits,
+            'invalidations': self.invalidations,
+            'settings': asdict(self.settings),
+        }
+
+
+# Global instance
+_preview_asset_service: Optional[PreviewAssetService] = None
+
+
+def get_preview_asset_service() -> PreviewAssetService:
+    """Get global preview asset service instance."""
+    global _preview_asset_service
+
+    if _preview_asset_service is None:
+        _preview_asset_service = PreviewAssetService()
+
+    return _preview_asset_service
@@ -0,0 +1,157 @@
+"""
+Progress Broadcaster - In-process push channel for operation progress.
+
+OperationProgress and OperationQueue publish every state change here;
+WebSocket handlers subscribe to an operation and await the next event
+instead of polling. A subscription holds only the latest event (latest
+wins) and is throttled to a maximum update rate, so an idle subscriber
+costs one pending await and a chatty operation cannot flood a socket.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled", "error"}
+MAX_UPDATE_RATE = float(os.getenv('OPERATION_PROGRESS_MAX_RATE', '4'))  # updates/second per subscriber
+
+
+class ProgressSubscription:
+    """Latest-wins, rate-limited stream of one operation's progress events."""
+
+    def __init__(self, broadcaster: 'ProgressBroadcaster', operation_id: str, min_interval: float):
+        self._broadcaster = broadcaster
+        self.operation_id = operation_id
+        self.min_interval = min_interval
+        self._latest: Optional[Dict[str, Any]] = None
+        self._event = asyncio.Event()
+        self._last_sent = 0.0
+        self.closed = False
+        self.dropped = 0
+
+    def _push(self, payload: Dict[str, Any]):
+        if self.closed:
+            return
+        if self._latest is not None:
+            self.dropped += 1
+        self._latest = payload
+        self._event.set()
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Wait for the next event; returns None once the subscription is closed."""
+        while not self.closed:
+            await self._event.wait()
+            if self.closed:
+                break
+
+            # Throttle, letting newer events replace this one meanwhile
+            wait = self._last_sent + self.min_interval - time.monotonic()
+            if wait > 0 and self._latest.get("status") not in TERMINAL_STATUSES:
+                await asyncio.sleep(wait)
+                if self.closed:
+                    break
+
+            payload, self._latest = self._latest, None
+            self._event.clear()
+            if payload is not None:
+                self._last_sent = time.monotonic()
+                return payload
+        return None
+
+    def close(self):
+        """Stop the stream and wake any waiter."""
+        if not self.closed:
+            self.closed = True
+            self._event.set()
+            self._broadcaster._remove(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        payload = await self.get()
+        if payload is None:
+            raise StopAsyncIteration
+        return payload
+
+
+class ProgressBroadcaster:
+    """Fan-out of operation progress events to in-process subscribers."""
+
+    def __init__(self, max_update_rate: float = MAX_UPDATE_RATE):
+        """
+        Initialize broadcaster.
+
+        Args:
+            max_update_rate: Maximum events per second delivered to each subscriber (0 = unthrottled)
+        """
+        self.min_interval = 1.0 / max_update_rate if max_update_rate > 0 else 0.0
+        self._subscribers: Dict[str, Set[ProgressSubscription]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+
+    def subscribe(self, operation_id: str) -> ProgressSubscription:
+        """Subscribe to an operation; must be called from the event loop."""
+        self._loop = asyncio.get_running_loop()
+        subscription = ProgressSubscription(self, operation_id, self.min_interval)
+        with self._lock:
+            self._subscribers.setdefault(operation_id, set()).add(subscription)
+        return subscription
+
+    def publish(self, operation_id: str, payload: Dict[str, Any]):
+        """
+        Publish an event; safe to call from worker threads.
+
+        Costs a dict lookup when nobody is subscribed.
+        """
+        if operation_id not in self._subscribers:
+            return
+        self.published += 1
+
+        loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is None or running is loop:
+            self._deliver(operation_id, payload)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._deliver, operation_id, payload)
+
+    def subscriber_count(self, operation_id: Optional[str] = None) -> int:
+        with self._lock:
+            if operation_id is not None:
+                return len(self._subscribers.get(operation_id, ()))
+            return sum(len(subs) for subs in self._subscribers.values())
+
+    def _deliver(self, operation_id: str, payload: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers.get(operation_id, ()))
+        for subscription in subscribers:
+            subscription._push(payload)
+
+    def _remove(self, subscription: ProgressSubscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.operation_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.operation_id]
+
+
+# Global instance
+_progress_broadcaster: Optional[ProgressBroadcaster] = None
+
+
+def get_progress_broadcaster() -> ProgressBroadcaster:
+    """Get global progress broadcaster instance."""
+    global _progress_broadcaster
+    if _progress_broadcaster is None:
+        _progress_broadcaster = ProgressBroadcaster()
+    return _progress_broadcaster
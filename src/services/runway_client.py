@@ -5,6 +5,8 @@ In production, this would integrate with the actual Runway ML API or similar ser
 """
 
 import os
+import re
+import asyncio
 import time
 import uuid
 import random
@@ -12,8 +14,25 @@ import logging
 from typing import Dict, List, Any, Optional, BinaryIO
 from datetime import datetime
 
+from ..utils.http_pool import get_sync_session
+from ..utils.streaming_download import (
+    DownloadResult, StreamChecksum, download_resumable_sync, write_chunks_atomic
+)
+from ..utils.render_cache import child_seed, get_render_cache, render_key, render_seed
+
 logger = logging.getLogger(__name__)
 
+# Bump to invalidate cached placeholders after changing their filter graphs
+PLACEHOLDER_RENDER_VERSION = 1
+
+_NOISE_FILTER = re.compile(r'(noise=[^,\[\]\s;]*allf=t)')
+
+
+def _seed_noise_filters(filter_complex: str, seed: int) -> str:
+    """Pin the seed of every temporal noise filter so renders are reproducible."""
+    return _NOISE_FILTER.sub(rf'\1:all_seed={seed}', filter_complex)
+
+
 class RunwayClient:
     """
     Stub client for video generation API (Runway ML or similar).
@@ -32,6 +51,12 @@ class RunwayClient:
         self.api_key = api_key or os.getenv('RUNWAY_API_KEY', 'dummy_key')
         self.base_url = os.getenv('RUNWAY_API_URL', 'https://api.runway.ml/v1')
         
+        # Shared keep-alive session for all Runway requests
+        self.session = get_sync_session('runway')
+        
+        # Rendered offline placeholders, keyed on their render seed
+        self.render_cache = get_render_cache()
+        
         # Simulated job storage
         self._jobs = {}
         
@@ -57,8 +82,6 @@ class RunwayClient:
         Returns:
             Generation job information
         """
-        import requests
-        
         job_id = str(uuid.uuid4())
         
         try:
@@ -91,7 +114,7 @@ class RunwayClient:
             }
             
             # Submit generation request
-            response = requests.post(
+            response = self.session.post(
                 f'{self.base_url}/generate',
                 headers=headers,
                 json=payload,
@@ -103,7 +126,7 @@ class RunwayClient:
                 api_response = response.json()
                 
                 job_data = {
-                    'id': api_response.get('id', job_id),
+                    'id': job_id,
                     'runway_id': api_response.get('id'),
                     'status': 'processing',
                     'prompt': prompt,
@@ -126,15 +149,16 @@ class RunwayClient:
             else:
                 # API error - fall back to enhanced placeholder
                 logger.warning(f"Runway API error {response.status_code}: {response.text}")
-                return self._create_enhanced_placeholder(job_id, prompt, duration, resolution, style)
+                return self._create_enhanced_placeholder(job_id, prompt, duration, resolution, style, seed)
                 
         except Exception as e:
             logger.error(f"Runway API request failed: {str(e)}")
             # Fall back to enhanced placeholder
-            return self._create_enhanced_placeholder(job_id, prompt, duration, resolution, style)
+            return self._create_enhanced_placeholder(job_id, prompt, duration, resolution, style, seed)
     
     def _create_enhanced_placeholder(self, job_id: str, prompt: str, duration: float, 
-                                   resolution: str, style: str) -> Dict[str, Any]:
+                                   resolution: str, style: str,
+                                   seed: Optional[int] = None) -> Dict[str, Any]:
         """Create enhanced placeholder with scene-specific visuals"""
         job_data = {
             'id': job_id,
@@ -143,6 +167,7 @@ class RunwayClient:
             'duration': duration,
             'resolution': resolution,
             'style': style,
+            'seed': seed,
             'created_at': datetime.utcnow().isoformat(),
             'progress': 0,
             'estimated_time': 5,  # Quick generation for placeholders
@@ -180,8 +205,6 @@ class RunwayClient:
         
         # Real Runway API status check
         try:
-            import requests
-            
             runway_id = job.get('runway_id')
             if not runway_id:
                 # Fallback to simulation
@@ -192,7 +215,7 @@ class RunwayClient:
                 'Accept': 'application/json'
             }
             
-            response = requests.get(
+            response = self.session.get(
                 f'{self.base_url}/generations/{runway_id}',
                 headers=headers,
                 timeout=10
@@ -252,14 +275,12 @@ class RunwayClient:
         else:
             # Real Runway video download
             try:
-                import requests
-                
                 headers = {
                     'Authorization': f'Bearer {self.api_key}',
                     'Accept': 'video/mp4'
                 }
                 
-                response = requests.get(video_url, headers=headers, timeout=60)
+                response = self.session.get(video_url, headers=headers, timeout=60)
                 
                 if response.status_code == 200:
                     logger.info(f"Successfully downloaded video: {len(response.content)} bytes")
@@ -272,12 +293,94 @@ class RunwayClient:
                 logger.error(f"Error downloading video: {str(e)}")
                 return self._generate_enhanced_placeholder_video(video_url)
     
+    def download_video_to_file(self, video_url: str, output_path: str) -> DownloadResult:
+        """
+        Download generated video straight to disk.
+        
+        Real videos are streamed in chunks with resumable range requests and
+        checksummed on the fly; placeholders are rendered directly into place.
+        Nothing larger than one chunk is held in memory.
+        
+        Args:
+            video_url: URL of the video to download
+            output_path: Final path of the video file
+        
+        Returns:
+            DownloadResult with file size and checksums
+        """
+        logger.info(f"Streaming video from: {video_url}")
+        
+        if not video_url.startswith(('placeholder://', 'simulated://')):
+            headers = {
+                'Authorization': f'Bearer {self.api_key}',
+                'Accept': 'video/mp4'
+            }
+            try:
+                result = download_resumable_sync(
+                    video_url, output_path, session=self.session, headers=headers
+                )
+                if not self._verify_download(result):
+                    raise ValueError(f"Downloaded video failed integrity check: {result.path}")
+                logger.info(f"Successfully downloaded video: {result.size} bytes")
+                return result
+            except Exception as e:
+                logger.error(f"Error downloading video: {str(e)}")
+        
+        return self._render_placeholder_to_file(video_url, output_path)
+    
+    def _verify_download(self, download: DownloadResult) -> bool:
+        """Validate a streamed video, reusing the checksums computed while it downloaded."""
+        try:
+            from .corruption_detector import IntegrityStatus, corruption_detector
+        except ImportError as e:
+            logger.warning(f"Corruption detector unavailable, skipping integrity check: {e}")
+            return True
+        
+        info = asyncio.run(corruption_detector.verify_download(download))
+        return info.status in (IntegrityStatus.VALID, IntegrityStatus.RECOVERABLE)
+    
+    def _render_placeholder_to_file(self, video_url: str, output_path: str) -> DownloadResult:
+        """Render the enhanced placeholder into output_path, checksumming the result."""
+        part_path = f"{output_path}.render.mp4"
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        
+        if self._render_enhanced_placeholder(video_url, part_path):
+            checksum = StreamChecksum()
+            checksum.update_from_file(part_path)
+            os.replace(part_path, output_path)
+            return DownloadResult(path=output_path, size=checksum.size,
+                                  checksums=checksum.as_dict())
+        
+        return write_chunks_atomic([self._generate_simple_placeholder()], output_path)
+    
     def _generate_enhanced_placeholder_video(self, video_url: str) -> bytes:
-        """Generate enhanced placeholder video with cinematic visual content using advanced FFmpeg filters"""
+        """Generate enhanced placeholder video and return it as bytes"""
+        import tempfile
+        
+        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as temp_file:
+            temp_path = temp_file.name
+        
+        try:
+            if self._render_enhanced_placeholder(video_url, temp_path):
+                with open(temp_path, 'rb') as f:
+                    video_data = f.read()
+                logger.info(f"Generated enhanced placeholder video: {len(video_data)} bytes")
+                return video_data
+            return self._generate_simple_placeholder()
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+    
+    def _render_enhanced_placeholder(self, video_url: str, output_path: str) -> bool:
+        """
+        Render enhanced placeholder video with cinematic visual content using advanced FFmpeg filters.
+        
+        Placeholders are deterministic in (prompt, style, seed): noise filters
+        are seeded from them, and a repeated placeholder is copied from the
+        render cache instead of running FFmpeg again.
+        """
         try:
             import subprocess
-            import tempfile
-            import os
             from .runway_client_cinematic import CinematicVisualGenerator
             
             # Extract job info from URL
@@ -290,6 +393,15 @@ class RunwayClient:
             # Determine if we should use cinematic mode
             use_cinematic = os.environ.get('RUNWAY_CINEMATIC_MODE', 'true').lower() == 'true'
             
+            scene_seed = render_seed(prompt, style, job.get('seed'))
+            cache_key = render_key(
+                'placeholder', PLACEHOLDER_RENDER_VERSION, scene_seed,
+                duration=duration, cinematic=use_cinematic
+            )
+            if self.render_cache.fetch(cache_key, output_path):
+                logger.info(f"Reused cached placeholder render {cache_key}")
+                return True
+            
             # Create visual content - use cinematic or basic mode
             if use_cinematic:
                 logger.info("Using cinematic visual generation mode")
@@ -505,10 +617,11 @@ class RunwayClient:
                 [lights]curves=preset=darker,vignette=a=0.8[out]
                 """
             
-            # Generate video using FFmpeg
-            with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as temp_file:
-                temp_path = temp_file.name
+            filter_complex = _seed_noise_filters(
+                filter_complex, child_seed(scene_seed, 'noise') % 2 ** 31
+            )
             
+            # Generate video using FFmpeg
             cmd = [
                 'ffmpeg', '-y',
                 '-f', 'lavfi',
@@ -519,24 +632,24 @@ class RunwayClient:
                 '-preset', 'fast',
                 '-pix_fmt', 'yuv420p',
                 '-r', '24',
-                temp_path
+                output_path
             ]
             
             result = subprocess.run(cmd, capture_output=True, text=True)
             
-            if result.returncode == 0 and os.path.exists(temp_path):
-                with open(temp_path, 'rb') as f:
-                    video_data = f.read()
-                os.unlink(temp_path)
-                logger.info(f"Generated enhanced placeholder video: {len(video_data)} bytes")
-                return video_data
+            if result.returncode == 0 and os.path.exists(output_path):
+                try:
+                    self.render_cache.put(cache_key, output_path)
+                except OSError as e:
+                    logger.warning(f"Could not cache placeholder render {cache_key}: {e}")
+                return True
             else:
                 logger.error(f"FFmpeg failed: {result.stderr}")
-                return self._generate_simple_placeholder()
+                return False
                 
         except Exception as e:
             logger.error(f"Error generating enhanced placeholder: {str(e)}")
-            return self._generate_simple_placeholder()
+            return False
     
     def _generate_simulated_video(self, video_url: str) -> bytes:
         """Generate simulated video for fallback"""
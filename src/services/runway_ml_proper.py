@@ -15,6 +15,11 @@ from pathlib import Path
 import asyncio
 import tempfile
 
+import aiohttp
+
+from ..utils.http_pool import get_http_pool, get_sync_session
+from ..utils.streaming_download import download_resumable, download_resumable_sync
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,21 +28,27 @@ class RunwayMLProperClient:
     Proper RunwayML API client that actually uses the RunwayML API endpoints.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """
         Initialize RunwayML client with proper API configuration.
         
         Args:
             api_key: RunwayML API key (can also be set via RUNWAY_API_KEY env var)
+            base_url: API base URL (can also be set via RUNWAY_API_BASE_URL env var)
         """
         self.api_key = api_key or os.getenv('RUNWAY_API_KEY')
         if not self.api_key:
             raise ValueError("RunwayML API key is required")
         
         # Use the correct base URL from the docs
-        self.base_url = "https://api.dev.runwayml.com"  # Development API URL
+        self.base_url = base_url or os.getenv(
+            'RUNWAY_API_BASE_URL', "https://api.dev.runwayml.com"  # Development API URL
+        )
         self.api_version = "2024-11-06"
         
+        # Shared keep-alive session for all Runway requests
+        self.session = get_sync_session('runway')
+        
         # Default headers for all requests
         self.headers = {
             'Authorization': f'Bearer {self.api_key}',
@@ -165,28 +176,12 @@ class RunwayMLProperClient:
             Task creation response with task ID
         """
         endpoint = f"{self.base_url}/v1/image_to_video"
-        
-        # Validate duration
-        if duration not in [5, 10]:
-            duration = 10 if duration > 7 else 5
-        
-        # Build request payload
-        payload = {
-            "promptImage": image_url,
-            "promptText": prompt,
-            "model": model,
-            "ratio": ratio,
-            "duration": duration
-        }
-        
-        if seed is not None:
-            payload["seed"] = seed
-        
-        if content_moderation:
-            payload["contentModeration"] = content_moderation
+        payload = self._build_image_to_video_payload(
+            image_url, prompt, duration, model, ratio, seed, content_moderation
+        )
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 endpoint,
                 headers=self.headers,
                 json=payload,
@@ -212,6 +207,63 @@ class RunwayMLProperClient:
                 "error": str(e)
             }
     
+    def _build_image_to_video_payload(
+        self,
+        image_url: str,
+        prompt: str,
+        duration: int,
+        model: str,
+        ratio: str,
+        seed: Optional[int],
+        content_moderation: Optional[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """Build the image-to-video request body, normalizing duration."""
+        # Validate duration
+        if duration not in [5, 10]:
+            duration = 10 if duration > 7 else 5
+        
+        payload = {
+            "promptImage": image_url,
+            "promptText": prompt,
+            "model": model,
+            "ratio": ratio,
+            "duration": duration
+        }
+        
+        if seed is not None:
+            payload["seed"] = seed
+        
+        if content_moderation:
+            payload["contentModeration"] = content_moderation
+        
+        return payload
+    
+    @staticmethod
+    def _resolve_task_output(task_id: str, status: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """
+        Interpret a task status response.
+        
+        Returns:
+            Tuple of (finished, output URL); URL is None for failed tasks
+        """
+        state = status.get('status')
+        
+        if state == 'SUCCEEDED':
+            output = status.get('output', [])
+            if output and len(output) > 0:
+                logger.info(f"Task {task_id} completed successfully")
+                return True, output[0]  # Return first output URL
+        
+        elif state == 'FAILED':
+            logger.error(f"Task {task_id} failed: {status.get('failure', 'Unknown error')}")
+            return True, None
+        
+        elif state == 'CANCELLED':
+            logger.warning(f"Task {task_id} was cancelled")
+            return True, None
+        
+        return False, None
+    
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """
         Get the status of a generation task.
@@ -225,7 +277,7 @@ class RunwayMLProperClient:
         endpoint = f"{self.base_url}/v1/tasks/{task_id}"
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 endpoint,
                 headers=self.headers,
                 timeout=10
@@ -265,19 +317,9 @@ class RunwayMLProperClient:
         while time.time() - start_time < max_wait_time:
             status = self.get_task_status(task_id)
             
-            if status.get('status') == 'SUCCEEDED':
-                output = status.get('output', [])
-                if output and len(output) > 0:
-                    logger.info(f"Task {task_id} completed successfully")
-                    return output[0]  # Return first output URL
-            
-            elif status.get('status') == 'FAILED':
-                logger.error(f"Task {task_id} failed: {status.get('failure', 'Unknown error')}")
-                return None
-            
-            elif status.get('status') == 'CANCELLED':
-                logger.warning(f"Task {task_id} was cancelled")
-                return None
+            finished, video_url = self._resolve_task_output(task_id, status)
+            if finished:
+                return video_url
             
             # Still processing, wait before next check
             time.sleep(poll_interval)
@@ -298,7 +340,7 @@ class RunwayMLProperClient:
         endpoint = f"{self.base_url}/v1/tasks/{task_id}"
         
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 endpoint,
                 headers=self.headers,
                 timeout=10
@@ -355,7 +397,7 @@ class RunwayMLProperClient:
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 endpoint,
                 headers=self.headers,
                 json=payload,
@@ -397,22 +439,16 @@ class RunwayMLProperClient:
             Path to downloaded video or None if failed
         """
         try:
-            # RunwayML URLs are presigned and don't need auth
-            response = requests.get(video_url, stream=True, timeout=60)
+            if not output_path:
+                fd, output_path = tempfile.mkstemp(suffix=".mp4")
+                os.close(fd)
             
-            if response.status_code == 200:
-                if not output_path:
-                    output_path = tempfile.mktemp(suffix=".mp4")
-                
-                with open(output_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
-                logger.info(f"Downloaded video to {output_path}")
-                return output_path
-            else:
-                logger.error(f"Failed to download video: {response.status_code}")
-                return None
+            # RunwayML URLs are presigned and don't need auth; stream with
+            # range-request resume so dropped connections don't restart
+            download_resumable_sync(video_url, output_path, session=self.session)
+            
+            logger.info(f"Downloaded video to {output_path}")
+            return output_path
                 
         except Exception as e:
             logger.error(f"Download failed: {e}")
@@ -520,7 +556,7 @@ class RunwayMLProperClient:
         endpoint = f"{self.base_url}/v1/organization"
         
         try:
-            response = requests.get(
+            response = self.session.get(
                 endpoint,
                 headers=self.headers,
                 timeout=10
@@ -537,33 +573,198 @@ class RunwayMLProperClient:
             return {}
 
 
-# Async wrapper for better integration
+# Native async client for better integration
 class AsyncRunwayMLClient:
-    """Async wrapper for RunwayML client."""
+    """
+    Async RunwayML client running on the shared Runway connection pool.
     
-    def __init__(self, api_key: Optional[str] = None):
-        self.sync_client = RunwayMLProperClient(api_key)
+    Requests are issued directly on the event loop instead of being pushed to
+    a thread pool, and status polling uses ``asyncio.sleep`` so waiting on a
+    task never occupies a worker thread.
+    """
     
-    async def generate_video_from_image(self, **kwargs) -> Dict[str, Any]:
-        """Async wrapper for video generation from image."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, 
-            lambda: self.sync_client.generate_video_from_image(**kwargs)
-        )
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        """
+        Initialize async RunwayML client.
+        
+        Args:
+            api_key: RunwayML API key (can also be set via RUNWAY_API_KEY env var)
+            base_url: API base URL (can also be set via RUNWAY_API_BASE_URL env var)
+        """
+        # Sync client supplies configuration and the request/response helpers
+        self.sync_client = RunwayMLProperClient(api_key, base_url)
+        self.base_url = self.sync_client.base_url
+        self.headers = self.sync_client.headers
+        self.http = get_http_pool('runway')
     
-    async def wait_for_completion(self, task_id: str, **kwargs) -> Optional[str]:
-        """Async wrapper for waiting for task completion."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.sync_client.wait_for_completion(task_id, **kwargs)
+    async def generate_video_from_image(
+        self,
+        image_url: str,
+        prompt: str,
+        duration: int = 10,
+        model: str = "gen4_turbo",
+        ratio: str = "1280:720",
+        seed: Optional[int] = None,
+        content_moderation: Optional[Dict[str, str]] = None,
+        position: str = "first"
+    ) -> Dict[str, Any]:
+        """
+        Generate video from image using RunwayML image-to-video endpoint.
+        
+        Args:
+            image_url: URL or data URI of the image
+            prompt: Text description to guide video generation
+            duration: Video duration in seconds (5 or 10)
+            model: Model to use (gen4_turbo or gen3a_turbo)
+            ratio: Video resolution/aspect ratio
+            seed: Random seed for reproducibility
+            content_moderation: Content moderation settings
+            position: Image position (first or last)
+        
+        Returns:
+            Task creation response with task ID
+        """
+        payload = self.sync_client._build_image_to_video_payload(
+            image_url, prompt, duration, model, ratio, seed, content_moderation
         )
+        
+        try:
+            async with self.http.request(
+                "POST",
+                f"{self.base_url}/v1/image_to_video",
+                headers=self.headers,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                if response.status in [200, 202]:
+                    result = await response.json()
+                    logger.info(f"Video generation task created: {result.get('id')}")
+                    return result
+                
+                details = await response.text()
+                logger.error(f"RunwayML API error {response.status}: {details}")
+                return {
+                    "id": None,
+                    "error": f"API error: {response.status}",
+                    "details": details
+                }
+                
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Request failed: {e}")
+            return {
+                "id": None,
+                "error": str(e)
+            }
+    
+    async def get_task_status(self, task_id: str) -> Dict[str, Any]:
+        """
+        Get the status of a generation task.
+        
+        Args:
+            task_id: The task ID returned from generation request
+        
+        Returns:
+            Task status information
+        """
+        try:
+            async with self.http.request(
+                "GET",
+                f"{self.base_url}/v1/tasks/{task_id}",
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 200:
+                    return await response.json()
+                elif response.status == 404:
+                    return {"status": "NOT_FOUND", "error": "Task not found"}
+                else:
+                    logger.error(f"Error getting task status: {response.status}")
+                    return {"status": "ERROR", "error": await response.text()}
+                    
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Request failed: {e}")
+            return {"status": "ERROR", "error": str(e)}
+    
+    async def wait_for_completion(
+        self,
+        task_id: str,
+        max_wait_time: int = 600,
+        poll_interval: int = 5
+    ) -> Optional[str]:
+        """
+        Wait for a task to complete and return the video URL.
+        
+        Args:
+            task_id: The task ID to wait for
+            max_wait_time: Maximum time to wait in seconds
+            poll_interval: Time between status checks in seconds
+        
+        Returns:
+            Video URL if successful, None otherwise
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait_time
+        
+        while loop.time() < deadline:
+            status = await self.get_task_status(task_id)
+            
+            finished, video_url = self.sync_client._resolve_task_output(task_id, status)
+            if finished:
+                return video_url
+            
+            await asyncio.sleep(poll_interval)
+        
+        logger.error(f"Task {task_id} timed out after {max_wait_time} seconds")
+        return None
+    
+    async def cancel_task(self, task_id: str) -> bool:
+        """
+        Cancel a running task.
+        
+        Args:
+            task_id: The task ID to cancel
+        
+        Returns:
+            True if cancelled successfully
+        """
+        try:
+            async with self.http.request(
+                "DELETE",
+                f"{self.base_url}/v1/tasks/{task_id}",
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 204:
+                    logger.info(f"Task {task_id} cancelled successfully")
+                    return True
+                logger.error(f"Failed to cancel task: {response.status}")
+                return False
+                
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Request failed: {e}")
+            return False
     
     async def download_video(self, video_url: str, output_path: Optional[str] = None) -> Optional[str]:
-        """Async wrapper for video download."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.sync_client.download_video(video_url, output_path)
-        )
\ No newline at end of file
+        """
+        Stream video from RunwayML URL to disk.
+        
+        Args:
+            video_url: URL of the video to download
+            output_path: Optional path to save the video
+        
+        Returns:
+            Path to downloaded video or None if failed
+        """
+        if not output_path:
+            fd, output_path = tempfile.mkstemp(suffix=".mp4")
+            os.close(fd)
+        
+        try:
+            # RunwayML URLs are presigned and don't need auth
+            await download_resumable(video_url, output_path, pool=self.http)
+            logger.info(f"Downloaded video to {output_path}")
+            return output_path
+            
+        except Exception as e:
+            logger.error(f"Download failed: {e}")
+            return None
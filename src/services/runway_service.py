@@ -17,6 +17,8 @@ import structlog
 
 from .ffmpeg_service import FFmpegService
 from ..utils.file_manager import FileManager
+from ..utils.http_pool import get_http_pool
+from ..utils.streaming_download import DEFAULT_CHUNK_SIZE
 from ..utils.runway_api_client import RunwayAPIClient
 
 logger = structlog.get_logger()
@@ -164,14 +166,13 @@ class RunwayService:
             )
             
             # Poll for completion
-            video_data = await self._poll_runway_completion(job)
+            video_url = await self._poll_runway_completion(job)
             
-            if not video_data:
+            if not video_url:
                 raise Exception("Failed to retrieve video from Runway")
             
-            # Save video file
-            filename = f"{job.job_id}_runway.mp4"
-            return await self.file_manager.save_video_file(filename, video_data)
+            # Stream video file to disk
+            return await self._download_video(job, video_url)
             
         except Exception as e:
             logger.warning(
@@ -182,8 +183,8 @@ class RunwayService:
             return await self._generate_placeholder(job, resolution, fps, style)
     
     async def _poll_runway_completion(self, job: GenerationJob, 
-                                    timeout: float = 300.0) -> Optional[bytes]:
-        """Poll Runway API for job completion."""
+                                    timeout: float = 300.0) -> Optional[str]:
+        """Poll Runway API for job completion, returning the video URL."""
         start_time = asyncio.get_event_loop().time()
         poll_interval = 5.0  # Poll every 5 seconds
         
@@ -205,7 +206,8 @@ class RunwayService:
                 if job.status == 'completed':
                     video_url = status.get('video_url')
                     if video_url:
-                        return await self.api_client.download_video(video_url)
+                        job.video_url = video_url
+                        return video_url
                     else:
                         raise Exception("No video URL in completion response")
                 
@@ -229,6 +231,37 @@ class RunwayService:
         job.error = "Generation timeout or polling error"
         return None
     
+    async def _download_video(self, job: GenerationJob, video_url: str) -> str:
+        """
+        Stream a finished Runway video into the video directory.
+        
+        The file is checksummed while it is written, and the integrity check
+        reuses those checksums instead of reading the clip again.
+        """
+        filename = f"{job.job_id}_runway.mp4"
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Accept': 'video/mp4'
+        }
+        
+        async with get_http_pool('runway').request('GET', video_url, headers=headers) as response:
+            response.raise_for_status()
+            download = await self.file_manager.save_video_stream(
+                filename, response.content.iter_chunked(DEFAULT_CHUNK_SIZE)
+            )
+        
+        try:
+            from .corruption_detector import IntegrityStatus, corruption_detector
+        except ImportError as e:
+            logger.warning("Corruption detector unavailable, skipping integrity check", error=str(e))
+            return download.path
+        
+        info = await corruption_detector.verify_download(download)
+        if info.status not in (IntegrityStatus.VALID, IntegrityStatus.RECOVERABLE):
+            raise Exception(f"Downloaded video failed integrity check: {info.error_details}")
+        
+        return download.path
+    
     async def _generate_placeholder(self, job: GenerationJob, resolution: str, 
                                   fps: int, style: str) -> str:
         """Generate enhanced placeholder video."""
@@ -6,17 +6,29 @@ Creates detailed procedural scenes with physics, lighting, and environmental eff
 import numpy as np
 import math
 import random
-from typing import Dict, Any, List, Tuple, Optional
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, Any, Iterator, List, Tuple, Optional
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import noise
 import cv2
 from datetime import datetime
 
-from .visual_effects_engine import VisualEffectsEngine, ParticleType, LightType
+from .visual_effects_engine import VisualEffectsEngine, Particle, ParticleType, LightType
 from ..config.visual_styles import VisualStyle
 from ..terminal_sim.font_manager import FontManager
+from .scene_raster import (
+    Sprite, add_glow, draw_segments, ellipse, grid_view, make_sprite, pack_rgb, packed_image,
+    paste_sprites, rectangle
+)
+from ..utils.render_cache import (
+    RenderCache, child_seed, get_render_cache, make_np_rng, make_rng, render_key, render_seed
+)
+
+logger = logging.getLogger(__name__)
 
 
 class EnvironmentType(Enum):
@@ -67,13 +79,142 @@ class SceneElement:
     physics: Optional[Dict[str, Any]] = None
 
 
+# Particle type, count, wind and gravity of weather that moves between frames
+ANIMATED_WEATHER = {
+    Weather.RAIN: (ParticleType.RAIN, 2000, 0.0, 9.8),
+    Weather.SNOW: (ParticleType.SNOW, 1500, 10.0, 50.0),
+}
+
+STATIC_LAYER_CACHE_SIZE = 4  # a 1080p layer is ~6 MB
+
+# Bump to invalidate cached renders after changing how scenes are drawn
+SCENE_RENDER_VERSION = 2
+
+# Repeated primitives drawn by the batched rasterizer
+GLOW_RADIUS = 6
+WINDOW_MARGIN = 10
+DARK_WINDOW_COLOR = (30, 30, 40)
+BLIND_COLOR = (60, 60, 70)
+SILHOUETTE_COLOR = (20, 20, 20)
+CAR_COLORS = [
+    (150, 30, 30),   # Red
+    (30, 30, 150),   # Blue
+    (150, 150, 150), # Silver
+    (30, 30, 30),    # Black
+    (200, 200, 200)  # White
+]
+TRUNK_COLOR = (60, 40, 20)
+BUSH_COLOR = (30, 50, 30)
+GRASS_COLOR = (50, 70, 50)
+GRASS_BLADES = 500
+VEHICLE_COLOR = (80, 90, 100)
+THRUSTER_COLOR = (100, 200, 255)
+TREE_HEIGHT_STEP = 10
+SPRITE_VARIANTS = 4  # random shapes per tree height or bush size
+
+
+@lru_cache(maxsize=256)
+def _tree_sprite(tree_height: int, variant: int) -> Sprite:
+    """Tree anchored at the base of its trunk."""
+    rng = np.random.default_rng([tree_height, variant])
+    trunk_width = tree_height // 10
+    shapes = [rectangle(-(trunk_width // 2), -tree_height, trunk_width // 2, 0, TRUNK_COLOR)]
+    
+    # Foliage (multiple layers for depth), irregular from overlapping circles
+    foliage_radius = tree_height // 3
+    for layer in range(3):
+        layer_offset = layer * 10
+        if 2 * layer_offset >= foliage_radius:
+            break  # Inner layers of small trees would be inside-out
+        layer_color = (20 + layer * 10, 40 + layer * 15, 20 + layer * 5)
+        for _ in range(5):
+            offset_x = int(rng.integers(-foliage_radius // 2, foliage_radius // 2 + 1))
+            offset_y = int(rng.integers(-foliage_radius // 2, 1))
+            shapes.append(ellipse(
+                -foliage_radius + offset_x + layer_offset,
+                -tree_height + offset_y + layer_offset,
+                foliage_radius + offset_x - layer_offset,
+                -tree_height + foliage_radius + offset_y - layer_offset,
+                layer_color
+            ))
+    return make_sprite(tuple(shapes))
+
+
+@lru_cache(maxsize=256)
+def _bush_sprite(bush_size: int, variant: int) -> Sprite:
+    """Bush anchored at the middle of its base."""
+    rng = np.random.default_rng([bush_size, variant])
+    return make_sprite(tuple(
+        ellipse(-bush_size + offset_x, -bush_size, bush_size + offset_x, 0, BUSH_COLOR)
+        for offset_x in rng.integers(-bush_size // 2, bush_size // 2 + 1, 3).tolist()
+    ))
+
+
+@lru_cache(maxsize=256)
+def _car_sprite(car_width: int, color: int, lights_on: bool) -> Sprite:
+    """Car in CAR_COLORS[color], anchored at its rear bottom corner."""
+    car_height = 20
+    shapes = [
+        rectangle(0, -car_height, car_width, 0, CAR_COLORS[color]),                   # Body
+        rectangle(5, -car_height + 5, car_width - 5, -car_height + 10, (50, 50, 60)),  # Windows
+    ]
+    if lights_on:
+        shapes += [
+            ellipse(car_width - 10, -15, car_width - 5, -10, (255, 255, 200)),  # Headlights
+            ellipse(5, -15, 10, -10, (255, 0, 0)),                              # Taillights
+        ]
+    return make_sprite(tuple(shapes))
+
+
+@lru_cache(maxsize=64)
+def _person_sprite(person_height: int) -> Sprite:
+    """Pedestrian silhouette anchored at their feet."""
+    return make_sprite((
+        ellipse(-3, -person_height - 5, 3, -person_height + 1, SILHOUETTE_COLOR),
+        rectangle(-2, -person_height + 1, 2, 0, SILHOUETTE_COLOR),
+    ))
+
+
+@lru_cache(maxsize=64)
+def _vehicle_sprite(size: int, lights_on: bool) -> Sprite:
+    """Flying vehicle anchored at its center."""
+    # Streamlined body
+    shapes = [ellipse(-size, -(size // 3), size, size // 3, VEHICLE_COLOR)]
+    if lights_on:
+        # Glowing thrusters
+        shapes += [ellipse(-size - 5, 0, -size, 5, THRUSTER_COLOR),
+                   ellipse(size, 0, size + 5, 5, THRUSTER_COLOR)]
+    return make_sprite(tuple(shapes))
+
+
+@lru_cache(maxsize=256)
+def _trail_sprite(size: int, trail_length: int) -> Sprite:
+    """Thruster trails of a flying vehicle, fading out below its center."""
+    trail = np.zeros((trail_length, 2 * size + 5, 4), dtype=np.uint8)
+    trail[..., :3] = THRUSTER_COLOR
+    fade = (255 * (1 - np.arange(trail_length) / trail_length) * 0.5).astype(np.uint8)
+    trail[:, :3, 3] = fade[:, None]
+    trail[:, -3:, 3] = fade[:, None]
+    return Sprite(image=Image.fromarray(trail), offset=(-size - 2, 0))
+
+
+@dataclass
+class AnimationState:
+    """Per-animation dynamic layer state; the static layer is shared."""
+    rng: random.Random
+    particles: List[Particle] = field(default_factory=list)
+    lights: List[Tuple[int, int, float]] = field(default_factory=list)  # x, y, blink phase
+
+
 class RealisticSceneGenerator:
     """Generates high-quality realistic scenes."""
     
-    def __init__(self):
+    def __init__(self, render_cache: Optional[RenderCache] = None):
         self.effects_engine = VisualEffectsEngine()
         self.font_manager = FontManager()
+        self.render_cache = render_cache or get_render_cache()
         self.scene_elements: List[SceneElement] = []
+        self._static_layers: 'OrderedDict[str, Image.Image]' = OrderedDict()
         
     def generate_scene(
         self,
@@ -83,9 +224,79 @@ class RealisticSceneGenerator:
         resolution: Tuple[int, int],
         style: VisualStyle,
         camera_angle: str = "medium",
-        camera_movement: Optional[Dict[str, Any]] = None
+        camera_movement: Optional[Dict[str, Any]] = None,
+        seed: Optional[int] = None
     ) -> Image.Image:
-        """Generate a complete scene."""
+        """
+        Generate a complete scene.
+        
+        With a seed the scene is deterministic: the same settings and seed
+        always produce the same image, which is served from the render
+        cache after the first render. Without one every call draws a new
+        scene.
+        """
+        if seed is None:
+            return self._render_scene(
+                environment, time_of_day, weather, resolution, style, random.Random(), camera_angle
+            )
+        
+        scene_seed = self._scene_seed(environment, time_of_day, weather, style, seed)
+        key = self._scene_key(scene_seed, resolution, camera_angle, include_dynamic=True)
+        return self._cached_frame(key, lambda: self._render_scene(
+            environment, time_of_day, weather, resolution, style, make_rng(scene_seed), camera_angle
+        ))
+    
+    def _scene_seed(
+        self,
+        environment: EnvironmentType,
+        time_of_day: TimeOfDay,
+        weather: Weather,
+        style: VisualStyle,
+        seed: int
+    ) -> int:
+        """Render seed of a scene; its settings stand in for the prompt."""
+        return render_seed(
+            f"{environment.value}/{time_of_day.value}/{weather.value}", style.name, seed
+        )
+    
+    def _scene_key(
+        self,
+        scene_seed: int,
+        resolution: Tuple[int, int],
+        camera_angle: str,
+        include_dynamic: bool
+    ) -> str:
+        width, height = resolution
+        return render_key(
+            'scene', SCENE_RENDER_VERSION, scene_seed,
+            resolution=f"{width}x{height}", camera_angle=camera_angle, dynamic=include_dynamic
+        )
+    
+    def _cached_frame(self, key: str, render: Callable[[], Image.Image]) -> Image.Image:
+        """Load a frame from the render cache, rendering and storing it on a miss."""
+        frame = self.render_cache.get_frame(key)
+        if frame is not None:
+            return frame
+        
+        frame = render()
+        try:
+            self.render_cache.put_frame(key, frame)
+        except OSError as e:
+            logger.warning(f"Could not cache scene render {key}: {e}")
+        return frame
+    
+    def _render_scene(
+        self,
+        environment: EnvironmentType,
+        time_of_day: TimeOfDay,
+        weather: Weather,
+        resolution: Tuple[int, int],
+        style: VisualStyle,
+        rng: random.Random,
+        camera_angle: str = "medium",
+        include_dynamic: bool = True
+    ) -> Image.Image:
+        """Render every layer of a scene, or only its static layers, drawing from rng."""
         
         width, height = resolution
         
@@ -95,28 +306,30 @@ class RealisticSceneGenerator:
         
         # Generate environment-specific elements
         if environment == EnvironmentType.URBAN:
-            img = self._generate_urban_scene(img, time_of_day, weather, style)
+            img = self._generate_urban_scene(img, time_of_day, weather, style, rng)
         elif environment == EnvironmentType.NATURE:
-            img = self._generate_nature_scene(img, time_of_day, weather, style)
+            img = self._generate_nature_scene(img, time_of_day, weather, style, rng)
         elif environment == EnvironmentType.INDOOR:
             img = self._generate_indoor_scene(img, time_of_day, style)
         elif environment == EnvironmentType.INDUSTRIAL:
             img = self._generate_industrial_scene(img, time_of_day, weather, style)
         elif environment == EnvironmentType.FUTURISTIC:
-            img = self._generate_futuristic_scene(img, time_of_day, weather, style)
+            img = self._generate_futuristic_scene(img, time_of_day, weather, style, rng)
         elif environment == EnvironmentType.APOCALYPTIC:
-            img = self._generate_apocalyptic_scene(img, time_of_day, weather, style)
+            img = self._generate_apocalyptic_scene(img, time_of_day, weather, style, rng)
         elif environment == EnvironmentType.UNDERWATER:
             img = self._generate_underwater_scene(img, time_of_day, style)
         elif environment == EnvironmentType.SPACE:
             img = self._generate_space_scene(img, style)
         
-        # Apply weather effects
-        img = self._apply_weather_effects(img, weather, time_of_day)
+        # Apply weather effects. They draw from their own stream, so leaving
+        # out the dynamic ones does not change the layers drawn after them.
+        weather_rng = make_rng(rng.getrandbits(64))
+        img = self._apply_weather_effects(img, weather, time_of_day, weather_rng, include_dynamic)
         
         # Apply camera effects
         if camera_angle != "medium":
-            img = self._apply_camera_angle(img, camera_angle)
+            img = self._apply_camera_angle(img, camera_angle, rng)
         
         # Apply depth of field if enabled
         if style.depth_of_field:
@@ -160,12 +373,14 @@ class RealisticSceneGenerator:
         img: Image.Image,
         time_of_day: TimeOfDay,
         weather: Weather,
-        style: VisualStyle
+        style: VisualStyle,
+        rng: random.Random
     ) -> Image.Image:
         """Generate urban cityscape."""
         
         draw = ImageDraw.Draw(img)
         width, height = img.size
+        np_rng = make_np_rng(rng.getrandbits(64))
         
         # Generate city skyline with parallax layers
         layers = 3
@@ -187,11 +402,14 @@ class RealisticSceneGenerator:
             fog_color = self._get_sky_color(time_of_day, weather)
             building_color = self._blend_colors(base_building_color, fog_color, depth * 0.5)
             
+            # Light from the layer's lit windows, blurred into a glow
+            emission = Image.new('RGB', img.size)
+            
             # Generate buildings
             x = 0
             while x < width:
-                building_width = random.randint(*building_width_range)
-                building_height = random.randint(*building_height_range)
+                building_width = rng.randint(*building_width_range)
+                building_height = rng.randint(*building_height_range)
                 
                 # Building base
                 building_y = height - building_height
@@ -224,14 +442,14 @@ class RealisticSceneGenerator:
                 
                 # Windows
                 self._draw_building_windows(
-                    draw, x, building_y, building_width, building_height,
-                    time_of_day, layer == 0
+                    img, emission, x, building_y, building_width, building_height,
+                    building_color, time_of_day, layer == 0, np_rng
                 )
                 
                 # Architectural details for foreground
                 if layer == 0:
                     # Antenna
-                    if random.random() < 0.3:
+                    if rng.random() < 0.3:
                         antenna_x = x + building_width // 2
                         draw.line(
                             [(antenna_x, building_y), (antenna_x, building_y - 30)],
@@ -245,28 +463,39 @@ class RealisticSceneGenerator:
                                 fill=(255, 0, 0)
                             )
                 
-                x += building_width + random.randint(5, 20)
+                x += building_width + rng.randint(5, 20)
+            
+            # Glow of this layer's lit windows, under any layer drawn later
+            add_glow(img, emission, GLOW_RADIUS)
         
         # Add street level details
         self._add_street_level(draw, width, height, time_of_day)
         
         # Add vehicles and people for scale
         if weather not in [Weather.STORM, Weather.SANDSTORM]:
-            self._add_urban_life(draw, width, height, time_of_day)
+            self._add_urban_life(img, time_of_day, np_rng)
         
         return img
     
     def _draw_building_windows(
         self,
-        draw: ImageDraw.Draw,
+        img: Image.Image,
+        emission: Image.Image,
         x: int,
         y: int,
         width: int,
         height: int,
+        facade_color: Tuple[int, int, int],
         time_of_day: TimeOfDay,
-        is_foreground: bool
+        is_foreground: bool,
+        rng: np.random.Generator
     ):
-        """Draw realistic building windows."""
+        """
+        Draw realistic building windows.
+        
+        The window grid is drawn as one block over the plain facade, with
+        light from lit windows going to the emission layer.
+        """
         
         window_width = 8 if is_foreground else 4
         window_height = 12 if is_foreground else 6
@@ -281,36 +510,44 @@ class RealisticSceneGenerator:
         else:
             lit_probability = 0.1
         
-        for wx in range(x + 10, x + width - 10, spacing_x):
-            for wy in range(y + 10, y + height - 10, spacing_y):
-                if random.random() < lit_probability:
-                    # Lit window
-                    brightness = random.randint(200, 255)
-                    window_color = (brightness, brightness - 20, brightness - 40)
-                    
-                    # Window glow
-                    if is_foreground and time_of_day == TimeOfDay.NIGHT:
-                        glow_size = window_width + 4
-                        draw.rectangle(
-                            [(wx - 2, wy - 2), (wx + glow_size, wy + window_height + 2)],
-                            fill=(brightness // 2, brightness // 2 - 10, brightness // 2 - 20)
-                        )
-                else:
-                    # Dark window
-                    window_color = (30, 30, 40)
-                
-                draw.rectangle(
-                    [(wx, wy), (wx + window_width, wy + window_height)],
-                    fill=window_color
-                )
-                
-                # Window details for foreground
-                if is_foreground and random.random() < 0.2:
-                    # Curtains or blinds
-                    draw.rectangle(
-                        [(wx, wy), (wx + window_width, wy + window_height // 3)],
-                        fill=(60, 60, 70)
-                    )
+        left, top = x + WINDOW_MARGIN, y + WINDOW_MARGIN
+        cols = len(range(left, x + width - WINDOW_MARGIN, spacing_x))
+        rows = len(range(top, y + height - WINDOW_MARGIN, spacing_y))
+        if not rows or not cols:
+            return
+        
+        block = np.full((rows * spacing_y, cols * spacing_x), pack_rgb(facade_color))
+        # Pixels from the first window to the far corner of the last one
+        extent = (slice(0, (rows - 1) * spacing_y + window_height + 1),
+                  slice(0, (cols - 1) * spacing_x + window_width + 1))
+        
+        def windows(target: np.ndarray, cell_height: int) -> np.ndarray:
+            return grid_view(target, 0, 0, rows, cols, spacing_x, spacing_y,
+                             window_width + 1, cell_height + 1)
+        
+        lit = rng.random((rows, cols)) < lit_probability
+        brightness = rng.integers(200, 256, (rows, cols))
+        lit_colors = np.stack([brightness, brightness - 20, brightness - 40], axis=-1)
+        windows(block, window_height)[:] = np.where(
+            lit, pack_rgb(lit_colors), pack_rgb(DARK_WINDOW_COLOR)
+        )[:, None, :, None]
+        
+        # Window details for foreground
+        if is_foreground:
+            # Curtains or blinds
+            blinds = rng.random((rows, cols)) < 0.2
+            np.copyto(windows(block, window_height // 3), pack_rgb(BLIND_COLOR),
+                      where=blinds[:, None, :, None])
+        
+        img.paste(packed_image(block[extent]), (left, top))
+        
+        # Window glow
+        if is_foreground and time_of_day == TimeOfDay.NIGHT:
+            light = np.zeros_like(block)
+            windows(light, window_height)[:] = np.where(
+                lit, pack_rgb(lit_colors // 2), 0
+            )[:, None, :, None]
+            emission.paste(packed_image(light[extent]), (left, top))
     
     def _add_street_level(
         self,
@@ -357,85 +594,41 @@ class RealisticSceneGenerator:
     
     def _add_urban_life(
         self,
-        draw: ImageDraw.Draw,
-        width: int,
-        height: int,
-        time_of_day: TimeOfDay
+        img: Image.Image,
+        time_of_day: TimeOfDay,
+        rng: np.random.Generator
     ):
         """Add vehicles and pedestrians."""
         
+        width, height = img.size
         street_y = height - 30
+        lights_on = time_of_day in [TimeOfDay.DUSK, TimeOfDay.NIGHT]
         
         # Cars
-        num_cars = random.randint(3, 6)
-        for _ in range(num_cars):
-            car_x = random.randint(0, width - 60)
-            car_width = random.randint(40, 60)
-            car_height = 20
-            
-            # Car body
-            car_color = random.choice([
-                (150, 30, 30),   # Red
-                (30, 30, 150),   # Blue
-                (150, 150, 150), # Silver
-                (30, 30, 30),    # Black
-                (200, 200, 200)  # White
-            ])
-            
-            draw.rectangle(
-                [(car_x, street_y - car_height), (car_x + car_width, street_y)],
-                fill=car_color
-            )
-            
-            # Windows
-            draw.rectangle(
-                [(car_x + 5, street_y - car_height + 5),
-                 (car_x + car_width - 5, street_y - car_height + 10)],
-                fill=(50, 50, 60)
-            )
-            
-            # Headlights/taillights
-            if time_of_day in [TimeOfDay.DUSK, TimeOfDay.NIGHT]:
-                # Headlights
-                draw.ellipse(
-                    [(car_x + car_width - 10, street_y - 15),
-                     (car_x + car_width - 5, street_y - 10)],
-                    fill=(255, 255, 200)
-                )
-                # Taillights
-                draw.ellipse(
-                    [(car_x + 5, street_y - 15),
-                     (car_x + 10, street_y - 10)],
-                    fill=(255, 0, 0)
-                )
+        num_cars = rng.integers(3, 7)
+        car_xs = rng.integers(0, width - 60 + 1, num_cars)
+        car_widths = rng.integers(40, 61, num_cars)
+        car_colors = rng.integers(0, len(CAR_COLORS), num_cars)
+        for car_x, car_width, car_color in zip(car_xs.tolist(), car_widths.tolist(),
+                                               car_colors.tolist()):
+            paste_sprites(img, _car_sprite(car_width, car_color, lights_on), [car_x], [street_y])
         
         # Pedestrians
         if time_of_day not in [TimeOfDay.NIGHT]:
-            num_people = random.randint(5, 10)
+            num_people = rng.integers(5, 11)
             sidewalk_y = height - 50
-            
-            for _ in range(num_people):
-                person_x = random.randint(10, width - 10)
-                person_height = random.randint(15, 20)
-                
-                # Simple silhouette
-                draw.ellipse(
-                    [(person_x - 3, sidewalk_y - person_height - 5),
-                     (person_x + 3, sidewalk_y - person_height + 1)],
-                    fill=(20, 20, 20)
-                )
-                draw.rectangle(
-                    [(person_x - 2, sidewalk_y - person_height + 1),
-                     (person_x + 2, sidewalk_y)],
-                    fill=(20, 20, 20)
-                )
+            person_xs = rng.integers(10, width - 10 + 1, num_people)
+            person_heights = rng.integers(15, 21, num_people)
+            for person_x, person_height in zip(person_xs.tolist(), person_heights.tolist()):
+                paste_sprites(img, _person_sprite(person_height), [person_x], [sidewalk_y])
     
     def _generate_nature_scene(
         self,
         img: Image.Image,
         time_of_day: TimeOfDay,
         weather: Weather,
-        style: VisualStyle
+        style: VisualStyle,
+        rng: random.Random
     ) -> Image.Image:
         """Generate natural landscape."""
         
@@ -477,11 +670,11 @@ class RealisticSceneGenerator:
             draw.line([(x, terrain_height[x]), (x, height)], fill=grass_color)
         
         # Add vegetation
-        self._add_vegetation(draw, width, height, terrain_height, time_of_day)
+        self._add_vegetation(img, terrain_height, time_of_day, make_np_rng(rng.getrandbits(64)))
         
         # Add water features
-        if random.random() < 0.5:
-            self._add_water_feature(draw, width, height, terrain_height)
+        if rng.random() < 0.5:
+            self._add_water_feature(draw, width, height, terrain_height, rng)
         
         # Add wildlife
         if weather == Weather.CLEAR and time_of_day not in [TimeOfDay.NIGHT]:
@@ -491,96 +684,71 @@ class RealisticSceneGenerator:
     
     def _add_vegetation(
         self,
-        draw: ImageDraw.Draw,
-        width: int,
-        height: int,
+        img: Image.Image,
         terrain_height: List[int],
-        time_of_day: TimeOfDay
+        time_of_day: TimeOfDay,
+        rng: np.random.Generator
     ):
         """Add trees, bushes, and grass."""
         
-        # Trees
-        num_trees = random.randint(10, 30)
-        for _ in range(num_trees):
-            tree_x = random.randint(20, width - 20)
-            tree_y = terrain_height[min(tree_x, len(terrain_height) - 1)]
-            tree_height = random.randint(60, 120)
-            
-            # Tree trunk
-            trunk_width = tree_height // 10
-            draw.rectangle(
-                [(tree_x - trunk_width // 2, tree_y - tree_height),
-                 (tree_x + trunk_width // 2, tree_y)],
-                fill=(60, 40, 20)
-            )
-            
-            # Tree foliage (multiple layers for depth)
-            foliage_radius = tree_height // 3
-            for layer in range(3):
-                layer_offset = layer * 10
-                layer_color = (
-                    20 + layer * 10,
-                    40 + layer * 15,
-                    20 + layer * 5
-                )
-                
-                # Irregular shape using multiple circles
-                for _ in range(5):
-                    offset_x = random.randint(-foliage_radius // 2, foliage_radius // 2)
-                    offset_y = random.randint(-foliage_radius // 2, 0)
-                    
-                    draw.ellipse(
-                        [(tree_x - foliage_radius + offset_x + layer_offset,
-                          tree_y - tree_height + offset_y + layer_offset),
-                         (tree_x + foliage_radius + offset_x - layer_offset,
-                          tree_y - tree_height + foliage_radius + offset_y - layer_offset)],
-                        fill=layer_color
-                    )
+        width, height = img.size
+        ground = np.asarray(terrain_height)
         
-        # Bushes
-        num_bushes = random.randint(20, 40)
-        for _ in range(num_bushes):
-            bush_x = random.randint(10, width - 10)
-            bush_y = terrain_height[min(bush_x, len(terrain_height) - 1)]
-            bush_size = random.randint(10, 25)
-            
-            # Irregular bush shape
-            for _ in range(3):
-                offset_x = random.randint(-bush_size // 2, bush_size // 2)
-                draw.ellipse(
-                    [(bush_x - bush_size + offset_x, bush_y - bush_size),
-                     (bush_x + bush_size + offset_x, bush_y)],
-                    fill=(30, 50, 30)
-                )
+        def ground_at(xs: np.ndarray) -> np.ndarray:
+            return ground[np.minimum(xs, len(ground) - 1)]
+        
+        # Trees, instanced from a few foliage variants per height
+        num_trees = rng.integers(10, 31)
+        tree_xs = rng.integers(20, width - 20 + 1, num_trees)
+        tree_heights = rng.integers(60, 121, num_trees) // TREE_HEIGHT_STEP * TREE_HEIGHT_STEP
+        variants = rng.integers(0, SPRITE_VARIANTS, num_trees)
+        for tree_x, tree_y, tree_height, variant in zip(
+            tree_xs.tolist(), ground_at(tree_xs).tolist(), tree_heights.tolist(), variants.tolist()
+        ):
+            paste_sprites(img, _tree_sprite(tree_height, variant), [tree_x], [tree_y])
         
-        # Grass details
+        # Bushes
+        num_bushes = rng.integers(20, 41)
+        bush_xs = rng.integers(10, width - 10 + 1, num_bushes)
+        bush_sizes = rng.integers(10, 26, num_bushes)
+        variants = rng.integers(0, SPRITE_VARIANTS, num_bushes)
+        for bush_x, bush_y, bush_size, variant in zip(
+            bush_xs.tolist(), ground_at(bush_xs).tolist(), bush_sizes.tolist(), variants.tolist()
+        ):
+            paste_sprites(img, _bush_sprite(bush_size, variant), [bush_x], [bush_y])
+        
+        # Grass details, drawn into the band of the frame around the ground line
         if time_of_day not in [TimeOfDay.NIGHT]:
-            for _ in range(500):
-                grass_x = random.randint(0, width)
-                grass_y = terrain_height[min(grass_x, len(terrain_height) - 1)]
-                grass_height = random.randint(3, 8)
-                
-                draw.line(
-                    [(grass_x, grass_y), (grass_x + random.randint(-2, 2), grass_y - grass_height)],
-                    fill=(50, 70, 50),
-                    width=1
+            grass_xs = rng.integers(0, width + 1, GRASS_BLADES)
+            grass_ys = ground_at(grass_xs)
+            grass_tips = grass_ys - rng.integers(3, 9, GRASS_BLADES)
+            top = max(int(grass_tips.min()), 0)
+            bottom = min(int(grass_ys.max()) + 1, height)
+            if top < bottom:
+                band = np.array(img.crop((0, top, width, bottom)))
+                draw_segments(
+                    band, grass_xs, grass_ys - top,
+                    grass_xs + rng.integers(-2, 3, GRASS_BLADES), grass_tips - top,
+                    GRASS_COLOR
                 )
+                img.paste(Image.fromarray(band), (0, top))
     
     def _add_water_feature(
         self,
         draw: ImageDraw.Draw,
         width: int,
         height: int,
-        terrain_height: List[int]
+        terrain_height: List[int],
+        rng: random.Random
     ):
         """Add lake or river."""
         
-        water_type = random.choice(['lake', 'river'])
+        water_type = rng.choice(['lake', 'river'])
         
         if water_type == 'lake':
             # Find a valley for the lake
-            lake_center_x = width // 2 + random.randint(-width // 4, width // 4)
-            lake_width = random.randint(width // 4, width // 2)
+            lake_center_x = width // 2 + rng.randint(-width // 4, width // 4)
+            lake_width = rng.randint(width // 4, width // 2)
             lake_start_x = max(0, lake_center_x - lake_width // 2)
             lake_end_x = min(width, lake_center_x + lake_width // 2)
             
@@ -607,12 +775,12 @@ class RealisticSceneGenerator:
         else:  # river
             # Winding river
             river_points = []
-            river_x = random.randint(0, width // 4)
+            river_x = rng.randint(0, width // 4)
             
             while river_x < width:
                 river_y = terrain_height[min(river_x, len(terrain_height) - 1)]
                 river_points.append((river_x, river_y))
-                river_x += random.randint(20, 40)
+                river_x += rng.randint(20, 40)
                 
             # Draw river
             if len(river_points) > 2:
@@ -621,7 +789,7 @@ class RealisticSceneGenerator:
                     end = river_points[i + 1]
                     
                     # River width varies
-                    river_width = random.randint(10, 30)
+                    river_width = rng.randint(10, 30)
                     
                     # Draw river segment
                     for w in range(river_width):
@@ -639,7 +807,8 @@ class RealisticSceneGenerator:
         img: Image.Image,
         time_of_day: TimeOfDay,
         weather: Weather,
-        style: VisualStyle
+        style: VisualStyle,
+        rng: random.Random
     ) -> Image.Image:
         """Generate futuristic sci-fi scene."""
         
@@ -648,17 +817,17 @@ class RealisticSceneGenerator:
         
         # Futuristic city with unique architecture
         # Flying vehicles layer
-        self._add_flying_vehicles(draw, width, height, time_of_day)
+        self._add_flying_vehicles(img, time_of_day, make_np_rng(rng.getrandbits(64)))
         
         # Megastructures
-        num_structures = random.randint(3, 6)
+        num_structures = rng.randint(3, 6)
         for i in range(num_structures):
-            x = i * width // num_structures + random.randint(-50, 50)
-            structure_width = random.randint(100, 200)
-            structure_height = random.randint(height // 2, int(height * 0.9))
+            x = i * width // num_structures + rng.randint(-50, 50)
+            structure_width = rng.randint(100, 200)
+            structure_height = rng.randint(height // 2, int(height * 0.9))
             
             # Unique architectural shapes
-            shape_type = random.choice(['pyramid', 'cylinder', 'angular', 'organic'])
+            shape_type = rng.choice(['pyramid', 'cylinder', 'angular', 'organic'])
             
             if shape_type == 'pyramid':
                 # Pyramid structure
@@ -715,15 +884,15 @@ class RealisticSceneGenerator:
             # Add glowing windows/panels
             self._add_futuristic_details(
                 draw, x, height - structure_height,
-                structure_width, structure_height, time_of_day
+                structure_width, structure_height, time_of_day, rng
             )
         
         # Holographic displays
-        num_holograms = random.randint(3, 8)
+        num_holograms = rng.randint(3, 8)
         for _ in range(num_holograms):
-            holo_x = random.randint(50, width - 50)
-            holo_y = random.randint(height // 3, height - 100)
-            holo_size = random.randint(30, 80)
+            holo_x = rng.randint(50, width - 50)
+            holo_y = rng.randint(height // 3, height - 100)
+            holo_size = rng.randint(30, 80)
             
             # Hologram effect
             for alpha in range(100, 0, -20):
@@ -739,10 +908,10 @@ class RealisticSceneGenerator:
                 )
         
         # Energy beams
-        if random.random() < 0.5:
-            for _ in range(random.randint(1, 3)):
-                beam_x = random.randint(0, width)
-                beam_color = random.choice([
+        if rng.random() < 0.5:
+            for _ in range(rng.randint(1, 3)):
+                beam_x = rng.randint(0, width)
+                beam_color = rng.choice([
                     (255, 0, 100),   # Pink
                     (0, 255, 200),   # Cyan
                     (255, 200, 0),   # Yellow
@@ -766,7 +935,8 @@ class RealisticSceneGenerator:
         y: int,
         width: int,
         height: int,
-        time_of_day: TimeOfDay
+        time_of_day: TimeOfDay,
+        rng: random.Random
     ):
         """Add futuristic building details."""
         
@@ -787,9 +957,9 @@ class RealisticSceneGenerator:
         panel_size = 20
         for px in range(x + 20, x + width - 20, 40):
             for py in range(y + 20, y + height - 20, 40):
-                if random.random() < 0.7:
+                if rng.random() < 0.7:
                     # Active panel
-                    panel_color = random.choice([
+                    panel_color = rng.choice([
                         (0, 255, 200),
                         (255, 0, 200),
                         (200, 255, 0),
@@ -814,77 +984,40 @@ class RealisticSceneGenerator:
     
     def _add_flying_vehicles(
         self,
-        draw: ImageDraw.Draw,
-        width: int,
-        height: int,
-        time_of_day: TimeOfDay
+        img: Image.Image,
+        time_of_day: TimeOfDay,
+        rng: np.random.Generator
     ):
         """Add flying vehicles to futuristic scene."""
         
-        num_vehicles = random.randint(5, 15)
-        
-        for _ in range(num_vehicles):
-            # Vehicle position and size
-            veh_x = random.randint(0, width)
-            veh_y = random.randint(50, height // 2)
-            veh_size = random.randint(10, 30)
-            
-            # Distance-based sizing
-            distance_factor = veh_y / (height // 2)
-            veh_size = int(veh_size * distance_factor)
-            
-            # Vehicle shape
-            vehicle_color = (80, 90, 100)
-            
-            # Streamlined body
-            draw.ellipse(
-                [(veh_x - veh_size, veh_y - veh_size // 3),
-                 (veh_x + veh_size, veh_y + veh_size // 3)],
-                fill=vehicle_color
-            )
-            
-            # Thrusters
-            if time_of_day in [TimeOfDay.DUSK, TimeOfDay.NIGHT]:
-                # Glowing thrusters
-                thruster_color = (100, 200, 255)
-                
-                # Left thruster
-                draw.ellipse(
-                    [(veh_x - veh_size - 5, veh_y),
-                     (veh_x - veh_size, veh_y + 5)],
-                    fill=thruster_color
-                )
-                
-                # Right thruster
-                draw.ellipse(
-                    [(veh_x + veh_size, veh_y),
-                     (veh_x + veh_size + 5, veh_y + 5)],
-                    fill=thruster_color
-                )
-                
+        width, height = img.size
+        num_vehicles = rng.integers(5, 16)
+        
+        # Vehicle position and size
+        xs = rng.integers(0, width + 1, num_vehicles)
+        ys = rng.integers(50, height // 2 + 1, num_vehicles)
+        sizes = rng.integers(10, 31, num_vehicles)
+        
+        # Distance-based sizing
+        sizes = (sizes * (ys / (height // 2))).astype(np.int64)
+        
+        lights_on = time_of_day in [TimeOfDay.DUSK, TimeOfDay.NIGHT]
+        trail_lengths = rng.integers(20, 51, num_vehicles) if lights_on else None
+        for index, (veh_x, veh_y, veh_size) in enumerate(zip(xs.tolist(), ys.tolist(),
+                                                              sizes.tolist())):
+            paste_sprites(img, _vehicle_sprite(veh_size, lights_on), [veh_x], [veh_y])
+            if lights_on:
                 # Thruster trails
-                trail_length = random.randint(20, 50)
-                for i in range(trail_length):
-                    alpha = int(255 * (1 - i / trail_length) * 0.5)
-                    trail_y = veh_y + i
-                    
-                    draw.line(
-                        [(veh_x - veh_size - 2, trail_y),
-                         (veh_x - veh_size, trail_y)],
-                        fill=(*thruster_color, alpha)
-                    )
-                    draw.line(
-                        [(veh_x + veh_size, trail_y),
-                         (veh_x + veh_size + 2, trail_y)],
-                        fill=(*thruster_color, alpha)
-                    )
+                paste_sprites(img, _trail_sprite(veh_size, int(trail_lengths[index])),
+                              [veh_x], [veh_y])
     
     def _generate_apocalyptic_scene(
         self,
         img: Image.Image,
         time_of_day: TimeOfDay,
         weather: Weather,
-        style: VisualStyle
+        style: VisualStyle,
+        rng: random.Random
     ) -> Image.Image:
         """Generate post-apocalyptic wasteland."""
         
@@ -893,15 +1026,15 @@ class RealisticSceneGenerator:
         
         # Ruined cityscape
         # Broken buildings
-        num_ruins = random.randint(5, 10)
+        num_ruins = rng.randint(5, 10)
         
         for i in range(num_ruins):
-            ruin_x = i * width // num_ruins + random.randint(-30, 30)
-            ruin_width = random.randint(60, 120)
-            original_height = random.randint(height // 2, int(height * 0.8))
+            ruin_x = i * width // num_ruins + rng.randint(-30, 30)
+            ruin_width = rng.randint(60, 120)
+            original_height = rng.randint(height // 2, int(height * 0.8))
             
             # Damaged height
-            ruin_height = random.randint(original_height // 3, int(original_height * 0.7))
+            ruin_height = rng.randint(original_height // 3, int(original_height * 0.7))
             ruin_y = height - ruin_height
             
             # Main structure (damaged)
@@ -921,9 +1054,9 @@ class RealisticSceneGenerator:
             
             # Broken edges
             break_points = []
-            for _ in range(random.randint(3, 8)):
-                break_x = ruin_x + random.randint(0, ruin_width)
-                break_y = ruin_y + random.randint(-20, 20)
+            for _ in range(rng.randint(3, 8)):
+                break_x = ruin_x + rng.randint(0, ruin_width)
+                break_y = ruin_y + rng.randint(-20, 20)
                 break_points.append((break_x, break_y))
             
             if break_points:
@@ -938,10 +1071,10 @@ class RealisticSceneGenerator:
                 )
             
             # Rubble at base
-            for _ in range(random.randint(5, 15)):
-                rubble_x = ruin_x + random.randint(-20, ruin_width + 20)
-                rubble_y = height - random.randint(0, 30)
-                rubble_size = random.randint(5, 15)
+            for _ in range(rng.randint(5, 15)):
+                rubble_x = ruin_x + rng.randint(-20, ruin_width + 20)
+                rubble_y = height - rng.randint(0, 30)
+                rubble_size = rng.randint(5, 15)
                 
                 draw.polygon(
                     [(rubble_x, rubble_y),
@@ -951,10 +1084,10 @@ class RealisticSceneGenerator:
                 )
         
         # Abandoned vehicles
-        num_vehicles = random.randint(2, 5)
+        num_vehicles = rng.randint(2, 5)
         for _ in range(num_vehicles):
-            veh_x = random.randint(50, width - 100)
-            veh_y = height - random.randint(20, 60)
+            veh_x = rng.randint(50, width - 100)
+            veh_y = height - rng.randint(20, 60)
             
             # Rusted vehicle
             draw.rectangle(
@@ -969,10 +1102,10 @@ class RealisticSceneGenerator:
             )
         
         # Dead vegetation
-        for _ in range(random.randint(10, 20)):
-            tree_x = random.randint(20, width - 20)
-            tree_y = height - random.randint(0, 50)
-            tree_height = random.randint(40, 80)
+        for _ in range(rng.randint(10, 20)):
+            tree_x = rng.randint(20, width - 20)
+            tree_y = height - rng.randint(0, 50)
+            tree_height = rng.randint(40, 80)
             
             # Dead tree trunk
             draw.line(
@@ -982,10 +1115,10 @@ class RealisticSceneGenerator:
             )
             
             # Bare branches
-            for _ in range(random.randint(3, 6)):
-                branch_y = tree_y - random.randint(20, tree_height - 10)
-                branch_length = random.randint(10, 30)
-                branch_angle = random.uniform(-0.5, 0.5)
+            for _ in range(rng.randint(3, 6)):
+                branch_y = tree_y - rng.randint(20, tree_height - 10)
+                branch_length = rng.randint(10, 30)
+                branch_angle = rng.uniform(-0.5, 0.5)
                 
                 end_x = tree_x + int(branch_length * math.cos(branch_angle))
                 end_y = branch_y - int(branch_length * math.sin(branch_angle))
@@ -998,9 +1131,9 @@ class RealisticSceneGenerator:
         
         # Ash and debris in the air
         for _ in range(200):
-            ash_x = random.randint(0, width)
-            ash_y = random.randint(0, height)
-            ash_size = random.randint(1, 3)
+            ash_x = rng.randint(0, width)
+            ash_y = rng.randint(0, height)
+            ash_size = rng.randint(1, 3)
             
             draw.ellipse(
                 [(ash_x, ash_y), (ash_x + ash_size, ash_y + ash_size)],
@@ -1008,9 +1141,9 @@ class RealisticSceneGenerator:
             )
         
         # Fire and smoke
-        if random.random() < 0.5:
-            fire_x = random.randint(width // 4, 3 * width // 4)
-            fire_y = height - random.randint(0, 100)
+        if rng.random() < 0.5:
+            fire_x = rng.randint(width // 4, 3 * width // 4)
+            fire_y = height - rng.randint(0, 100)
             
             # Smoke plume
             for i in range(50):
@@ -1045,50 +1178,58 @@ class RealisticSceneGenerator:
         self,
         img: Image.Image,
         weather: Weather,
-        time_of_day: TimeOfDay
+        time_of_day: TimeOfDay,
+        rng: random.Random,
+        include_dynamic: bool = True
     ) -> Image.Image:
-        """Apply weather effects to the scene."""
+        """
+        Apply weather effects to the scene.
+        
+        With include_dynamic=False, particles and lightning are left out so
+        the result can serve as the frozen background of an animation.
+        """
         
         if weather == Weather.RAIN:
-            # Create rain particles
-            particles = asyncio.run(
-                self.effects_engine.create_particle_system(
+            if include_dynamic:
+                # Create rain particles
+                particles = self.effects_engine.spawn_particles(
                     ParticleType.RAIN,
                     count=2000,
                     bounds=(0, 0, img.width, img.height),
                     wind=20.0,
-                    gravity=600.0
+                    gravity=600.0,
+                    rng=rng
                 )
-            )
-            
-            # Update and render particles
-            self.effects_engine.update_particles(particles, 1/30)
-            self.effects_engine.render_particles(img, particles)
+                
+                # Update and render particles
+                self.effects_engine.update_particles(particles, 1/30, rng=rng)
+                self.effects_engine.render_particles(img, particles)
             
             # Wet surface effect
             img = img.filter(ImageFilter.GaussianBlur(radius=1))
             
         elif weather == Weather.SNOW:
-            # Create snow particles
-            particles = asyncio.run(
-                self.effects_engine.create_particle_system(
+            if include_dynamic:
+                # Create snow particles
+                particles = self.effects_engine.spawn_particles(
                     ParticleType.SNOW,
                     count=1500,
                     bounds=(0, 0, img.width, img.height),
                     wind=10.0,
-                    gravity=50.0
+                    gravity=50.0,
+                    rng=rng
                 )
-            )
-            
-            self.effects_engine.update_particles(particles, 1/30)
-            self.effects_engine.render_particles(img, particles)
+                
+                self.effects_engine.update_particles(particles, 1/30, rng=rng)
+                self.effects_engine.render_particles(img, particles)
             
         elif weather == Weather.FOG:
             # Apply fog effect
             img = self.effects_engine.apply_atmospheric_effects(
                 img,
                 fog_density=0.5,
-                fog_color=(150, 150, 160)
+                fog_color=(150, 150, 160),
+                rng=make_np_rng(rng.getrandbits(64))
             )
             
         elif weather == Weather.STORM:
@@ -1096,14 +1237,17 @@ class RealisticSceneGenerator:
             img = img.point(lambda p: p * 0.6)
             
             # Lightning flash occasionally
-            if random.random() < 0.1:
-                # Create lightning overlay
-                lightning = Image.new('RGBA', img.size, (255, 255, 255, 100))
-                img = Image.alpha_composite(img.convert('RGBA'), lightning).convert('RGB')
+            if include_dynamic and rng.random() < 0.1:
+                img = self._flash_lightning(img)
         
         return img
     
-    def _apply_camera_angle(self, img: Image.Image, angle: str) -> Image.Image:
+    def _flash_lightning(self, img: Image.Image) -> Image.Image:
+        """Overlay a lightning flash."""
+        lightning = Image.new('RGBA', img.size, (255, 255, 255, 100))
+        return Image.alpha_composite(img.convert('RGBA'), lightning).convert('RGB')
+    
+    def _apply_camera_angle(self, img: Image.Image, angle: str, rng: random.Random) -> Image.Image:
         """Apply camera angle perspective transform."""
         
         if angle == "low":
@@ -1124,7 +1268,7 @@ class RealisticSceneGenerator:
             )
         elif angle == "dutch":
             # Dutch angle - rotate slightly
-            img = img.rotate(random.uniform(-15, 15), expand=False, fillcolor=(0, 0, 0))
+            img = img.rotate(rng.uniform(-15, 15), expand=False, fillcolor=(0, 0, 0))
         
         return img
     
@@ -1192,73 +1336,200 @@ class RealisticSceneGenerator:
         resolution: Tuple[int, int],
         style: VisualStyle,
         duration: float,
-        fps: int = 30
-    ) -> List[Image.Image]:
-        """Generate animated scene sequence."""
-        
-        frames = []
+        fps: int = 30,
+        camera_angle: str = "medium",
+        seed: Optional[int] = None
+    ) -> Iterator[Image.Image]:
+        """
+        Generate animated scene sequence.
+        
+        The static layers (sky, buildings, windows, street, vegetation,
+        static weather, camera and depth of field) are rendered once and
+        frozen; each frame is a copy of them with only the dynamic layers
+        (particles, lightning, blinking lights, holograms) drawn on top.
+        Frames are yielded one at a time so they can be streamed to an
+        encoder; wrap in list() to collect them. A seeded animation is
+        deterministic and its static layer is kept in the render cache.
+        """
+        cacheable = seed is not None
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        scene_seed = self._scene_seed(environment, time_of_day, weather, style, seed)
+        
+        static = self._get_static_layer(
+            environment, time_of_day, weather, resolution, style, camera_angle, scene_seed, cacheable
+        )
+        state = self._init_animation_state(
+            environment, time_of_day, weather, resolution, child_seed(scene_seed, 'animation')
+        )
         total_frames = int(duration * fps)
         
-        # Initialize dynamic elements
-        if weather == Weather.RAIN:
-            rain_particles = asyncio.run(
-                self.effects_engine.create_particle_system(
-                    ParticleType.RAIN,
-                    count=2000,
-                    bounds=(0, 0, resolution[0], resolution[1])
-                )
-            )
-        else:
-            rain_particles = []
-        
-        # Generate frames
         for frame_idx in range(total_frames):
             t = frame_idx / fps
-            
-            # Generate base scene
-            frame = self.generate_scene(
-                environment, time_of_day, weather,
-                resolution, style
-            )
+            frame = static.copy()
             
             # Animate dynamic elements
-            if rain_particles:
-                self.effects_engine.update_particles(rain_particles, 1/fps)
-                self.effects_engine.render_particles(frame, rain_particles)
+            if state.particles:
+                self._update_weather_particles(state, weather, resolution, 1/fps)
+                self.effects_engine.render_particles(frame, state.particles)
+            
+            if weather == Weather.STORM and state.rng.random() < 0.1:
+                frame = self._flash_lightning(frame)
             
             # Add time-based animations
             # Blinking lights, moving vehicles, etc.
-            self._add_frame_animations(frame, t, environment, time_of_day)
+            self._add_frame_animations(frame, t, environment, time_of_day, state)
             
-            frames.append(frame)
+            yield frame
+    
+    def write_animated_scene(
+        self,
+        output_path: str,
+        environment: EnvironmentType,
+        time_of_day: TimeOfDay,
+        weather: Weather,
+        resolution: Tuple[int, int],
+        style: VisualStyle,
+        duration: float,
+        fps: int = 30,
+        camera_angle: str = "medium",
+        seed: Optional[int] = None
+    ) -> int:
+        """
+        Render an animated scene straight to a video file.
+        
+        Frames go to the encoder as they are produced, so memory use does
+        not grow with duration. A seeded animation is copied from the render
+        cache when it was rendered before. Returns the number of frames
+        written.
+        """
+        width, height = resolution
+        key = None
+        if seed is not None:
+            scene_seed = self._scene_seed(environment, time_of_day, weather, style, seed)
+            key = render_key(
+                'animation', SCENE_RENDER_VERSION, scene_seed,
+                resolution=f"{width}x{height}", camera_angle=camera_angle,
+                duration=duration, fps=fps
+            )
+            if self.render_cache.fetch(key, output_path):
+                return int(duration * fps)
+        
+        writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+        frame_count = 0
+        try:
+            for frame in self.generate_animated_scene(
+                environment, time_of_day, weather, resolution, style,
+                duration, fps, camera_angle, seed
+            ):
+                writer.write(cv2.cvtColor(np.asarray(frame), cv2.COLOR_RGB2BGR))
+                frame_count += 1
+        finally:
+            writer.release()
+        
+        if key is not None:
+            try:
+                self.render_cache.put(key, output_path)
+            except OSError as e:
+                logger.warning(f"Could not cache animation render {key}: {e}")
+        return frame_count
+    
+    def _get_static_layer(
+        self,
+        environment: EnvironmentType,
+        time_of_day: TimeOfDay,
+        weather: Weather,
+        resolution: Tuple[int, int],
+        style: VisualStyle,
+        camera_angle: str,
+        scene_seed: int,
+        cacheable: bool = True
+    ) -> Image.Image:
+        """Render the frozen background of an animation, reusing recent renders."""
+        key = self._scene_key(scene_seed, resolution, camera_angle, include_dynamic=False)
+        layer = self._static_layers.get(key)
+        if layer is not None:
+            self._static_layers.move_to_end(key)
+            return layer
+        
+        def render() -> Image.Image:
+            return self._render_scene(
+                environment, time_of_day, weather, resolution, style,
+                make_rng(scene_seed), camera_angle, include_dynamic=False
+            )
+        
+        layer = self._cached_frame(key, render) if cacheable else render()
+        
+        self._static_layers[key] = layer
+        while len(self._static_layers) > STATIC_LAYER_CACHE_SIZE:
+            self._static_layers.popitem(last=False)
+        return layer
+    
+    def _init_animation_state(
+        self,
+        environment: EnvironmentType,
+        time_of_day: TimeOfDay,
+        weather: Weather,
+        resolution: Tuple[int, int],
+        seed: int
+    ) -> AnimationState:
+        """Place the dynamic elements of an animation."""
+        width, height = resolution
+        state = AnimationState(rng=make_rng(seed))
+        
+        if weather in ANIMATED_WEATHER:
+            particle_type, count, wind, gravity = ANIMATED_WEATHER[weather]
+            state.particles = self.effects_engine.spawn_particles(
+                particle_type, count, (0, 0, width, height), wind, gravity, rng=state.rng
+            )
+        
+        # City lights stay in place and blink out of phase
+        if environment == EnvironmentType.URBAN and time_of_day in [TimeOfDay.NIGHT, TimeOfDay.DUSK]:
+            state.lights = [
+                (state.rng.randint(0, width), state.rng.randint(height // 2, height), state.rng.random())
+                for _ in range(20)
+            ]
         
-        return frames
+        return state
+    
+    def _update_weather_particles(
+        self,
+        state: AnimationState,
+        weather: Weather,
+        resolution: Tuple[int, int],
+        dt: float
+    ):
+        """Advance particles, replacing those that expired or left the frame."""
+        width, height = resolution
+        self.effects_engine.update_particles(state.particles, dt, rng=state.rng)
+        state.particles[:] = [p for p in state.particles if p.y <= height + 50]
+        
+        particle_type, count, wind, gravity = ANIMATED_WEATHER[weather]
+        missing = count - len(state.particles)
+        if missing > 0:
+            state.particles.extend(self.effects_engine.spawn_particles(
+                particle_type, missing, (0, 0, width, height), wind, gravity, rng=state.rng
+            ))
     
     def _add_frame_animations(
         self,
         frame: Image.Image,
         t: float,
         environment: EnvironmentType,
-        time_of_day: TimeOfDay
+        time_of_day: TimeOfDay,
+        state: AnimationState
     ):
         """Add frame-specific animations."""
         
         draw = ImageDraw.Draw(frame)
         width, height = frame.size
         
-        # Blinking lights for night scenes
-        if time_of_day in [TimeOfDay.NIGHT, TimeOfDay.DUSK]:
-            # City lights blinking
-            if environment == EnvironmentType.URBAN:
-                for _ in range(20):
-                    if random.random() < 0.05:  # 5% chance to toggle
-                        light_x = random.randint(0, width)
-                        light_y = random.randint(height // 2, height)
-                        
-                        draw.ellipse(
-                            [(light_x - 2, light_y - 2), (light_x + 2, light_y + 2)],
-                            fill=(255, 255, 200) if int(t * 2) % 2 else (100, 100, 100)
-                        )
+        # Blinking city lights for night scenes
+        for light_x, light_y, phase in state.lights:
+            draw.ellipse(
+                [(light_x - 2, light_y - 2), (light_x + 2, light_y + 2)],
+                fill=(255, 255, 200) if int(t * 2 + phase * 2) % 2 else (100, 100, 100)
+            )
         
         # Moving elements
         if environment == EnvironmentType.FUTURISTIC:
@@ -1271,4 +1542,4 @@ class RealisticSceneGenerator:
                 fill=None,
                 outline=(0, 200, 255, holo_alpha),
                 width=2
-            )
\ No newline at end of file
+            )
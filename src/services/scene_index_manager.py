@@ -4,6 +4,14 @@ Scene Index Manager - High-Performance Scene Lookup Service
 Transforms O(n) scene file system scans into O(1) Redis-cached lookups.
 Designed for sub-100ms response times with intelligent caching and indexing.
 
+Each project's scene -> video map is one Redis hash, so a batch of scene
+lookups is a single HMGET and invalidating a project is a single UNLINK.
+A short-lived in-process cache serves hot lookups without touching Redis.
+
+The project index is patched in place from file watcher deltas, and a
+periodic reconciliation compares media directory mtimes to pick up missed
+events, so indexing cost follows the number of changes, not project size.
+
 Performance Targets:
 - Scene lookup: < 100ms
 - Index updates: < 50ms  
@@ -16,14 +24,16 @@ import json
 import asyncio
 import logging
 import hashlib
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Callable, Dict, List, Optional, Tuple, Set
 from datetime import datetime, timedelta
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from contextlib import asynccontextmanager
 
 import redis.asyncio as aioredis
-from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import ConnectionError as RedisConnectionError, WatchError
+
+from ..utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -52,12 +62,23 @@ class ProjectSceneIndex:
     scenes: Dict[str, List[SceneMediaInfo]]
     last_updated: float
     total_files: int
-    index_version: str = "1.0"
+    index_version: str = "1.1"
+    # Relative media directory ("scene_1/video") or "" for the project -> st_mtime_ns
+    dir_mtimes: Dict[str, int] = field(default_factory=dict)
     
     def __post_init__(self):
         if not hasattr(self, 'last_updated') or self.last_updated is None:
             self.last_updated = datetime.utcnow().timestamp()
 
+@dataclass
+class SceneFileDelta:
+    """A single file change to apply to a project index."""
+    event_type: str  # 'created', 'modified', 'deleted', 'moved'
+    file_path: str
+    dest_path: Optional[str] = None  # New location for 'moved'
+    file_size: Optional[int] = None
+    last_modified: Optional[float] = None
+
 class SceneIndexManager:
     """
     High-performance scene indexing and lookup service.
@@ -72,7 +93,7 @@ class SceneIndexManager:
     
     # Redis key patterns
     SCENE_INDEX_KEY = "scene_index:project:{project_id}"
-    SCENE_LOOKUP_KEY = "scene_lookup:{project_id}:{scene_id}"
+    SCENE_MAP_KEY = "scene_map:{project_id}"  # Hash: scene_id -> video path
     SCENE_FILES_KEY = "scene_files:{project_id}:{scene_id}:{file_type}"
     GLOBAL_INDEX_KEY = "scene_index:global"
     HEALTH_KEY = "scene_index:health"
@@ -83,11 +104,16 @@ class SceneIndexManager:
     BATCH_SIZE = 50     # Files per batch operation
     MAX_RETRIES = 3     # Redis operation retries
     TIMEOUT = 10        # Redis operation timeout (seconds)
+    SCAN_CONCURRENCY = 16  # Concurrent file system scans for cache misses
+    LOCAL_CACHE_SIZE = 4096
+    LOCAL_CACHE_TTL = float(os.getenv('SCENE_LOCAL_CACHE_TTL', '5'))  # 0 disables
+    MEDIA_DIRS = {'video': 'video', 'audio': 'audio', 'images': 'image'}  # dir -> file_type
     
     def __init__(self, 
                  redis_url: str = None,
                  default_ttl: int = DEFAULT_TTL,
-                 enable_compression: bool = True):
+                 enable_compression: bool = True,
+                 local_cache_ttl: Optional[float] = None):
         """
         Initialize Scene Index Manager.
         
@@ -95,17 +121,27 @@ class SceneIndexManager:
             redis_url: Redis connection URL (defaults to env REDIS_URL)
             default_ttl: Default cache TTL in seconds
             enable_compression: Enable JSON compression for storage
+            local_cache_ttl: In-process lookup cache TTL in seconds (0 disables)
         """
         self.redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379')
         self.default_ttl = default_ttl
         self.enable_compression = enable_compression
         self.redis_client: Optional[aioredis.Redis] = None
         self._connection_pool = None
+        self._local_cache = TTLCache(
+            maxsize=self.LOCAL_CACHE_SIZE,
+            ttl=self.LOCAL_CACHE_TTL if local_cache_ttl is None else local_cache_ttl
+        )
         self._stats = {
             'lookups': 0,
             'cache_hits': 0,
             'cache_misses': 0,
+            'local_hits': 0,
+            'batch_lookups': 0,
             'index_updates': 0,
+            'index_patches': 0,
+            'reconciliations': 0,
+            'dirs_rescanned': 0,
             'errors': 0
         }
         
@@ -190,52 +226,105 @@ class SceneIndexManager:
         Returns:
             Path to scene video file or None if not found
         """
-        async with self._redis_operation("find_scene_video"):
-            self._stats['lookups'] += 1
+        results = await self.find_scene_videos([scene_target], project_id)
+        return results.get(scene_target)
+    
+    async def find_scene_videos(self, scene_targets: List[str], project_id: str) -> Dict[str, Optional[str]]:
+        """
+        Look up many scene videos in one Redis round trip.
+        
+        Hits come from the local cache, then a single HMGET on the
+        project's scene map; misses are scanned on disk and written back
+        in one pipeline.
+        
+        Args:
+            scene_targets: Scene identifiers (e.g., ["scene_1", "scene_2"])
+            project_id: Project identifier
             
-            # Parse scene number from target
-            scene_id = self._parse_scene_id(scene_target)
-            if not scene_id:
-                logger.warning(f"Invalid scene target format: {scene_target}")
-                return None
+        Returns:
+            Mapping of each scene target to its video path (or None)
+        """
+        async with self._redis_operation("find_scene_videos"):
+            self._stats['lookups'] += len(scene_targets)
+            if len(scene_targets) > 1:
+                self._stats['batch_lookups'] += 1
             
-            # Check Redis cache first
-            cache_key = self.SCENE_LOOKUP_KEY.format(project_id=project_id, scene_id=scene_id)
+            results: Dict[str, Optional[str]] = {}
+            scene_ids: Dict[str, str] = {}
+            for target in scene_targets:
+                scene_id = self._parse_scene_id(target)
+                if not scene_id:
+                    logger.warning(f"Invalid scene target format: {target}")
+                    results[target] = None
+                    continue
+                
+                local = self._local_cache.get((project_id, scene_id))
+                if local:
+                    self._stats['local_hits'] += 1
+                    results[target] = local
+                else:
+                    scene_ids[target] = scene_id
+            
+            if not scene_ids:
+                return results
+            
+            unique_ids = list(dict.fromkeys(scene_ids.values()))
+            map_key = self.SCENE_MAP_KEY.format(project_id=project_id)
             
             try:
-                cached_result = await self.redis_client.get(cache_key)
-                if cached_result:
+                cached_paths = await self.redis_client.hmget(map_key, unique_ids)
+            except Exception as e:
+                logger.error(f"Error in scene lookup for project {project_id}: {e}")
+                cached_paths = [None] * len(unique_ids)
+            
+            found: Dict[str, Optional[str]] = {}
+            stale: List[str] = []
+            misses: List[str] = []
+            for scene_id, cached_path in zip(unique_ids, cached_paths):
+                if cached_path and Path(cached_path).exists():
                     self._stats['cache_hits'] += 1
-                    file_path = json.loads(cached_result)
-                    
-                    # Verify file still exists
-                    if Path(file_path).exists():
-                        logger.debug(f"Cache hit for scene {scene_target}: {file_path}")
-                        return file_path
-                    else:
-                        # File was deleted, invalidate cache
-                        await self.redis_client.delete(cache_key)
-                        logger.info(f"Cache invalidated for missing file: {file_path}")
+                    found[scene_id] = cached_path
+                    continue
                 
-                # Cache miss, perform file system lookup
-                self._stats['cache_misses'] += 1
-                video_path = await self._scan_scene_video(scene_id, project_id)
+                if cached_path:
+                    # File was deleted, invalidate cache
+                    stale.append(scene_id)
+                    logger.info(f"Cache invalidated for missing file: {cached_path}")
                 
+                self._stats['cache_misses'] += 1
+                misses.append(scene_id)
+            
+            # Cache misses, perform file system lookups concurrently
+            semaphore = asyncio.Semaphore(self.SCAN_CONCURRENCY)
+            
+            async def scan(scene_id: str) -> Optional[str]:
+                async with semaphore:
+                    return await asyncio.to_thread(self._scan_scene_video, scene_id, project_id)
+            
+            scanned_paths = await asyncio.gather(*(scan(scene_id) for scene_id in misses))
+            found.update(zip(misses, scanned_paths))
+            scanned = {scene_id: path for scene_id, path in zip(misses, scanned_paths) if path}
+            
+            if stale or scanned:
+                try:
+                    async with self.redis_client.pipeline(transaction=False) as pipe:
+                        if stale:
+                            pipe.hdel(map_key, *stale)
+                        if scanned:
+                            pipe.hset(map_key, mapping=scanned)
+                            pipe.expire(map_key, self.default_ttl)
+                        await pipe.execute()
+                except Exception as e:
+                    logger.error(f"Failed to cache scene lookups for project {project_id}: {e}")
+            
+            for scene_id, video_path in found.items():
                 if video_path:
-                    # Cache the result
-                    await self.redis_client.setex(
-                        cache_key, 
-                        self.default_ttl, 
-                        json.dumps(video_path)
-                    )
-                    logger.debug(f"Cached scene video: {scene_target} -> {video_path}")
-                
-                return video_path
-                
-            except Exception as e:
-                logger.error(f"Error in scene lookup for {scene_target}: {e}")
-                # Fallback to direct file system scan
-                return await self._scan_scene_video(scene_id, project_id)
+                    self._local_cache.set((project_id, scene_id), video_path)
+            
+            for target, scene_id in scene_ids.items():
+                results[target] = found[scene_id]
+            
+            return results
     
     async def get_all_scene_videos(self, project_id: str) -> List[str]:
         """
@@ -254,10 +343,13 @@ class SceneIndexManager:
             try:
                 cached_index = await self.redis_client.get(index_key)
                 if cached_index:
-                    project_index = ProjectSceneIndex(**json.loads(cached_index))
+                    project_index = self._load_project_index(cached_index)
                     
-                    # Verify index is recent (within 10 minutes)
-                    if (datetime.utcnow().timestamp() - project_index.last_updated) < 600:
+                    # Past 10 minutes, confirm the index against directory mtimes
+                    if (datetime.utcnow().timestamp() - project_index.last_updated) >= 600:
+                        project_index = await self.reconcile_project_index(project_id)
+                    
+                    if project_index:
                         videos = []
                         for scene_id in sorted(project_index.scenes.keys(), key=self._sort_scene_key):
                             scene_files = project_index.scenes[scene_id]
@@ -273,7 +365,7 @@ class SceneIndexManager:
                             logger.debug(f"Retrieved {len(videos)} scene videos from index")
                             return videos
                 
-                # Index miss or stale, rebuild
+                # Index miss or no videos indexed, rebuild
                 return await self._rebuild_project_index(project_id)
                 
             except Exception as e:
@@ -302,10 +394,13 @@ class SceneIndexManager:
                     existing_index = await self.redis_client.get(index_key)
                     
                     if existing_index:
-                        project_index = ProjectSceneIndex(**json.loads(existing_index))
+                        project_index = self._load_project_index(existing_index)
                         # If index is less than 5 minutes old, skip update
                         if (datetime.utcnow().timestamp() - project_index.last_updated) < 300:
                             return True
+                        # Otherwise rescan only the directories that changed
+                        if await self.reconcile_project_index(project_id):
+                            return True
                 
                 # Perform full scan and index rebuild
                 await self._rebuild_project_index(project_id)
@@ -327,28 +422,90 @@ class SceneIndexManager:
         """
         async with self._redis_operation("invalidate_cache"):
             try:
+                map_key = self.SCENE_MAP_KEY.format(project_id=project_id)
                 if scene_id:
                     # Invalidate specific scene
-                    cache_key = self.SCENE_LOOKUP_KEY.format(project_id=project_id, scene_id=scene_id)
-                    await self.redis_client.delete(cache_key)
+                    self._local_cache.pop((project_id, scene_id))
+                    await self.redis_client.hdel(map_key, scene_id)
                     logger.debug(f"Invalidated cache for scene: {project_id}/{scene_id}")
                 else:
-                    # Invalidate entire project
+                    # Invalidate entire project; UNLINK frees memory off the main thread
+                    self._local_cache.discard_where(lambda key: key[0] == project_id)
                     index_key = self.SCENE_INDEX_KEY.format(project_id=project_id)
-                    
-                    # Find all scene cache keys for this project
-                    pattern = self.SCENE_LOOKUP_KEY.format(project_id=project_id, scene_id="*")
-                    keys = await self.redis_client.keys(pattern)
-                    
-                    if keys:
-                        await self.redis_client.delete(*keys)
-                    await self.redis_client.delete(index_key)
+                    await self.redis_client.unlink(map_key, index_key)
                     
                     logger.info(f"Invalidated all cache for project: {project_id}")
                     
             except Exception as e:
                 logger.error(f"Failed to invalidate cache: {e}")
     
+    async def apply_file_changes(self, project_id: str, deltas: List[SceneFileDelta]) -> bool:
+        """
+        Patch a project's stored index with individual file changes.
+        
+        Each delta adds, updates or removes one entry, and the affected
+        scenes are dropped from the lookup map in the same transaction.
+        Without a stored index only the lookups are dropped; the next read
+        builds the index.
+        
+        Args:
+            project_id: Project identifier
+            deltas: File changes in the order they happened
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        async with self._redis_operation("apply_file_changes"):
+            try:
+                self._stats['index_patches'] += 1
+                affected = set()
+                for delta in deltas:
+                    for path in (delta.file_path, delta.dest_path):
+                        located = self._locate_media_file(project_id, path) if path else None
+                        if located:
+                            affected.add(located[0])
+                
+                def patch(project_index: ProjectSceneIndex) -> Set[str]:
+                    for delta in deltas:
+                        self._apply_delta(project_index, delta)
+                    return affected
+                
+                if await self._patch_project_index(project_id, patch) is None and affected:
+                    map_key = self.SCENE_MAP_KEY.format(project_id=project_id)
+                    await self.redis_client.hdel(map_key, *affected)
+                    for scene_id in affected:
+                        self._local_cache.pop((project_id, scene_id))
+                
+                logger.debug(f"Applied {len(deltas)} file changes to project {project_id}")
+                return True
+                
+            except Exception as e:
+                logger.error(f"Failed to apply file changes for {project_id}: {e}")
+                return False
+    
+    async def reconcile_project_index(self, project_id: str) -> Optional[ProjectSceneIndex]:
+        """
+        Bring a stored project index up to date using directory mtimes.
+        
+        Only media directories whose mtime changed since the last scan are
+        listed again, which catches files added, removed or renamed while
+        events were missed. Rewrites in place keep the directory mtime and
+        are left to file watcher deltas.
+        
+        Args:
+            project_id: Project identifier
+            
+        Returns:
+            The reconciled index, or None if the project has no stored index
+        """
+        async with self._redis_operation("reconcile_project_index"):
+            try:
+                self._stats['reconciliations'] += 1
+                return await self._patch_project_index(project_id, self._reconcile_directories)
+            except Exception as e:
+                logger.error(f"Failed to reconcile scene index for {project_id}: {e}")
+                return None
+    
     async def get_scene_status(self, project_id: str) -> Dict[str, Dict[str, any]]:
         """
         Get comprehensive scene availability status for a project.
@@ -378,7 +535,7 @@ class SceneIndexManager:
                 cached_index = await self.redis_client.get(index_key)
                 
                 if cached_index:
-                    project_index = ProjectSceneIndex(**json.loads(cached_index))
+                    project_index = self._load_project_index(cached_index)
                     status['summary']['last_updated'] = project_index.last_updated
                     
                     for scene_id, scene_files in project_index.scenes.items():
@@ -451,7 +608,12 @@ class SceneIndexManager:
                     'cache_hits': self._stats['cache_hits'],
                     'cache_misses': self._stats['cache_misses'],
                     'cache_hit_rate': round(cache_hit_rate, 2),
+                    'local_hits': self._stats['local_hits'],
+                    'batch_lookups': self._stats['batch_lookups'],
                     'index_updates': self._stats['index_updates'],
+                    'index_patches': self._stats['index_patches'],
+                    'reconciliations': self._stats['reconciliations'],
+                    'dirs_rescanned': self._stats['dirs_rescanned'],
                     'errors': self._stats['errors']
                 },
                 'health': health_status,
@@ -462,7 +624,9 @@ class SceneIndexManager:
                 'settings': {
                     'default_ttl': self.default_ttl,
                     'batch_size': self.BATCH_SIZE,
-                    'compression_enabled': self.enable_compression
+                    'compression_enabled': self.enable_compression,
+                    'local_cache_ttl': self._local_cache.ttl,
+                    'local_cache_entries': len(self._local_cache)
                 }
             }
             
@@ -472,6 +636,211 @@ class SceneIndexManager:
     
     # Private helper methods
     
+    def _load_project_index(self, raw: str) -> ProjectSceneIndex:
+        """Deserialize a stored project index, restoring SceneMediaInfo entries."""
+        project_index = ProjectSceneIndex(**json.loads(raw))
+        project_index.scenes = {
+            scene_id: [SceneMediaInfo(**f) if isinstance(f, dict) else f for f in files]
+            for scene_id, files in project_index.scenes.items()
+        }
+        return project_index
+    
+    async def _patch_project_index(self, project_id: str,
+                                   patch: Callable[[ProjectSceneIndex], Set[str]]) -> Optional[ProjectSceneIndex]:
+        """
+        Read-modify-write the stored project index under WATCH.
+        
+        The patch mutates the index and returns the scene IDs it touched;
+        those are removed from the lookup map in the same transaction.
+        Returns None if there is no stored index.
+        """
+        index_key = self.SCENE_INDEX_KEY.format(project_id=project_id)
+        map_key = self.SCENE_MAP_KEY.format(project_id=project_id)
+        
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            for attempt in range(self.MAX_RETRIES):
+                try:
+                    await pipe.watch(index_key)
+                    raw = await pipe.get(index_key)
+                    if not raw:
+                        await pipe.reset()
+                        return None
+                    
+                    project_index = self._load_project_index(raw)
+                    affected = patch(project_index)
+                    project_index.total_files = sum(len(files) for files in project_index.scenes.values())
+                    project_index.last_updated = datetime.utcnow().timestamp()
+                    
+                    pipe.multi()
+                    pipe.setex(index_key, self.default_ttl, json.dumps(asdict(project_index)))
+                    if affected:
+                        pipe.hdel(map_key, *affected)
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    logger.debug(f"Scene index for {project_id} changed concurrently, retrying")
+            else:
+                raise WatchError(f"Scene index for {project_id} kept changing during update")
+        
+        for scene_id in affected:
+            self._local_cache.pop((project_id, scene_id))
+        return project_index
+    
+    def _apply_delta(self, project_index: ProjectSceneIndex, delta: SceneFileDelta):
+        """Apply one file change to an index in memory."""
+        if delta.event_type in ('deleted', 'moved'):
+            self._remove_media_file(project_index, delta.file_path)
+        
+        if delta.event_type == 'moved':
+            if delta.dest_path:
+                self._upsert_media_file(project_index, delta.dest_path,
+                                        delta.file_size, delta.last_modified)
+        elif delta.event_type != 'deleted':
+            self._upsert_media_file(project_index, delta.file_path,
+                                    delta.file_size, delta.last_modified)
+    
+    def _upsert_media_file(self, project_index: ProjectSceneIndex, path: str,
+                           file_size: Optional[int], last_modified: Optional[float]):
+        """Add or refresh the entry for a file, stat-ing it if the delta lacks metadata."""
+        located = self._locate_media_file(project_index.project_id, path)
+        if not located:
+            return
+        scene_id, file_type, file_path = located
+        
+        if file_size is None or last_modified is None:
+            try:
+                stat = file_path.stat()
+            except OSError:
+                # Gone again before we got to it
+                self._remove_media_file(project_index, path)
+                return
+            file_size, last_modified = stat.st_size, stat.st_mtime
+        
+        info = SceneMediaInfo(
+            scene_id=scene_id,
+            project_id=project_index.project_id,
+            file_path=str(file_path),
+            file_type=file_type,
+            file_size=file_size,
+            last_modified=last_modified,
+            format=file_path.suffix
+        )
+        files = project_index.scenes.setdefault(scene_id, [])
+        for position, existing in enumerate(files):
+            if existing.file_path == info.file_path:
+                files[position] = info
+                break
+        else:
+            files.append(info)
+    
+    def _remove_media_file(self, project_index: ProjectSceneIndex, path: str):
+        located = self._locate_media_file(project_index.project_id, path)
+        if not located:
+            return
+        scene_id, _, file_path = located
+        files = [f for f in project_index.scenes.get(scene_id, []) if f.file_path != str(file_path)]
+        if files:
+            project_index.scenes[scene_id] = files
+        else:
+            project_index.scenes.pop(scene_id, None)
+    
+    def _locate_media_file(self, project_id: str, path: str) -> Optional[Tuple[str, str, Path]]:
+        """
+        Map a watched path to (scene_id, file_type, indexed path).
+        
+        Only files directly inside a scene's media directories are indexed;
+        the path is normalized to the form the rebuild stores.
+        """
+        parts = Path(path).parts
+        if len(parts) < 4:
+            return None
+        project, scene_id, dir_name, name = parts[-4:]
+        if project != project_id or not scene_id.startswith("scene_") or dir_name not in self.MEDIA_DIRS:
+            return None
+        return scene_id, self.MEDIA_DIRS[dir_name], self._project_dir(project_id) / scene_id / dir_name / name
+    
+    def _reconcile_directories(self, project_index: ProjectSceneIndex) -> Set[str]:
+        """Rescan media directories whose mtime changed; returns the affected scenes."""
+        project_dir = self._project_dir(project_index.project_id)
+        dir_mtimes = project_index.dir_mtimes
+        
+        scene_ids = set(project_index.scenes) | {key.split('/')[0] for key in dir_mtimes if key}
+        project_mtime = self._dir_mtime(project_dir)
+        if project_mtime != dir_mtimes.get(''):
+            # Scene directories were added or removed
+            if project_mtime is not None:
+                scene_ids.update(d.name for d in project_dir.iterdir()
+                                 if d.is_dir() and d.name.startswith("scene_"))
+            self._set_dir_mtime(dir_mtimes, '', project_mtime)
+        
+        affected = set()
+        for scene_id in scene_ids:
+            for dir_name, file_type in self.MEDIA_DIRS.items():
+                key = f"{scene_id}/{dir_name}"
+                media_dir = project_dir / scene_id / dir_name
+                mtime = self._dir_mtime(media_dir)
+                if mtime == dir_mtimes.get(key):
+                    continue
+                
+                self._stats['dirs_rescanned'] += 1
+                files = [f for f in project_index.scenes.get(scene_id, []) if f.file_type != file_type]
+                if mtime is not None:
+                    files += self._scan_media_dir(project_index.project_id, scene_id, file_type, media_dir)
+                if files:
+                    project_index.scenes[scene_id] = files
+                else:
+                    project_index.scenes.pop(scene_id, None)
+                self._set_dir_mtime(dir_mtimes, key, mtime)
+                affected.add(scene_id)
+        
+        if affected:
+            logger.info(f"Reconciled {len(affected)} scenes for project {project_index.project_id}")
+        return affected
+    
+    def _scan_media_dir(self, project_id: str, scene_id: str, file_type: str,
+                        media_dir: Path) -> List[SceneMediaInfo]:
+        """List one media directory."""
+        scene_files = []
+        try:
+            entries = list(media_dir.iterdir())
+        except OSError:
+            return scene_files
+        
+        for file_path in entries:
+            try:
+                if not file_path.is_file():
+                    continue
+                stat = file_path.stat()
+                scene_files.append(SceneMediaInfo(
+                    scene_id=scene_id,
+                    project_id=project_id,
+                    file_path=str(file_path),
+                    file_type=file_type,
+                    file_size=stat.st_size,
+                    last_modified=stat.st_mtime,
+                    format=file_path.suffix
+                ))
+            except Exception as e:
+                logger.warning(f"Error processing file {file_path}: {e}")
+        return scene_files
+    
+    def _project_dir(self, project_id: str) -> Path:
+        return Path(f"output/projects/{project_id}")
+    
+    @staticmethod
+    def _dir_mtime(path: Path) -> Optional[int]:
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    @staticmethod
+    def _set_dir_mtime(dir_mtimes: Dict[str, int], key: str, mtime: Optional[int]):
+        if mtime is None:
+            dir_mtimes.pop(key, None)
+        else:
+            dir_mtimes[key] = mtime
+    
     def _parse_scene_id(self, scene_target: str) -> Optional[str]:
         """Parse scene ID from various target formats."""
         if scene_target.startswith("scene_"):
@@ -515,8 +884,8 @@ class SceneIndexManager:
         # Return first available if no preferred pattern found
         return video_files[0]
     
-    async def _scan_scene_video(self, scene_id: str, project_id: str) -> Optional[str]:
-        """Scan file system for scene video (fallback method)."""
+    def _scan_scene_video(self, scene_id: str, project_id: str) -> Optional[str]:
+        """Scan file system for scene video (fallback method, blocking)."""
         try:
             # Enhanced scene patterns based on Agent 2C's structure
             scene_num_str = scene_id.replace("scene_", "")
@@ -586,9 +955,13 @@ class SceneIndexManager:
         """Rebuild complete project index with all media files."""
         try:
             scenes_data = {}
-            project_dir = Path(f"output/projects/{project_id}")
+            dir_mtimes = {}
+            project_dir = self._project_dir(project_id)
             
             if project_dir.exists():
+                # Directory mtimes are read before listing so reconciliation errs toward rescanning
+                self._set_dir_mtime(dir_mtimes, '', self._dir_mtime(project_dir))
+                
                 # Scan all scene directories
                 scene_dirs = [d for d in project_dir.iterdir() 
                             if d.is_dir() and d.name.startswith("scene_")]
@@ -598,30 +971,12 @@ class SceneIndexManager:
                     scene_files = []
                     
                     # Scan for different media types
-                    media_dirs = {
-                        'video': scene_dir / 'video',
-                        'audio': scene_dir / 'audio', 
-                        'image': scene_dir / 'images'
-                    }
-                    
-                    for media_type, media_dir in media_dirs.items():
-                        if media_dir.exists():
-                            for file_path in media_dir.iterdir():
-                                if file_path.is_file():
-                                    try:
-                                        stat = file_path.stat()
-                                        scene_info = SceneMediaInfo(
-                                            scene_id=scene_id,
-                                            project_id=project_id,
-                                            file_path=str(file_path),
-                                            file_type=media_type,
-                                            file_size=stat.st_size,
-                                            last_modified=stat.st_mtime,
-                                            format=file_path.suffix
-                                        )
-                                        scene_files.append(scene_info)
-                                    except Exception as e:
-                                        logger.warning(f"Error processing file {file_path}: {e}")
+                    for dir_name, media_type in self.MEDIA_DIRS.items():
+                        media_dir = scene_dir / dir_name
+                        mtime = self._dir_mtime(media_dir)
+                        if mtime is not None:
+                            self._set_dir_mtime(dir_mtimes, f"{scene_id}/{dir_name}", mtime)
+                            scene_files.extend(self._scan_media_dir(project_id, scene_id, media_type, media_dir))
                     
                     if scene_files:
                         scenes_data[scene_id] = scene_files
@@ -631,15 +986,8 @@ class SceneIndexManager:
                 project_id=project_id,
                 scenes={k: [asdict(f) for f in v] for k, v in scenes_data.items()},
                 last_updated=datetime.utcnow().timestamp(),
-                total_files=sum(len(files) for files in scenes_data.values())
-            )
-            
-            # Store in Redis
-            index_key = self.SCENE_INDEX_KEY.format(project_id=project_id)
-            await self.redis_client.setex(
-                index_key,
-                self.default_ttl,
-                json.dumps(asdict(project_index))
+                total_files=sum(len(files) for files in scenes_data.values()),
+                dir_mtimes=dir_mtimes
             )
             
             # Extract video list for return
@@ -650,6 +998,15 @@ class SceneIndexManager:
                     best_video = self._select_best_video_file(video_files)
                     videos.append(best_video.file_path)
             
+            # Store the index and drop scene lookups in one round trip
+            index_key = self.SCENE_INDEX_KEY.format(project_id=project_id)
+            map_key = self.SCENE_MAP_KEY.format(project_id=project_id)
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.setex(index_key, self.default_ttl, json.dumps(asdict(project_index)))
+                pipe.unlink(map_key)
+                await pipe.execute()
+            self._local_cache.discard_where(lambda key: key[0] == project_id)
+            
             logger.info(f"Rebuilt index for project {project_id}: "
                        f"{len(scenes_data)} scenes, {project_index.total_files} files")
             
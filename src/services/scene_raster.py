@@ -0,0 +1,146 @@
+"""
+Batched rasterization of repeated scene primitives.
+
+Procedural scenes repeat a few small shapes many times: window grids,
+cars, pedestrians, trees, bushes, grass blades and flying vehicles.
+Drawing each part of each one with its own PIL call makes a dense night
+skyline tens of thousands of calls. Instead:
+
+- A window grid is a strided view of a block of packed pixels (one
+  32-bit word each), one cell per window, so a facade's windows are
+  written by one broadcast assignment, with lit/dark and blinds chosen
+  as boolean masks, and the block is pasted into the frame in one call.
+- A composite shape (tree, car, vehicle) is a sprite rendered once,
+  cached, and pasted per instance in a single C call.
+- Thin repeated lines (grass) are sampled as one array of points.
+- Glow comes from one separable blur of an emission layer, run at a
+  reduced resolution, instead of halo shapes around every light.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageChops, ImageDraw, ImageFilter
+
+# (kind, (x0, y0, x1, y1), fill) with PIL's inclusive box corners
+Shape = Tuple[str, Tuple[int, int, int, int], Tuple[int, int, int]]
+
+GLOW_SCALE = 4  # emission is blurred at 1/GLOW_SCALE resolution
+
+
+def rectangle(x0: int, y0: int, x1: int, y1: int, fill: Tuple[int, int, int]) -> Shape:
+    return ('rectangle', (x0, y0, x1, y1), tuple(int(c) for c in fill))
+
+
+def ellipse(x0: int, y0: int, x1: int, y1: int, fill: Tuple[int, int, int]) -> Shape:
+    return ('ellipse', (x0, y0, x1, y1), tuple(int(c) for c in fill))
+
+
+@dataclass(frozen=True)
+class Sprite:
+    """A pre-rendered shape and the offset of its top-left corner from its anchor."""
+    image: Image.Image
+    offset: Tuple[int, int]
+
+
+@lru_cache(maxsize=1024)
+def make_sprite(shapes: Tuple[Shape, ...]) -> Sprite:
+    """Render shapes, later ones on top, with boxes relative to an anchor at (0, 0)."""
+    boxes = [box for _, box, _ in shapes]
+    left = min(box[0] for box in boxes)
+    top = min(box[1] for box in boxes)
+    width = max(box[2] for box in boxes) - left + 1
+    height = max(box[3] for box in boxes) - top + 1
+
+    image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    for (kind, _, fill), (x0, y0, x1, y1) in zip(shapes, boxes):
+        box = [(x0 - left, y0 - top), (x1 - left, y1 - top)]
+        if kind == 'ellipse':
+            draw.ellipse(box, fill=(*fill, 255))
+        else:
+            draw.rectangle(box, fill=(*fill, 255))
+    return Sprite(image=image, offset=(left, top))
+
+
+def paste_sprites(img: Image.Image, sprite: Sprite, xs: Sequence[int], ys: Sequence[int]):
+    """Paste a sprite at every anchor, later instances on top."""
+    left, top = sprite.offset
+    for x, y in zip(np.asarray(xs).tolist(), np.asarray(ys).tolist()):
+        img.paste(sprite.image, (x + left, y + top), sprite.image)
+
+
+def pack_rgb(colors) -> np.ndarray:
+    """RGB colors, shape (..., 3), as one little-endian RGBX word each."""
+    colors = np.asarray(colors, dtype=np.uint32)
+    return (colors[..., 0] | colors[..., 1] << 8 | colors[..., 2] << 16).astype('<u4')
+
+
+def packed_image(pixels: np.ndarray) -> Image.Image:
+    """RGB image of a (height, width) array of pack_rgb words."""
+    pixels = np.ascontiguousarray(pixels, dtype='<u4')
+    height, width = pixels.shape
+    return Image.frombytes('RGB', (width, height), pixels, 'raw', 'RGBX')
+
+
+def grid_view(canvas: np.ndarray,
+              x: int,
+              y: int,
+              rows: int,
+              cols: int,
+              spacing_x: int,
+              spacing_y: int,
+              cell_width: int,
+              cell_height: int) -> np.ndarray:
+    """
+    Writable view of a lattice of cells in a pixel array.
+
+    view[row, :, col, :] is the cell_height x cell_width block whose
+    top-left pixel is (x + col * spacing_x, y + row * spacing_y). Cells
+    must fit in their spacing, and the canvas must extend a full spacing
+    past the last cell.
+    """
+    block = canvas[y:y + rows * spacing_y, x:x + cols * spacing_x]
+    lattice = block.reshape(rows, spacing_y, cols, spacing_x, *canvas.shape[2:])
+    return lattice[:, :cell_height, :, :cell_width]
+
+
+def draw_segments(canvas: np.ndarray,
+                  x0: np.ndarray,
+                  y0: np.ndarray,
+                  x1: np.ndarray,
+                  y1: np.ndarray,
+                  color: Tuple[int, ...]):
+    """Draw one-pixel line segments, sampling each at every pixel step."""
+    x0, y0, x1, y1 = (np.asarray(v, dtype=np.float64) for v in (x0, y0, x1, y1))
+    if not x0.size:
+        return
+    steps = int(max(np.abs(x1 - x0).max(), np.abs(y1 - y0).max())) + 1
+    t = np.linspace(0.0, 1.0, max(steps, 2))
+    px = np.rint(x0[:, None] + (x1 - x0)[:, None] * t).astype(np.int64)
+    py = np.rint(y0[:, None] + (y1 - y0)[:, None] * t).astype(np.int64)
+
+    height, width = canvas.shape[:2]
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    canvas[py[inside], px[inside]] = color
+
+
+def add_glow(img: Image.Image, emission: Image.Image, radius: float):
+    """
+    Blur the emission layer once and add it to img as light, in place.
+
+    The blur is PIL's Gaussian (separable passes in C) on a downscaled
+    copy of the lit part of the emission, so its cost follows the lit
+    area rather than the number of lights.
+    """
+    bbox = emission.getbbox()
+    if bbox is None:
+        return
+    margin = int(3 * radius)
+    box = (max(bbox[0] - margin, 0), max(bbox[1] - margin, 0),
+           min(bbox[2] + margin, img.width), min(bbox[3] + margin, img.height))
+    region = emission.crop(box)
+    light = region.reduce(GLOW_SCALE).filter(ImageFilter.GaussianBlur(radius=radius / GLOW_SCALE))
+    img.paste(ImageChops.add(img.crop(box), light.resize(region.size, Image.BILINEAR)), box[:2])
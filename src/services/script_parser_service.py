@@ -3,15 +3,22 @@ Script Parser Service
 
 Handles parsing of LOG script format for video generation with proper error handling
 and validation.
+
+Every consumer (the API, the video workers and this service) reads its view of a
+script from one cached record, keyed by the script's content hash and the parser
+versions, so a script is parsed once however many processes ask for it.
 """
 
 import re
+import asyncio
 import logging
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
 import structlog
 
+from ..utils.result_cache import get_result_cache
+
 logger = structlog.get_logger()
 
 
@@ -30,6 +37,9 @@ class ScriptSegment:
 class ScriptParserService:
     """Service for parsing script content into structured data."""
     
+    # Bump when parse output changes, so cached results are not reused
+    VERSION = "2.0"
+    
     def __init__(self):
         """Initialize the script parser with regex patterns."""
         self.timestamp_pattern = re.compile(r'\[(\d+:\d+)[^\]]*\]')
@@ -65,6 +75,14 @@ class ScriptParserService:
         if not script_content or not script_content.strip():
             raise ValueError("Script content is empty or invalid")
         
+        # A script parsed before, by this or any other process, is not parsed again
+        result = (await asyncio.to_thread(parse_script_cached, script_content))["log"]
+        if not result["scenes"]:
+            raise ValueError("No valid scenes found in script")
+        return result
+    
+    def _parse(self, script_content: str) -> Dict[str, Any]:
+        """Parse non-empty script content, bypassing the cache."""
         logger.info("Starting script parsing", content_length=len(script_content))
         
         try:
@@ -74,9 +92,6 @@ class ScriptParserService:
             # Split script into timestamp sections
             sections = self.timestamp_pattern.split(script_content)
             
-            if len(sections) < 3:  # At least header + one timestamp + content
-                raise ValueError("No valid timestamp sections found in script")
-            
             scenes = []
             total_duration = 0
             
@@ -102,9 +117,6 @@ class ScriptParserService:
                         )
                         continue
             
-            if not scenes:
-                raise ValueError("No valid scenes found in script")
-            
             result = {
                 "title": title,
                 "scenes": [self._scene_to_dict(scene) for scene in scenes],
@@ -112,7 +124,7 @@ class ScriptParserService:
                 "scene_count": len(scenes),
                 "metadata": {
                     "parsed_at": "now",
-                    "parser_version": "2.0",
+                    "parser_version": self.VERSION,
                     "content_length": len(script_content)
                 }
             }
@@ -321,4 +333,220 @@ class ScriptParserService:
             "service": "script_parser",
             "patterns_loaded": 4,
             "version": "2.0"
-        }
\ No newline at end of file
+        }
+
+
+class DirectiveScriptParser:
+    """Parse scripts written as SCENE/COMMAND/VISUAL directives (the /scripts/parse format)."""
+    
+    # Bump when parse output changes, so cached results are not reused
+    VERSION = "1"
+    
+    def __init__(self, content: str):
+        self.content = content
+        self.scenes = []
+        self.warnings = []
+    
+    def parse(self) -> Dict[str, Any]:
+        """Parse the script content into scenes"""
+        # Split content into lines
+        lines = self.content.strip().split('\n')
+        
+        current_scene = None
+        scene_number = 0
+        
+        for line_num, line in enumerate(lines):
+            line = line.strip()
+            
+            if not line:
+                continue
+            
+            # Check for scene marker
+            if self._is_scene_marker(line):
+                # Save previous scene if exists
+                if current_scene:
+                    self.scenes.append(current_scene)
+                
+                # Start new scene
+                scene_number += 1
+                current_scene = {
+                    "scene_number": scene_number,
+                    "description": self._extract_scene_description(line),
+                    "duration": 0.0,
+                    "commands": [],
+                    "dialogue": None,
+                    "visual_prompts": []
+                }
+            
+            # Check for commands
+            elif self._is_command(line):
+                if current_scene:
+                    command = self._extract_command(line)
+                    current_scene["commands"].append(command)
+                    
+                    # Update duration based on command
+                    duration = self._estimate_command_duration(command)
+                    current_scene["duration"] += duration
+                else:
+                    self.warnings.append(f"Command found outside scene at line {line_num + 1}")
+            
+            # Check for dialogue
+            elif self._is_dialogue(line):
+                if current_scene:
+                    if current_scene["dialogue"]:
+                        current_scene["dialogue"] += f" {line}"
+                    else:
+                        current_scene["dialogue"] = line
+                    
+                    # Estimate dialogue duration
+                    words = len(line.split())
+                    current_scene["duration"] += words * 0.3  # ~0.3 seconds per word
+                else:
+                    self.warnings.append(f"Dialogue found outside scene at line {line_num + 1}")
+            
+            # Check for visual prompts
+            elif self._is_visual_prompt(line):
+                if current_scene:
+                    prompt = self._extract_visual_prompt(line)
+                    current_scene["visual_prompts"].append(prompt)
+                else:
+                    self.warnings.append(f"Visual prompt found outside scene at line {line_num + 1}")
+            
+            # Otherwise, it might be description
+            elif current_scene and not any([
+                self._is_scene_marker(line),
+                self._is_command(line),
+                self._is_dialogue(line),
+                self._is_visual_prompt(line)
+            ]):
+                # Add to scene description
+                current_scene["description"] += f" {line}"
+        
+        # Save last scene
+        if current_scene:
+            self.scenes.append(current_scene)
+        
+        # Validate and create response
+        return self._create_response()
+    
+    def _is_scene_marker(self, line: str) -> bool:
+        """Check if line is a scene marker"""
+        patterns = [
+            r"^SCENE\s+\d+",
+            r"^INT\.",
+            r"^EXT\.",
+            r"^\[SCENE",
+            r"^#\s*SCENE"
+        ]
+        return any(re.match(pattern, line.upper()) for pattern in patterns)
+    
+    def _is_command(self, line: str) -> bool:
+        """Check if line is a command"""
+        patterns = [
+            r"^COMMAND:",
+            r"^CMD:",
+            r"^\[COMMAND",
+            r"^//\s*COMMAND"
+        ]
+        return any(re.match(pattern, line.upper()) for pattern in patterns)
+    
+    def _is_dialogue(self, line: str) -> bool:
+        """Check if line is dialogue"""
+        # Dialogue often starts with quotes or has character names
+        return (
+            line.startswith('"') or 
+            line.startswith("'") or
+            re.match(r"^[A-Z][A-Z\s]+:", line) or  # CHARACTER NAME:
+            re.match(r"^VOICE:", line.upper())
+        )
+    
+    def _is_visual_prompt(self, line: str) -> bool:
+        """Check if line is a visual prompt"""
+        patterns = [
+            r"^VISUAL:",
+            r"^PROMPT:",
+            r"^\[VISUAL",
+            r"^#\s*VISUAL"
+        ]
+        return any(re.match(pattern, line.upper()) for pattern in patterns)
+    
+    def _extract_scene_description(self, line: str) -> str:
+        """Extract scene description from marker line"""
+        # Remove scene markers
+        description = re.sub(r"^(SCENE\s+\d+|INT\.|EXT\.|\[SCENE|#\s*SCENE)[:\s]*", "", line, flags=re.IGNORECASE)
+        return description.strip()
+    
+    def _extract_command(self, line: str) -> str:
+        """Extract command from line"""
+        # Remove command markers
+        command = re.sub(r"^(COMMAND|CMD|\/\/\s*COMMAND|\[COMMAND)[:\s]*", "", line, flags=re.IGNORECASE)
+        return command.strip()
+    
+    def _extract_visual_prompt(self, line: str) -> str:
+        """Extract visual prompt from line"""
+        # Remove visual markers
+        prompt = re.sub(r"^(VISUAL|PROMPT|\[VISUAL|#\s*VISUAL)[:\s]*", "", line, flags=re.IGNORECASE)
+        return prompt.strip()
+    
+    def _estimate_command_duration(self, command: str) -> float:
+        """Estimate duration for a command"""
+        # Basic estimation based on command type
+        command_lower = command.lower()
+        
+        if "glitch" in command_lower:
+            return 0.5
+        elif "zoom" in command_lower or "pan" in command_lower:
+            return 2.0
+        elif "transition" in command_lower:
+            return 1.0
+        elif "effect" in command_lower:
+            return 1.5
+        else:
+            return 1.0
+    
+    def _create_response(self) -> Dict[str, Any]:
+        """Create the parse result (the fields of ScriptParseResponse)"""
+        parsed_scenes = []
+        total_duration = 0.0
+        
+        for scene in self.scenes:
+            # Ensure minimum scene duration
+            if scene["duration"] < 2.0:
+                scene["duration"] = 2.0
+                self.warnings.append(f"Scene {scene['scene_number']} duration adjusted to minimum 2 seconds")
+            
+            parsed_scenes.append({
+                "scene_number": scene["scene_number"],
+                "description": scene["description"],
+                "duration": round(scene["duration"], 2),
+                "commands": scene["commands"],
+                "dialogue": scene["dialogue"],
+                "visual_prompts": scene["visual_prompts"]
+            })
+            total_duration += scene["duration"]
+        
+        return {
+            "scenes": parsed_scenes,
+            "total_duration": round(total_duration, 2),
+            "scene_count": len(parsed_scenes),
+            "warnings": self.warnings
+        }
+
+
+def parse_script_cached(script_content: str) -> Dict[str, Any]:
+    """
+    Canonical parse of a script, shared by every process through the result cache.
+    
+    Returns:
+        {"log": LOG format parse (ScriptParserService), used by the video workers,
+         "directives": SCENE/COMMAND directive parse, used by /scripts/parse}
+    """
+    return get_result_cache().get_or_compute(
+        "script_parse",
+        f"{ScriptParserService.VERSION}+{DirectiveScriptParser.VERSION}",
+        script_content,
+        lambda: {
+            "log": ScriptParserService()._parse(script_content),
+            "directives": DirectiveScriptParser(script_content).parse()
+        }
+    )
\ No newline at end of file
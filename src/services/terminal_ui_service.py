@@ -7,7 +7,9 @@ and resource management.
 
 import asyncio
 import os
+import shutil
 import tempfile
+from pathlib import Path
 from typing import Dict, List, Any, Optional
 
 import structlog
@@ -20,9 +22,13 @@ logger = structlog.get_logger()
 class TerminalUIService:
     """Service for generating terminal UI animations."""
     
-    def __init__(self):
+    FPS = 24
+    FRAME_SIZE = "1920x1080"
+    FONT_FILE = "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf"
+    
+    def __init__(self, file_manager: Optional[FileManager] = None):
         """Initialize terminal UI service."""
-        self.file_manager = FileManager()
+        self.file_manager = file_manager or FileManager()
         
         # Active generation jobs for cancellation
         self.active_jobs: Dict[str, List[asyncio.Task]] = {}
@@ -68,10 +74,10 @@ class TerminalUIService:
         )
         
         ui_elements = []
-        generation_tasks = []
+        overlays = []
         
         try:
-            # Process each scene's on-screen text
+            # Collect each scene's on-screen text
             for scene_idx, scene in enumerate(parsed_script.get('scenes', [])):
                 scene_duration = self._calculate_scene_duration(
                     scene, scene_idx, parsed_script
@@ -79,25 +85,38 @@ class TerminalUIService:
                 
                 for text_idx, onscreen_text in enumerate(scene.get('onscreen_text', [])):
                     if onscreen_text.strip():
-                        task = self._generate_terminal_animation(
-                            job_id=job_id,
-                            scene=scene,
-                            onscreen_text=onscreen_text,
-                            text_index=text_idx,
-                            duration=scene_duration,
-                            theme=theme
-                        )
-                        generation_tasks.append(task)
-            
-            # Track active tasks for cancellation
-            self.active_jobs[job_id] = generation_tasks
+                        overlays.append({
+                            'scene': scene,
+                            'onscreen_text': onscreen_text,
+                            'text_index': text_idx,
+                            'duration': scene_duration
+                        })
             
-            if generation_tasks:
-                # Execute all UI generation tasks
-                results = await asyncio.gather(
-                    *generation_tasks,
-                    return_exceptions=True
+            if overlays:
+                # Render every overlay in one FFmpeg process; tracked for cancellation
+                batch = asyncio.ensure_future(
+                    self._render_overlay_batch(job_id, overlays, theme)
                 )
+                self.active_jobs[job_id] = [batch]
+                results = await batch
+                
+                if results is None:
+                    logger.warning(
+                        "Batched UI rendering failed, rendering overlays individually",
+                        job_id=job_id,
+                        overlays=len(overlays)
+                    )
+                    generation_tasks = [
+                        asyncio.ensure_future(self._generate_terminal_animation(
+                            job_id=job_id, theme=theme, **overlay
+                        ))
+                        for overlay in overlays
+                    ]
+                    self.active_jobs[job_id] = generation_tasks
+                    results = await asyncio.gather(
+                        *generation_tasks,
+                        return_exceptions=True
+                    )
                 
                 # Process results
                 successful_elements = []
@@ -116,9 +135,9 @@ class TerminalUIService:
             logger.info(
                 "Terminal UI generation completed",
                 job_id=job_id,
-                total_requested=len(generation_tasks),
+                total_requested=len(overlays),
                 successful=len(ui_elements),
-                failed=len(generation_tasks) - len(ui_elements)
+                failed=len(overlays) - len(ui_elements)
             )
             
             return ui_elements
@@ -286,6 +305,143 @@ class TerminalUIService:
             logger.error("Failed to create typing animation", error=str(e))
             return None
     
+    async def _render_overlay_batch(self, job_id: str, overlays: List[Dict[str, Any]],
+                                    theme: str) -> Optional[List[str]]:
+        """
+        Render all of a job's overlays with one FFmpeg process and encoder.
+        
+        The overlays are laid end to end on a single background stream, each
+        text enabled for its own frame range, encoded once with keyframes
+        forced at the boundaries, and cut into one file per overlay by the
+        segment muxer (a stream copy, no re-encoding).
+        
+        Args:
+            job_id: Job identifier
+            overlays: Overlays with scene, onscreen_text, text_index and duration
+            theme: Terminal theme
+            
+        Returns:
+            Saved file paths in overlay order, or None if the batch failed
+        """
+        theme_colors = self.themes[theme]
+        
+        # Whole frames per overlay, so every cut lands exactly on a frame
+        frame_counts = [max(1, round(overlay['duration'] * self.FPS)) for overlay in overlays]
+        starts = []
+        total_frames = 0
+        for frames in frame_counts:
+            starts.append(total_frames)
+            total_frames += frames
+        
+        filters = [
+            f"color=c={theme_colors['bg']}:s={self.FRAME_SIZE}:r={self.FPS}"
+            f":d={total_frames / self.FPS:.6f}"
+        ]
+        for overlay, start, frames in zip(overlays, starts, frame_counts):
+            safe_text = self._escape_text_for_ffmpeg(overlay['onscreen_text'])
+            filters.append(
+                f"drawtext=text='{safe_text[:100]}':"
+                f"fontcolor={theme_colors['fg']}:fontsize=28:x=50:y=100:"
+                f"fontfile={self.FONT_FILE}:"
+                f"enable='between(n,{start},{start + frames - 1})'"
+            )
+        # The prompt is the same on every overlay, so it is drawn once
+        filters.append(
+            f"drawtext=text='$ ':fontcolor={theme_colors['accent']}:fontsize=28:"
+            f"x=50:y=50:fontfile={self.FONT_FILE}"
+        )
+        
+        work_dir = Path(tempfile.mkdtemp(prefix=f"{job_id}_ui_"))
+        pattern = str(work_dir / "overlay_%04d.mp4")
+        
+        cmd = [
+            'ffmpeg', '-y', '-v', 'error',
+            '-filter_complex', ','.join(filters) + '[out]',
+            '-map', '[out]',
+            '-c:v', 'libx264',
+            '-preset', 'fast',
+            '-pix_fmt', 'yuv420p'
+        ]
+        if len(overlays) > 1:
+            # Half a frame early, so float rounding cannot push a cut past its frame
+            cut_times = ','.join(f"{(start - 0.5) / self.FPS:.6f}" for start in starts[1:])
+            cmd += [
+                '-force_key_frames', cut_times,
+                '-f', 'segment',
+                '-segment_format', 'mp4',
+                '-segment_times', cut_times,
+                '-reset_timestamps', '1',
+                pattern
+            ]
+        else:
+            cmd.append(pattern % 0)
+        
+        try:
+            logger.debug(
+                "Rendering terminal UI overlays",
+                job_id=job_id,
+                overlays=len(overlays),
+                total_seconds=total_frames / self.FPS
+            )
+            
+            if not await self._run_ffmpeg(cmd):
+                return None
+            
+            segments = sorted(work_dir.glob("overlay_*.mp4"))
+            if len(segments) != len(overlays):
+                logger.error(
+                    "Batched UI render produced the wrong number of segments",
+                    job_id=job_id,
+                    expected=len(overlays),
+                    produced=len(segments)
+                )
+                return None
+            
+            paths = []
+            for overlay, segment in zip(overlays, segments):
+                timestamp_clean = overlay['scene']['timestamp'].replace(':', '_')
+                filename = f"{job_id}_ui_{timestamp_clean}_{overlay['text_index']}.mp4"
+                paths.append(await self.file_manager.save_video_file_from_temp(
+                    filename, str(segment)
+                ))
+            return paths
+            
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Batched UI render failed", job_id=job_id, error=str(e))
+            return None
+        
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    async def _run_ffmpeg(self, cmd: List[str]) -> bool:
+        """Run an FFmpeg command, killing it if the job is cancelled."""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            logger.error("ffmpeg not found; cannot render terminal UI")
+            return False
+        
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+        
+        if process.returncode != 0:
+            logger.error(
+                "FFmpeg failed for terminal UI batch",
+                stderr=stderr.decode(errors='replace')[-500:]
+            )
+            return False
+        return True
+    
     def _escape_text_for_ffmpeg(self, text: str) -> str:
         """Escape text for safe use in FFmpeg filters."""
         # Replace characters that cause issues in FFmpeg
@@ -15,6 +15,8 @@ from enum import Enum
 
 from .dalle3_client import OpenAIImageGenerator, create_dalle3_client
 from .runway_ml_proper import RunwayMLProperClient, AsyncRunwayMLClient
+from ..prompts.prompt_similarity import PromptSimilarityIndex, cluster_prompts, jaccard, shingles
+from ..utils.stage_pipeline import PipelineStage, run_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +35,12 @@ class VideoGenerationMode(Enum):
     AUTO = "auto"
 
 
+# generate_video_clip arguments that only affect the video step
+VIDEO_OPTIONS = (
+    "video_model", "video_ratio", "style", "camera_movement", "lighting", "mood", "seed", "output_path"
+)
+
+
 class UnifiedPipelineManager:
     """
     Manages the complete pipeline from text to video generation.
@@ -83,6 +91,18 @@ class UnifiedPipelineManager:
         
         # Cache for generated assets
         self.asset_cache = {}
+        
+        # Clips generated by this manager, for reuse by near-duplicate prompts
+        self.clip_index = PromptSimilarityIndex()
+        self.reused_clips = 0
+        
+        # One stage per provider, each kept busy at its own limit and shared by
+        # batch runs and single clips alike
+        image_concurrency = self.dalle3_client.rate_limiter.max_concurrency if self.dalle3_client else 1
+        self.stages = {
+            "image": PipelineStage("image", image_concurrency),
+            "video": PipelineStage("video", int(os.getenv("RUNWAY_MAX_CONCURRENCY", "2")))
+        }
     
     async def generate_video_clip(
         self,
@@ -126,18 +146,12 @@ class UnifiedPipelineManager:
             Dictionary with generation results, URLs, and metadata
         """
         start_time = datetime.now()
-        pipeline_result = {
-            "success": False,
-            "prompt": prompt,
-            "start_time": start_time.isoformat(),
-            "steps": [],
-            "cost": 0.0
-        }
         
+        # Step 1: Generate initial image
+        logger.info("Step 1: Generating initial image")
         try:
-            # Step 1: Generate initial image
-            logger.info("Step 1: Generating initial image")
-            image_result = await self._generate_initial_image(
+            image_result = await self.stages["image"].call(
+                self._generate_initial_image,
                 prompt=prompt,
                 provider=image_provider or self.default_provider,
                 size=image_size,
@@ -149,132 +163,29 @@ class UnifiedPipelineManager:
                 lighting=lighting,
                 mood=mood
             )
-            
-            pipeline_result["steps"].append({
-                "name": "image_generation",
-                "status": "success" if image_result["success"] else "failed",
-                "duration": image_result.get("generation_time", 0),
-                "result": image_result
-            })
-            
-            if not image_result["success"]:
-                raise Exception(f"Image generation failed: {image_result.get('error')}")
-            
-            # Update cost
-            pipeline_result["cost"] += image_result.get("cost", 0)
-            
-            # Step 2: Generate video from image
-            logger.info("Step 2: Generating video from image")
-            
-            # Prepare video prompt
-            video_prompt = self._prepare_video_prompt(
-                base_prompt=prompt,
-                style=style,
-                camera_movement=camera_movement,
-                lighting=lighting,
-                mood=mood
-            )
-            
-            # Create data URI from resized image
-            image_path = image_result.get("resized_path")
-            if not image_path:
-                raise Exception("No resized image path available")
-            
-            image_data_uri = self.runway_client.create_data_uri_from_image(image_path)
-            
-            # Generate video
-            video_task = await self.async_runway_client.generate_video_from_image(
-                image_url=image_data_uri,
-                prompt=video_prompt,
-                duration=duration,
-                model=video_model,
-                ratio=video_ratio,
-                seed=seed
-            )
-            
-            if not video_task or not video_task.get("id"):
-                raise Exception(f"Video generation failed to start: {video_task}")
-            
-            logger.info(f"Video generation task created: {video_task['id']}")
-            
-            # Step 3: Wait for video completion
-            logger.info("Step 3: Waiting for video generation")
-            video_url = await self.async_runway_client.wait_for_completion(
-                video_task["id"],
-                max_wait_time=600,
-                poll_interval=5
-            )
-            
-            if not video_url:
-                raise Exception("Video generation failed or timed out")
-            
-            pipeline_result["steps"].append({
-                "name": "video_generation",
-                "status": "success",
-                "task_id": video_task["id"],
-                "video_url": video_url
-            })
-            
-            # Step 4: Download video if output path specified
-            final_path = None
-            if output_path:
-                logger.info("Step 4: Downloading video")
-                final_path = await self.async_runway_client.download_video(
-                    video_url,
-                    output_path
-                )
-                
-                pipeline_result["steps"].append({
-                    "name": "video_download",
-                    "status": "success" if final_path else "failed",
-                    "output_path": final_path
-                })
-            
-            # Calculate total time
-            end_time = datetime.now()
-            total_duration = (end_time - start_time).total_seconds()
-            
-            # Update pipeline result
-            pipeline_result.update({
-                "success": True,
-                "end_time": end_time.isoformat(),
-                "total_duration": total_duration,
-                "image_url": image_result.get("original_url"),
-                "image_path": image_result.get("resized_path"),
-                "video_url": video_url,
-                "video_path": final_path,
-                "revised_prompt": image_result.get("revised_prompt", prompt),
-                "video_prompt": video_prompt
-            })
-            
-            # Update metrics
-            self.pipeline_runs += 1
-            self.success_count += 1
-            self.total_cost += pipeline_result["cost"]
-            
-            # Clean up temporary image file
-            try:
-                if image_path and os.path.exists(image_path):
-                    os.unlink(image_path)
-            except Exception as e:
-                logger.warning(f"Failed to clean up temp image: {e}")
-            
-            return pipeline_result
-            
         except Exception as e:
-            logger.error(f"Pipeline failed: {e}")
-            
-            # Update failure metrics
-            self.pipeline_runs += 1
-            self.failure_count += 1
-            
-            pipeline_result.update({
-                "success": False,
-                "error": str(e),
-                "end_time": datetime.now().isoformat()
-            })
-            
-            return pipeline_result
+            image_result = {"success": False, "error": str(e)}
+        
+        video_args = dict(
+            prompt=prompt,
+            image_result=image_result,
+            duration=duration,
+            video_model=video_model,
+            video_ratio=video_ratio,
+            style=style,
+            camera_movement=camera_movement,
+            lighting=lighting,
+            mood=mood,
+            seed=seed,
+            output_path=output_path,
+            start_time=start_time
+        )
+        if not image_result.get("success"):
+            # Nothing to render; report the failure without waiting for a video slot
+            return await self._generate_video_from_image_result(**video_args)
+        
+        # Steps 2-4: Generate, await and download the video
+        return await self.stages["video"].call(self._generate_video_from_image_result, **video_args)
     
     async def _generate_initial_image(
         self,
@@ -475,105 +386,309 @@ class UnifiedPipelineManager:
         """
         Generate multiple video clips in an optimized batch process.
         
+        A prompt close enough to one this manager already generated a clip
+        for reuses that clip, and the remaining prompts are clustered so
+        only one clip per group of near-duplicates is generated. Reused
+        results carry ``reused_from`` (the prompt that was generated) and
+        cost nothing.
+        
         Args:
             prompts: List of prompts to generate
             duration: Duration for all videos
             **kwargs: Additional arguments passed to generate_video_clip
         
         Returns:
-            List of generation results
+            List of generation results, one per prompt
+        """
+        # Clips are only interchangeable under the same look and format
+        style_key = "/".join(str(kwargs.get(name, default)) for name, default in (
+            ("style", "cinematic"), ("image_style", "vivid"), ("image_quality", "hd")
+        ))
+        size_key = f"{kwargs.get('image_size', '1792x1024')}/{kwargs.get('video_ratio', '1280:720')}/{duration}"
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(prompts)
+        pending = []
+        for position, prompt in enumerate(prompts):
+            match = self.clip_index.find(prompt, style_key, size_key)
+            if match is not None:
+                results[position] = self._reused_clip(match.asset, prompt, match.similarity)
+            else:
+                pending.append(position)
+        
+        representatives = cluster_prompts(
+            [prompts[position] for position in pending],
+            self.clip_index.threshold, style_key, size_key
+        )
+        to_generate = [pending[index] for index in sorted(set(representatives))]
+        if len(to_generate) < len(prompts):
+            logger.info(f"Generating {len(to_generate)} clips for {len(prompts)} prompts, "
+                        f"reusing near-duplicates")
+        
+        generated = {}
+        if to_generate:
+            generated = dict(zip(
+                to_generate,
+                await self._generate_clips([prompts[position] for position in to_generate], duration, **kwargs)
+            ))
+        for position, clip in generated.items():
+            results[position] = clip
+            if clip.get("success"):
+                self.clip_index.add(prompts[position], clip, style_key, size_key)
+        
+        for position, representative in zip(pending, representatives):
+            if results[position] is None:
+                source = pending[representative]
+                clip = generated[source]
+                if clip.get("success"):
+                    similarity = jaccard(shingles(prompts[position]), shingles(prompts[source]))
+                    results[position] = self._reused_clip(clip, prompts[position], similarity)
+                else:
+                    results[position] = {**clip, "prompt": prompts[position]}
+        
+        return results
+    
+    def _reused_clip(self, clip: Dict[str, Any], prompt: str, similarity: float) -> Dict[str, Any]:
+        """Result for a prompt served by an already generated clip."""
+        self.reused_clips += 1
+        return {
+            **clip,
+            "prompt": prompt,
+            "reused_from": clip.get("prompt"),
+            "similarity": similarity,
+            "cost": 0.0
+        }
+    
+    async def _generate_clips(
+        self,
+        prompts: List[str],
+        duration: int,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate one clip per prompt with the image and video stages overlapped.
+        
+        Images are generated while earlier clips render on Runway. Each
+        provider runs at its own stage limit, and at most a stage buffer of
+        finished images waits for a video slot before image generation
+        pauses, so images are not produced long before they can be used.
         """
-        results = []
+        logger.info(f"Generating {len(prompts)} clips through the image and video stages")
+        
+        video_kwargs = {name: kwargs[name] for name in VIDEO_OPTIONS if name in kwargs}
+        
+        async def generate_image(prompt: str, _) -> Dict[str, Any]:
+            image_result = await self._generate_batch_image(prompt, **kwargs)
+            if not image_result.get("success"):
+                return {
+                    "success": False,
+                    "prompt": prompt,
+                    "error": f"Image generation failed: {image_result.get('error')}",
+                    "image_result": image_result
+                }
+            return image_result
         
-        # First, generate all images in parallel (with rate limiting)
-        logger.info(f"Generating {len(prompts)} images in batch")
+        async def generate_video(prompt: str, image_result: Dict[str, Any]) -> Dict[str, Any]:
+            return await self._generate_video_from_image_result(
+                prompt=prompt,
+                image_result=image_result,
+                duration=duration,
+                **video_kwargs
+            )
         
+        return await run_pipeline(
+            prompts,
+            [(self.stages["image"], generate_image), (self.stages["video"], generate_video)],
+            is_final=lambda result: not result.get("success"),
+            on_error=lambda prompt, error: {"success": False, "prompt": prompt, "error": str(error)}
+        )
+    
+    async def _generate_batch_image(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Image for one prompt of a batch."""
         if self.dalle3_client:
-            image_results = await self.dalle3_client.generate_batch(
-                prompts=prompts,
+            return await self.dalle3_client.generate_image(
+                prompt=prompt,
                 size=kwargs.get("image_size", "1792x1024"),
                 quality=kwargs.get("image_quality", "hd"),
                 style=kwargs.get("image_style", "vivid"),
                 enhance_for_video=kwargs.get("enhance_prompt", True)
             )
-        else:
-            # Fallback to sequential generation
-            image_results = []
-            for prompt in prompts:
-                result = await self._generate_initial_image(
-                    prompt=prompt,
-                    provider=kwargs.get("image_provider", self.default_provider),
-                    size=kwargs.get("image_size", "1792x1024"),
-                    quality=kwargs.get("image_quality", "hd"),
-                    style=kwargs.get("image_style", "vivid"),
-                    enhance_for_video=kwargs.get("enhance_prompt", True),
-                    video_style=kwargs.get("style", "cinematic"),
-                    camera_movement=kwargs.get("camera_movement"),
-                    lighting=kwargs.get("lighting"),
-                    mood=kwargs.get("mood")
-                )
-                image_results.append(result)
         
-        # Then generate videos from successful images
-        for i, (prompt, image_result) in enumerate(zip(prompts, image_results)):
-            if image_result.get("success"):
-                logger.info(f"Generating video {i+1}/{len(prompts)}")
-                
-                # Create a modified kwargs with the image result
-                clip_kwargs = kwargs.copy()
-                clip_kwargs["_pregenerated_image"] = image_result
-                
-                clip_result = await self._generate_video_from_image_result(
-                    prompt=prompt,
-                    image_result=image_result,
-                    duration=duration,
-                    **clip_kwargs
-                )
-                
-                results.append(clip_result)
-            else:
-                # Add failed result
-                results.append({
-                    "success": False,
-                    "prompt": prompt,
-                    "error": f"Image generation failed: {image_result.get('error')}",
-                    "image_result": image_result
-                })
-        
-        return results
+        return await self._generate_initial_image(
+            prompt=prompt,
+            provider=kwargs.get("image_provider", self.default_provider),
+            size=kwargs.get("image_size", "1792x1024"),
+            quality=kwargs.get("image_quality", "hd"),
+            style=kwargs.get("image_style", "vivid"),
+            enhance_for_video=kwargs.get("enhance_prompt", True),
+            video_style=kwargs.get("style", "cinematic"),
+            camera_movement=kwargs.get("camera_movement"),
+            lighting=kwargs.get("lighting"),
+            mood=kwargs.get("mood")
+        )
     
     async def _generate_video_from_image_result(
         self,
         prompt: str,
         image_result: Dict[str, Any],
         duration: int,
-        **kwargs
+        video_model: str = "gen4_turbo",
+        video_ratio: str = "1280:720",
+        style: str = "cinematic",
+        camera_movement: Optional[str] = None,
+        lighting: Optional[str] = None,
+        mood: Optional[str] = None,
+        seed: Optional[int] = None,
+        output_path: Optional[str] = None,
+        start_time: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
-        Generate video from pre-generated image result.
+        Generate the video for an already generated image (steps 2-4).
         
         Args:
             prompt: Original prompt
             image_result: Image generation result
             duration: Video duration
-            **kwargs: Additional video generation parameters
+            start_time: When the clip's generation started (defaults to now)
+            Other arguments as for generate_video_clip
         
         Returns:
             Video generation result
         """
-        # This is a simplified version of generate_video_clip that skips image generation
-        # Implementation would follow similar pattern but start from step 2
-        # For brevity, using the main method with the pre-generated image
-        
-        # Note: This is a placeholder for optimization
-        # In a real implementation, we'd extract the video generation logic
-        # to avoid code duplication
+        start_time = start_time or datetime.now()
+        pipeline_result = {
+            "success": False,
+            "prompt": prompt,
+            "start_time": start_time.isoformat(),
+            "steps": [],
+            "cost": 0.0
+        }
         
-        return await self.generate_video_clip(
-            prompt=prompt,
-            duration=duration,
-            **kwargs
-        )
+        try:
+            pipeline_result["steps"].append({
+                "name": "image_generation",
+                "status": "success" if image_result["success"] else "failed",
+                "duration": image_result.get("generation_time", 0),
+                "result": image_result
+            })
+            
+            if not image_result["success"]:
+                raise Exception(f"Image generation failed: {image_result.get('error')}")
+            
+            # Update cost
+            pipeline_result["cost"] += image_result.get("cost", 0)
+            
+            # Step 2: Generate video from image
+            logger.info("Step 2: Generating video from image")
+            
+            # Prepare video prompt
+            video_prompt = self._prepare_video_prompt(
+                base_prompt=prompt,
+                style=style,
+                camera_movement=camera_movement,
+                lighting=lighting,
+                mood=mood
+            )
+            
+            # Create data URI from resized image
+            image_path = image_result.get("resized_path")
+            if not image_path:
+                raise Exception("No resized image path available")
+            
+            image_data_uri = self.runway_client.create_data_uri_from_image(image_path)
+            
+            # Generate video
+            video_task = await self.async_runway_client.generate_video_from_image(
+                image_url=image_data_uri,
+                prompt=video_prompt,
+                duration=duration,
+                model=video_model,
+                ratio=video_ratio,
+                seed=seed
+            )
+            
+            if not video_task or not video_task.get("id"):
+                raise Exception(f"Video generation failed to start: {video_task}")
+            
+            logger.info(f"Video generation task created: {video_task['id']}")
+            
+            # Step 3: Wait for video completion
+            logger.info("Step 3: Waiting for video generation")
+            video_url = await self.async_runway_client.wait_for_completion(
+                video_task["id"],
+                max_wait_time=600,
+                poll_interval=5
+            )
+            
+            if not video_url:
+                raise Exception("Video generation failed or timed out")
+            
+            pipeline_result["steps"].append({
+                "name": "video_generation",
+                "status": "success",
+                "task_id": video_task["id"],
+                "video_url": video_url
+            })
+            
+            # Step 4: Download video if output path specified
+            final_path = None
+            if output_path:
+                logger.info("Step 4: Downloading video")
+                final_path = await self.async_runway_client.download_video(
+                    video_url,
+                    output_path
+                )
+                
+                pipeline_result["steps"].append({
+                    "name": "video_download",
+                    "status": "success" if final_path else "failed",
+                    "output_path": final_path
+                })
+            
+            # Calculate total time
+            end_time = datetime.now()
+            total_duration = (end_time - start_time).total_seconds()
+            
+            # Update pipeline result
+            pipeline_result.update({
+                "success": True,
+                "end_time": end_time.isoformat(),
+                "total_duration": total_duration,
+                "image_url": image_result.get("original_url"),
+                "image_path": image_result.get("resized_path"),
+                "video_url": video_url,
+                "video_path": final_path,
+                "revised_prompt": image_result.get("revised_prompt", prompt),
+                "video_prompt": video_prompt
+            })
+            
+            # Update metrics
+            self.pipeline_runs += 1
+            self.success_count += 1
+            self.total_cost += pipeline_result["cost"]
+            
+            # Clean up temporary image file
+            try:
+                if image_path and os.path.exists(image_path):
+                    os.unlink(image_path)
+            except Exception as e:
+                logger.warning(f"Failed to clean up temp image: {e}")
+            
+            return pipeline_result
+            
+        except Exception as e:
+            logger.error(f"Pipeline failed: {e}")
+            
+            # Update failure metrics
+            self.pipeline_runs += 1
+            self.failure_count += 1
+            
+            pipeline_result.update({
+                "success": False,
+                "error": str(e),
+                "end_time": datetime.now().isoformat()
+            })
+            
+            return pipeline_result
     
     def get_pipeline_stats(self) -> Dict[str, Any]:
         """
@@ -592,6 +707,8 @@ class UnifiedPipelineManager:
             "total_runs": self.pipeline_runs,
             "successful_runs": self.success_count,
             "failed_runs": self.failure_count,
+            "reused_clips": self.reused_clips,
+            "stages": {name: stage.get_stats() for name, stage in self.stages.items()},
             "success_rate": round(success_rate, 2),
             "total_cost": round(self.total_cost, 3),
             "average_cost_per_run": round(
@@ -64,8 +64,9 @@ class GenerationJob:
     
     def update_progress(self, stage: GenerationStage, progress: float):
         """Update job progress and stage."""
+        # Concurrent stages report out of order; progress never moves backwards
         self.stage = stage
-        self.progress = progress
+        self.progress = max(self.progress, progress)
         self.updated_at = time.time()
     
     def add_error(self, stage: str, error: str, details: Optional[Dict] = None):
@@ -140,16 +141,16 @@ class VideoGenerationOrchestrator:
                 # Stage 1: Parse script
                 await self._parse_script(job)
                 
-                # Stage 2: Generate voice narration (with circuit breaker)
-                await self._generate_voice_with_protection(job)
-                
-                # Stage 3: Generate visual content (with circuit breaker)
-                await self._generate_visuals_with_protection(job)
-                
-                # Stage 4: Create terminal UI elements
-                await self._generate_ui_elements(job)
+                # Stages 2-4: voice, visuals and terminal UI only depend on
+                # the parsed script, so they run concurrently. Each stage
+                # handles its own failures with fallbacks.
+                await asyncio.gather(
+                    self._generate_voice_with_protection(job),
+                    self._generate_visuals_with_protection(job),
+                    self._generate_ui_elements(job)
+                )
                 
-                # Stage 5: Assemble final video
+                # Stage 5: Assemble final video once all inputs exist
                 await self._assemble_video(job)
                 
                 job.update_progress(GenerationStage.COMPLETED, 100.0)
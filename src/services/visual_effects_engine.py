@@ -319,24 +319,39 @@ class VisualEffectsEngine:
         bounds: Tuple[int, int, int, int] = (0, 0, 1920, 1080),
         wind: float = 0.0,
         gravity: float = 9.8,
-        turbulence: float = 0.0
+        turbulence: float = 0.0,
+        rng: Optional[random.Random] = None
     ) -> List[Particle]:
         """Create a particle system with specified parameters."""
+        return self.spawn_particles(particle_type, count, bounds, wind, gravity, turbulence, rng)
+    
+    def spawn_particles(
+        self,
+        particle_type: ParticleType,
+        count: int = 1000,
+        bounds: Tuple[int, int, int, int] = (0, 0, 1920, 1080),
+        wind: float = 0.0,
+        gravity: float = 9.8,
+        turbulence: float = 0.0,
+        rng: Optional[random.Random] = None
+    ) -> List[Particle]:
+        """Create particles synchronously, drawing from `rng` if given."""
         
+        rand = rng or random
         particles = []
         x_min, y_min, x_max, y_max = bounds
         
         for _ in range(count):
             if particle_type == ParticleType.RAIN:
                 particle = Particle(
-                    x=random.uniform(x_min - 100, x_max + 100),
-                    y=random.uniform(y_min - 200, y_min),
-                    vx=wind + random.uniform(-1, 1),
-                    vy=random.uniform(15, 25),
-                    size=random.uniform(1, 3),
+                    x=rand.uniform(x_min - 100, x_max + 100),
+                    y=rand.uniform(y_min - 200, y_min),
+                    vx=wind + rand.uniform(-1, 1),
+                    vy=rand.uniform(15, 25),
+                    size=rand.uniform(1, 3),
                     color=(150, 150, 200),
-                    alpha=random.uniform(0.3, 0.7),
-                    lifetime=random.uniform(2, 4),
+                    alpha=rand.uniform(0.3, 0.7),
+                    lifetime=rand.uniform(2, 4),
                     gravity=gravity,
                     wind=wind,
                     turbulence=turbulence
@@ -344,14 +359,14 @@ class VisualEffectsEngine:
             
             elif particle_type == ParticleType.SNOW:
                 particle = Particle(
-                    x=random.uniform(x_min - 50, x_max + 50),
-                    y=random.uniform(y_min - 100, y_min),
-                    vx=wind + random.uniform(-0.5, 0.5),
-                    vy=random.uniform(1, 3),
-                    size=random.uniform(2, 5),
+                    x=rand.uniform(x_min - 50, x_max + 50),
+                    y=rand.uniform(y_min - 100, y_min),
+                    vx=wind + rand.uniform(-0.5, 0.5),
+                    vy=rand.uniform(1, 3),
+                    size=rand.uniform(2, 5),
                     color=(255, 255, 255),
-                    alpha=random.uniform(0.6, 0.9),
-                    lifetime=random.uniform(5, 10),
+                    alpha=rand.uniform(0.6, 0.9),
+                    lifetime=rand.uniform(5, 10),
                     gravity=gravity * 0.1,
                     wind=wind,
                     turbulence=turbulence * 2
@@ -359,14 +374,14 @@ class VisualEffectsEngine:
             
             elif particle_type == ParticleType.FIRE:
                 particle = Particle(
-                    x=random.uniform(x_min, x_max),
+                    x=rand.uniform(x_min, x_max),
                     y=y_max,
-                    vx=random.uniform(-2, 2),
-                    vy=random.uniform(-8, -4),
-                    size=random.uniform(3, 8),
-                    color=(255, random.randint(100, 200), 0),
-                    alpha=random.uniform(0.7, 1.0),
-                    lifetime=random.uniform(0.5, 1.5),
+                    vx=rand.uniform(-2, 2),
+                    vy=rand.uniform(-8, -4),
+                    size=rand.uniform(3, 8),
+                    color=(255, rand.randint(100, 200), 0),
+                    alpha=rand.uniform(0.7, 1.0),
+                    lifetime=rand.uniform(0.5, 1.5),
                     gravity=-gravity * 0.5,
                     wind=wind * 0.5,
                     turbulence=turbulence * 3
@@ -374,31 +389,31 @@ class VisualEffectsEngine:
             
             elif particle_type == ParticleType.SMOKE:
                 particle = Particle(
-                    x=random.uniform(x_min, x_max),
+                    x=rand.uniform(x_min, x_max),
                     y=y_max,
-                    vx=random.uniform(-1, 1),
-                    vy=random.uniform(-3, -1),
-                    size=random.uniform(10, 20),
+                    vx=rand.uniform(-1, 1),
+                    vy=rand.uniform(-3, -1),
+                    size=rand.uniform(10, 20),
                     color=(100, 100, 100),
-                    alpha=random.uniform(0.2, 0.4),
-                    lifetime=random.uniform(3, 6),
+                    alpha=rand.uniform(0.2, 0.4),
+                    lifetime=rand.uniform(3, 6),
                     gravity=-gravity * 0.2,
                     wind=wind,
                     turbulence=turbulence * 2
                 )
             
             elif particle_type == ParticleType.SPARKS:
-                angle = random.uniform(0, 2 * math.pi)
-                speed = random.uniform(5, 15)
+                angle = rand.uniform(0, 2 * math.pi)
+                speed = rand.uniform(5, 15)
                 particle = Particle(
                     x=x_max // 2,
                     y=y_max // 2,
                     vx=math.cos(angle) * speed,
                     vy=math.sin(angle) * speed,
-                    size=random.uniform(1, 3),
-                    color=(255, random.randint(200, 255), 0),
+                    size=rand.uniform(1, 3),
+                    color=(255, rand.randint(200, 255), 0),
                     alpha=1.0,
-                    lifetime=random.uniform(0.5, 1.0),
+                    lifetime=rand.uniform(0.5, 1.0),
                     gravity=gravity,
                     wind=0,
                     turbulence=0
@@ -406,13 +421,13 @@ class VisualEffectsEngine:
             
             elif particle_type == ParticleType.STARS:
                 particle = Particle(
-                    x=random.uniform(x_min, x_max),
-                    y=random.uniform(y_min, y_max * 0.6),
+                    x=rand.uniform(x_min, x_max),
+                    y=rand.uniform(y_min, y_max * 0.6),
                     vx=0,
                     vy=0,
-                    size=random.uniform(1, 3),
+                    size=rand.uniform(1, 3),
                     color=(255, 255, 200),
-                    alpha=random.uniform(0.3, 1.0),
+                    alpha=rand.uniform(0.3, 1.0),
                     lifetime=float('inf'),
                     gravity=0,
                     wind=0,
@@ -423,9 +438,11 @@ class VisualEffectsEngine:
         
         return particles
     
-    def update_particles(self, particles: List[Particle], dt: float):
+    def update_particles(self, particles: List[Particle], dt: float,
+                         rng: Optional[random.Random] = None):
         """Update particle positions and properties."""
         
+        rand = rng or random
         for particle in particles[:]:
             # Update age
             particle.age += dt
@@ -441,8 +458,8 @@ class VisualEffectsEngine:
             
             # Apply turbulence
             if particle.turbulence > 0:
-                particle.vx += random.uniform(-particle.turbulence, particle.turbulence) * dt
-                particle.vy += random.uniform(-particle.turbulence, particle.turbulence) * dt
+                particle.vx += rand.uniform(-particle.turbulence, particle.turbulence) * dt
+                particle.vy += rand.uniform(-particle.turbulence, particle.turbulence) * dt
             
             # Update position
             particle.x += particle.vx * dt * 60  # 60 fps base
@@ -528,10 +545,12 @@ class VisualEffectsEngine:
         img: Image.Image,
         lights: List[Light],
         ambient: Tuple[int, int, int] = (20, 20, 30),
-        time: float = 0.0
+        time: float = 0.0,
+        rng: Optional[random.Random] = None
     ):
-        """Render lighting effects onto image."""
+        """Render lighting effects onto image, drawing flicker from `rng` if given."""
         
+        rand = rng or random
         # Create light map
         light_map = Image.new('RGB', img.size, ambient)
         light_pixels = light_map.load()
@@ -541,7 +560,7 @@ class VisualEffectsEngine:
             # Animate light intensity with flicker
             intensity = light.intensity
             if light.flicker > 0:
-                intensity *= (1 + light.flicker * math.sin(time * 10 + random.random()))
+                intensity *= (1 + light.flicker * math.sin(time * 10 + rand.random()))
             
             if light.type == LightType.POINT:
                 # Radial light falloff
@@ -582,7 +601,7 @@ class VisualEffectsEngine:
                 # Volumetric light rays
                 ray_count = 50
                 for ray in range(ray_count):
-                    angle = light.angle + random.uniform(-light.spread/2, light.spread/2)
+                    angle = light.angle + rand.uniform(-light.spread/2, light.spread/2)
                     
                     # Trace ray
                     for r in range(0, int(light.radius), 5):
@@ -627,9 +646,10 @@ class VisualEffectsEngine:
         img: Image.Image,
         fog_density: float = 0.0,
         fog_color: Tuple[int, int, int] = (150, 150, 160),
-        depth_layers: int = 3
+        depth_layers: int = 3,
+        rng: Optional[np.random.Generator] = None
     ) -> Image.Image:
-        """Apply atmospheric perspective and fog effects."""
+        """Apply atmospheric perspective and fog effects, drawing fog noise from `rng` if given."""
         
         if fog_density <= 0:
             return img
@@ -655,7 +675,7 @@ class VisualEffectsEngine:
         
         # Add noise to fog for realism
         fog_array = np.array(fog_layer)
-        noise_array = np.random.normal(0, 10, fog_array.shape[:2])
+        noise_array = (rng or np.random).normal(0, 10, fog_array.shape[:2])
         
         for i in range(3):
             fog_array[:, :, i] = np.clip(fog_array[:, :, i] + noise_array, 0, 255)
@@ -674,9 +694,10 @@ class VisualEffectsEngine:
         chromatic_aberration: float = 0.0,
         vignette_intensity: float = 0.5,
         grain_amount: float = 0.1,
-        color_grading: Optional[Dict[str, float]] = None
+        color_grading: Optional[Dict[str, float]] = None,
+        rng: Optional[np.random.Generator] = None
     ) -> Image.Image:
-        """Apply cinematic post-processing effects."""
+        """Apply cinematic post-processing effects, drawing film grain from `rng` if given."""
         
         # Bloom effect
         if bloom_intensity > 0:
@@ -721,7 +742,7 @@ class VisualEffectsEngine:
         # Film grain
         if grain_amount > 0:
             img_array = np.array(img)
-            grain = np.random.normal(0, grain_amount * 20, img_array.shape)
+            grain = (rng or np.random).normal(0, grain_amount * 20, img_array.shape)
             img_array = np.clip(img_array + grain, 0, 255).astype(np.uint8)
             img = Image.fromarray(img_array)
         
@@ -0,0 +1,263 @@
+"""
+Adaptive client-side rate limiting for provider APIs.
+
+Outgoing requests pass through two gates:
+
+- A concurrency window that keeps up to N requests in flight. N grows by
+  one per window of successful requests and halves on every 429
+  (additive increase, multiplicative decrease). Its ceiling is the
+  account's requests-per-minute limit from the headers below, unless a
+  fixed ceiling is configured, so the window can grow to whatever the
+  tier actually allows.
+- A token bucket that spaces request starts at the account's rate. The
+  rate and remaining budget come from the provider's rate limit
+  response headers (``x-ratelimit-limit-requests``,
+  ``x-ratelimit-remaining-requests``, ``x-ratelimit-reset-requests``), so
+  the limiter follows the account's real tier instead of a fixed guess.
+
+A 429 also pauses new requests until ``Retry-After`` (or the reset the
+headers announced), with exponential backoff when the provider gives
+neither. Limiters are shared per provider, like the HTTP pools, so what
+one client learns applies to every client in the process.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+
+# Window ceiling until the provider reports its limit, and the starting window
+DEFAULT_MAX_CONCURRENCY = 50
+DEFAULT_INITIAL_CONCURRENCY = 3
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in a header value such as "20ms", "1s", "6m0s" or "1.5"."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """Concurrency window plus header-fed token bucket for one provider."""
+
+    def __init__(self,
+                 max_concurrency: Optional[int] = None,
+                 min_concurrency: int = 1,
+                 initial_concurrency: Optional[int] = None,
+                 requests_per_minute: Optional[float] = None,
+                 base_backoff: float = 1.0,
+                 max_backoff: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize limiter.
+
+        Args:
+            max_concurrency: Fixed upper bound on requests in flight (None
+                follows ``x-ratelimit-limit-requests``, starting from
+                DEFAULT_MAX_CONCURRENCY)
+            min_concurrency: Lower bound the window shrinks to on 429s
+            initial_concurrency: Starting window (defaults to a fixed
+                max_concurrency, else DEFAULT_INITIAL_CONCURRENCY)
+            requests_per_minute: Starting rate, until headers report the real
+                one (None leaves request starts unpaced)
+            base_backoff: First pause after a 429 without Retry-After, in seconds
+            max_backoff: Longest pause after repeated 429s, in seconds
+            clock: Monotonic time source
+        """
+        self.fixed_ceiling = max_concurrency is not None
+        self.max_concurrency = max_concurrency if self.fixed_ceiling else DEFAULT_MAX_CONCURRENCY
+        self.min_concurrency = min(min_concurrency, self.max_concurrency)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+
+        if initial_concurrency is None:
+            initial_concurrency = (self.max_concurrency if self.fixed_ceiling
+                                   else DEFAULT_INITIAL_CONCURRENCY)
+        self.window = float(max(self.min_concurrency,
+                                min(initial_concurrency, self.max_concurrency)))
+        self.in_flight = 0
+        self.rate: Optional[float] = None  # requests per second
+        self.capacity = 1.0
+        self.tokens = 1.0
+        self._refilled_at = clock()
+        self.paused_until = 0.0
+        self._consecutive_limited = 0
+        if requests_per_minute:
+            self.set_rate(requests_per_minute)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._condition: Optional[asyncio.Condition] = None
+
+        self.requests = 0
+        self.rate_limited = 0
+
+    @property
+    def concurrency(self) -> int:
+        """Requests currently allowed in flight."""
+        return max(self.min_concurrency, int(self.window))
+
+    def set_rate(self, requests_per_minute: float):
+        """Pace request starts at the given rate, bursting up to the window."""
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(max(1, min(self.max_concurrency, int(requests_per_minute))))
+        self.tokens = min(self.tokens, self.capacity)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one request slot for the duration of the block."""
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < self.concurrency)
+            self.in_flight += 1
+        try:
+            await self._take_token()
+            self.requests += 1
+            yield
+        finally:
+            async with condition:
+                self.in_flight -= 1
+                condition.notify_all()
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Adopt the rate and remaining budget the provider reports."""
+        limit = _header_int(headers, 'x-ratelimit-limit-requests')
+        if limit and (self.rate is None or abs(limit / 60.0 - self.rate) > 1e-9):
+            if not self.fixed_ceiling:
+                # More requests in flight than the minute allows can never all start
+                self.max_concurrency = max(self.min_concurrency, limit)
+                self.window = min(self.window, float(self.max_concurrency))
+            self.set_rate(limit)
+
+        remaining = _header_int(headers, 'x-ratelimit-remaining-requests')
+        if remaining is not None:
+            self._refill()
+            self.tokens = min(self.tokens, float(remaining))
+            if remaining == 0:
+                reset = parse_duration(headers.get('x-ratelimit-reset-requests'))
+                if reset:
+                    self.paused_until = max(self.paused_until, self._clock() + reset)
+
+    def on_success(self):
+        """Widen the window by about one request per window of successes."""
+        self._consecutive_limited = 0
+        if self.window < self.max_concurrency:
+            # Waiters re-check the window when the caller's slot is released
+            self.window = min(float(self.max_concurrency), self.window + 1.0 / self.window)
+
+    def on_rate_limited(self, headers: Optional[Mapping[str, str]] = None) -> float:
+        """
+        Back off after a 429.
+
+        Returns:
+            Seconds until requests resume
+        """
+        headers = headers or {}
+        self.rate_limited += 1
+        self._consecutive_limited += 1
+        self.window = max(float(self.min_concurrency), self.window / 2)
+        self.tokens = 0.0
+        self._refilled_at = self._clock()
+
+        delay = (parse_duration(headers.get('retry-after'))
+                 or parse_duration(headers.get('x-ratelimit-reset-requests')))
+        if not delay:
+            delay = min(self.max_backoff, self.base_backoff * 2 ** (self._consecutive_limited - 1))
+        self.paused_until = max(self.paused_until, self._clock() + delay)
+
+        logger.warning(f"Rate limited; pausing {delay:.1f}s with {self.concurrency} "
+                       f"request(s) in flight allowed")
+        return delay
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            'concurrency': self.concurrency,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'requests_per_minute': self.rate * 60 if self.rate else None,
+            'requests': self.requests,
+            'rate_limited': self.rate_limited
+        }
+
+    def _get_condition(self) -> asyncio.Condition:
+        # asyncio primitives belong to one loop; Celery tasks run a new one per call
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._condition = asyncio.Condition()
+            self.in_flight = 0
+        return self._condition
+
+    def _refill(self):
+        now = self._clock()
+        if self.rate is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    async def _take_token(self):
+        while True:
+            now = self._clock()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            if self.rate is None:
+                return
+            self._refill()
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> AdaptiveRateLimiter:
+    """
+    Get the shared limiter for a provider, creating it on first use.
+
+    Settings come from ``<PROVIDER>_MAX_CONCURRENCY``,
+    ``<PROVIDER>_INITIAL_CONCURRENCY`` and ``<PROVIDER>_REQUESTS_PER_MINUTE``,
+    e.g. ``OPENAI_IMAGES_MAX_CONCURRENCY=5``. Without a max concurrency the
+    ceiling follows the limit the provider reports.
+    """
+    with _registry_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            prefix = provider.upper()
+            ceiling = os.getenv(f'{prefix}_MAX_CONCURRENCY')
+            initial = os.getenv(f'{prefix}_INITIAL_CONCURRENCY')
+            rpm = os.getenv(f'{prefix}_REQUESTS_PER_MINUTE')
+            limiter = AdaptiveRateLimiter(
+                max_concurrency=int(ceiling) if ceiling else None,
+                initial_concurrency=int(initial) if initial else None,
+                requests_per_minute=float(rpm) if rpm else None
+            )
+            _limiters[provider] = limiter
+        return limiter
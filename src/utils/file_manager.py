@@ -8,10 +8,12 @@ import os
 import shutil
 import asyncio
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import AsyncIterable, Dict, List, Any, Optional, Union
 
 import structlog
 
+from .streaming_download import DownloadResult, write_chunks_atomic, write_stream_atomic
+
 logger = structlog.get_logger()
 
 
@@ -96,7 +98,10 @@ class FileManager:
     
     async def save_video_file(self, filename: str, video_data: bytes) -> str:
         """
-        Save video file to video directory.
+        Save in-memory video data (placeholders) to video directory.
+        
+        Downloads should use save_video_stream instead, so the clip is never
+        held in memory and its checksums come for free.
         
         Args:
             filename: Name of video file
@@ -110,18 +115,17 @@ class FileManager:
             safe_filename = self._sanitize_filename(filename)
             file_path = self.video_dir / safe_filename
             
-            # Write file
-            with open(file_path, 'wb') as f:
-                f.write(video_data)
+            # Write file atomically, through the same path as streamed videos
+            result = write_chunks_atomic([video_data], file_path)
             
             logger.debug(
                 "Video file saved",
                 filename=safe_filename,
-                size_bytes=len(video_data),
-                path=str(file_path)
+                size_bytes=result.size,
+                path=result.path
             )
             
-            return str(file_path)
+            return result.path
             
         except Exception as e:
             logger.error(
@@ -131,6 +135,45 @@ class FileManager:
             )
             raise
     
+    async def save_video_stream(self, filename: str,
+                                chunks: AsyncIterable[bytes]) -> DownloadResult:
+        """
+        Stream video chunks to the video directory.
+        
+        Chunks are written to a temporary file, fsynced and atomically renamed,
+        with checksums computed along the way so the full clip is never held
+        in memory or re-read for integrity checks.
+        
+        Args:
+            filename: Name of video file
+            chunks: Async iterable of video data chunks
+            
+        Returns:
+            DownloadResult with final path, size and checksums
+        """
+        try:
+            safe_filename = self._sanitize_filename(filename)
+            file_path = self.video_dir / safe_filename
+            
+            result = await write_stream_atomic(chunks, file_path)
+            
+            logger.debug(
+                "Video stream saved",
+                filename=safe_filename,
+                size_bytes=result.size,
+                path=result.path
+            )
+            
+            return result
+            
+        except Exception as e:
+            logger.error(
+                "Failed to save video stream",
+                filename=filename,
+                error=str(e)
+            )
+            raise
+    
     async def save_video_file_from_temp(self, filename: str, temp_path: str) -> str:
         """
         Move video file from temporary location to video directory.
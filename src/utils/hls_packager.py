@@ -0,0 +1,455 @@
+"""
+On-the-fly HLS packaging for scene and project playback.
+
+Scene videos are cut into fragmented MP4 (CMAF) segments on first request
+with ffmpeg's HLS muxer using stream copy, so packaging costs roughly one
+read of the file. A project plays as one virtual timeline: its media
+playlist lists every scene's segments in order, separated by
+discontinuities, without concatenating any files.
+
+Lower-bitrate renditions are listed in the master playlist but transcoded
+only when one of their segments is first requested. Keyframes are forced
+at the source segment boundaries, so every rendition shares the source's
+segment timeline and playlists can be written before transcoding.
+
+Packaged output lives in a disk LRU bounded by total size. Package ids
+hash the source path, size, mtime and rendition, so segment URLs are
+immutable and a re-rendered scene gets a new package. The source and
+rendition behind each id are recorded on disk next to the packages, so any
+API worker (or one started later) can serve or package a segment that
+another worker put in a playlist.
+"""
+
+import os
+import json
+import math
+import shutil
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate packaged output after changing the ffmpeg settings
+PACKAGER_VERSION = 1
+
+SEGMENT_DURATION = float(os.getenv('HLS_SEGMENT_DURATION', '4'))
+DEFAULT_CACHE_DIR = os.getenv('HLS_CACHE_DIR', '/app/output/cache/hls')
+DEFAULT_CACHE_MAX_BYTES = int(os.getenv('HLS_CACHE_MAX_BYTES', str(2 * 1024 ** 3)))
+
+PLAYLIST_NAME = 'index.m3u8'
+INIT_NAME = 'init.mp4'
+SOURCES_DIR = '.sources'  # package id -> source and rendition, one JSON file each
+
+
+class PackagingError(Exception):
+    """Raised when ffmpeg fails to package a source."""
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """Output variant; a rendition without a height is the stream-copied source."""
+    name: str
+    height: Optional[int] = None
+    video_bitrate: Optional[str] = None
+    audio_bitrate: str = '128k'
+    bandwidth: int = 0
+
+
+RENDITIONS: Dict[str, Rendition] = {
+    'source': Rendition('source'),
+    '720p': Rendition('720p', 720, '2500k', bandwidth=2_700_000),
+    '480p': Rendition('480p', 480, '1000k', bandwidth=1_150_000),
+}
+
+
+@dataclass
+class Package:
+    """Segments of one source in one rendition."""
+    package_id: str
+    segments: List[Tuple[str, float]]  # (file name, duration)
+    bandwidth: int = 0
+    packaged: bool = True
+
+    @property
+    def duration(self) -> float:
+        return sum(duration for _, duration in self.segments)
+
+    @property
+    def boundaries(self) -> List[float]:
+        """Start time of every segment after the first."""
+        times, elapsed = [], 0.0
+        for _, duration in self.segments[:-1]:
+            elapsed += duration
+            times.append(round(elapsed, 3))
+        return times
+
+
+def package_id(source: str, rendition: str) -> str:
+    """Content-addressed id for a source file in a rendition."""
+    stat = os.stat(source)
+    payload = f"{PACKAGER_VERSION}:{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}:{rendition}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+
+def parse_media_playlist(text: str) -> List[Tuple[str, float]]:
+    """Segment URIs and durations from an HLS media playlist."""
+    segments = []
+    duration = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('#EXTINF:'):
+            duration = float(line[len('#EXTINF:'):].split(',')[0])
+        elif line and not line.startswith('#') and duration is not None:
+            segments.append((line, duration))
+            duration = None
+    return segments
+
+
+def media_playlist(parts: List[Tuple[Package, str]]) -> str:
+    """
+    Build a VOD media playlist.
+
+    Args:
+        parts: (package, segment URL prefix) in timeline order; consecutive
+            packages are joined with discontinuities
+
+    Returns:
+        Playlist text
+    """
+    segments = [duration for package, _ in parts for _, duration in package.segments]
+    target = max(1, math.ceil(max(segments, default=1)))
+
+    lines = [
+        '#EXTM3U',
+        '#EXT-X-VERSION:7',
+        f'#EXT-X-TARGETDURATION:{target}',
+        '#EXT-X-MEDIA-SEQUENCE:0',
+        '#EXT-X-PLAYLIST-TYPE:VOD',
+        '#EXT-X-INDEPENDENT-SEGMENTS',
+    ]
+    for index, (package, prefix) in enumerate(parts):
+        if index:
+            lines.append('#EXT-X-DISCONTINUITY')
+        lines.append(f'#EXT-X-MAP:URI="{prefix}/{INIT_NAME}"')
+        for name, duration in package.segments:
+            lines.append(f'#EXTINF:{duration:.3f},')
+            lines.append(f'{prefix}/{name}')
+    lines.append('#EXT-X-ENDLIST')
+    return '\n'.join(lines) + '\n'
+
+
+def master_playlist(variants: List[Tuple[str, int]]) -> str:
+    """Build a master playlist from (media playlist URL, bandwidth) pairs."""
+    lines = ['#EXTM3U', '#EXT-X-VERSION:7', '#EXT-X-INDEPENDENT-SEGMENTS']
+    for url, bandwidth in variants:
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={max(bandwidth, 1)}')
+        lines.append(url)
+    return '\n'.join(lines) + '\n'
+
+
+async def _run_ffmpeg(cmd: List[str]) -> bool:
+    """Run an ffmpeg command, returning True on success."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        logger.error("ffmpeg not found; cannot package video")
+        return False
+
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        logger.error(f"ffmpeg packaging failed: {stderr.decode(errors='replace')[-500:]}")
+        return False
+    return True
+
+
+class SegmentCache:
+    """
+    Disk LRU of packaged sources, bounded by total size.
+
+    Each entry is a directory holding a playlist, an init segment and the
+    media segments of one package.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes or DEFAULT_CACHE_MAX_BYTES
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load()
+
+    def _load(self):
+        """Adopt packages left by a previous process, oldest first."""
+        if not self.root.exists():
+            return
+        found = []
+        for directory in self.root.iterdir():
+            playlist = directory / PLAYLIST_NAME
+            if directory.is_dir() and not directory.name.startswith('.') and playlist.exists():
+                size = sum(f.stat().st_size for f in directory.iterdir())
+                found.append((playlist.stat().st_mtime, directory.name, size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._entries.values())
+
+    def directory(self, package_id: str) -> Path:
+        return self.root / package_id
+
+    def get(self, package_id: str) -> Optional[Path]:
+        """Directory of a cached package, marking it recently used."""
+        directory = self.directory(package_id)
+        if (directory / PLAYLIST_NAME).exists():
+            if package_id not in self._entries:
+                # Packaged by another process sharing the cache directory
+                self._entries[package_id] = sum(f.stat().st_size for f in directory.iterdir())
+            self._entries.move_to_end(package_id)
+            self.hits += 1
+            return directory
+        self._entries.pop(package_id, None)
+        self.misses += 1
+        return None
+
+    def put(self, package_id: str, size: int):
+        """Add a package and evict least recently used ones over the limit."""
+        self._entries[package_id] = size
+        self._entries.move_to_end(package_id)
+
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            evicted, _ = self._entries.popitem(last=False)
+            shutil.rmtree(self.directory(evicted), ignore_errors=True)
+            self.evictions += 1
+            logger.debug(f"Evicted HLS package {evicted}")
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'packages': len(self._entries),
+            'total_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class HLSPackager:
+    """Packages sources on demand and builds scene and project playlists."""
+
+    def __init__(self,
+                 cache: Optional[SegmentCache] = None,
+                 segment_duration: float = SEGMENT_DURATION,
+                 max_concurrent: int = 4):
+        """
+        Initialize packager.
+
+        Args:
+            cache: Segment cache
+            segment_duration: Target segment length in seconds
+            max_concurrent: Maximum concurrent ffmpeg processes
+        """
+        self.cache = cache or SegmentCache()
+        self.segment_duration = segment_duration
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._locks: Dict[str, asyncio.Lock] = {}  # package ids being packaged
+
+    async def plan(self, source: str, rendition: str = 'source') -> Package:
+        """
+        Get a package for playlist building.
+
+        The source rendition is packaged immediately (stream copy). Other
+        renditions reuse its segment timeline and are transcoded when a
+        segment is first requested.
+        """
+        if rendition not in RENDITIONS:
+            raise KeyError(rendition)
+
+        source_package = await self._ensure(self._register(source, 'source'))
+        if rendition == 'source':
+            return source_package
+
+        pid = self._register(source, rendition)
+        directory = self.cache.get(pid)
+        if directory:
+            return self._load_package(pid, directory, RENDITIONS[rendition])
+        return Package(pid, list(source_package.segments),
+                       bandwidth=RENDITIONS[rendition].bandwidth, packaged=False)
+
+    async def segment_path(self, pid: str, name: str) -> Optional[Path]:
+        """
+        Path of a segment or init file, packaging its source if needed.
+
+        Returns:
+            Path, or None for unknown packages or files
+        """
+        if '/' in name or name.startswith('.'):
+            return None
+
+        directory = self.cache.get(pid)
+        if not directory:
+            if self._source(pid) is None:
+                return None
+            await self._ensure(pid)
+            directory = self.cache.directory(pid)
+
+        path = directory / name
+        return path if path.is_file() else None
+
+    def _source_record(self, pid: str) -> Path:
+        return self.cache.root / SOURCES_DIR / f"{pid}.json"
+
+    def _register(self, source: str, rendition: str) -> str:
+        """Package id of a source, recording what it packages for other processes."""
+        pid = package_id(source, rendition)
+        record = self._source_record(pid)
+        if not record.exists():
+            record.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = record.with_name(f".{record.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({'source': source, 'rendition': rendition}))
+            os.replace(tmp_path, record)
+        return pid
+
+    def _source(self, pid: str) -> Optional[Tuple[str, str]]:
+        """(source, rendition) a package id was registered for, if still current."""
+        record = self._source_record(pid)
+        try:
+            entry = json.loads(record.read_text())
+            source, rendition = entry['source'], entry['rendition']
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            if rendition in RENDITIONS and package_id(source, rendition) == pid:
+                return source, rendition
+        except OSError:
+            pass
+        # The source was edited or removed; its old segments can't be rebuilt
+        record.unlink(missing_ok=True)
+        return None
+
+    async def _ensure(self, pid: str) -> Package:
+        """Load a package from the cache, packaging it once if missing."""
+        registered = self._source(pid)
+        if registered is None:
+            raise PackagingError(f"Unknown package {pid}")
+        source, rendition_name = registered
+        rendition = RENDITIONS[rendition_name]
+
+        directory = self.cache.get(pid)
+        if directory:
+            return self._load_package(pid, directory, rendition)
+
+        # Concurrent requests for the same package wait for one ffmpeg run;
+        # once it is cached, later requests never reach the lock
+        lock = self._locks.setdefault(pid, asyncio.Lock())
+        async with lock:
+            try:
+                directory = self.cache.get(pid)
+                if not directory:
+                    directory = await self._package(pid, source, rendition)
+            finally:
+                if self._locks.get(pid) is lock:
+                    del self._locks[pid]
+        return self._load_package(pid, directory, rendition)
+
+    async def _package(self, pid: str, source: str, rendition: Rendition) -> Path:
+        keyframes = None
+        if rendition.height:
+            keyframes = (await self._ensure(self._register(source, 'source'))).boundaries
+
+        tmp_dir = self.cache.root / f".{pid}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        cmd = self._package_command(source, tmp_dir, rendition, keyframes)
+        async with self._semaphore:
+            logger.info(f"Packaging {source} ({rendition.name}) as {pid}")
+            ok = await _run_ffmpeg(cmd)
+
+        if not ok or not (tmp_dir / PLAYLIST_NAME).exists():
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise PackagingError(f"Could not package {source} ({rendition.name})")
+
+        directory = self.cache.directory(pid)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_dir, directory)
+
+        self.cache.put(pid, sum(f.stat().st_size for f in directory.iterdir()))
+        return directory
+
+    def _package_command(self,
+                         source: str,
+                         output_dir: Path,
+                         rendition: Rendition,
+                         keyframes: Optional[List[float]]) -> List[str]:
+        cmd = ['ffmpeg', '-y', '-v', 'error', '-i', source]
+
+        if rendition.height is None:
+            cmd += ['-c', 'copy']
+        else:
+            cmd += [
+                '-vf', f'scale=-2:{rendition.height}',
+                '-c:v', 'libx264', '-preset', 'veryfast',
+                '-b:v', rendition.video_bitrate, '-maxrate', rendition.video_bitrate,
+                # Keyframes only at the source boundaries so segments line up
+                '-g', '100000', '-sc_threshold', '0',
+                '-c:a', 'aac', '-b:a', rendition.audio_bitrate,
+            ]
+            if keyframes:
+                cmd += ['-force_key_frames', ','.join(f'{t:.3f}' for t in keyframes)]
+
+        cmd += [
+            '-f', 'hls',
+            '-hls_time', str(self.segment_duration),
+            '-hls_playlist_type', 'vod',
+            '-hls_segment_type', 'fmp4',
+            '-hls_fmp4_init_filename', INIT_NAME,
+            '-hls_segment_filename', str(output_dir / 'seg_%05d.m4s'),
+            '-hls_flags', 'independent_segments',
+            str(output_dir / PLAYLIST_NAME),
+        ]
+        return cmd
+
+    def _load_package(self, pid: str, directory: Path, rendition: Rendition) -> Package:
+        segments = parse_media_playlist((directory / PLAYLIST_NAME).read_text())
+
+        bandwidth = rendition.bandwidth
+        if not bandwidth:
+            # Peak segment bitrate, as HLS BANDWIDTH requires
+            for name, duration in segments:
+                if duration > 0:
+                    size = (directory / name).stat().st_size
+                    bandwidth = max(bandwidth, int(size * 8 / duration))
+
+        return Package(pid, segments, bandwidth=bandwidth)
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            'segment_duration': self.segment_duration,
+            'renditions': list(RENDITIONS),
+            'cache': self.cache.get_stats(),
+        }
+
+
+# Global instance
+_hls_packager: Optional[HLSPackager] = None
+
+
+def get_hls_packager() -> HLSPackager:
+    """Get global HLS packager instance."""
+    global _hls_packager
+
+    if _hls_packager is None:
+        _hls_packager = HLSPackager()
+
+    return _hls_packager
@@ -0,0 +1,357 @@
+"""
+Shared HTTP Connection Pools for External Providers
+
+Provides one pooled HTTP client per provider (Runway, OpenAI, ElevenLabs) so
+that every client instance reuses the same keep-alive connections instead of
+opening a fresh session per call.
+
+Features:
+- One aiohttp session per provider and event loop with keep-alive
+- DNS caching and configurable total/per-host connection limits
+- Streaming downloads to disk with atomic rename
+- Matching pooled requests.Session for synchronous callers (Celery tasks)
+
+Limits are read from ``<PROVIDER>_HTTP_*`` environment variables, e.g.
+``RUNWAY_HTTP_LIMIT_PER_HOST=4``. aiohttp speaks HTTP/1.1 only, so HTTP/2 is
+not negotiated; connection reuse is provided through keep-alive pooling.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Optional, Tuple, Union
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolConfig:
+    """Connection pool settings for a single provider."""
+    limit: int = 100                 # Total connections across all hosts
+    limit_per_host: int = 10         # Concurrent connections per host
+    dns_cache_ttl: int = 300         # Seconds to cache DNS lookups
+    keepalive_timeout: float = 30.0  # Seconds to keep idle connections open
+    connect_timeout: float = 10.0
+    read_timeout: float = 60.0
+    total_timeout: Optional[float] = None
+    chunk_size: int = 1024 * 1024    # Streaming download chunk size
+    max_retries: int = 3             # Sync session retries on 429/5xx
+
+    @classmethod
+    def from_env(cls, provider: str, base: Optional['PoolConfig'] = None) -> 'PoolConfig':
+        """
+        Build a config for a provider, overriding defaults from environment.
+
+        Args:
+            provider: Provider name (used as the env var prefix)
+            base: Defaults to start from
+
+        Returns:
+            Provider pool configuration
+        """
+        config = base or cls()
+        prefix = f"{provider.upper()}_HTTP_"
+        overrides: Dict[str, Any] = {}
+
+        for field_name, caster in (
+            ('limit', int),
+            ('limit_per_host', int),
+            ('dns_cache_ttl', int),
+            ('keepalive_timeout', float),
+            ('connect_timeout', float),
+            ('read_timeout', float),
+            ('total_timeout', float),
+            ('chunk_size', int),
+            ('max_retries', int),
+        ):
+            value = os.getenv(prefix + field_name.upper())
+            if value is None or value == '':
+                continue
+            try:
+                overrides[field_name] = caster(value)
+            except ValueError:
+                logger.warning(f"Ignoring invalid {prefix}{field_name.upper()}={value!r}")
+
+        return replace(config, **overrides) if overrides else config
+
+
+# Provider defaults tuned to each API's concurrency allowance
+PROVIDER_DEFAULTS: Dict[str, PoolConfig] = {
+    'runway': PoolConfig(limit_per_host=8, read_timeout=120.0),
+    'openai': PoolConfig(limit_per_host=10, read_timeout=90.0),
+    'elevenlabs': PoolConfig(limit_per_host=5, read_timeout=60.0),
+}
+
+
+class AsyncHTTPPool:
+    """
+    Pooled aiohttp client for a single provider.
+
+    aiohttp sessions are bound to the event loop they were created on, so one
+    session is kept per running loop. Long-lived API processes therefore share a
+    single session, while Celery tasks that call ``asyncio.run`` get a fresh
+    one that is reused for the lifetime of that loop.
+
+    A session holds a strong reference to its loop, so entries cannot simply
+    be dropped when the loop is garbage collected. Instead each session is
+    tied to a parked async generator: ``asyncio.run`` finalizes live async
+    generators while shutting its loop down, which closes the session and
+    removes the entry.
+    """
+
+    def __init__(self, provider: str, config: Optional[PoolConfig] = None):
+        """
+        Initialize provider pool.
+
+        Args:
+            provider: Provider name, used for logging and env configuration
+            config: Pool settings (defaults to provider defaults + env)
+        """
+        self.provider = provider
+        self.config = config or PoolConfig.from_env(
+            provider, PROVIDER_DEFAULTS.get(provider)
+        )
+        # loop -> (session, parked generator that closes it at loop shutdown)
+        self._sessions: Dict[asyncio.AbstractEventLoop,
+                             Tuple[aiohttp.ClientSession, AsyncGenerator[None, None]]] = {}
+
+        # Pool statistics
+        self.requests_made = 0
+        self.sessions_created = 0
+        self.bytes_downloaded = 0
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a new pooled session for the running loop."""
+        connector = aiohttp.TCPConnector(
+            limit=self.config.limit,
+            limit_per_host=self.config.limit_per_host,
+            ttl_dns_cache=self.config.dns_cache_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.config.keepalive_timeout,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.config.total_timeout,
+            sock_connect=self.config.connect_timeout,
+            sock_read=self.config.read_timeout,
+        )
+        self.sessions_created += 1
+        logger.debug(f"Created HTTP session for provider {self.provider}")
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the pooled session for the running event loop.
+
+        Returns:
+            Shared aiohttp session
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._sessions.get(loop)
+        if entry is not None and not entry[0].closed:
+            return entry[0]
+
+        self._forget_closed_loops()
+        session = self._create_session()
+        closer = self._close_at_shutdown(loop, session)
+        # Starting the generator registers it with the loop
+        await closer.__anext__()
+        self._sessions[loop] = (session, closer)
+        return session
+
+    async def _close_at_shutdown(self, loop: asyncio.AbstractEventLoop,
+                                 session: aiohttp.ClientSession) -> AsyncGenerator[None, None]:
+        """Wait for the loop's async generator shutdown, then close the session."""
+        try:
+            yield
+        finally:
+            entry = self._sessions.get(loop)
+            if entry is not None and entry[0] is session:
+                del self._sessions[loop]
+            if not session.closed:
+                await session.close()
+
+    def _forget_closed_loops(self):
+        """Drop sessions of loops that were closed without finalizing them."""
+        for loop in [loop for loop in self._sessions if loop.is_closed()]:
+            logger.warning(f"Dropping {self.provider} HTTP session of a closed event loop")
+            del self._sessions[loop]
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Issue a request on the pooled session.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed through to ``aiohttp.ClientSession.request``
+
+        Yields:
+            The response; the connection returns to the pool on exit
+        """
+        session = await self.get_session()
+        self.requests_made += 1
+        async with session.request(method, url, **kwargs) as response:
+            yield response
+
+    async def download(self, url: str, dest_path: Union[str, Path],
+                       headers: Optional[Dict[str, str]] = None,
+                       chunk_size: Optional[int] = None) -> int:
+        """
+        Stream a response body to disk without buffering it in memory.
+
+        Data is written to ``<dest>.part`` and renamed into place only after
+        the full body has been received.
+
+        Args:
+            url: URL to download
+            dest_path: Final file path
+            headers: Optional request headers
+            chunk_size: Read chunk size (defaults to pool config)
+
+        Returns:
+            Number of bytes written
+
+        Raises:
+            aiohttp.ClientResponseError: If the server returns a non-2xx status
+        """
+        dest = Path(dest_path)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        part_path = dest.with_name(dest.name + '.part')
+        chunk_size = chunk_size or self.config.chunk_size
+        written = 0
+
+        try:
+            async with self.request('GET', url, headers=headers) as response:
+                response.raise_for_status()
+                with open(part_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        f.write(chunk)
+                        written += len(chunk)
+            os.replace(part_path, dest)
+        except BaseException:
+            try:
+                part_path.unlink()
+            except FileNotFoundError:
+                pass
+            raise
+
+        self.bytes_downloaded += written
+        logger.info(f"Downloaded {written} bytes from {self.provider} to {dest}")
+        return written
+
+    async def close(self):
+        """Close the session bound to the running event loop."""
+        entry = self._sessions.get(asyncio.get_running_loop())
+        if entry is not None:
+            await entry[1].aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics.
+
+        Returns:
+            Statistics dictionary
+        """
+        return {
+            'provider': self.provider,
+            'requests_made': self.requests_made,
+            'sessions_created': self.sessions_created,
+            'open_sessions': sum(1 for s, _ in list(self._sessions.values()) if not s.closed),
+            'bytes_downloaded': self.bytes_downloaded,
+            'limit': self.config.limit,
+            'limit_per_host': self.config.limit_per_host,
+        }
+
+
+_async_pools: Dict[str, AsyncHTTPPool] = {}
+_sync_sessions: Dict[str, requests.Session] = {}
+_registry_lock = threading.Lock()
+
+
+def get_http_pool(provider: str, config: Optional[PoolConfig] = None) -> AsyncHTTPPool:
+    """
+    Get the shared async pool for a provider, creating it on first use.
+
+    Args:
+        provider: Provider name ('runway', 'openai', 'elevenlabs', ...)
+        config: Settings used only when the pool is first created
+
+    Returns:
+        Shared AsyncHTTPPool instance
+    """
+    with _registry_lock:
+        pool = _async_pools.get(provider)
+        if pool is None:
+            pool = AsyncHTTPPool(provider, config)
+            _async_pools[provider] = pool
+        return pool
+
+
+def get_sync_session(provider: str, config: Optional[PoolConfig] = None) -> requests.Session:
+    """
+    Get the shared requests session for a provider.
+
+    The session mounts a pooled adapter sized from the provider config and
+    retries 429/5xx responses with exponential backoff. Credentials must be
+    passed per request since the session is shared between client instances.
+
+    Args:
+        provider: Provider name
+        config: Settings used only when the session is first created
+
+    Returns:
+        Shared requests.Session instance
+    """
+    with _registry_lock:
+        session = _sync_sessions.get(provider)
+        if session is None:
+            config = config or PoolConfig.from_env(provider, PROVIDER_DEFAULTS.get(provider))
+            retry_strategy = Retry(
+                total=config.max_retries,
+                backoff_factor=1,
+                status_forcelist=[429, 500, 502, 503, 504],
+            )
+            adapter = HTTPAdapter(
+                pool_connections=max(1, config.limit // max(1, config.limit_per_host)),
+                pool_maxsize=config.limit_per_host,
+                max_retries=retry_strategy,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sync_sessions[provider] = session
+        return session
+
+
+async def close_http_pools():
+    """Close all async sessions bound to the running loop and all sync sessions."""
+    with _registry_lock:
+        pools = list(_async_pools.values())
+        sessions = list(_sync_sessions.values())
+        _sync_sessions.clear()
+
+    for pool in pools:
+        await pool.close()
+    for session in sessions:
+        session.close()
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get statistics for all provider pools.
+
+    Returns:
+        Mapping of provider name to pool statistics
+    """
+    with _registry_lock:
+        return {name: pool.get_stats() for name, pool in _async_pools.items()}
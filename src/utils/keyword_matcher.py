@@ -0,0 +1,147 @@
+"""
+Multi-pattern keyword matching with an Aho-Corasick automaton.
+
+A KeywordMatcher is built once per vocabulary and finds every occurrence of
+every keyword in a single left-to-right pass over the text, so the cost of
+a scan depends on the length of the text and not on how many keywords are
+being looked for. Matching is case-insensitive by default and can be
+restricted to whole words.
+"""
+
+from collections import Counter, deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple
+
+
+class KeywordMatch(NamedTuple):
+    """One keyword occurrence; offsets index the (case-folded) text."""
+    keyword: str
+    start: int
+    end: int
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed keyword vocabulary.
+
+    Usage:
+        matcher = KeywordMatcher(['dark', 'empty', 'abandoned'])
+        matcher.present("An abandoned, dark street")  # {'abandoned', 'dark'}
+    """
+
+    def __init__(self, keywords: Iterable[str], case_sensitive: bool = False,
+                 whole_words: bool = False):
+        self.case_sensitive = case_sensitive
+        self.whole_words = whole_words
+        # Keywords are reported as given, each once
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(
+            keyword for keyword in keywords if keyword
+        ))
+
+        goto: List[Dict[str, int]] = [{}]
+        own_output: List[List[Tuple[str, int]]] = [[]]
+        for keyword in self.keywords:
+            state = 0
+            for char in self._fold(keyword):
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    own_output.append([])
+                state = next_state
+            own_output[state].append((keyword, len(self._fold(keyword))))
+
+        self._build_transitions(goto, own_output)
+
+    def _fold(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def _build_transitions(self, goto: List[Dict[str, int]],
+                           own_output: List[List[Tuple[str, int]]]):
+        """
+        Resolve failure links into a full transition table.
+
+        States are visited breadth-first, so each state's failure target is
+        complete before the state copies its transitions. Scanning then takes
+        exactly one dictionary lookup per character, with characters outside
+        the vocabulary's alphabet falling back to the root.
+        """
+        fail = [0] * len(goto)
+        self._delta: List[Dict[str, int]] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        self._output: List[Tuple[Tuple[str, int], ...]] = [()] * len(goto)
+
+        queue = deque(goto[0].values())
+        for state in queue:
+            self._output[state] = tuple(own_output[state])
+        while queue:
+            state = queue.popleft()
+            if self._delta[state] is None:
+                self._delta[state] = {**self._delta[fail[state]], **goto[state]}
+            for char, child in goto[state].items():
+                fail[child] = self._delta[fail[state]].get(char, 0)
+                # A state also reports every keyword that ends its suffix
+                self._output[child] = tuple(own_output[child]) + self._output[fail[child]]
+                queue.append(child)
+
+    def iter_matches(self, text: str) -> Iterator[KeywordMatch]:
+        """Yield every (possibly overlapping) occurrence, ordered by end offset."""
+        folded = self._fold(text)
+        delta, output = self._delta, self._output
+        state = 0
+        for index, char in enumerate(folded):
+            state = delta[state].get(char, 0)
+            if output[state]:
+                for keyword, length in output[state]:
+                    start = index + 1 - length
+                    if self.whole_words and not self._at_word_boundary(folded, start, index + 1):
+                        continue
+                    yield KeywordMatch(keyword, start, index + 1)
+
+    @staticmethod
+    def _at_word_boundary(text: str, start: int, end: int) -> bool:
+        before = text[start - 1] if start > 0 else ''
+        after = text[end] if end < len(text) else ''
+        return not _is_word_char(before) and not _is_word_char(after)
+
+    def present(self, text: str) -> Set[str]:
+        """Keywords occurring at least once in text."""
+        if self.whole_words:
+            return {match.keyword for match in self.iter_matches(text)}
+
+        # Offsets are not needed here, so skip building match tuples
+        delta, output = self._delta, self._output
+        found = set()
+        state = 0
+        for char in self._fold(text):
+            state = delta[state].get(char, 0)
+            if output[state]:
+                for keyword, _ in output[state]:
+                    found.add(keyword)
+        return found
+
+    def counts(self, text: str) -> Counter:
+        """
+        Non-overlapping occurrence count per keyword.
+
+        Each keyword is counted the way str.count counts it on its own, so
+        'aaaa' holds two 'aa' even though the automaton sees three.
+        """
+        counts = Counter()
+        next_free: Dict[str, int] = {}
+        for match in self.iter_matches(text):
+            if match.start >= next_free.get(match.keyword, 0):
+                counts[match.keyword] += 1
+                next_free[match.keyword] = match.end
+        return counts
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+
+def _is_word_char(char: str) -> bool:
+    return bool(char) and (char.isalnum() or char == '_')
+
+
+def groups_present(groups: Dict[str, Iterable[str]], found: Set[str]) -> List[str]:
+    """Group names, in definition order, with at least one keyword in found."""
+    return [name for name, keywords in groups.items() if any(keyword in found for keyword in keywords)]
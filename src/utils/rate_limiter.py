@@ -0,0 +1,176 @@
+"""
+GCRA rate limiting shared across processes through Redis.
+
+The generic cell rate algorithm is a token bucket that stores a single
+number per key, the theoretical arrival time (TAT) of the next request.
+Requests refill continuously, so there is no window edge at which a
+client can spend two budgets back to back. The check-and-update is one
+Lua script, making each decision a single atomic round trip that every
+API worker shares.
+
+While Redis is unreachable the same algorithm runs against a bounded
+in-process LRU whose entries expire once their bucket is full again.
+"""
+
+import math
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]: bucket key
+# ARGV[1]: emission interval in microseconds, ARGV[2]: burst tolerance in microseconds
+# Returns {allowed, remaining, retry_after_us, reset_after_us}
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+local allow_at = new_tat - tolerance
+if now < allow_at then
+    return {0, 0, allow_at - now, tat - now}
+end
+
+redis.call('SET', KEYS[1], string.format('%.0f', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+return {1, math.floor((tolerance - (new_tat - now)) / interval), 0, new_tat - now}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Sustained rate of `limit` requests per `period` seconds, allowing `burst` at once."""
+    limit: int
+    period: float = 60.0
+    burst: Optional[int] = None
+
+    @property
+    def capacity(self) -> int:
+        return max(1, self.burst if self.burst is not None else self.limit)
+
+    @property
+    def emission_interval(self) -> float:
+        return self.period / self.limit
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Outcome of one rate limit check."""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds until a request would be allowed (0 if allowed)
+    reset_after: float  # seconds until the bucket is full again
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class GCRARateLimiter:
+    """Token-bucket limiter backed by Redis, with a local fallback."""
+
+    def __init__(self,
+                 redis_url: Optional[str] = None,
+                 redis_client: Optional[aioredis.Redis] = None,
+                 key_prefix: str = "rate_limit",
+                 local_max_keys: int = 10000,
+                 redis_timeout: float = 0.05,
+                 redis_retry_interval: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize limiter.
+
+        Args:
+            redis_url: Redis connection URL, or None for local-only limiting
+            redis_client: Existing client to use instead of connecting
+            key_prefix: Prefix for bucket keys
+            local_max_keys: Buckets kept in memory while Redis is unavailable
+            redis_timeout: Socket timeout for limiter calls, in seconds
+            redis_retry_interval: Seconds to stay local after a Redis failure
+            clock: Monotonic time source for the local fallback
+        """
+        if redis_client is None and redis_url:
+            redis_client = aioredis.from_url(
+                redis_url,
+                socket_timeout=redis_timeout,
+                socket_connect_timeout=redis_timeout
+            )
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self.redis_retry_interval = redis_retry_interval
+        self._clock = clock
+        self._script = redis_client.register_script(GCRA_SCRIPT) if redis_client is not None else None
+        self._redis_down_until = 0.0
+        self._local = TTLCache(maxsize=local_max_keys, ttl=1.0, clock=clock)
+
+        self.redis_failures = 0
+        self.local_decisions = 0
+
+    @property
+    def using_redis(self) -> bool:
+        return self._script is not None and self._clock() >= self._redis_down_until
+
+    async def hit(self, key: str, limit: RateLimit) -> RateLimitDecision:
+        """Count one request against a bucket and decide whether it may proceed."""
+        bucket = f"{self.key_prefix}:{key}"
+        if self.using_redis:
+            try:
+                allowed, remaining, retry_after_us, reset_after_us = await self._script(
+                    keys=[bucket],
+                    args=[int(limit.emission_interval * 1e6), int(limit.emission_interval * limit.capacity * 1e6)]
+                )
+                return RateLimitDecision(
+                    allowed=bool(allowed),
+                    limit=limit.limit,
+                    remaining=int(remaining),
+                    retry_after=int(retry_after_us) / 1e6,
+                    reset_after=int(reset_after_us) / 1e6
+                )
+            except (RedisError, OSError, asyncio.TimeoutError) as e:
+                self.redis_failures += 1
+                self._redis_down_until = self._clock() + self.redis_retry_interval
+                logger.warning(f"Rate limiter falling back to local buckets for "
+                               f"{self.redis_retry_interval:.0f}s: {e}")
+
+        return self._hit_local(bucket, limit)
+
+    def get_stats(self) -> dict:
+        return {
+            'backend': 'redis' if self.using_redis else 'local',
+            'redis_failures': self.redis_failures,
+            'local_decisions': self.local_decisions,
+            'local_buckets': len(self._local)
+        }
+
+    def _hit_local(self, bucket: str, limit: RateLimit) -> RateLimitDecision:
+        """The Lua script's algorithm, against the in-process LRU."""
+        self.local_decisions += 1
+        now = self._clock()
+        interval = limit.emission_interval
+        tolerance = interval * limit.capacity
+
+        tat = max(self._local.get(bucket, now), now)
+        new_tat = tat + interval
+        allow_at = new_tat - tolerance
+        if now < allow_at:
+            return RateLimitDecision(False, limit.limit, 0, allow_at - now, tat - now)
+
+        # The entry expires exactly when the bucket would be full again
+        self._local.set(bucket, new_tat, ttl=new_tat - now)
+        remaining = int((tolerance - (new_tat - now)) / interval + 1e-9)
+        return RateLimitDecision(True, limit.limit, remaining, 0.0, new_tat - now)
@@ -0,0 +1,237 @@
+"""
+Seeded randomness and a disk cache for procedural renders.
+
+Procedural renderers (the realistic scene generator and the Runway
+clients' offline placeholders) draw from an explicit RNG instead of the
+global `random` module. The RNG is seeded from (prompt, style, seed), so
+an identical request always renders identical pixels, and that render
+seed, together with the renderer's version and output settings, names
+the output. Rendered frames (PNG) and segments (video files) live in a
+disk LRU bounded by total size, so repeated previews and offline
+fallbacks copy a file instead of rendering it again.
+
+Randomness that must not depend on render order (e.g. a single frame of
+an animation) comes from a child seed: `child_seed(seed, 'frame', 12)`
+gives the same stream whether or not frames 0-11 were rendered first.
+"""
+
+import os
+import stat
+import time
+import random
+import shutil
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv('RENDER_CACHE_DIR', '/app/output/cache/render')
+DEFAULT_CACHE_MAX_BYTES = int(os.getenv('RENDER_CACHE_MAX_BYTES', str(1024 ** 3)))
+
+FRAME_SUFFIX = '.png'
+
+
+def _digest(*parts: Any, size: int = 8) -> bytes:
+    text = '\x1f'.join(str(part) for part in parts)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=size).digest()
+
+
+def render_seed(prompt: str, style: str = '', seed: Optional[int] = None) -> int:
+    """64-bit seed of a render, stable across processes and platforms."""
+    return int.from_bytes(_digest(prompt, style, seed), 'big')
+
+
+def child_seed(seed: int, *labels: Any) -> int:
+    """Independent seed for one part of a render (a layer, a frame)."""
+    return int.from_bytes(_digest(seed, *labels), 'big')
+
+
+def make_rng(seed: int) -> random.Random:
+    return random.Random(seed)
+
+
+def make_np_rng(seed: int) -> np.random.Generator:
+    return np.random.default_rng(seed)
+
+
+def render_key(renderer: str, version: int, seed: int, **params: Any) -> str:
+    """Cache key of a render: the renderer, its version, the seed and output settings."""
+    settings = ','.join(f'{name}={params[name]}' for name in sorted(params))
+    return f'{renderer}-v{version}-' + _digest(seed, settings, size=16).hex()
+
+
+class RenderCache:
+    """
+    Disk LRU of rendered frames and segments, bounded by total size.
+
+    Entries are single files named after their render key. Writes go to a
+    hidden temporary file first, so readers never see a partial render.
+
+    The directory is the index shared by every process using the same root:
+    a miss checks the disk before giving up, a hit touches the file's mtime,
+    and eviction sums the files actually present, removing the least
+    recently touched first. ``_entries`` is this process's view as of its
+    last scan.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes or DEFAULT_CACHE_MAX_BYTES
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load()
+
+    def _load(self):
+        """Adopt renders left by a previous process, oldest first."""
+        self._entries = self._scan()
+
+    def _scan(self) -> 'OrderedDict[str, int]':
+        """Renders on disk with their sizes, least recently used first."""
+        try:
+            paths = list(self.root.iterdir())
+        except FileNotFoundError:
+            return OrderedDict()
+        found = []
+        for path in paths:
+            if path.name.startswith('.'):
+                continue
+            try:
+                info = path.stat()
+            except FileNotFoundError:
+                # Evicted by another process while listing
+                continue
+            if stat.S_ISREG(info.st_mode):
+                found.append((info.st_mtime_ns, path.name, info.st_size))
+        return OrderedDict((name, size) for _, name, size in sorted(found))
+
+    @staticmethod
+    def _touch(path: Path):
+        """Mark a render as used now, for this and every other process."""
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._entries.values())
+
+    def path(self, key: str, suffix: str) -> Path:
+        return self.root / f'{key}{suffix}'
+
+    def get(self, key: str, suffix: str = '.mp4') -> Optional[Path]:
+        """Path of a cached render, marking it recently used."""
+        name = f'{key}{suffix}'
+        path = self.root / name
+        with self._lock:
+            try:
+                # Another process may have rendered it, or evicted it
+                size = path.stat().st_size
+                self._touch(path)
+            except FileNotFoundError:
+                self._entries.pop(name, None)
+                self.misses += 1
+                return None
+            self._entries[name] = size
+            self._entries.move_to_end(name)
+            self.hits += 1
+            return path
+
+    def put(self, key: str, source: str, suffix: str = '.mp4') -> Path:
+        """Copy a rendered file into the cache; the source is left in place."""
+        path = self.path(key, suffix)
+        self.root.mkdir(parents=True, exist_ok=True)
+        partial = self.root / f'.{path.name}.{threading.get_ident()}'
+        shutil.copyfile(source, partial)
+        os.replace(partial, path)
+        self._add(path)
+        return path
+
+    def fetch(self, key: str, destination: str, suffix: str = '.mp4') -> bool:
+        """Copy a cached render to destination; False on a miss."""
+        path = self.get(key, suffix)
+        if path is None:
+            return False
+        try:
+            shutil.copyfile(path, destination)
+        except OSError as e:
+            logger.warning(f"Could not copy cached render {path.name}: {e}")
+            return False
+        return True
+
+    def get_frame(self, key: str) -> Optional[Image.Image]:
+        """Cached frame, loaded into memory."""
+        path = self.get(key, FRAME_SUFFIX)
+        if path is None:
+            return None
+        try:
+            with Image.open(path) as frame:
+                frame.load()
+                return frame.copy()
+        except OSError as e:
+            logger.warning(f"Could not load cached frame {path.name}: {e}")
+            return None
+
+    def put_frame(self, key: str, frame: Image.Image) -> Path:
+        """Store a frame losslessly."""
+        path = self.path(key, FRAME_SUFFIX)
+        self.root.mkdir(parents=True, exist_ok=True)
+        partial = self.root / f'.{path.name}.{threading.get_ident()}'
+        frame.save(partial, format='PNG')
+        os.replace(partial, path)
+        self._add(path)
+        return path
+
+    def _add(self, path: Path):
+        """Register a render and evict least recently used ones over the limit."""
+        with self._lock:
+            self._touch(path)
+            # Renders written by other processes count against the same limit
+            self._entries = self._scan()
+            self._entries[path.name] = path.stat().st_size
+            self._entries.move_to_end(path.name)
+
+            total = self.total_bytes
+            while total > self.max_bytes and len(self._entries) > 1:
+                evicted, size = self._entries.popitem(last=False)
+                try:
+                    (self.root / evicted).unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+                logger.debug(f"Evicted render {evicted}")
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'total_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+# Global instance
+_render_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> RenderCache:
+    """Get global render cache instance."""
+    global _render_cache
+
+    if _render_cache is None:
+        _render_cache = RenderCache()
+
+    return _render_cache
@@ -0,0 +1,199 @@
+"""
+Content-addressed cache for parse and analysis results.
+
+Results are keyed by (kind, producer version, style, SHA-256 of the
+input), so a cached entry can never be served for different content or
+by a parser whose output format has since changed. Values are msgpack
+bytes in Redis, shared by API processes and Celery workers, with an
+in-process LRU in front for repeated lookups within one process. Both
+layers hold the encoded bytes, and each hit is decoded afresh, so callers
+are free to mutate what they get back.
+
+While Redis is unreachable the cache runs from the local LRU alone.
+"""
+
+import os
+import time
+import hashlib
+import logging
+from typing import Any, Callable, Optional, TypeVar
+
+import msgpack
+import redis
+from redis.exceptions import RedisError
+
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def packb(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def content_digest(content: str) -> str:
+    """SHA-256 of text content, the identity of a cached result."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Two-level (local LRU, then Redis) cache of encoded results."""
+
+    KEY = "result_cache:{kind}:{version}:{style}:{digest}"
+
+    DEFAULT_TTL = int(os.getenv('RESULT_CACHE_TTL', str(24 * 3600)))
+
+    def __init__(self,
+                 redis_url: Optional[str] = None,
+                 redis_client: Optional[redis.Redis] = None,
+                 ttl: int = DEFAULT_TTL,
+                 local_max_entries: int = 256,
+                 local_ttl: float = 300.0,
+                 redis_timeout: float = 0.2,
+                 redis_retry_interval: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize cache.
+
+        Args:
+            redis_url: Redis connection URL, or None for a local-only cache
+            redis_client: Existing client to use instead of connecting
+            ttl: Lifetime of Redis entries in seconds
+            local_max_entries: Results kept in the in-process LRU
+            local_ttl: Lifetime of in-process entries in seconds
+            redis_timeout: Socket timeout for cache calls, in seconds
+            redis_retry_interval: Seconds to stay local after a Redis failure
+            clock: Monotonic time source
+        """
+        if redis_client is None and redis_url:
+            redis_client = redis.Redis.from_url(
+                redis_url,
+                socket_timeout=redis_timeout,
+                socket_connect_timeout=redis_timeout
+            )
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.redis_retry_interval = redis_retry_interval
+        self._clock = clock
+        self._redis_down_until = 0.0
+        self._local = TTLCache(maxsize=local_max_entries, ttl=local_ttl, clock=clock)
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.redis_failures = 0
+
+    @property
+    def using_redis(self) -> bool:
+        return self.redis_client is not None and self._clock() >= self._redis_down_until
+
+    def key(self, kind: str, version: str, digest: str, style: str = "") -> str:
+        return self.KEY.format(kind=kind, version=version, style=style, digest=digest)
+
+    def get(self, kind: str, version: str, digest: str, style: str = "") -> Optional[bytes]:
+        """Encoded result, or None on a miss."""
+        key = self.key(kind, version, digest, style)
+        data = self._local.get(key)
+        if data is not None:
+            self.local_hits += 1
+            return data
+
+        if self.using_redis:
+            try:
+                data = self.redis_client.get(key)
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+            else:
+                if data is not None:
+                    self.redis_hits += 1
+                    self._local.set(key, data)
+                    return data
+
+        self.misses += 1
+        return None
+
+    def set(self, kind: str, version: str, digest: str, data: bytes, style: str = ""):
+        """Store an encoded result in both layers."""
+        key = self.key(kind, version, digest, style)
+        self._local.set(key, data)
+        if self.using_redis:
+            try:
+                self.redis_client.set(key, data, ex=self.ttl)
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+
+    def get_or_compute(self,
+                       kind: str,
+                       version: str,
+                       content: str,
+                       compute: Callable[[], T],
+                       style: str = "",
+                       encode: Callable[[T], bytes] = packb,
+                       decode: Callable[[bytes], T] = unpackb,
+                       digest: Optional[str] = None) -> T:
+        """
+        Cached result for content, computing and storing it on a miss.
+
+        Args:
+            kind: Namespace of the producer, e.g. "api_script_parse"
+            version: Producer version; bump it when the result format changes
+            content: Input the result was computed from
+            compute: Produces the result on a miss; exceptions are not cached
+            style: Extra input that changes the result
+            encode: Result to bytes (msgpack of plain data by default)
+            decode: Bytes to result
+            digest: Precomputed identity of content, to skip hashing it
+        """
+        digest = digest or content_digest(content)
+        data = self.get(kind, version, digest, style)
+        if data is not None:
+            try:
+                return decode(data)
+            except Exception as e:
+                logger.warning(f"Discarding undecodable {kind} cache entry: {e}")
+
+        result = compute()
+        self.set(kind, version, digest, encode(result), style)
+        return result
+
+    def invalidate(self, kind: str, version: str, digest: str, style: str = ""):
+        key = self.key(kind, version, digest, style)
+        self._local.pop(key)
+        if self.using_redis:
+            try:
+                self.redis_client.delete(key)
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+
+    def get_stats(self) -> dict:
+        return {
+            'backend': 'redis' if self.using_redis else 'local',
+            'local_hits': self.local_hits,
+            'redis_hits': self.redis_hits,
+            'misses': self.misses,
+            'redis_failures': self.redis_failures,
+            'local_entries': len(self._local)
+        }
+
+    def _redis_failed(self, error: Exception):
+        self.redis_failures += 1
+        self._redis_down_until = self._clock() + self.redis_retry_interval
+        logger.warning(f"Result cache using local entries only for "
+                       f"{self.redis_retry_interval:.0f}s: {error}")
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get the process-wide result cache (Redis-backed when REDIS_URL is set)."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(redis_url=os.getenv('REDIS_URL'))
+    return _result_cache
@@ -0,0 +1,180 @@
+"""
+Bounded producer/consumer stages for multi-provider generation.
+
+Items flow through a chain of stages, each backed by one provider (e.g.
+image generation, then image-to-video). A stage runs at most
+`concurrency` calls at once, shared by every pipeline run and direct call
+that uses it. Its input queue holds at most `buffer` items, so a fast
+upstream provider blocks (backpressure) instead of racing ahead of a slow
+downstream one, while every provider stays busy at its own limit.
+Results are reassembled in input order.
+
+Each stage tracks its queue depth and utilization: the fraction of its
+slots that were busy while it had work waiting or running.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineStage:
+    """One provider's slot limit, queue and utilization counters."""
+
+    def __init__(self, name: str, concurrency: int, buffer: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize stage.
+
+        Args:
+            name: Stage name used in stats
+            concurrency: Calls allowed in flight at once
+            buffer: Items a pipeline run may queue for this stage
+                (defaults to concurrency)
+            clock: Monotonic time source
+        """
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.buffer = buffer if buffer is not None else self.concurrency
+        self._clock = clock
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.queued = 0
+        self.active = 0
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0   # integral of active calls over time
+        self.open_seconds = 0.0   # time with work queued or running
+        self._advanced_at = clock()
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run fn in one of the stage's slots, waiting for a free one."""
+        slots = self._get_slots()
+        self._adjust(queued=1)
+        try:
+            await slots.acquire()
+        finally:
+            self._adjust(queued=-1)
+
+        self._adjust(active=1)
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._adjust(active=-1)
+            slots.release()
+
+        self.processed += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._advance()
+        utilization = (self.busy_seconds / (self.concurrency * self.open_seconds)
+                       if self.open_seconds else 0.0)
+        return {
+            'concurrency': self.concurrency,
+            'queue_depth': self.queued,
+            'in_flight': self.active,
+            'processed': self.processed,
+            'failed': self.failed,
+            'utilization': round(utilization, 3)
+        }
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.concurrency)
+        return self._slots
+
+    def _advance(self):
+        now = self._clock()
+        elapsed = now - self._advanced_at
+        self._advanced_at = now
+        self.busy_seconds += self.active * elapsed
+        if self.queued or self.active:
+            self.open_seconds += elapsed
+
+    def _adjust(self, queued: int = 0, active: int = 0):
+        self._advance()
+        self.queued += queued
+        self.active += active
+
+
+Step = Tuple[PipelineStage, Callable[[Any, Any], Awaitable[Any]]]
+
+
+async def run_pipeline(items: Sequence[Any],
+                       steps: List[Step],
+                       is_final: Callable[[Any], bool] = lambda value: False,
+                       on_error: Optional[Callable[[Any, Exception], Any]] = None) -> List[Any]:
+    """
+    Pass every item through the steps, overlapping the stages.
+
+    Args:
+        items: Inputs, one result is produced per item
+        steps: (stage, fn) pairs; fn(item, value) gets the original item and
+            the previous step's output (the item itself for the first step)
+        is_final: Whether a step's output skips the remaining steps
+            (e.g. a failure)
+        on_error: Result for an item whose step raised; the exception is
+            the result if not given
+
+    Returns:
+        Results in input order
+    """
+    results: List[Any] = [None] * len(items)
+    if not items:
+        return results
+
+    queues = [asyncio.Queue(maxsize=stage.buffer) for stage, _ in steps]
+
+    async def enqueue(position: int, index: int, value: Any):
+        await queues[position].put((index, value))
+        steps[position][0]._adjust(queued=1)
+
+    async def work(position: int):
+        stage, fn = steps[position]
+        queue = queues[position]
+        while True:
+            index, value = await queue.get()
+            stage._adjust(queued=-1)
+            try:
+                try:
+                    value = await stage.call(fn, items[index], value)
+                except Exception as e:
+                    logger.warning(f"Pipeline stage {stage.name} failed for item {index}: {e}")
+                    results[index] = on_error(items[index], e) if on_error else e
+                    continue
+
+                if position + 1 == len(steps) or is_final(value):
+                    results[index] = value
+                else:
+                    # Blocks while the next stage's buffer is full
+                    await enqueue(position + 1, index, value)
+            finally:
+                queue.task_done()
+
+    workers = [
+        asyncio.ensure_future(work(position))
+        for position, (stage, _) in enumerate(steps)
+        for _ in range(stage.concurrency)
+    ]
+    try:
+        for index, item in enumerate(items):
+            await enqueue(0, index, item)
+        # A stage's queue drains only after handing every item on
+        for queue in queues:
+            await queue.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    return results
@@ -0,0 +1,373 @@
+"""
+Streaming Downloads with Resume and Inline Checksums
+
+Downloads large media files (generated clips, images) straight to disk in
+fixed-size chunks so workers never hold a whole video in memory.
+
+Features:
+- Chunked writes to a ``.part`` file, fsync, then atomic rename into place
+- Resumable HTTP range requests (``Range``/``If-Range``) after dropped connections
+- MD5/SHA256/CRC32 computed while streaming, in the same format as
+  ``CorruptionDetector._calculate_checksums`` so integrity checks can skip
+  re-reading the file
+- Async (aiohttp pool) and sync (requests session) variants
+"""
+
+import os
+import time
+import zlib
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterable, Dict, Iterable, Optional, Union
+
+import aiohttp
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class StreamChecksum:
+    """Incremental MD5/SHA256/CRC32 over a byte stream."""
+
+    def __init__(self):
+        self.md5 = hashlib.md5()
+        self.sha256 = hashlib.sha256()
+        self.crc32 = 0
+        self.size = 0
+
+    def update(self, chunk: bytes):
+        """Feed the next chunk of the stream."""
+        self.md5.update(chunk)
+        self.sha256.update(chunk)
+        self.crc32 = zlib.crc32(chunk, self.crc32) & 0xffffffff
+        self.size += len(chunk)
+
+    def update_from_file(self, file_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Feed the contents of an existing file (used when resuming)."""
+        with open(file_path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                self.update(chunk)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return checksums keyed like ``CorruptionDetector._calculate_checksums``."""
+        return {
+            'md5': self.md5.hexdigest(),
+            'sha256': self.sha256.hexdigest(),
+            'crc32': self.crc32
+        }
+
+
+@dataclass
+class DownloadResult:
+    """Result of a completed streaming download."""
+    path: str
+    size: int
+    checksums: Dict[str, Any] = field(default_factory=dict)
+    resumed_bytes: int = 0
+    attempts: int = 1
+
+    @property
+    def sha256(self) -> str:
+        return self.checksums.get('sha256', '')
+
+
+def _fsync_directory(directory: Path):
+    """Persist a rename by syncing the parent directory (no-op where unsupported)."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _parse_content_range_total(value: Optional[str]) -> Optional[int]:
+    """Extract the total length from a ``Content-Range`` header."""
+    if not value or '/' not in value:
+        return None
+    total = value.rsplit('/', 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+class _PartFile:
+    """
+    Write target shared by the sync and async downloaders.
+
+    Tracks the ``.part`` file, the running checksum and the byte offset so a
+    dropped connection can be resumed with a range request.
+    """
+
+    def __init__(self, dest_path: Union[str, Path], resume: bool = True):
+        self.dest = Path(dest_path)
+        self.dest.parent.mkdir(parents=True, exist_ok=True)
+        self.part = self.dest.with_name(self.dest.name + '.part')
+        self.checksum = StreamChecksum()
+        self.validator: Optional[str] = None
+        self.resumed_bytes = 0
+        self._file = None
+
+        if resume and self.part.exists() and self.part.stat().st_size > 0:
+            # Left behind by an interrupted run; hash what is already on disk
+            self.checksum.update_from_file(self.part)
+            self.resumed_bytes = self.checksum.size
+            logger.info(f"Resuming download of {self.dest.name} at byte {self.checksum.size}")
+        elif self.part.exists():
+            self.part.unlink()
+
+    @property
+    def offset(self) -> int:
+        return self.checksum.size
+
+    def request_headers(self, base: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Build request headers, adding a range request when resuming."""
+        headers = dict(base or {})
+        if self.offset:
+            headers['Range'] = f'bytes={self.offset}-'
+            if self.validator:
+                headers['If-Range'] = self.validator
+        return headers
+
+    def is_already_complete(self, status: int, headers) -> bool:
+        """A 416 for a range starting at the file length means nothing is left to fetch."""
+        return (
+            status == 416
+            and self.offset > 0
+            and _parse_content_range_total(headers.get('Content-Range')) == self.offset
+        )
+
+    def open_for(self, status: int, headers):
+        """
+        Open the part file for the response body.
+
+        A 206 appends to the existing bytes; a 200 means the server ignored
+        (or invalidated) the range, so the download restarts from zero.
+        """
+        if status == 206 and self.offset:
+            mode = 'ab'
+        elif status in (200, 206):
+            if self.offset:
+                logger.info(f"Server restarted {self.dest.name} from byte 0")
+                self.checksum = StreamChecksum()
+                self.resumed_bytes = 0
+            mode = 'wb'
+        else:
+            raise ValueError(f"Unexpected status {status}")
+
+        etag = headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            self.validator = etag
+        elif headers.get('Last-Modified'):
+            self.validator = headers.get('Last-Modified')
+
+        self._file = open(self.part, mode)
+        return self._file
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self.checksum.update(chunk)
+
+    def close(self, sync: bool = False):
+        """Close the part file, optionally forcing its contents to disk."""
+        if self._file is None:
+            return
+        try:
+            if sync:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            self._file = None
+
+    def commit(self, attempts: int) -> DownloadResult:
+        """Atomically move the completed part file into place."""
+        if not self.part.exists():
+            # Zero-byte body
+            self.part.touch()
+        os.replace(self.part, self.dest)
+        _fsync_directory(self.dest.parent)
+        return DownloadResult(
+            path=str(self.dest),
+            size=self.checksum.size,
+            checksums=self.checksum.as_dict(),
+            resumed_bytes=self.resumed_bytes,
+            attempts=attempts
+        )
+
+    def discard(self):
+        self.close()
+        try:
+            self.part.unlink()
+        except FileNotFoundError:
+            pass
+
+
+async def download_resumable(url: str, dest_path: Union[str, Path],
+                             pool=None,
+                             headers: Optional[Dict[str, str]] = None,
+                             max_attempts: int = 3,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             retry_delay: float = 1.0) -> DownloadResult:
+    """
+    Stream a URL to disk on the event loop, resuming after dropped connections.
+
+    Args:
+        url: URL to download
+        dest_path: Final file path
+        pool: AsyncHTTPPool to use (defaults to the 'runway' pool)
+        headers: Optional request headers
+        max_attempts: Total attempts including resumes
+        chunk_size: Read chunk size
+        retry_delay: Base delay between attempts (doubled each time)
+
+    Returns:
+        DownloadResult with size and checksums
+
+    Raises:
+        aiohttp.ClientError: If the download still fails after all attempts
+    """
+    if pool is None:
+        from .http_pool import get_http_pool
+        pool = get_http_pool('runway')
+
+    target = _PartFile(dest_path)
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            async with pool.request('GET', url, headers=target.request_headers(headers)) as response:
+                if not target.is_already_complete(response.status, response.headers):
+                    if response.status not in (200, 206):
+                        response.raise_for_status()
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history,
+                            status=response.status, message="Unexpected status"
+                        )
+                    target.open_for(response.status, response.headers)
+                    try:
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            target.write(chunk)
+                    finally:
+                        target.close(sync=True)
+
+            result = target.commit(attempt)
+            logger.info(f"Downloaded {result.size} bytes to {result.path} in {attempt} attempt(s)")
+            return result
+
+        except aiohttp.ClientResponseError:
+            target.discard()
+            raise
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            if attempt == max_attempts:
+                logger.error(f"Download of {url} failed after {attempt} attempts: {e}")
+                raise
+            logger.warning(f"Download interrupted at byte {target.offset}, resuming: {e}")
+            await asyncio.sleep(retry_delay * (2 ** (attempt - 1)))
+
+
+def download_resumable_sync(url: str, dest_path: Union[str, Path],
+                            session: Optional[requests.Session] = None,
+                            headers: Optional[Dict[str, str]] = None,
+                            max_attempts: int = 3,
+                            chunk_size: int = DEFAULT_CHUNK_SIZE,
+                            retry_delay: float = 1.0,
+                            timeout: float = 60) -> DownloadResult:
+    """
+    Stream a URL to disk from synchronous code (Celery tasks).
+
+    Same semantics as :func:`download_resumable`, using a requests session.
+
+    Raises:
+        requests.RequestException: If the download still fails after all attempts
+    """
+    session = session or requests.Session()
+    target = _PartFile(dest_path)
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            with session.get(url, headers=target.request_headers(headers),
+                             stream=True, timeout=timeout) as response:
+                if not target.is_already_complete(response.status_code, response.headers):
+                    if response.status_code not in (200, 206):
+                        response.raise_for_status()
+                        raise requests.HTTPError(
+                            f"Unexpected status {response.status_code}", response=response
+                        )
+                    target.open_for(response.status_code, response.headers)
+                    try:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            if chunk:
+                                target.write(chunk)
+                    finally:
+                        target.close(sync=True)
+
+            result = target.commit(attempt)
+            logger.info(f"Downloaded {result.size} bytes to {result.path} in {attempt} attempt(s)")
+            return result
+
+        except requests.HTTPError:
+            target.discard()
+            raise
+
+        except (requests.RequestException, OSError) as e:
+            if attempt == max_attempts:
+                logger.error(f"Download of {url} failed after {attempt} attempts: {e}")
+                raise
+            logger.warning(f"Download interrupted at byte {target.offset}, resuming: {e}")
+            time.sleep(retry_delay * (2 ** (attempt - 1)))
+
+
+async def write_stream_atomic(chunks: AsyncIterable[bytes],
+                              dest_path: Union[str, Path]) -> DownloadResult:
+    """
+    Write an async chunk stream to disk with fsync and atomic rename.
+
+    Args:
+        chunks: Async iterable of byte chunks
+        dest_path: Final file path
+
+    Returns:
+        DownloadResult with size and checksums
+    """
+    target = _PartFile(dest_path, resume=False)
+    target.open_for(200, {})
+    try:
+        async for chunk in chunks:
+            target.write(chunk)
+        target.close(sync=True)
+    except BaseException:
+        target.discard()
+        raise
+    return target.commit(attempts=1)
+
+
+def write_chunks_atomic(chunks: Iterable[bytes],
+                        dest_path: Union[str, Path]) -> DownloadResult:
+    """
+    Write a chunk iterable to disk with fsync and atomic rename.
+
+    Args:
+        chunks: Iterable of byte chunks
+        dest_path: Final file path
+
+    Returns:
+        DownloadResult with size and checksums
+    """
+    target = _PartFile(dest_path, resume=False)
+    target.open_for(200, {})
+    try:
+        for chunk in chunks:
+            target.write(chunk)
+        target.close(sync=True)
+    except BaseException:
+        target.discard()
+        raise
+    return target.commit(attempts=1)
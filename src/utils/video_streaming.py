@@ -4,6 +4,11 @@ Video Streaming Utility - Optimized Video Delivery with Range Support
 Provides efficient video streaming with HTTP range requests, chunk-based delivery,
 and adaptive quality for smooth playback of large video files.
 
+Bodies are sent with the ASGI ``http.response.zerocopysend`` extension when
+the server offers it (the server then uses ``sendfile``), or handed to nginx
+via ``X-Accel-Redirect`` when configured; otherwise file regions are read
+with ``os.pread`` in large chunks and sent directly.
+
 Performance Targets:
 - 4K video streaming without buffering
 - Range request support for seeking
@@ -13,17 +18,18 @@ Performance Targets:
 """
 
 import os
+import time
+import uuid
 import mimetypes
 import logging
-from typing import Optional, Tuple, Dict, Any, AsyncGenerator, BinaryIO
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple, Dict, Any, Callable, List
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import asyncio
-import aiofiles
-from io import BytesIO
 
 from fastapi import Request, Response, HTTPException
-from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +44,15 @@ class VideoMetadata:
     format: Optional[str] = None
     last_modified: float = 0
     
+    @property
+    def etag(self) -> str:
+        """Strong validator derived from size and modification time."""
+        return f'"{int(self.last_modified * 1_000_000):x}-{self.file_size:x}"'
+    
+    @property
+    def last_modified_http(self) -> str:
+        return formatdate(self.last_modified, usegmt=True)
+    
     @classmethod
     async def from_file(cls, file_path: str) -> 'VideoMetadata':
         """Create metadata from video file."""
@@ -118,6 +133,16 @@ class StreamingConfig:
     enable_compression: bool = False
     cache_control_max_age: int = 3600  # 1 hour
     adaptive_chunk_size: bool = True
+    max_ranges: int = 16  # More ranges than this are answered with the full file
+    # Per-connection bandwidth cap in bytes/second (0 = unlimited)
+    max_bandwidth: int = field(default_factory=lambda: int(os.getenv('VIDEO_STREAM_MAX_BPS', '0')))
+    # nginx internal location serving accel_redirect_root, e.g. '/internal-media/'
+    accel_redirect_prefix: Optional[str] = field(
+        default_factory=lambda: os.getenv('VIDEO_ACCEL_REDIRECT_PREFIX') or None
+    )
+    accel_redirect_root: str = field(
+        default_factory=lambda: os.getenv('VIDEO_ACCEL_ROOT', '/app/output')
+    )
     
     def get_adaptive_chunk_size(self, file_size: int, connection_speed: Optional[str] = None) -> int:
         """Calculate optimal chunk size based on file size and connection."""
@@ -150,73 +175,246 @@ class StreamingConfig:
 class RangeRequest:
     """HTTP Range request parser and handler."""
     
-    def __init__(self, range_header: str, file_size: int):
+    def __init__(self, range_header: str, file_size: int, max_ranges: int = 16):
         """
         Initialize range request.
         
         Args:
             range_header: HTTP Range header value
             file_size: Total file size in bytes
+            max_ranges: Maximum ranges honored before falling back to the full file
         """
         self.range_header = range_header
         self.file_size = file_size
+        self.max_ranges = max_ranges
         self.start = 0
         self.end = file_size - 1
         self.length = file_size
         self.is_partial = False
+        self.ranges: List[Tuple[int, int]] = [(0, file_size - 1)] if file_size else []
+        self._satisfiable = True
         
         self._parse_range()
     
     def _parse_range(self):
-        """Parse HTTP Range header."""
+        """Parse HTTP Range header, including suffix and multiple ranges."""
+        if not self.range_header or not self.range_header.startswith('bytes='):
+            return
+        
+        ranges = []
         try:
-            if not self.range_header or not self.range_header.startswith('bytes='):
-                return
-            
-            range_spec = self.range_header[6:]  # Remove 'bytes='
-            
-            # Handle multiple ranges (take first one)
-            range_parts = range_spec.split(',')[0].strip()
-            
-            if '-' not in range_parts:
-                return
-            
-            start_str, end_str = range_parts.split('-', 1)
-            
-            # Parse start
-            if start_str:
-                self.start = int(start_str)
-                self.is_partial = True
-            
-            # Parse end
-            if end_str:
-                self.end = int(end_str)
-                self.is_partial = True
-            else:
-                self.end = self.file_size - 1
-            
-            # Validate and adjust bounds
-            self.start = max(0, min(self.start, self.file_size - 1))
-            self.end = max(self.start, min(self.end, self.file_size - 1))
-            self.length = self.end - self.start + 1
-            
-            logger.debug(f"Parsed range: {self.start}-{self.end}/{self.file_size}")
-            
-        except (ValueError, IndexError) as e:
+            for spec in self.range_header[6:].split(','):
+                spec = spec.strip()
+                if not spec:
+                    continue
+                
+                start_str, end_str = spec.split('-', 1)
+                
+                if not start_str:
+                    # Suffix range: last N bytes
+                    suffix = int(end_str)
+                    if suffix <= 0:
+                        continue
+                    start, end = max(0, self.file_size - suffix), self.file_size - 1
+                else:
+                    start = int(start_str)
+                    end = int(end_str) if end_str else None
+                    if end is not None and end < start:
+                        raise ValueError("range end before start")
+                    if start >= self.file_size:
+                        continue
+                    end = self.file_size - 1 if end is None else min(end, self.file_size - 1)
+                
+                ranges.append((start, end))
+                    
+        except ValueError as e:
+            # Invalid syntax: ignore the header and serve the full file
             logger.warning(f"Invalid range header '{self.range_header}': {e}")
-            # Reset to full file on invalid range
-            self.start = 0
-            self.end = self.file_size - 1
-            self.length = self.file_size
+            return
+        
+        self.is_partial = True
+        if not ranges:
+            self._satisfiable = False
+            return
+        
+        # Coalesce overlapping and adjacent ranges
+        ranges.sort()
+        merged = [ranges[0]]
+        for start, end in ranges[1:]:
+            last_start, last_end = merged[-1]
+            if start <= last_end + 1:
+                merged[-1] = (last_start, max(last_end, end))
+            else:
+                merged.append((start, end))
+        
+        if len(merged) > self.max_ranges:
+            logger.warning(f"Ignoring range header with {len(merged)} ranges")
             self.is_partial = False
+            return
+        
+        self.ranges = merged
+        self.start, self.end = merged[0]
+        self.length = self.end - self.start + 1
+        
+        logger.debug(f"Parsed range: {self.ranges}/{self.file_size}")
+    
+    @property
+    def is_multipart(self) -> bool:
+        return self.is_partial and len(self.ranges) > 1
     
-    def get_content_range_header(self) -> str:
+    def get_content_range_header(self, start: Optional[int] = None, end: Optional[int] = None) -> str:
         """Get Content-Range header value."""
-        return f"bytes {self.start}-{self.end}/{self.file_size}"
+        start = self.start if start is None else start
+        end = self.end if end is None else end
+        return f"bytes {start}-{end}/{self.file_size}"
     
     def is_satisfiable(self) -> bool:
         """Check if range request is satisfiable."""
-        return self.start < self.file_size and self.end < self.file_size and self.start <= self.end
+        return self._satisfiable
+
+
+class BandwidthLimiter:
+    """Paces a single connection to a maximum byte rate."""
+    
+    def __init__(self, rate: int):
+        self.rate = rate
+        self._started: Optional[float] = None
+        self._sent = 0
+    
+    async def throttle(self, sent: int):
+        """Account for bytes just sent, sleeping if ahead of the allowed rate."""
+        if not self.rate:
+            return
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        self._sent += sent
+        delay = self._started + self._sent / self.rate - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class SendfileResponse(Response):
+    """
+    File response for full, single-range and multipart range bodies.
+    
+    Uses the ASGI ``http.response.zerocopysend`` extension when the server
+    supports it, so bytes go from the page cache to the socket via
+    ``sendfile``. Otherwise each region is read with ``os.pread`` in large
+    chunks and sent without intermediate buffering.
+    """
+    
+    def __init__(self,
+                 file_path: str,
+                 range_request: RangeRequest,
+                 media_type: str,
+                 headers: Dict[str, str],
+                 chunk_size: int,
+                 max_bandwidth: int = 0,
+                 on_complete: Optional[Callable[[int], None]] = None):
+        self.file_path = file_path
+        self.range_request = range_request
+        self.chunk_size = chunk_size
+        self.max_bandwidth = max_bandwidth
+        self.on_complete = on_complete
+        self.bytes_sent = 0
+        self.status_code = 206 if range_request.is_partial else 200
+        self.background = None
+        self.body = b''
+        
+        self._parts: List[Tuple[bytes, int, int]] = []
+        trailer = b''
+        if range_request.is_multipart:
+            boundary = uuid.uuid4().hex
+            for start, end in range_request.ranges:
+                part_header = (
+                    f"\r\n--{boundary}\r\n"
+                    f"Content-Type: {media_type}\r\n"
+                    f"Content-Range: {range_request.get_content_range_header(start, end)}\r\n\r\n"
+                ).encode('latin-1')
+                self._parts.append((part_header, start, end - start + 1))
+            trailer = f"\r\n--{boundary}--\r\n".encode('latin-1')
+            media_type = f"multipart/byteranges; boundary={boundary}"
+        elif range_request.ranges:
+            start, end = range_request.ranges[0] if range_request.is_partial else (0, range_request.file_size - 1)
+            self._parts.append((b'', start, end - start + 1))
+        self._trailer = trailer
+        
+        content_length = sum(len(h) + n for h, _, n in self._parts) + len(trailer)
+        headers = dict(headers, **{'Content-Length': str(content_length)})
+        self.media_type = media_type
+        self.init_headers(headers)
+        self.headers['content-type'] = media_type
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        zero_copy = 'http.response.zerocopysend' in scope.get('extensions', {})
+        send_body = scope.get('method', 'GET') != 'HEAD'
+        limiter = BandwidthLimiter(self.max_bandwidth)
+        chunk_size = self.chunk_size
+        if self.max_bandwidth:
+            # Smaller chunks keep pacing smooth under a cap
+            chunk_size = max(64 * 1024, min(chunk_size, self.max_bandwidth // 4))
+        
+        await send({
+            'type': 'http.response.start',
+            'status': self.status_code,
+            'headers': self.raw_headers,
+        })
+        
+        try:
+            if send_body:
+                with open(self.file_path, 'rb') as file:
+                    for part_header, offset, count in self._parts:
+                        if part_header:
+                            await send({'type': 'http.response.body', 'body': part_header, 'more_body': True})
+                            self.bytes_sent += len(part_header)
+                        await self._send_region(send, file, offset, count, chunk_size, zero_copy, limiter)
+                if self._trailer:
+                    await send({'type': 'http.response.body', 'body': self._trailer, 'more_body': True})
+                    self.bytes_sent += len(self._trailer)
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        except OSError as e:
+            # Client went away mid-stream
+            logger.debug(f"Stream of {self.file_path} ended early after {self.bytes_sent} bytes: {e}")
+        finally:
+            if self.on_complete:
+                self.on_complete(self.bytes_sent)
+    
+    async def _send_region(self, send: Send, file, offset: int, count: int,
+                           chunk_size: int, zero_copy: bool, limiter: BandwidthLimiter):
+        loop = asyncio.get_running_loop()
+        fd = file.fileno()
+        end = offset + count
+        
+        while offset < end:
+            size = min(chunk_size, end - offset)
+            if zero_copy:
+                await send({
+                    'type': 'http.response.zerocopysend',
+                    'file': file,
+                    'offset': offset,
+                    'count': size,
+                    'more_body': True,
+                })
+            else:
+                chunk = await loop.run_in_executor(None, _pread, file, fd, size, offset)
+                if not chunk:
+                    break
+                size = len(chunk)
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            
+            offset += size
+            self.bytes_sent += size
+            await limiter.throttle(size)
+
+
+def _pread(file, fd: int, size: int, offset: int) -> bytes:
+    """Positional read without moving a shared file offset where supported."""
+    if hasattr(os, 'pread'):
+        return os.pread(fd, size, offset)
+    file.seek(offset)
+    return file.read(size)
+
 
 class VideoStreamer:
     """
@@ -236,28 +434,48 @@ class VideoStreamer:
         self._file_cache: Dict[str, VideoMetadata] = {}
         self._cache_ttl = 300  # 5 minutes
         
+        # Bytes actually written to clients, and responses handed to nginx
+        self.bytes_sent = 0
+        self.offloaded_streams = 0
+        
         logger.info("Initialized VideoStreamer with range request support")
     
     async def stream_video(self, 
                           file_path: str, 
-                          request: Request) -> StreamingResponse:
+                          request: Request,
+                          on_complete: Optional[Callable[[int], None]] = None) -> Response:
         """
         Stream video file with range support.
         
         Args:
             file_path: Path to video file
             request: FastAPI request object
+            on_complete: Called with the number of bytes actually sent
             
         Returns:
-            StreamingResponse with video content
+            Response with video content (206/200), or 304 if the client's copy is current
         """
         try:
             # Get video metadata
             metadata = await self._get_video_metadata(file_path)
             
-            # Parse range request
-            range_header = request.headers.get('range')
-            range_request = RangeRequest(range_header or '', metadata.file_size)
+            # Determine content type
+            content_type = self._get_content_type(file_path)
+            
+            if self._is_not_modified(request, metadata):
+                return Response(status_code=304, headers=self._validator_headers(metadata))
+            
+            # Let nginx send the file if configured
+            accel_path = self._accel_redirect_path(file_path)
+            if accel_path:
+                self.offloaded_streams += 1
+                return Response(headers={'X-Accel-Redirect': accel_path, 'Content-Type': content_type})
+            
+            # Parse range request; a stale If-Range gets the full file
+            range_header = request.headers.get('range') if self.config.enable_range_requests else None
+            if range_header and not self._if_range_matches(request, metadata):
+                range_header = None
+            range_request = RangeRequest(range_header or '', metadata.file_size, self.config.max_ranges)
             
             # Validate range
             if range_request.is_partial and not range_request.is_satisfiable():
@@ -270,9 +488,6 @@ class VideoStreamer:
                     }
                 )
             
-            # Determine content type
-            content_type = self._get_content_type(file_path)
-            
             # Get adaptive chunk size
             connection_speed = self._detect_connection_speed(request)
             chunk_size = self.config.get_adaptive_chunk_size(
@@ -280,26 +495,25 @@ class VideoStreamer:
                 connection_speed
             )
             
-            # Create streaming response
             headers = self._build_response_headers(metadata, range_request)
-            status_code = 206 if range_request.is_partial else 200
             
-            # Create async generator for file chunks
-            generator = self._create_file_generator(
-                file_path, 
-                range_request, 
-                chunk_size
-            )
+            def record(bytes_sent: int):
+                self.bytes_sent += bytes_sent
+                if on_complete:
+                    on_complete(bytes_sent)
             
             logger.info(f"Streaming video {file_path}: "
-                       f"{range_request.start}-{range_request.end}/{metadata.file_size}, "
+                       f"{range_request.ranges}/{metadata.file_size}, "
                        f"chunk_size={chunk_size}")
             
-            return StreamingResponse(
-                generator,
-                status_code=status_code,
+            return SendfileResponse(
+                file_path,
+                range_request,
+                media_type=content_type,
                 headers=headers,
-                media_type=content_type
+                chunk_size=chunk_size,
+                max_bandwidth=self.config.max_bandwidth,
+                on_complete=record
             )
             
         except HTTPException:
@@ -403,61 +617,72 @@ class VideoStreamer:
         
         return None
     
+    def _validator_headers(self, metadata: VideoMetadata) -> Dict[str, str]:
+        """Cache validators, also sent on 304 responses."""
+        headers = {
+            'Cache-Control': f'public, max-age={self.config.cache_control_max_age}',
+            'ETag': metadata.etag,
+        }
+        if metadata.last_modified:
+            headers['Last-Modified'] = metadata.last_modified_http
+        return headers
+    
+    def _is_not_modified(self, request: Request, metadata: VideoMetadata) -> bool:
+        """Evaluate If-None-Match, falling back to If-Modified-Since."""
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match:
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or metadata.etag in tags
+        
+        if_modified_since = request.headers.get('if-modified-since')
+        if if_modified_since and metadata.last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(metadata.last_modified) <= since
+        
+        return False
+    
+    def _if_range_matches(self, request: Request, metadata: VideoMetadata) -> bool:
+        """Whether a Range should be honored given If-Range (strong comparison)."""
+        if_range = request.headers.get('if-range')
+        if not if_range:
+            return True
+        if if_range.startswith('"'):
+            return if_range == metadata.etag
+        return bool(metadata.last_modified) and if_range == metadata.last_modified_http
+    
+    def _accel_redirect_path(self, file_path: str) -> Optional[str]:
+        """Internal nginx location for a file under the accel root, if enabled."""
+        prefix = self.config.accel_redirect_prefix
+        if not prefix:
+            return None
+        try:
+            relative = Path(file_path).resolve().relative_to(Path(self.config.accel_redirect_root).resolve())
+        except ValueError:
+            return None
+        return prefix.rstrip('/') + '/' + relative.as_posix()
+    
     def _build_response_headers(self, 
                                metadata: VideoMetadata, 
                                range_request: RangeRequest) -> Dict[str, str]:
         """Build HTTP response headers for video streaming."""
         headers = {
             'Accept-Ranges': 'bytes',
-            'Cache-Control': f'public, max-age={self.config.cache_control_max_age}',
-            'Content-Length': str(range_request.length)
+            **self._validator_headers(metadata)
         }
         
-        # Add range headers for partial content
-        if range_request.is_partial:
+        # Add range headers for partial content (multipart parts carry their own)
+        if range_request.is_partial and not range_request.is_multipart:
             headers['Content-Range'] = range_request.get_content_range_header()
         
-        # Add last modified for caching
-        if metadata.last_modified:
-            from email.utils import formatdate
-            headers['Last-Modified'] = formatdate(metadata.last_modified, usegmt=True)
-        
         # Add video-specific headers
         if metadata.duration:
             headers['X-Content-Duration'] = str(metadata.duration)
         
         return headers
-    
-    async def _create_file_generator(self, 
-                                   file_path: str, 
-                                   range_request: RangeRequest, 
-                                   chunk_size: int) -> AsyncGenerator[bytes, None]:
-        """Create async generator for file chunks."""
-        try:
-            async with aiofiles.open(file_path, 'rb') as file:
-                # Seek to start position
-                await file.seek(range_request.start)
-                
-                bytes_remaining = range_request.length
-                
-                while bytes_remaining > 0:
-                    # Read chunk (don't exceed remaining bytes)
-                    read_size = min(chunk_size, bytes_remaining)
-                    chunk = await file.read(read_size)
-                    
-                    if not chunk:
-                        break
-                    
-                    yield chunk
-                    bytes_remaining -= len(chunk)
-                    
-                    # Small delay to prevent overwhelming the client
-                    if bytes_remaining > 0:
-                        await asyncio.sleep(0.001)  # 1ms delay
-                        
-        except Exception as e:
-            logger.error(f"Error in file generator for {file_path}: {e}")
-            raise
+
 
 class VideoStreamingManager:
     """
@@ -482,7 +707,7 @@ class VideoStreamingManager:
     async def stream_scene_video(self, 
                                 scene_id: str, 
                                 project_id: str, 
-                                request: Request) -> StreamingResponse:
+                                request: Request) -> Response:
         """
         Stream a scene video file with automatic path resolution.
         
@@ -492,7 +717,7 @@ class VideoStreamingManager:
             request: FastAPI request
             
         Returns:
-            StreamingResponse for video
+            Response for video
         """
         try:
             # Import here to avoid circular imports
@@ -513,15 +738,8 @@ class VideoStreamingManager:
             if request.headers.get('range'):
                 self._stream_stats['range_requests'] += 1
             
-            # Stream the video
-            response = await self.streamer.stream_video(video_path, request)
-            
-            # Track bytes served (estimate)
-            content_length = response.headers.get('content-length')
-            if content_length:
-                self._stream_stats['total_bytes_served'] += int(content_length)
-            
-            return response
+            # Stream the video; bytes are counted as they are actually sent
+            return await self.streamer.stream_video(video_path, request, on_complete=self._record_bytes)
             
         except HTTPException:
             self._stream_stats['errors'] += 1
@@ -531,15 +749,24 @@ class VideoStreamingManager:
             logger.error(f"Error streaming scene video {scene_id}: {e}")
             raise HTTPException(status_code=500, detail=f"Streaming failed: {str(e)}")
     
+    def _record_bytes(self, bytes_sent: int):
+        self._stream_stats['total_bytes_served'] += bytes_sent
+    
     async def get_streaming_stats(self) -> Dict[str, Any]:
         """Get video streaming statistics."""
         return {
-            'statistics': self._stream_stats.copy(),
+            'statistics': {
+                **self._stream_stats,
+                'all_bytes_sent': self.streamer.bytes_sent,
+                'offloaded_streams': self.streamer.offloaded_streams
+            },
             'configuration': {
                 'chunk_size': self.streamer.config.chunk_size,
                 'range_requests_enabled': self.streamer.config.enable_range_requests,
                 'adaptive_chunk_size': self.streamer.config.adaptive_chunk_size,
-                'cache_max_age': self.streamer.config.cache_control_max_age
+                'cache_max_age': self.streamer.config.cache_control_max_age,
+                'max_bandwidth': self.streamer.config.max_bandwidth,
+                'accel_redirect': bool(self.streamer.config.accel_redirect_prefix)
             },
             'performance': {
                 'cache_size': len(self.streamer._file_cache),
@@ -1,6 +1,9 @@
 """Unit tests for script parser module."""
 
+import dataclasses
+
 import pytest
+from src.script_engine import lexer
 from src.script_engine.parser import (
     MarkdownScriptParser, ScreenplayScriptParser, ParsedScript,
     ScriptMetadata, Scene, Narrative, Dialogue, SceneDescription
@@ -286,4 +289,82 @@ class TestParserHelpers:
         # Test neutral detection
         neutral_text = "The report was filed at noon."
         tone = parser.detect_emotional_tone(neutral_text)
-        assert tone == "neutral"
\ No newline at end of file
+        assert tone == "neutral"
+
+
+class TestLexer:
+    """Test line classification."""
+    
+    @pytest.mark.parametrize("line,kind", [
+        ("# LOG_0002: THE DESCENT", lexer.TITLE),
+        ("**Location**: Berlin", lexer.METADATA),
+        ("  ---  ", lexer.SCENE_BREAK),
+        ("***", lexer.SCENE_BREAK),
+        ("- Duration: 2:47", lexer.LIST_ITEM),
+        ('"We can\'t stop this." - Sarah', lexer.DIALOGUE),
+        ("[SIGNAL LOST]", lexer.BRACKET),
+        ("The facility was silent.", lexer.TEXT),
+        ("   ", lexer.BLANK),
+    ])
+    def test_line_kinds(self, line, kind):
+        """Each line type is recognized with one match."""
+        assert lexer.lex_line(line, 1).kind == kind
+    
+    def test_dialogue_captures(self):
+        """Dialogue text and speaker are captured."""
+        token = lexer.lex_line('"Run." — Marcus', 7)
+        
+        assert token.groups == ("Run.", "Marcus")
+        assert token.line_number == 7
+
+
+class TestIncrementalParsing:
+    """Test reparsing edited scripts."""
+    
+    @pytest.fixture
+    def script(self):
+        """A script with several scenes."""
+        scenes = [
+            "The bodies on the rooftop wore white uniforms.\n\n\"We can't stop this.\" - Sarah",
+            "The facility was dark and silent.\n[SIGNAL LOST]",
+            "Screens showing static filled the empty room.",
+        ]
+        return "# LOG_0003\n**Location**: Berlin\n\n---\n" + "\n---\n".join(scenes)
+    
+    @staticmethod
+    def _snapshot(result):
+        data = dataclasses.asdict(result)
+        data["characters"] = sorted(data["characters"])
+        return data
+    
+    @pytest.mark.parametrize("edit", [
+        lambda s: s.replace("dark and silent", "dark, silent and burning"),
+        lambda s: s.replace("The facility", "\"Move.\" - Marcus\nThe facility"),
+        lambda s: s.replace("\n---\nScreens", "\nScreens"),
+        lambda s: s.replace("Berlin", "Prague"),
+        lambda s: s + "\n---\nA new scene.",
+        lambda s: "",
+    ])
+    def test_reparse_matches_full_parse(self, script, edit):
+        """An incremental reparse gives the same result as parsing from scratch."""
+        parser = MarkdownScriptParser()
+        parser.parse(script)
+        edited = edit(script)
+        
+        incremental = parser.reparse(edited)
+        
+        assert self._snapshot(incremental) == self._snapshot(MarkdownScriptParser().parse(edited))
+    
+    def test_reparse_only_analyzes_touched_scene(self, script, monkeypatch):
+        """Scenes outside the edit are reused, with line numbers shifted."""
+        parser = MarkdownScriptParser()
+        before = parser.parse(script)
+        analyzed = []
+        original = parser.extract_visual_cues
+        monkeypatch.setattr(parser, "extract_visual_cues", lambda text: analyzed.append(text) or original(text))
+        
+        after = parser.reparse(script.replace("The facility", "\n\nThe facility"))
+        
+        assert analyzed == ["The facility was dark and silent."]
+        assert after.scenes[2].elements[0] is before.scenes[2].elements[0]
+        assert after.scenes[2].elements[0].line_number == 14
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Unit tests for adaptive client-side rate limiting and streamed image batches.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.adaptive_limiter import AdaptiveRateLimiter, parse_duration
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdaptiveRateLimiter:
+
+    def test_parse_duration_reads_provider_formats(self):
+        assert parse_duration("20ms") == pytest.approx(0.02)
+        assert parse_duration("6m0s") == 360.0
+        assert parse_duration("1.5") == 1.5
+        assert parse_duration("soon") is None
+
+    @pytest.mark.asyncio
+    async def test_window_keeps_requests_in_flight_continuously(self):
+        limiter = AdaptiveRateLimiter(max_concurrency=3)
+        in_flight = []
+        peak = 0
+
+        async def request(delay):
+            nonlocal peak
+            async with limiter.slot():
+                in_flight.append(delay)
+                peak = max(peak, len(in_flight))
+                await asyncio.sleep(delay)
+                in_flight.remove(delay)
+
+        # One slow request must not stop the others from cycling through
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(request(0.2), *(request(0.02) for _ in range(8)))
+
+        assert peak == 3
+        assert asyncio.get_running_loop().time() - started < 0.2 + 0.1
+        assert limiter.requests == 9
+
+    def test_429_halves_the_window_and_successes_widen_it(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(max_concurrency=4, clock=clock)
+
+        assert limiter.on_rate_limited({'retry-after': '2'}) == 2.0
+        assert limiter.concurrency == 2
+        assert limiter.paused_until == clock.now + 2.0
+        # No Retry-After: exponential backoff
+        assert limiter.on_rate_limited() == 2.0
+        assert limiter.concurrency == 1
+
+        limiter.on_success()
+        assert limiter.concurrency == 2
+        for _ in range(7):
+            limiter.on_success()
+        assert limiter.concurrency == 4
+
+    def test_headers_set_the_rate_and_pause_an_empty_budget(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(max_concurrency=3, clock=clock)
+
+        limiter.update_from_headers({
+            'x-ratelimit-limit-requests': '7',
+            'x-ratelimit-remaining-requests': '0',
+            'x-ratelimit-reset-requests': '8.57s'
+        })
+
+        assert limiter.get_stats()['requests_per_minute'] == pytest.approx(7)
+        assert limiter.tokens == 0
+        assert limiter.paused_until == pytest.approx(clock.now + 8.57)
+
+    def test_window_grows_to_the_reported_limit(self):
+        limiter = AdaptiveRateLimiter(clock=FakeClock())
+        assert limiter.concurrency == 3
+
+        limiter.update_from_headers({'x-ratelimit-limit-requests': '15'})
+        for _ in range(200):
+            limiter.on_success()
+        assert limiter.concurrency == 15
+
+        # A lower tier reported later shrinks the ceiling and the window
+        limiter.update_from_headers({'x-ratelimit-limit-requests': '5'})
+        assert limiter.concurrency == 5
+
+
+class FakeResponse:
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self.body
+
+    async def text(self):
+        return str(self.body)
+
+
+class FakePool:
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    from src.services.dalle3_client import OpenAIImageGenerator
+
+    generator = OpenAIImageGenerator(api_key="test")
+    generator.rate_limiter = AdaptiveRateLimiter(max_concurrency=2)
+
+    async def fake_download(url):
+        return f"/tmp/{url}.jpg"
+
+    monkeypatch.setattr(generator, "_download_and_resize_image", fake_download)
+    return generator
+
+
+class TestImageGeneratorRateLimiting:
+
+    @pytest.mark.asyncio
+    async def test_generate_image_retries_after_429(self, generator):
+        generator.http = FakePool([
+            FakeResponse(429, {'retry-after': '0.01'}, {'error': 'rate_limit_exceeded'}),
+            FakeResponse(200, {'x-ratelimit-limit-requests': '600'}, {'data': [{'url': 'img1'}]}),
+        ])
+
+        result = await generator.generate_image("rooftop at night")
+
+        assert result["success"] and result["resized_path"] == "/tmp/img1.jpg"
+        assert generator.http.calls == 2
+        assert generator.rate_limiter.rate_limited == 1
+
+    @pytest.mark.asyncio
+    async def test_exhausted_quota_is_not_retried(self, generator):
+        generator.http = FakePool([
+            FakeResponse(429, {}, {'error': {'code': 'insufficient_quota'}}),
+        ])
+
+        result = await generator.generate_image("rooftop at night")
+
+        assert not result["success"] and not result["rate_limited"]
+        assert generator.http.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_stream_yields_images_as_they_complete(self, generator, monkeypatch):
+        delays = {"slow harbour crane": 0.1, "empty street in the rain": 0.0}
+
+        async def fake_generate_image(prompt, **kwargs):
+            await asyncio.sleep(delays.get(prompt, 0.05))
+            return {"success": True, "resized_path": f"/tmp/{prompt}.jpg", "cost": 0.08}
+
+        monkeypatch.setattr(generator, "generate_image", fake_generate_image)
+
+        prompts = ["slow harbour crane", "empty street in the rain", "rain in the empty streets"]
+        order = [position async for position, _ in generator.generate_batch_stream(prompts)]
+
+        # The duplicate follows its representative, the slow image comes last
+        assert order == [1, 2, 0]
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Unit tests for incremental per-scene rebuilds.
+
+FFmpeg is replaced by a recorder that writes the output file, so the tests
+count encodes instead of running them.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from workers import build_cache
+from workers.build_cache import BuildCache, scene_stage_keys
+from workers.tasks import video_generation
+from workers.tasks.video_generation import ScriptParser, VideoComposer, build_generation_pipeline
+
+SCRIPT = """SCRIPT: Test
+[0:00] Opening
+Visual: City skyline
+Narration (calm): It began quietly.
+[0:20] Terminal
+ON-SCREEN TEXT: $ ls
+Narration (calm): Then the logs appeared.
+[0:45] Ending
+Visual: Sunrise
+Narration (calm): And it was over.
+"""
+
+
+@pytest.fixture
+def ffmpeg_calls(monkeypatch):
+    calls = []
+
+    def fake_ffmpeg(cmd):
+        calls.append(cmd)
+        Path(cmd[-1]).write_bytes(b"\x00\x00\x00\x18ftypisom" + str(len(calls)).encode())
+        return True
+
+    monkeypatch.setattr(video_generation, "_run_ffmpeg", fake_ffmpeg)
+    return calls
+
+
+def _build_assets(tmp_path, parsed_script, tag=""):
+    """Write real-looking stage outputs for every scene."""
+    scene_assets = {}
+    for index, scene in enumerate(parsed_script["scenes"]):
+        assets = {}
+        for stage in scene_stage_keys(parsed_script, index, {}):
+            path = tmp_path / f"{stage}_{index}{tag}.bin"
+            path.write_bytes(f"{stage}:{scene['raw_content']}".encode())
+            assets[stage] = [str(path)]
+        scene_assets[index] = assets
+    return scene_assets
+
+
+def _record_stages(cache, parsed_script, scene_assets):
+    for index, assets in scene_assets.items():
+        keys = scene_stage_keys(parsed_script, index, {})
+        for stage, files in assets.items():
+            cache.record_stage(keys[stage], files)
+
+
+class TestStageKeys:
+
+    def test_editing_narration_only_changes_that_voice_key(self):
+        parser = ScriptParser()
+        before = parser.parse_script(SCRIPT)
+        after = parser.parse_script(SCRIPT.replace("Then the logs appeared.", "Then errors appeared."))
+
+        changed = [
+            (index, stage)
+            for index in range(3)
+            for stage, key in scene_stage_keys(after, index, {}).items()
+            if scene_stage_keys(before, index, {})[stage] != key
+        ]
+        assert changed == [(1, "voice")]
+
+    def test_scenes_shifted_by_an_insertion_keep_their_keys(self):
+        parser = ScriptParser()
+        before = parser.parse_script(SCRIPT)
+        after = parser.parse_script(
+            SCRIPT.replace("[0:20] Terminal", "[0:20] Interlude\nVisual: Rain\n[0:30] Terminal")
+                  .replace("[0:45] Ending", "[0:55] Ending")
+        )
+
+        assert [scene_stage_keys(after, index, {}) for index in (0, 2, 3)] == \
+            [scene_stage_keys(before, index, {}) for index in range(3)]
+
+    def test_style_change_invalidates_visuals_only(self):
+        script = ScriptParser().parse_script(SCRIPT)
+        default = scene_stage_keys(script, 0, {"style": "techwear"})
+        vintage = scene_stage_keys(script, 0, {"style": "vintage"})
+
+        assert default["voice"] == vintage["voice"]
+        assert default["visual"] != vintage["visual"]
+
+
+class TestBuildCache:
+
+    def test_lookup_detects_modified_files(self, tmp_path):
+        cache = BuildCache("project", root=str(tmp_path / "cache"))
+        asset = tmp_path / "voice.mp3"
+        asset.write_bytes(b"ID3 real audio")
+        cache.record_stage("k", [str(asset)])
+
+        assert cache.lookup_stage("k") == [str(asset)]
+        asset.write_bytes(b"ID3 other audio!")
+        assert cache.lookup_stage("k") is None
+
+    def test_placeholders_are_not_cached(self, tmp_path):
+        cache = BuildCache("project", root=str(tmp_path / "cache"))
+        asset = tmp_path / "voice.mp3"
+        asset.write_bytes(b"MOCK_AUDIO_DUE_TO_API_ERROR")
+
+        assert not cache.record_stage("k", [str(asset)])
+        assert cache.lookup_stage("k") is None
+
+    def test_manifest_persists_across_instances(self, tmp_path):
+        asset = tmp_path / "clip.mp4"
+        asset.write_bytes(b"clip")
+        cache = BuildCache("project", root=str(tmp_path / "cache"))
+        cache.record_stage("k", [str(asset)])
+        cache.save()
+
+        assert BuildCache("project", root=str(tmp_path / "cache")).lookup_stage("k") == [str(asset)]
+
+    def test_concurrent_saves_keep_each_others_entries(self, tmp_path):
+        first = BuildCache("project", root=str(tmp_path / "cache"))
+        second = BuildCache("project", root=str(tmp_path / "cache"))
+        for name, cache in (("a", first), ("b", second)):
+            asset = tmp_path / f"{name}.mp3"
+            asset.write_bytes(b"ID3 " + name.encode())
+            cache.record_stage(name, [str(asset)])
+        first.save()
+        second.save()
+
+        merged = BuildCache("project", root=str(tmp_path / "cache"))
+        assert merged.lookup_stage("a") and merged.lookup_stage("b")
+
+    def test_dropped_segments_are_deleted_after_grace_period(self, tmp_path, monkeypatch):
+        cache = BuildCache("project", root=str(tmp_path / "cache"))
+        old, new = cache.segment_path("old"), cache.segment_path("new")
+        for path in (old, new):
+            Path(path).write_bytes(b"segment")
+        cache.record_segment("old", old)
+        cache.record_build([{"segment": "old", "stages": {}}])
+        cache.save()
+
+        cache.record_segment("new", new)
+        cache.record_build([{"segment": "new", "stages": {}}])
+        cache.save()
+        assert Path(old).exists()
+        assert cache.lookup_segment("old") is None
+
+        monkeypatch.setattr(build_cache, "RETIRED_SEGMENT_TTL", -1)
+        cache.save()
+        assert not Path(old).exists()
+        assert Path(new).exists()
+
+
+class TestIncrementalBuild:
+
+    def test_one_edited_scene_costs_one_stage_and_one_encode(self, tmp_path, ffmpeg_calls, monkeypatch):
+        monkeypatch.setattr(build_cache, "DEFAULT_CACHE_ROOT", str(tmp_path / "cache"))
+        parser = ScriptParser()
+        settings = {"project_id": "p1"}
+
+        # First build: everything is encoded
+        first = parser.parse_script(SCRIPT)
+        cache = BuildCache.for_job("job-1", settings)
+        assets = _build_assets(tmp_path, first)
+        _record_stages(cache, first, assets)
+        composer = VideoComposer("job-1", first, {})
+        assert composer.assemble_incremental(composer.build_scene_timeline(assets),
+                                             str(tmp_path / "out1.mp4"), cache)
+        assert composer.segments_encoded == 3
+
+        # Second build after editing one narration line
+        edited = parser.parse_script(SCRIPT.replace("Then the logs appeared.", "Then errors appeared."))
+        pipeline = build_generation_pipeline("job-2", edited, settings)
+        assert [(t.task, t.args[3]) for t in pipeline.tasks] == [("video_generation.scene_voice", 1)]
+
+        cache = BuildCache.for_job("job-2", settings)
+        new_voice = tmp_path / "voice_1_edited.bin"
+        new_voice.write_bytes(b"new narration audio")
+        assets = {r["scene_index"]: {} for r in pipeline.body.args[3]}
+        for r in pipeline.body.args[3]:
+            assets[r["scene_index"]][r["stage"]] = r["files"]
+        assets[1]["voice"] = [str(new_voice)]
+        cache.record_stage(scene_stage_keys(edited, 1, {})["voice"], [str(new_voice)])
+
+        ffmpeg_calls.clear()
+        composer = VideoComposer("job-2", edited, {})
+        assert composer.assemble_incremental(composer.build_scene_timeline(assets),
+                                             str(tmp_path / "out2.mp4"), cache)
+
+        assert composer.segments_encoded == 1
+        encodes = [cmd for cmd in ffmpeg_calls if "-filter_complex" in cmd]
+        assert len(encodes) == 1 and str(new_voice) in encodes[0]
+        remux = ffmpeg_calls[-1]
+        assert remux[remux.index("-c") + 1] == "copy"
+        # The superseded segment was dropped from the cache but kept on disk
+        # until other jobs of the project can no longer be using it
+        assert len(cache.manifest["segments"]) == 3
+        assert len(cache.manifest["retired"]) == 1
+        assert len(list((tmp_path / "cache" / "p1" / "segments").iterdir())) == 4
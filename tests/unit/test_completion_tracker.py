@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the remote generation completion tracker.
+
+Runs against a local mock Runway server with an in-memory Redis, and
+captures follow-up tasks instead of sending them to a broker.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import fakeredis
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from workers.completion_tracker import (
+    CompletionTracker, PendingGeneration, ENTRIES_KEY, PENDING_KEY, normalize_runway_task
+)
+
+FOLLOW_UP = 'workers.tasks.video_tasks.finalize_video_segment'
+
+
+class FakeCeleryApp:
+    """Records send_task calls."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_task(self, name, args=None, kwargs=None):
+        self.sent.append((name, args, kwargs))
+
+
+@pytest_asyncio.fixture
+async def runway_server():
+    """Mock Runway generations API that finishes after a few polls."""
+    state = {"polls": {}}
+
+    async def generation(request):
+        generation_id = request.match_info["generation_id"]
+        polls = state["polls"][generation_id] = state["polls"].get(generation_id, 0) + 1
+        if generation_id == "broken":
+            return web.json_response({"status": "failed", "error": "model error"})
+        if polls < 3:
+            return web.json_response({"status": "processing", "progress": polls * 40})
+        base = str(request.url.origin())
+        return web.json_response({
+            "status": "completed", "progress": 100, "video_url": f"{base}/files/{generation_id}.mp4"
+        })
+
+    app = web.Application()
+    app.router.add_get("/v1/generations/{generation_id}", generation)
+    server = TestServer(app)
+    await server.start_server()
+    yield str(server.make_url("/v1")), state
+    await server.close()
+
+
+@pytest.fixture
+def tracker():
+    celery = FakeCeleryApp()
+    return CompletionTracker(
+        redis_client=fakeredis.FakeRedis(), celery_app=celery,
+        min_interval=0, max_interval=0.05
+    )
+
+
+async def _drain(tracker, attempts=20):
+    for _ in range(attempts):
+        await tracker.poll_due()
+        if not tracker.pending_count():
+            return
+        await asyncio.sleep(0.05)
+
+
+class TestCompletionTracker:
+
+    @pytest.mark.asyncio
+    async def test_multiplexes_jobs_and_dispatches_follow_ups(self, tracker, runway_server):
+        base_url, state = runway_server
+        for remote_id in ("gen-a", "gen-b", "broken"):
+            tracker.register("runway", remote_id, FOLLOW_UP,
+                             args=["job-1", {"id": remote_id}], metadata={"base_url": base_url})
+
+        await _drain(tracker)
+
+        sent = {args[1]["id"]: kwargs["generation_result"] for _, args, kwargs in tracker.celery_app.sent}
+        assert sent["gen-a"]["status"] == "completed"
+        assert sent["gen-a"]["video_url"].endswith("/files/gen-a.mp4")
+        assert sent["broken"]["status"] == "failed"
+        assert state["polls"] == {"gen-a": 3, "gen-b": 3, "broken": 1}
+        assert tracker.redis.hlen(ENTRIES_KEY) == 0
+
+    @pytest.mark.asyncio
+    async def test_times_out_stalled_jobs(self, tracker, runway_server):
+        base_url, _ = runway_server
+        tracker.register("runway", "gen-slow", FOLLOW_UP, timeout=0, metadata={"base_url": base_url})
+
+        await tracker.poll_due()
+
+        (_, _, kwargs), = tracker.celery_app.sent
+        assert kwargs["generation_result"]["status"] == "timeout"
+
+    @pytest.mark.asyncio
+    async def test_webhook_event_finishes_job_once(self, tracker):
+        tracker.register("runway", "gen-hook", FOLLOW_UP, kwargs={"scene": 2})
+
+        event = {"status": "completed", "video_url": "https://cdn/x.mp4"}
+        assert await tracker.handle_event("runway", "gen-hook", event)
+        assert not await tracker.handle_event("runway", "gen-hook", event)
+        await tracker.poll_due()
+
+        (name, _, kwargs), = tracker.celery_app.sent
+        assert name == FOLLOW_UP
+        assert kwargs["scene"] == 2
+        assert tracker.checks_made == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_dispatch_is_retried_after_lease(self, tracker):
+        tracker.visibility_timeout = 0.05
+        tracker.register("runway", "gen-retry", FOLLOW_UP, timeout=0)
+        sent = tracker.celery_app.sent
+
+        def broker_down(*args, **kwargs):
+            raise ConnectionError("broker down")
+
+        tracker.celery_app.send_task = broker_down
+
+        assert await tracker.poll_due() == 0
+        assert tracker.redis.hexists(ENTRIES_KEY, "runway:gen-retry")
+        assert await tracker.poll_due() == 0  # still leased
+
+        del tracker.celery_app.send_task
+        await asyncio.sleep(0.06)
+        assert await tracker.poll_due() == 1
+
+        (_, _, kwargs), = sent
+        assert kwargs["generation_result"]["status"] == "timeout"
+        assert tracker.pending_count() == 0 and tracker.redis.hlen(ENTRIES_KEY) == 0
+
+    def test_claims_are_exclusive_until_the_lease_expires(self, tracker):
+        tracker.register("runway", "gen-lease", FOLLOW_UP)
+        other = CompletionTracker(redis_client=tracker.redis, celery_app=tracker.celery_app)
+
+        now = tracker.redis.zscore(PENDING_KEY, "runway:gen-lease")
+        assert [entry.remote_id for entry in tracker._claim_due(now)] == ["gen-lease"]
+        assert other._claim_due(now + 1) == []
+        assert [entry.remote_id for entry in other._claim_due(now + tracker.visibility_timeout)] == ["gen-lease"]
+
+    def test_unknown_provider_rejected(self, tracker):
+        with pytest.raises(ValueError):
+            tracker.register("pika", "x", FOLLOW_UP)
+
+
+class TestAdaptiveInterval:
+
+    def test_progress_schedules_near_estimated_finish(self):
+        tracker = CompletionTracker(redis_client=fakeredis.FakeRedis(), min_interval=1, max_interval=60)
+        entry = PendingGeneration("runway", "g", FOLLOW_UP, interval=1, last_checked_at=0)
+
+        # 20% in 10s -> ~40s remaining -> check again in ~20s
+        assert tracker.next_interval(entry, 20, now=10) == pytest.approx(20)
+
+    def test_no_progress_backs_off_to_max(self):
+        tracker = CompletionTracker(redis_client=fakeredis.FakeRedis(), min_interval=1,
+                                    max_interval=10, backoff=2)
+        entry = PendingGeneration("runway", "g", FOLLOW_UP, interval=8, last_progress=50)
+
+        assert tracker.next_interval(entry, 50, now=100) == 10
+
+    def test_normalize_runway_task(self):
+        done = normalize_runway_task({"status": "SUCCEEDED", "output": ["https://cdn/v.mp4"]})
+        running = normalize_runway_task({"status": "RUNNING", "progress": 0.25})
+
+        assert done == {"status": "completed", "progress": 100, "video_url": "https://cdn/v.mp4"}
+        assert running == {"status": "processing", "progress": 25.0}
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Unit tests for WebSocket event fan-out.
+
+Two buses sharing one in-memory Redis stand in for two API processes;
+fake sockets record what each client receives.
+"""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services.event_bus import ClientChannel, EventBus, topic_channel
+
+
+class FakeSocket:
+    """Records messages; blocks sends until released when gated."""
+
+    def __init__(self, gated=False):
+        self.received = []
+        self.gate = asyncio.Event()
+        if not gated:
+            self.gate.set()
+
+    async def send_json(self, message):
+        await self.gate.wait()
+        self.received.append(message)
+
+
+def _progress(job_id, value):
+    return {"type": "job_update", "jobId": job_id, "data": {"progress": value}}
+
+
+async def _settle():
+    await asyncio.sleep(0.01)
+
+
+class TestClientChannel:
+
+    @pytest.mark.asyncio
+    async def test_progress_is_coalesced_latest_wins(self):
+        socket = FakeSocket(gated=True)
+        channel = ClientChannel(socket.send_json)
+        channel.start()
+
+        channel.offer(_progress("a", 0))
+        await _settle()
+        for value in range(10, 101, 10):
+            channel.offer(_progress("a", value))
+        channel.offer({"type": "job_completed", "jobId": "a"})
+        await _settle()
+        socket.gate.set()
+        await _settle()
+
+        # The first update was already in flight; the rest collapse into the latest
+        assert [m["data"]["progress"] for m in socket.received[:2]] == [0, 100]
+        assert socket.received[2]["type"] == "job_completed"
+        assert channel.coalesced == 9
+        channel.close()
+
+    @pytest.mark.asyncio
+    async def test_overflowing_client_is_dropped(self):
+        socket = FakeSocket(gated=True)
+        drops = []
+        channel = ClientChannel(socket.send_json, on_drop=drops.append, max_pending=4)
+        channel.start()
+
+        results = [channel.offer({"type": "log", "n": n}) for n in range(6)]
+
+        assert results == [True] * 4 + [False] * 2
+        assert drops == ["send queue full"]
+        channel.close()
+
+    @pytest.mark.asyncio
+    async def test_stalled_send_times_out(self):
+        socket = FakeSocket(gated=True)
+        drops = []
+        channel = ClientChannel(socket.send_json, on_drop=drops.append, send_timeout=0.01)
+        channel.start()
+
+        channel.offer(_progress("a", 1))
+        await asyncio.sleep(0.05)
+
+        assert drops == ["send timed out"]
+        assert channel.closed
+
+
+class TestEventBus:
+
+    @pytest.mark.asyncio
+    async def test_worker_events_reach_every_process(self):
+        server = fakeredis.FakeServer()
+        delivered = {"api-1": [], "api-2": []}
+        buses = [
+            EventBus(lambda topic, message, name=name: delivered[name].append((topic, message)),
+                     redis_client=fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+            for name in delivered
+        ]
+        for bus in buses:
+            assert await bus.start()
+
+        # A Celery worker publishes with the synchronous client
+        worker = fakeredis.FakeRedis(server=server)
+        worker.publish(topic_channel("job:42"), json.dumps(_progress("42", 50)))
+        await buses[0].publish("job:7", _progress("7", 10))
+        await asyncio.sleep(0.1)
+
+        for received in delivered.values():
+            assert received == [("job:42", _progress("42", 50)), ("job:7", _progress("7", 10))]
+        for bus in buses:
+            await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_without_redis_delivers_locally(self):
+        delivered = []
+        bus = EventBus(lambda topic, message: delivered.append(topic), redis_url="redis://127.0.0.1:1/0")
+
+        assert not await bus.start()
+        await bus.publish("job:1", _progress("1", 5))
+
+        assert delivered == ["job:1"]
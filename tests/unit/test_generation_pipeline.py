@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the per-scene video generation pipeline.
+
+Stage helpers are replaced so no assets are rendered; tasks run eagerly.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from workers import build_cache
+from workers.tasks import video_generation
+from workers.tasks.video_generation import (
+    ScriptParser, build_generation_pipeline, _scene_script,
+    generate_scene_voice, assemble_generated_video
+)
+
+SCRIPT = """SCRIPT: Test
+[0:00] Opening
+Visual: City skyline
+Narration (calm): It began quietly.
+[0:20] Terminal
+ON-SCREEN TEXT: $ ls
+Narration (calm): Then the logs appeared.
+[0:45] Ending
+Visual: Sunrise
+"""
+
+
+@pytest.fixture
+def parsed_script():
+    return ScriptParser().parse_script(SCRIPT)
+
+
+@pytest.fixture(autouse=True)
+def cache_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_cache, "DEFAULT_CACHE_ROOT", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+class TestPipelineGraph:
+
+    def test_one_task_per_scene_stage_with_content(self, parsed_script):
+        pipeline = build_generation_pipeline("job-1", parsed_script, {})
+
+        stages = [(task.task, task.args[3]) for task in pipeline.tasks]
+        assert stages == [
+            ("video_generation.scene_voice", 0),
+            ("video_generation.scene_visuals", 0),
+            ("video_generation.scene_voice", 1),
+            ("video_generation.scene_ui", 1),
+            ("video_generation.scene_visuals", 2),
+        ]
+        assert pipeline.body.task == "video_generation.assemble"
+
+    def test_scene_script_keeps_time_window(self, parsed_script):
+        middle = _scene_script(parsed_script, 1)
+        last = _scene_script(parsed_script, 2)
+
+        assert middle["scenes"][0]["timestamp"] == "0:20"
+        assert middle["total_duration"] == 45
+        assert last["total_duration"] == parsed_script["total_duration"]
+
+
+class TestSceneStages:
+
+    def test_failed_scene_is_retried_on_its_own(self, parsed_script, monkeypatch, tmp_path):
+        calls = []
+        voice = tmp_path / "voice.mp3"
+        voice.write_bytes(b"ID3 real audio")
+
+        def flaky(job_id, scene_script, settings):
+            calls.append(scene_script["scenes"][0]["timestamp"])
+            if len(calls) < 3:
+                raise RuntimeError("TTS unavailable")
+            return [str(voice)]
+
+        monkeypatch.setattr(video_generation, "_generate_voice_narration", flaky)
+
+        result = generate_scene_voice.apply(
+            args=("job-1", _scene_script(parsed_script, 1), {}, 1)
+        ).get()
+
+        assert result == {"stage": "voice", "scene_index": 1, "files": [str(voice)]}
+        assert calls == ["0:20"] * 3
+
+    def test_placeholder_outputs_are_retried_and_reported(self, parsed_script, monkeypatch, tmp_path):
+        calls = []
+        placeholder = tmp_path / "voice.mp3"
+        placeholder.write_bytes(b"MOCK_AUDIO_DUE_TO_API_ERROR")
+
+        def falls_back(job_id, scene_script, settings):
+            calls.append(scene_script["scenes"][0]["timestamp"])
+            return [str(placeholder)]
+
+        monkeypatch.setattr(video_generation, "_generate_voice_narration", falls_back)
+
+        result = generate_scene_voice.apply(
+            args=("job-1", _scene_script(parsed_script, 0), {}, 0)
+        ).get()
+
+        assert len(calls) == 4
+        assert result["files"] == [str(placeholder)]
+        assert "placeholders" in result["error"]
+
+    def test_exhausted_retries_report_instead_of_raise(self, parsed_script, monkeypatch):
+        def broken(job_id, scene_script, settings):
+            raise RuntimeError("TTS unavailable")
+
+        monkeypatch.setattr(video_generation, "_generate_voice_narration", broken)
+
+        result = generate_scene_voice.apply(
+            args=("job-1", _scene_script(parsed_script, 0), {}, 0)
+        ).get()
+
+        assert result["files"] == []
+        assert result["error"] == "TTS unavailable"
+
+    def test_assembly_collects_results_in_scene_order(self, parsed_script, monkeypatch):
+        captured = {}
+
+        def fake_assemble(job_id, script, voice, ui, visual, settings, **kwargs):
+            captured.update(voice=voice, ui=ui, visual=visual)
+            return f"/tmp/{job_id}.mp4"
+
+        monkeypatch.setattr(video_generation, "_assemble_video", fake_assemble)
+
+        stage_results = [
+            {"stage": "visual", "scene_index": 2, "files": ["v2.mp4"]},
+            {"stage": "voice", "scene_index": 1, "files": ["a1.mp3"]},
+            {"stage": "voice", "scene_index": 0, "files": ["a0.mp3"]},
+            {"stage": "ui", "scene_index": 1, "files": [], "error": "render failed"},
+        ]
+        result = assemble_generated_video.apply(
+            args=(stage_results, "job-1", parsed_script, {})
+        ).get()
+
+        assert captured["voice"] == ["a0.mp3", "a1.mp3"]
+        assert captured["visual"] == ["v2.mp4"]
+        assert result["output_file"] == "/tmp/job-1.mp4"
+        assert result["failed_stages"] == [{"stage": "ui", "scene_index": 1, "error": "render failed"}]
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Unit tests for on-the-fly HLS packaging.
+
+ffmpeg is replaced by a recorder that writes a playlist, init segment and
+media segments, so the tests count packaging runs instead of running them.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils import hls_packager
+from src.utils.hls_packager import (
+    HLSPackager, PackagingError, SegmentCache, media_playlist, parse_media_playlist
+)
+
+DURATIONS = [4.0, 4.0, 2.5]
+
+
+@pytest.fixture
+def ffmpeg_calls(monkeypatch):
+    calls = []
+
+    async def fake_ffmpeg(cmd):
+        calls.append(cmd)
+        await asyncio.sleep(0)
+        output_dir = Path(cmd[-1]).parent
+        (output_dir / "init.mp4").write_bytes(b"\x00" * 100)
+        lines = ["#EXTM3U", "#EXT-X-MAP:URI=\"init.mp4\""]
+        for index, duration in enumerate(DURATIONS):
+            name = f"seg_{index:05d}.m4s"
+            (output_dir / name).write_bytes(b"\x00" * 1000)
+            lines += [f"#EXTINF:{duration},", name]
+        lines.append("#EXT-X-ENDLIST")
+        Path(cmd[-1]).write_text("\n".join(lines))
+        return True
+
+    monkeypatch.setattr(hls_packager, "_run_ffmpeg", fake_ffmpeg)
+    return calls
+
+
+@pytest.fixture
+def scenes(tmp_path):
+    paths = []
+    for index in range(3):
+        path = tmp_path / "scenes" / f"scene_{index + 1}.mp4"
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(f"video {index}".encode())
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def packager(tmp_path):
+    return HLSPackager(SegmentCache(root=str(tmp_path / "hls"), max_bytes=10 ** 9))
+
+
+class TestPlaylists:
+
+    def test_project_timeline_joins_scenes_with_discontinuities(self, packager, scenes, ffmpeg_calls):
+        packages = asyncio.run(_plan_all(packager, scenes))
+
+        text = media_playlist([(p, f"/seg/{p.package_id}") for p in packages])
+        assert text.count("#EXT-X-DISCONTINUITY") == 2
+        assert text.count("#EXT-X-MAP") == 3
+        assert "#EXT-X-TARGETDURATION:4" in text
+        assert len(parse_media_playlist(text)) == 9
+        # Stream copy, one packaging run per scene
+        assert len(ffmpeg_calls) == 3
+        assert all(cmd[cmd.index("-c") + 1] == "copy" for cmd in ffmpeg_calls)
+
+
+class TestPackager:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_package_once(self, packager, scenes, ffmpeg_calls):
+        packages = await asyncio.gather(*(packager.plan(scenes[0]) for _ in range(5)))
+
+        assert len(ffmpeg_calls) == 1
+        assert packages[0].segments == [(f"seg_{i:05d}.m4s", d) for i, d in enumerate(DURATIONS)]
+
+    @pytest.mark.asyncio
+    async def test_renditions_are_transcoded_lazily_on_source_boundaries(self, packager, scenes, ffmpeg_calls):
+        planned = await packager.plan(scenes[0], "480p")
+
+        assert not planned.packaged
+        assert len(ffmpeg_calls) == 1
+
+        path = await packager.segment_path(planned.package_id, "seg_00001.m4s")
+
+        assert path and path.exists()
+        transcode = ffmpeg_calls[-1]
+        assert transcode[transcode.index("-force_key_frames") + 1] == "4.000,8.000"
+        assert "scale=-2:480" in transcode
+
+    @pytest.mark.asyncio
+    async def test_unknown_package_or_file(self, packager, scenes, ffmpeg_calls):
+        package = await packager.plan(scenes[0])
+
+        assert await packager.segment_path("nope", "seg_00000.m4s") is None
+        assert await packager.segment_path(package.package_id, "../index.m3u8") is None
+        assert await packager.segment_path(package.package_id, "init.mp4")
+
+    @pytest.mark.asyncio
+    async def test_other_workers_resolve_packages_from_disk(self, packager, tmp_path, scenes, ffmpeg_calls):
+        planned = await packager.plan(scenes[0], "480p")
+        other = HLSPackager(SegmentCache(root=str(tmp_path / "hls"), max_bytes=10 ** 9))
+
+        path = await other.segment_path(planned.package_id, "seg_00000.m4s")
+        assert path and path.exists()
+        assert await packager.segment_path(planned.package_id, "seg_00000.m4s") == path
+        # The source was packaged once, the rendition once, by whichever worker came first
+        assert len(ffmpeg_calls) == 2
+        assert packager._locks == {} and other._locks == {}
+
+    @pytest.mark.asyncio
+    async def test_removed_source_is_unknown(self, packager, scenes, ffmpeg_calls):
+        planned = await packager.plan(scenes[0], "480p")
+        Path(scenes[0]).unlink()
+
+        assert await packager.segment_path(planned.package_id, "seg_00000.m4s") is None
+
+    @pytest.mark.asyncio
+    async def test_edited_scene_gets_new_package(self, packager, scenes, ffmpeg_calls):
+        before = await packager.plan(scenes[0])
+        Path(scenes[0]).write_bytes(b"re-rendered video")
+        after = await packager.plan(scenes[0])
+
+        assert before.package_id != after.package_id
+
+    @pytest.mark.asyncio
+    async def test_failed_packaging_raises(self, packager, scenes, monkeypatch):
+        async def failing_ffmpeg(cmd):
+            return False
+
+        monkeypatch.setattr(hls_packager, "_run_ffmpeg", failing_ffmpeg)
+
+        with pytest.raises(PackagingError):
+            await packager.plan(scenes[0])
+
+
+class TestSegmentCache:
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_package_is_evicted(self, tmp_path, scenes, ffmpeg_calls):
+        # Each package is 3100 bytes; room for two
+        packager = HLSPackager(SegmentCache(root=str(tmp_path / "hls"), max_bytes=7000))
+        first = await packager.plan(scenes[0])
+        await packager.plan(scenes[1])
+        await packager.plan(scenes[0])  # touch
+        await packager.plan(scenes[2])
+
+        cache = packager.cache
+        assert cache.evictions == 1
+        assert cache.get(first.package_id)
+        assert len(ffmpeg_calls) == 3
+
+        # Survives a restart
+        assert SegmentCache(root=str(tmp_path / "hls"), max_bytes=7000).get(first.package_id)
+
+
+async def _plan_all(packager, sources):
+    return await asyncio.gather(*(packager.plan(source) for source in sources))
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared provider HTTP pools.
+
+Runs the async provider clients against a local fake server so no real
+API credentials or network access are needed.
+"""
+
+import io
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.http_pool import AsyncHTTPPool, PoolConfig, get_http_pool
+from src.services.runway_ml_proper import AsyncRunwayMLClient
+from src.services.dalle3_client import OpenAIImageGenerator
+from src.services.elevenlabs_client import ElevenLabsClient
+
+
+VIDEO_BYTES = b"\x00\x00\x00\x18ftypmp42" + os.urandom(256 * 1024)
+
+
+def _png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 36), (200, 40, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest_asyncio.fixture
+async def fake_server():
+    """Local server emulating the Runway, OpenAI and ElevenLabs endpoints."""
+    state = {"polls": 0, "peers": set()}
+    app = web.Application()
+
+    def track(request):
+        state["peers"].add(request.transport.get_extra_info("peername"))
+
+    async def image_to_video(request):
+        track(request)
+        body = await request.json()
+        assert body["duration"] == 5
+        return web.json_response({"id": "task-1"})
+
+    async def task_status(request):
+        track(request)
+        state["polls"] += 1
+        if state["polls"] < 3:
+            return web.json_response({"status": "RUNNING"})
+        base = str(request.url.origin())
+        return web.json_response({"status": "SUCCEEDED", "output": [f"{base}/files/video.mp4"]})
+
+    async def video_file(request):
+        track(request)
+        return web.Response(body=VIDEO_BYTES, content_type="video/mp4")
+
+    async def image_file(request):
+        return web.Response(body=_png_bytes(), content_type="image/png")
+
+    async def images_generations(request):
+        base = str(request.url.origin())
+        return web.json_response({"data": [{"url": f"{base}/files/image.png", "revised_prompt": "p"}]})
+
+    async def tts(request):
+        assert request.headers["xi-api-key"] == "test-key"
+        return web.Response(body=b"ID3" + b"\x01" * 4096, content_type="audio/mpeg")
+
+    app.router.add_post("/v1/image_to_video", image_to_video)
+    app.router.add_get("/v1/tasks/{task_id}", task_status)
+    app.router.add_get("/files/video.mp4", video_file)
+    app.router.add_get("/files/image.png", image_file)
+    app.router.add_post("/images/generations", images_generations)
+    app.router.add_post("/text-to-speech/{voice_id}", tts)
+
+    server = TestServer(app)
+    await server.start_server()
+    yield str(server.make_url("")).rstrip("/"), state
+    await server.close()
+
+
+class TestAsyncHTTPPool:
+    """Tests for the pooled session itself."""
+
+    @pytest.mark.asyncio
+    async def test_session_reused_across_requests(self, fake_server):
+        base_url, state = fake_server
+        pool = AsyncHTTPPool("test", PoolConfig(limit_per_host=2))
+
+        for _ in range(5):
+            async with pool.request("GET", f"{base_url}/v1/tasks/x") as response:
+                assert response.status == 200
+                await response.read()
+
+        assert pool.sessions_created == 1
+        assert pool.requests_made == 5
+        # Keep-alive means a single TCP connection served every request
+        assert len(state["peers"]) == 1
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_download_streams_to_disk(self, fake_server, tmp_path):
+        base_url, _ = fake_server
+        pool = AsyncHTTPPool("test", PoolConfig(chunk_size=4096))
+
+        dest = tmp_path / "out" / "video.mp4"
+        written = await pool.download(f"{base_url}/files/video.mp4", dest)
+
+        assert written == len(VIDEO_BYTES)
+        assert dest.read_bytes() == VIDEO_BYTES
+        assert not (tmp_path / "out" / "video.mp4.part").exists()
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_download_leaves_no_partial_file(self, fake_server, tmp_path):
+        base_url, _ = fake_server
+        pool = AsyncHTTPPool("test")
+
+        dest = tmp_path / "missing.mp4"
+        with pytest.raises(Exception):
+            await pool.download(f"{base_url}/files/missing.mp4", dest)
+
+        assert list(tmp_path.iterdir()) == []
+        await pool.close()
+
+    def test_sessions_close_when_their_loop_shuts_down(self):
+        pool = AsyncHTTPPool("test")
+        sessions = []
+
+        async def use_pool():
+            sessions.append(await pool.get_session())
+            assert await pool.get_session() is sessions[-1]
+
+        for _ in range(3):
+            asyncio.run(use_pool())
+
+        assert all(session.closed for session in sessions)
+        assert pool.get_stats()["open_sessions"] == 0
+        assert not pool._sessions
+
+    def test_config_from_env(self, monkeypatch):
+        monkeypatch.setenv("ACME_HTTP_LIMIT_PER_HOST", "3")
+        monkeypatch.setenv("ACME_HTTP_DNS_CACHE_TTL", "not-a-number")
+
+        config = PoolConfig.from_env("acme")
+
+        assert config.limit_per_host == 3
+        assert config.dns_cache_ttl == PoolConfig().dns_cache_ttl
+
+    def test_registry_returns_shared_pool(self):
+        assert get_http_pool("runway") is get_http_pool("runway")
+        assert get_http_pool("runway") is not get_http_pool("openai")
+
+
+class TestProviderClients:
+    """Tests for clients rebuilt on the shared pools."""
+
+    @pytest.mark.asyncio
+    async def test_runway_generate_wait_download(self, fake_server, tmp_path):
+        base_url, state = fake_server
+        client = AsyncRunwayMLClient(api_key="test-key", base_url=base_url)
+
+        task = await client.generate_video_from_image(
+            image_url="data:image/png;base64,AAAA", prompt="rooftop", duration=5
+        )
+        assert task["id"] == "task-1"
+
+        video_url = await client.wait_for_completion("task-1", max_wait_time=5, poll_interval=0)
+        assert video_url.endswith("/files/video.mp4")
+        assert state["polls"] == 3
+
+        path = await client.download_video(video_url, str(tmp_path / "clip.mp4"))
+        assert Path(path).read_bytes() == VIDEO_BYTES
+        await client.http.close()
+
+    @pytest.mark.asyncio
+    async def test_dalle_generate_and_resize(self, fake_server):
+        base_url, _ = fake_server
+        client = OpenAIImageGenerator(api_key="test-key", base_url=base_url)
+
+        result = await client.generate_image("neon rooftop", enhance_for_video=False)
+
+        assert result["success"], result
+        with Image.open(result["resized_path"]) as image:
+            assert image.size == OpenAIImageGenerator.TARGET_RESOLUTION
+        os.unlink(result["resized_path"])
+        await client.http.close()
+
+    @pytest.mark.asyncio
+    async def test_elevenlabs_save_speech(self, fake_server, tmp_path):
+        base_url, _ = fake_server
+        client = ElevenLabsClient(api_key="test-key", base_url=base_url)
+
+        path = await client.save_speech_async("Hello there", "voice-1", tmp_path / "line.mp3")
+
+        assert Path(path).read_bytes().startswith(b"ID3")
+        await client.http.close()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared Aho-Corasick keyword matcher.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.keyword_matcher import KeywordMatch, KeywordMatcher, groups_present
+
+
+class TestKeywordMatcher:
+
+    def test_overlapping_and_nested_keywords_are_all_found(self):
+        matcher = KeywordMatcher(['he', 'she', 'his', 'hers'])
+
+        matches = list(matcher.iter_matches('ushers'))
+
+        assert matches == [
+            KeywordMatch('she', 1, 4),
+            KeywordMatch('he', 2, 4),
+            KeywordMatch('hers', 2, 6),
+        ]
+
+    def test_matching_folds_case_and_reports_keywords_as_given(self):
+        matcher = KeywordMatcher(['AI', 'golden hour'])
+
+        assert matcher.present('An ai watches the GOLDEN HOUR') == {'AI', 'golden hour'}
+        assert KeywordMatcher(['AI'], case_sensitive=True).present('an ai') == set()
+
+    def test_whole_words_skips_matches_inside_words(self):
+        matcher = KeywordMatcher(['end', 'a.i.'], whole_words=True)
+
+        assert matcher.present('The endless road') == set()
+        assert matcher.present('The end, said the a.i.') == {'end', 'a.i.'}
+
+    def test_counts_match_str_count_per_keyword(self):
+        matcher = KeywordMatcher(['aa', 'a', 'end'])
+        text = 'aaaa endend'
+
+        counts = matcher.counts(text)
+
+        assert counts == {keyword: text.count(keyword) for keyword in ['aa', 'a', 'end']}
+
+    def test_groups_present_keeps_definition_order(self):
+        groups = {'urgency': ['must', 'now'], 'fear': ['terror'], 'determined': ['will', 'must']}
+        matcher = KeywordMatcher(keyword for keywords in groups.values() for keyword in keywords)
+
+        assert groups_present(groups, matcher.present('We MUST go')) == ['urgency', 'determined']
+
+    def test_empty_vocabulary_matches_nothing(self):
+        matcher = KeywordMatcher(['', ''])
+
+        assert len(matcher) == 0
+        assert matcher.present('anything') == set()
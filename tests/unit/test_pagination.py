@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Unit tests for keyset pagination of project listings.
+
+Queries run against in-memory SQLite, which supports the same row-value
+comparison the Postgres indexes serve.
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, load_only
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.database.models import Base, Project, User
+from src.core.database.pagination import (
+    InvalidCursor,
+    build_page,
+    bounded_count_query,
+    decode_cursor,
+    encode_cursor,
+    keyset_query,
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__, Project.__table__])
+    with Session(engine) as session:
+        user = User(email="a@example.com", hashed_password="x", full_name="A")
+        session.add(user)
+        session.flush()
+        start = datetime(2024, 1, 1)
+        # Pairs of projects share a timestamp, so ties must be broken by id
+        for n in range(25):
+            session.add(Project(user_id=user.id, name=f"Project {n:02d}", script_content="x" * 1000,
+                                created_at=start + timedelta(hours=n // 2), updated_at=start))
+        session.commit()
+        session.user_id = user.id
+        yield session
+
+
+def _walk(db, sort_by, order, limit=10):
+    """Follow next_cursor until the listing is exhausted."""
+    base = select(Project).where(Project.user_id == db.user_id)
+    sort_column = getattr(Project, sort_by)
+    pages, cursor = [], None
+    while True:
+        after = decode_cursor(cursor, sort_column, sort_by, order) if cursor else None
+        query = keyset_query(base, sort_column, Project.id, order == "desc", limit, after)
+        page = build_page(db.execute(query).scalars().all(), limit, sort_by, order)
+        pages.append(page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+class TestKeyset:
+
+    @pytest.mark.parametrize("sort_by,order", [("created_at", "desc"), ("created_at", "asc"), ("name", "asc")])
+    def test_pages_cover_every_row_once_in_order(self, db, sort_by, order):
+        pages = _walk(db, sort_by, order)
+
+        rows = [p for page in pages for p in page]
+        keys = [(getattr(p, sort_by), p.id) for p in rows]
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert len({p.id for p in rows}) == 25
+        assert keys == sorted(keys, reverse=order == "desc")
+
+    def test_cursor_is_bound_to_its_ordering(self):
+        token = encode_cursor("created_at", "desc", datetime(2024, 1, 1), uuid4())
+
+        assert decode_cursor(token, Project.created_at, "created_at", "desc").value == datetime(2024, 1, 1)
+        with pytest.raises(InvalidCursor):
+            decode_cursor(token, Project.name, "name", "asc")
+        with pytest.raises(InvalidCursor):
+            decode_cursor("not-a-cursor", Project.created_at, "created_at", "desc")
+
+    def test_summary_query_uses_row_comparison_and_skips_large_columns(self):
+        after = decode_cursor(encode_cursor("name", "asc", "m", uuid4()), Project.name, "name", "asc")
+        query = keyset_query(select(Project).options(load_only(Project.id, Project.name)),
+                             Project.name, Project.id, False, 20, after)
+
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        assert "(projects.name, projects.id) > (" in sql
+        assert "script_content" not in sql and "metadata" not in sql
+        assert "OFFSET" not in sql
+
+
+class TestBoundedCount:
+
+    def test_count_stops_at_cap(self, db):
+        query = select(Project).options(load_only(Project.id)).where(Project.user_id == db.user_id)
+
+        assert db.execute(bounded_count_query(query, Project.id, 10)).scalar() == 11
+        assert db.execute(bounded_count_query(query, Project.id, 100)).scalar() == 25
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Unit tests for preview sprite sheets, WebVTT tracks and posters.
+
+ffmpeg is replaced by a recorder that writes colored sprite sheets, so the
+tests count decode passes instead of running them.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services import preview_assets
+from src.services.preview_assets import PreviewAssetService, PreviewSettings
+
+SETTINGS = PreviewSettings(interval=2.0, tile_width=16, tile_height=9, columns=5, rows=2)
+DURATION = 45.0  # 23 tiles -> 3 sheets of 10
+
+
+def _tile_color(index):
+    return (index * 10 % 256, 100, 200)
+
+
+@pytest.fixture
+def ffmpeg_calls(monkeypatch):
+    calls = []
+
+    def fake_ffmpeg(cmd):
+        calls.append(cmd)
+        sprite_pattern = Path(cmd[cmd.index('[sprites]') + 5])
+        for sheet in range(3):
+            image = Image.new('RGB', (16 * 5, 9 * 2))
+            for position in range(10):
+                row, column = divmod(position, 5)
+                tile = Image.new('RGB', (16, 9), _tile_color(sheet * 10 + position))
+                image.paste(tile, (column * 16, row * 9))
+            image.save(sprite_pattern.parent / f"sprite_{sheet + 1:03d}.jpg", quality=100)
+        Image.new('RGB', (64, 36), 'white').save(Path(cmd[-1]))
+        return True
+
+    monkeypatch.setattr(preview_assets, '_run_ffmpeg', fake_ffmpeg)
+    monkeypatch.setattr(preview_assets, '_probe_duration', lambda path: DURATION)
+    return calls
+
+
+@pytest.fixture
+def service(tmp_path):
+    return PreviewAssetService(str(tmp_path / '.thumbnails'), settings=SETTINGS)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / 'scene_1.mp4'
+    path.write_bytes(b'\x00\x00\x00\x18ftypisom' + b'frames' * 100)
+    return str(path)
+
+
+class TestPreviewGeneration:
+
+    def test_one_pass_produces_sprites_vtt_and_poster(self, service, video, ffmpeg_calls):
+        assets = service.get(video)
+
+        assert len(ffmpeg_calls) == 1
+        assert assets.count == 23
+        assert assets.sprites == ['sprite_001.jpg', 'sprite_002.jpg', 'sprite_003.jpg']
+        assert Path(assets.directory, assets.poster).exists()
+
+        vtt = Path(assets.directory, assets.vtt).read_text().split('\n')
+        assert vtt[0] == 'WEBVTT'
+        # Tile 12: second sheet, third column of the first row
+        cue = vtt.index('00:00:24.000 --> 00:00:26.000')
+        assert vtt[cue + 1] == 'sprite_002.jpg#xywh=32,0,16,9'
+        # Last cue ends at the video duration
+        assert '00:00:44.000 --> 00:00:45.000' in vtt
+
+    def test_repeat_requests_reuse_the_stored_set(self, service, video, ffmpeg_calls):
+        service.get(video)
+        service.frame_at(video, 3.0, str(Path(video).with_suffix('.a.jpg')))
+        service.poster(video)
+
+        assert len(ffmpeg_calls) == 1
+        assert service.hits == 2
+
+    def test_frame_at_crops_the_tile(self, service, video, ffmpeg_calls, tmp_path):
+        output = service.frame_at(video, 37.0, str(tmp_path / 'hover.jpg'))
+
+        with Image.open(output) as image:
+            assert image.size == (16, 9)
+            r, g, b = image.getpixel((8, 4))
+        assert abs(r - _tile_color(18)[0]) < 8 and abs(b - 200) < 8
+
+    def test_identical_content_shares_previews(self, service, video, ffmpeg_calls, tmp_path):
+        copy = tmp_path / 'copy.mp4'
+        copy.write_bytes(Path(video).read_bytes())
+
+        assert service.get(video).key == service.get(str(copy)).key
+        assert len(ffmpeg_calls) == 1
+
+    def test_index_survives_restart(self, service, video, ffmpeg_calls, tmp_path):
+        key = service.get(video).key
+
+        restarted = PreviewAssetService(str(tmp_path / '.thumbnails'), settings=SETTINGS)
+
+        assert restarted.cached(video).key == key
+
+
+class TestInvalidation:
+
+    def test_file_watcher_event_drops_previews(self, service, video, ffmpeg_calls):
+        directory = Path(service.get(video).directory)
+
+        service.handle_file_change(SimpleNamespace(event_type='modified', file_type='video', file_path=video))
+
+        assert not directory.exists()
+        assert service.invalidations == 1
+
+    def test_edited_video_gets_new_previews(self, service, video, ffmpeg_calls):
+        before = service.get(video).key
+        Path(video).write_bytes(b'\x00\x00\x00\x18ftypisom' + b're-rendered' * 100)
+
+        assert service.get(video).key != before
+        assert len(ffmpeg_calls) == 2
+        assert not (service.root / before).exists()
+
+    def test_failed_generation_raises(self, service, video, monkeypatch):
+        monkeypatch.setattr(preview_assets, '_run_ffmpeg', lambda cmd: False)
+        monkeypatch.setattr(preview_assets, '_probe_duration', lambda path: DURATION)
+
+        with pytest.raises(RuntimeError):
+            service.get(video)
+        assert service.cached(video) is None
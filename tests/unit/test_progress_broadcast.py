@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Unit tests for pushed operation progress.
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services.async_moviepy_wrapper import OperationProgress
+from src.services.operation_queue import OperationQueue
+from src.services import progress_broadcast
+from src.services.progress_broadcast import ProgressBroadcaster
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    broadcaster = ProgressBroadcaster(max_update_rate=20)  # 50 ms between updates
+    monkeypatch.setattr(progress_broadcast, "_progress_broadcaster", broadcaster)
+    return broadcaster
+
+
+class TestSubscription:
+
+    @pytest.mark.asyncio
+    async def test_updates_are_throttled_latest_wins(self, broadcaster):
+        subscription = broadcaster.subscribe("op")
+
+        broadcaster.publish("op", {"status": "running", "step": 1})
+        first = await subscription.get()
+        started = time.monotonic()
+        for step in range(2, 11):
+            broadcaster.publish("op", {"status": "running", "step": step})
+        second = await subscription.get()
+
+        assert (first["step"], second["step"]) == (1, 10)
+        assert time.monotonic() - started >= 0.04
+        assert subscription.dropped == 8
+
+    @pytest.mark.asyncio
+    async def test_terminal_state_is_not_delayed(self, broadcaster):
+        subscription = broadcaster.subscribe("op")
+        broadcaster.publish("op", {"status": "running"})
+        await subscription.get()
+
+        broadcaster.publish("op", {"status": "completed"})
+        update = await asyncio.wait_for(subscription.get(), 0.02)
+
+        assert update["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_close_wakes_waiter_and_unsubscribes(self, broadcaster):
+        subscription = broadcaster.subscribe("op")
+        waiter = asyncio.create_task(subscription.get())
+        await asyncio.sleep(0)
+
+        subscription.close()
+
+        assert await waiter is None
+        assert broadcaster.subscriber_count() == 0
+        broadcaster.publish("op", {"status": "running"})
+        assert broadcaster.published == 0
+
+    @pytest.mark.asyncio
+    async def test_progress_from_worker_thread(self, broadcaster):
+        subscription = broadcaster.subscribe("op")
+        progress = OperationProgress("op", total_steps=4)
+
+        thread = threading.Thread(target=progress.update, args=(2, "Trimming video"))
+        thread.start()
+        thread.join()
+        update = await asyncio.wait_for(subscription.get(), 1)
+
+        assert update["progress_percent"] == 50
+        assert update["message"] == "Trimming video"
+
+
+class TestOperationQueue:
+
+    @pytest.mark.asyncio
+    async def test_status_changes_are_pushed(self, broadcaster):
+        queue = OperationQueue(enable_persistence=False)
+        operation_id = await queue.add_operation("trim_video", {"input_path": "a.mp4"})
+        subscription = broadcaster.subscribe(operation_id)
+
+        assert (await queue.get_operation_status(operation_id))["status"] == "queued"
+        assert await queue.cancel_operation(operation_id)
+        update = await asyncio.wait_for(subscription.get(), 1)
+
+        assert update["status"] == "cancelled"
+        assert update["operation_type"] == "trim_video"
+        assert queue._queued_by_id == {}
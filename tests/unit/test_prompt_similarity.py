@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Unit tests for near-duplicate prompt detection and image reuse.
+"""
+
+import sys
+from pathlib import Path
+
+import fakeredis
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.prompts.prompt_similarity import (
+    PromptSimilarityIndex, RedisPromptIndex, cluster_prompts, normalize_tokens
+)
+
+
+class TestPromptSimilarityIndex:
+
+    def test_reordered_prompt_is_a_near_duplicate(self):
+        index = PromptSimilarityIndex(threshold=0.8)
+        index.add("rooftop at night, neon", "rooftop.png")
+
+        match = index.find("Neon rooftops at night")
+
+        assert normalize_tokens("Neon rooftops at night") == ["neon", "rooftop", "night"]
+        assert match.asset == "rooftop.png"
+        assert match.similarity == 1.0
+
+    def test_different_shots_and_formats_are_not_reused(self):
+        index = PromptSimilarityIndex(threshold=0.8)
+        index.add("rooftop at night, neon", "rooftop.png", style="vivid", size="1792x1024")
+
+        assert index.find("abandoned subway platform, flickering lights", "vivid", "1792x1024") is None
+        assert index.find("neon rooftop at night", "natural", "1792x1024") is None
+        assert index.find("neon rooftop at night", "vivid", "1024x1024") is None
+        assert PromptSimilarityIndex(threshold=0).find("rooftop at night, neon") is None
+
+    def test_descriptions_differing_in_one_content_word_are_different_shots(self):
+        index = PromptSimilarityIndex(threshold=0.8)
+        index.add("city at night", "night.mp4")
+        index.add("Man walks left", "left.mp4")
+
+        assert index.find("city at dawn") is None
+        assert index.find("Man walks right") is None
+
+    def test_cluster_prompts_maps_each_prompt_to_its_representative(self):
+        prompts = [
+            "rooftop at night, neon",
+            "server room with blinking lights",
+            "neon rooftop at night",
+            "blinking lights in a server room",
+            "empty street in the rain",
+        ]
+
+        assert cluster_prompts(prompts, threshold=0.8) == [0, 1, 0, 1, 4]
+        assert cluster_prompts(prompts, threshold=0) == [0, 1, 2, 3, 4]
+
+    def test_redis_index_is_shared_within_a_scope(self):
+        server = fakeredis.FakeServer()
+        writer = RedisPromptIndex(fakeredis.FakeRedis(server=server), "series-1", threshold=0.8)
+        reader = RedisPromptIndex(fakeredis.FakeRedis(server=server), "series-1", threshold=0.8)
+        other = RedisPromptIndex(fakeredis.FakeRedis(server=server), "series-2", threshold=0.8)
+
+        writer.add("rooftop at night, neon", "/visuals/rooftop.mp4", "techwear", "1920x1080")
+
+        assert reader.find("neon rooftop at night", "techwear", "1920x1080").asset == "/visuals/rooftop.mp4"
+        assert other.find("neon rooftop at night", "techwear", "1920x1080") is None
+        assert len(reader) == 1
+
+
+class TestBatchImageReuse:
+
+    @pytest.mark.asyncio
+    async def test_generate_batch_generates_one_image_per_cluster(self, monkeypatch):
+        from src.services.dalle3_client import OpenAIImageGenerator
+
+        generator = OpenAIImageGenerator(api_key="test")
+        calls = []
+
+        async def fake_generate_image(prompt, **kwargs):
+            calls.append(prompt)
+            return {"success": True, "resized_path": f"/tmp/{len(calls)}.jpg", "cost": 0.08}
+
+        monkeypatch.setattr(generator, "generate_image", fake_generate_image)
+
+        results = await generator.generate_batch(
+            ["rooftop at night, neon", "neon rooftop at night", "empty street in the rain"],
+            dedupe_threshold=0.8
+        )
+
+        assert calls == ["rooftop at night, neon", "empty street in the rain"]
+        assert results[1]["resized_path"] == results[0]["resized_path"]
+        assert results[1]["reused_from"] == 0 and results[1]["cost"] == 0.0
+        assert "reused_from" not in results[2]
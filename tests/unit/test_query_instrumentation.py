@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-request query instrumentation.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, selectinload
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.core.database.instrumentation import current_query_stats, instrument_engine, track_queries
+from src.core.database.models import Base, Project, Script, User
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__, Project.__table__, Script.__table__])
+    with Session(engine) as session:
+        user = User(email="a@example.com", hashed_password="x", full_name="A")
+        session.add(user)
+        session.flush()
+        for n in range(6):
+            project = Project(user_id=user.id, name=f"Project {n}", script_content="x")
+            project.scripts.append(Script(content="x"))
+            session.add(project)
+        session.commit()
+    instrument_engine(engine)
+    instrument_engine(engine)  # listeners are attached once
+    return engine
+
+
+class TestQueryTracking:
+
+    def test_lazy_relationship_shows_as_repeated_statement(self, engine):
+        with Session(engine) as session, track_queries() as queries:
+            for project in session.execute(select(Project)).scalars():
+                project.scripts
+
+        assert queries.count == 7
+        [(statement, repeats)] = queries.repeated_statements(5)
+        assert "FROM scripts" in statement and repeats == 6
+        assert queries.to_dict()["db_max_repeats"] == 6
+
+    def test_eager_loading_is_not_flagged(self, engine):
+        with Session(engine) as session, track_queries() as queries:
+            query = select(Project).options(selectinload(Project.scripts))
+            for project in session.execute(query).scalars():
+                project.scripts
+
+        assert queries.count == 2
+        assert queries.repeated_statements(5) == []
+        assert queries.total_time > 0
+
+    def test_untracked_queries_are_ignored(self, engine):
+        with Session(engine) as session:
+            session.execute(select(Project)).all()
+
+        assert current_query_stats() is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_are_counted_separately(self, engine):
+        async def request(queries_to_run):
+            with track_queries() as queries:
+                for _ in range(queries_to_run):
+                    with Session(engine) as session:
+                        session.execute(select(User)).all()
+                    await asyncio.sleep(0)
+            return queries.count
+
+        assert await asyncio.gather(request(2), request(5)) == [2, 5]
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Unit tests for GCRA rate limiting.
+
+The local fallback runs the same algorithm as the Redis script, so the
+bucket arithmetic is checked against it with a controllable clock.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.rate_limiter import GCRARateLimiter, RateLimit
+
+LIMIT = RateLimit(60, 60, burst=10)  # one per second, ten at once
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return GCRARateLimiter(clock=clock)
+
+
+class TestLocalBuckets:
+
+    @pytest.mark.asyncio
+    async def test_burst_then_sustained_rate(self, limiter, clock):
+        decisions = [await limiter.hit("ip", LIMIT) for _ in range(11)]
+
+        assert [d.allowed for d in decisions] == [True] * 10 + [False]
+        assert [d.remaining for d in decisions[:3]] == [9, 8, 7]
+        assert decisions[-1].retry_after == pytest.approx(1.0)
+        assert decisions[-1].retry_after_header == "1"
+
+        clock.now += 1.0
+        assert (await limiter.hit("ip", LIMIT)).allowed
+        assert not (await limiter.hit("ip", LIMIT)).allowed
+
+    @pytest.mark.asyncio
+    async def test_no_double_budget_at_window_edges(self, limiter, clock):
+        allowed = 0
+        # Hammer for two minutes, 10 requests every 100 ms
+        for _ in range(1200):
+            for _ in range(10):
+                allowed += (await limiter.hit("ip", LIMIT)).allowed
+            clock.now += 0.1
+
+        # Burst plus one per second, never a second window's worth on top
+        assert allowed == pytest.approx(10 + 120, abs=1)
+
+    @pytest.mark.asyncio
+    async def test_buckets_are_separate_and_memory_is_bounded(self, clock):
+        limiter = GCRARateLimiter(local_max_keys=100, clock=clock)
+
+        for n in range(1000):
+            assert (await limiter.hit(f"ip-{n}", LIMIT)).allowed
+
+        assert len(limiter._local) == 100
+        # A bucket is forgotten once it would have refilled anyway
+        clock.now += 1.0
+        assert limiter._local.get("rate_limit:ip-999") is None
+
+
+class TestRedisBackend:
+
+    @pytest.mark.asyncio
+    async def test_unreachable_redis_falls_back_without_retrying_each_request(self, clock):
+        limiter = GCRARateLimiter(redis_url="redis://127.0.0.1:1/0", clock=clock, redis_retry_interval=5)
+
+        decisions = [await limiter.hit("ip", LIMIT) for _ in range(11)]
+
+        assert [d.allowed for d in decisions] == [True] * 10 + [False]
+        assert limiter.redis_failures == 1
+        assert limiter.get_stats()["backend"] == "local"
+        clock.now += 5
+        assert limiter.using_redis
+        await limiter.redis_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_script_is_shared_by_every_client(self):
+        pytest.importorskip("lupa")
+        import fakeredis
+        import fakeredis.aioredis
+
+        server = fakeredis.FakeServer()
+        workers = [GCRARateLimiter(redis_client=fakeredis.aioredis.FakeRedis(server=server)) for _ in range(2)]
+
+        decisions = [await workers[n % 2].hit("ip", LIMIT) for n in range(11)]
+
+        assert [d.allowed for d in decisions] == [True] * 10 + [False]
+        assert decisions[0].remaining == 9
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Unit tests for seeded procedural rendering and the render cache.
+
+ffmpeg is replaced by a recorder that writes the output file, so the
+tests count placeholder renders instead of running them.
+"""
+
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.render_cache import (
+    RenderCache, child_seed, make_np_rng, make_rng, render_key, render_seed
+)
+
+
+class TestRenderSeeds:
+
+    def test_seed_depends_on_prompt_style_and_seed(self):
+        base = render_seed("rooftop at night", "cinematic", 7)
+
+        assert render_seed("rooftop at night", "cinematic", 7) == base
+        assert render_seed("rooftop at dawn", "cinematic", 7) != base
+        assert render_seed("rooftop at night", "noir", 7) != base
+        assert render_seed("rooftop at night", "cinematic", 8) != base
+        assert 0 <= base < 2 ** 64
+
+    def test_child_streams_are_reproducible_and_independent(self):
+        seed = render_seed("server room", "cinematic")
+
+        assert make_rng(child_seed(seed, 'frame', 3)).random() == \
+            make_rng(child_seed(seed, 'frame', 3)).random()
+        assert child_seed(seed, 'frame', 3) != child_seed(seed, 'frame', 4)
+        assert (make_np_rng(seed).normal(size=4) == make_np_rng(seed).normal(size=4)).all()
+
+    def test_key_covers_renderer_version_and_settings(self):
+        key = render_key('scene', 1, 42, resolution="640x360", fps=24)
+
+        assert key == render_key('scene', 1, 42, fps=24, resolution="640x360")
+        assert key.startswith('scene-v1-')
+        assert render_key('scene', 2, 42, resolution="640x360", fps=24) != key
+        assert render_key('scene', 1, 42, resolution="1280x720", fps=24) != key
+
+
+class TestRenderCache:
+
+    def test_segments_round_trip_and_survive_restart(self, tmp_path):
+        source = tmp_path / "render.mp4"
+        source.write_bytes(b"\x01" * 100)
+        cache = RenderCache(root=str(tmp_path / "cache"))
+
+        cache.put("clip", str(source))
+        assert source.exists()
+        assert cache.fetch("clip", str(tmp_path / "copy.mp4"))
+        assert (tmp_path / "copy.mp4").read_bytes() == source.read_bytes()
+        assert not cache.fetch("other", str(tmp_path / "missing.mp4"))
+
+        restarted = RenderCache(root=str(tmp_path / "cache"))
+        assert restarted.get("clip") is not None
+
+    def test_frames_are_stored_losslessly(self, tmp_path):
+        cache = RenderCache(root=str(tmp_path))
+        frame = Image.effect_noise((64, 36), 40).convert('RGB')
+
+        cache.put_frame("frame", frame)
+
+        assert cache.get_frame("frame").tobytes() == frame.tobytes()
+        assert cache.get_frame("missing") is None
+
+    def test_least_recently_used_renders_are_evicted(self, tmp_path):
+        source = tmp_path / "render.mp4"
+        source.write_bytes(b"\x00" * 400)
+        cache = RenderCache(root=str(tmp_path / "cache"), max_bytes=1000)
+
+        cache.put("a", str(source))
+        cache.put("b", str(source))
+        cache.get("a")
+        cache.put("c", str(source))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_processes_sharing_a_root_see_one_cache(self, tmp_path):
+        source = tmp_path / "render.mp4"
+        source.write_bytes(b"\x00" * 400)
+        first = RenderCache(root=str(tmp_path / "cache"), max_bytes=1000)
+        second = RenderCache(root=str(tmp_path / "cache"), max_bytes=1000)
+
+        first.put("a", str(source))
+        assert second.get("a") is not None
+
+        # The second process's writes count against the shared limit
+        second.put("b", str(source))
+        first.get("a")
+        second.put("c", str(source))
+
+        assert first.get("b") is None
+        assert first.get("a") is not None and first.get("c") is not None
+        assert len(list((tmp_path / "cache").iterdir())) == 2
+
+
+@pytest.fixture
+def ffmpeg_calls(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        Path(cmd[-1]).write_bytes(b"\x00" * 100)
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    return calls
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from src.services.runway_client import RunwayClient
+
+    monkeypatch.setenv('RUNWAY_CINEMATIC_MODE', 'false')
+    client = RunwayClient()
+    client.render_cache = RenderCache(root=str(tmp_path / "cache"))
+    return client
+
+
+class TestPlaceholderRenders:
+
+    def test_repeated_placeholder_is_copied_from_the_cache(self, client, ffmpeg_calls, tmp_path):
+        for job_id in ("job1", "job2"):
+            client._create_enhanced_placeholder(job_id, "rooftop at night", 5.0, "1920x1080", "cinematic", 7)
+
+        assert client._render_enhanced_placeholder("placeholder://enhanced/job1.mp4",
+                                                   str(tmp_path / "first.mp4"))
+        assert client._render_enhanced_placeholder("placeholder://enhanced/job2.mp4",
+                                                   str(tmp_path / "second.mp4"))
+
+        assert len(ffmpeg_calls) == 1
+        assert (tmp_path / "second.mp4").exists()
+
+    def test_noise_is_seeded_from_the_request(self, client, ffmpeg_calls, tmp_path):
+        client._create_enhanced_placeholder("job1", "rooftop at night", 5.0, "1920x1080", "cinematic", 7)
+        client._create_enhanced_placeholder("job2", "rooftop at night", 5.0, "1920x1080", "cinematic", 8)
+
+        for job_id in ("job1", "job2"):
+            client._render_enhanced_placeholder(f"placeholder://enhanced/{job_id}.mp4",
+                                                str(tmp_path / f"{job_id}.mp4"))
+
+        graphs = [cmd[cmd.index('-filter_complex') + 1] for cmd in ffmpeg_calls]
+        assert len(graphs) == 2
+        assert all("allf=t:all_seed=" in graph for graph in graphs)
+        assert graphs[0] != graphs[1]
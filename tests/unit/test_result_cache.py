@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the content-hash result cache and the script codec.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import fakeredis
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.script_engine.analyzer import ScriptAnalysis, ScriptAnalyzer
+from src.script_engine.parser import Dialogue, MarkdownScriptParser, Narrative
+from src.script_engine.serialization import pack, unpack, pack_script, unpack_script
+from src.services.script_parser_service import ScriptParserService, parse_script_cached
+from src.utils import result_cache
+from src.utils.result_cache import ResultCache
+
+SCRIPT = """# LOG_0001: CACHE
+
+**Location**: Berlin, Sector 7
+
+---
+
+The bodies on the rooftop wore white uniforms, arranged in perfect symmetry.
+
+"We can't stop this." - Sarah
+
+---
+
+Rain hammered the abandoned streets while drones drifted overhead.
+"""
+
+
+class Counter:
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"scenes": [{"number": 1, "prompts": ["dark"]}], "total": 1.5}
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+class TestResultCache:
+
+    def test_second_process_reuses_result_through_redis(self, server):
+        api = ResultCache(redis_client=fakeredis.FakeRedis(server=server))
+        worker = ResultCache(redis_client=fakeredis.FakeRedis(server=server))
+        compute = Counter()
+
+        first = api.get_or_compute("log_script", "1", SCRIPT, compute)
+        second = worker.get_or_compute("log_script", "1", SCRIPT, compute)
+        worker.get_or_compute("log_script", "1", SCRIPT, compute)
+
+        assert compute.calls == 1
+        assert first == second
+        assert worker.get_stats()["redis_hits"] == 1
+        assert worker.get_stats()["local_hits"] == 1
+
+    def test_version_style_and_content_are_part_of_the_key(self, server):
+        cache = ResultCache(redis_client=fakeredis.FakeRedis(server=server))
+        compute = Counter()
+
+        cache.get_or_compute("log_script", "1", SCRIPT, compute)
+        cache.get_or_compute("log_script", "2", SCRIPT, compute)
+        cache.get_or_compute("log_script", "1", SCRIPT, compute, style="noir")
+        cache.get_or_compute("log_script", "1", SCRIPT + " ", compute)
+
+        assert compute.calls == 4
+
+    def test_hits_are_fresh_copies(self):
+        cache = ResultCache()
+        cache.get_or_compute("log_script", "1", SCRIPT, Counter())["scenes"].clear()
+
+        assert cache.get_or_compute("log_script", "1", SCRIPT, Counter())["scenes"]
+
+    def test_failed_computations_are_not_cached(self):
+        cache = ResultCache()
+
+        def fail():
+            raise ValueError("invalid script")
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute("log_script", "1", SCRIPT, fail)
+        assert cache.get_or_compute("log_script", "1", SCRIPT, Counter())["total"] == 1.5
+
+    def test_unreachable_redis_falls_back_to_local_entries(self):
+        cache = ResultCache(redis_url="redis://127.0.0.1:1/0", redis_retry_interval=60)
+        compute = Counter()
+
+        cache.get_or_compute("log_script", "1", SCRIPT, compute)
+        cache.get_or_compute("log_script", "1", SCRIPT, compute)
+
+        assert compute.calls == 1
+        assert cache.redis_failures == 1
+        assert cache.get_stats()["backend"] == "local"
+
+
+class TestScriptCodec:
+
+    def test_parsed_script_round_trip_keeps_element_types(self):
+        script = MarkdownScriptParser().parse(SCRIPT)
+
+        restored = unpack_script(pack_script(script))
+
+        assert restored == script
+        assert isinstance(restored.scenes[0].elements[0], Narrative)
+        assert isinstance(restored.scenes[0].elements[1], Dialogue)
+
+    def test_analysis_round_trip_keeps_tuples(self):
+        script = MarkdownScriptParser().parse(SCRIPT)
+        analysis = ScriptAnalyzer(cache=ResultCache()).analyze(script)
+
+        restored = unpack(pack(analysis), ScriptAnalysis)
+
+        assert restored == analysis
+        assert isinstance(restored.timing.longest_scene, tuple)
+
+    def test_analyzer_reuses_analysis_of_identical_source(self, server):
+        first = ScriptAnalyzer(cache=ResultCache(redis_client=fakeredis.FakeRedis(server=server)))
+        second = ScriptAnalyzer(cache=ResultCache(redis_client=fakeredis.FakeRedis(server=server)))
+
+        analysis = first.analyze(MarkdownScriptParser().parse(SCRIPT))
+        reused = second.analyze(MarkdownScriptParser().parse(SCRIPT))
+
+        assert reused == analysis
+        assert second.cache.get_stats()["redis_hits"] == 1
+        assert second.scene_analyses == analysis.scenes
+
+
+class TestCanonicalScriptParse:
+
+    LOG_SCRIPT = "SCRIPT: Cache\n[0:00] Intro\nVisual: a terminal\nNarration (calm): hello\n"
+
+    def test_workers_and_service_share_one_parse(self, server, monkeypatch):
+        monkeypatch.setattr(result_cache, "_result_cache",
+                            ResultCache(redis_client=fakeredis.FakeRedis(server=server)))
+        calls = []
+        parse = ScriptParserService._parse
+        monkeypatch.setattr(ScriptParserService, "_parse",
+                            lambda self, content: calls.append(content) or parse(self, content))
+
+        from workers.tasks.video_generation import ScriptParser
+        worker = ScriptParser().parse_script(self.LOG_SCRIPT)
+        service = asyncio.run(ScriptParserService().parse_script(self.LOG_SCRIPT))
+
+        assert worker == service
+        assert parse_script_cached(self.LOG_SCRIPT)["directives"]["scene_count"] == 0
+        assert len(calls) == 1
+
+    def test_service_rejects_scripts_without_scenes(self, server, monkeypatch):
+        monkeypatch.setattr(result_cache, "_result_cache",
+                            ResultCache(redis_client=fakeredis.FakeRedis(server=server)))
+
+        with pytest.raises(ValueError):
+            asyncio.run(ScriptParserService().parse_script("SCENE 1: no timestamps"))
+        assert parse_script_cached("SCENE 1: no timestamps")["directives"]["scene_count"] == 1
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scene index Redis access patterns.
+
+Runs against an in-memory Redis and counts round trips: single commands
+through execute_command and pipelines through execute. Incremental updates
+are checked by forbidding or counting directory scans.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+
+import fakeredis.aioredis
+import pytest
+import pytest_asyncio
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services.scene_index_manager import SceneFileDelta, SceneIndexManager
+from src.utils.ttl_cache import TTLCache
+
+PROJECT = "proj"
+
+
+class RoundTripCounter:
+    """Wraps a Redis client and counts commands sent to the server."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+        original_execute = client.execute_command
+        original_pipeline = client.pipeline
+
+        async def execute_command(*args, **kwargs):
+            self.commands.append(args[0])
+            return await original_execute(*args, **kwargs)
+
+        def pipeline(*args, **kwargs):
+            pipe = original_pipeline(*args, **kwargs)
+            original_pipe_execute = pipe.execute
+
+            async def execute(*a, **kw):
+                self.commands.append("PIPELINE")
+                return await original_pipe_execute(*a, **kw)
+
+            pipe.execute = execute
+            return pipe
+
+        client.execute_command = execute_command
+        client.pipeline = pipeline
+
+    def reset(self):
+        self.commands.clear()
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for number in range(1, 101):
+        video_dir = tmp_path / "output" / "projects" / PROJECT / f"scene_{number}" / "video"
+        video_dir.mkdir(parents=True)
+        (video_dir / f"scene_{number}.mp4").write_bytes(b"video")
+    return tmp_path / "output" / "projects" / PROJECT
+
+
+@pytest_asyncio.fixture
+async def manager():
+    manager = SceneIndexManager(local_cache_ttl=0)
+    manager.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    manager.round_trips = RoundTripCounter(manager.redis_client)
+    yield manager
+    await manager.redis_client.aclose()
+
+
+TARGETS = [f"scene_{n}" for n in range(1, 101)]
+
+
+class TestBatchLookup:
+
+    @pytest.mark.asyncio
+    async def test_cached_batch_is_one_round_trip(self, manager, project_dir):
+        first = await manager.find_scene_videos(TARGETS, PROJECT)
+        assert all(first.values())
+        # One HMGET, one pipelined write-back of the 100 scanned paths
+        assert manager.round_trips.commands == ["HMGET", "PIPELINE"]
+
+        manager.round_trips.reset()
+        second = await manager.find_scene_videos(TARGETS, PROJECT)
+
+        assert second == first
+        assert manager.round_trips.commands == ["HMGET"]
+
+    @pytest.mark.asyncio
+    async def test_deleted_file_is_rescanned(self, manager, project_dir):
+        await manager.find_scene_videos(["scene_3"], PROJECT)
+        (project_dir / "scene_3" / "video" / "scene_3.mp4").unlink()
+
+        assert await manager.find_scene_video("scene_3", PROJECT) is None
+        assert await manager.redis_client.hget("scene_map:proj", "scene_3") is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_targets(self, manager, project_dir):
+        result = await manager.find_scene_videos(["scene_1", "intro"], PROJECT)
+
+        assert result["intro"] is None and result["scene_1"]
+
+    @pytest.mark.asyncio
+    async def test_misses_are_scanned_concurrently(self, manager, project_dir, monkeypatch):
+        scan = manager._scan_scene_video
+        lock = threading.Lock()
+        running, peak = 0, 0
+
+        def slow_scan(scene_id, project_id):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return scan(scene_id, project_id)
+
+        monkeypatch.setattr(manager, "SCAN_CONCURRENCY", 4)
+        monkeypatch.setattr(manager, "_scan_scene_video", slow_scan)
+        result = await manager.find_scene_videos(TARGETS[:20], PROJECT)
+
+        assert all(result.values())
+        assert 1 < peak <= 4
+
+
+class TestLocalCache:
+
+    @pytest.mark.asyncio
+    async def test_hot_lookups_skip_redis(self, manager, project_dir):
+        manager._local_cache = TTLCache(ttl=60)
+        await manager.find_scene_videos(TARGETS[:10], PROJECT)
+
+        manager.round_trips.reset()
+        result = await manager.find_scene_videos(TARGETS[:10], PROJECT)
+
+        assert all(result.values())
+        assert manager.round_trips.commands == []
+
+    def test_ttl_and_lru_eviction(self):
+        now = [0.0]
+        cache = TTLCache(maxsize=2, ttl=5, clock=lambda: now[0])
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None  # least recently used
+        now[0] = 6
+        assert cache.get("a") is None  # expired
+
+
+class TestInvalidation:
+
+    @pytest.mark.asyncio
+    async def test_project_invalidation_unlinks_without_keys(self, manager, project_dir):
+        manager._local_cache = TTLCache(ttl=60)
+        await manager.find_scene_videos(TARGETS, PROJECT)
+        await manager.redis_client.set("scene_index:project:proj", "{}")
+
+        manager.round_trips.reset()
+        await manager.invalidate_scene_cache(PROJECT)
+
+        assert manager.round_trips.commands == ["UNLINK"]
+        assert not await manager.redis_client.exists("scene_map:proj", "scene_index:project:proj")
+        assert len(manager._local_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_scene_invalidation(self, manager, project_dir):
+        await manager.find_scene_videos(["scene_1", "scene_2"], PROJECT)
+
+        await manager.invalidate_scene_cache(PROJECT, "scene_1")
+
+        assert await manager.redis_client.hkeys("scene_map:proj") == ["scene_2"]
+
+
+class TestProjectIndex:
+
+    @pytest.mark.asyncio
+    async def test_stored_index_is_served_without_rescan(self, manager, project_dir, monkeypatch):
+        videos = await manager.get_all_scene_videos(PROJECT)
+        assert len(videos) == 100 and videos[0].endswith("scene_1.mp4")
+
+        async def no_rebuild(project_id):
+            raise AssertionError("index should be served from Redis")
+
+        monkeypatch.setattr(manager, "_rebuild_project_index", no_rebuild)
+        assert await manager.get_all_scene_videos(PROJECT) == videos
+
+
+class TestIncrementalIndex:
+
+    @staticmethod
+    async def _stored_index(manager):
+        raw = await manager.redis_client.get("scene_index:project:proj")
+        return manager._load_project_index(raw)
+
+    @staticmethod
+    def _forbid_scans(manager, monkeypatch):
+        async def no_rebuild(project_id):
+            raise AssertionError("index should be patched, not rebuilt")
+
+        def no_scan(*args):
+            raise AssertionError("no directory should be listed")
+
+        monkeypatch.setattr(manager, "_rebuild_project_index", no_rebuild)
+        monkeypatch.setattr(manager, "_scan_media_dir", no_scan)
+
+    @pytest.mark.asyncio
+    async def test_deltas_patch_index_in_place(self, manager, project_dir, monkeypatch):
+        await manager.get_all_scene_videos(PROJECT)
+        self._forbid_scans(manager, monkeypatch)
+        audio = project_dir / "scene_5" / "audio" / "narration.mp3"
+        audio.parent.mkdir()
+        audio.write_bytes(b"audio")
+        (project_dir / "scene_3" / "video" / "scene_3.mp4").unlink()
+
+        assert await manager.apply_file_changes(PROJECT, [
+            SceneFileDelta("created", str(audio), file_size=5, last_modified=1.0),
+            SceneFileDelta("deleted", str(project_dir / "scene_3" / "video" / "scene_3.mp4")),
+        ])
+
+        index = await self._stored_index(manager)
+        assert "scene_3" not in index.scenes
+        assert [f.file_type for f in index.scenes["scene_5"]] == ["video", "audio"]
+        assert index.total_files == 100
+        assert len(await manager.get_all_scene_videos(PROJECT)) == 99
+
+    @pytest.mark.asyncio
+    async def test_move_drops_stale_lookup(self, manager, project_dir, monkeypatch):
+        await manager.get_all_scene_videos(PROJECT)
+        await manager.find_scene_videos(["scene_1", "scene_2"], PROJECT)
+        self._forbid_scans(manager, monkeypatch)
+        source = project_dir / "scene_2" / "video" / "scene_2.mp4"
+        target = source.with_name("runway_generated.mp4")
+        source.rename(target)
+
+        await manager.apply_file_changes(PROJECT, [
+            SceneFileDelta("moved", str(source), dest_path=str(target)),
+        ])
+
+        index = await self._stored_index(manager)
+        assert [f.file_path for f in index.scenes["scene_2"]] == [
+            "output/projects/proj/scene_2/video/runway_generated.mp4"
+        ]
+        assert index.scenes["scene_2"][0].file_size == len(b"video")
+        assert await manager.redis_client.hkeys("scene_map:proj") == ["scene_1"]
+
+    @pytest.mark.asyncio
+    async def test_deltas_without_index_only_drop_lookups(self, manager, project_dir):
+        await manager.find_scene_videos(["scene_1", "scene_2"], PROJECT)
+
+        await manager.apply_file_changes(PROJECT, [
+            SceneFileDelta("modified", str(project_dir / "scene_1" / "video" / "scene_1.mp4")),
+            SceneFileDelta("created", str(project_dir / "scene_1" / "notes.txt")),
+        ])
+
+        assert await manager.redis_client.hkeys("scene_map:proj") == ["scene_2"]
+        assert not await manager.redis_client.exists("scene_index:project:proj")
+
+
+class TestReconciliation:
+
+    @pytest.mark.asyncio
+    async def test_only_changed_directories_are_rescanned(self, manager, project_dir, monkeypatch):
+        await manager.get_all_scene_videos(PROJECT)
+        scanned = []
+        original_scan = manager._scan_media_dir
+
+        def counting_scan(project_id, scene_id, file_type, media_dir):
+            scanned.append(f"{scene_id}/{media_dir.name}")
+            return original_scan(project_id, scene_id, file_type, media_dir)
+
+        monkeypatch.setattr(manager, "_scan_media_dir", counting_scan)
+        # Changes made while no events were delivered
+        (project_dir / "scene_7" / "video" / "extra.mp4").write_bytes(b"video")
+        _bump_mtime(project_dir / "scene_7" / "video")
+        new_scene = project_dir / "scene_101" / "video"
+        new_scene.mkdir(parents=True)
+        (new_scene / "scene_101.mp4").write_bytes(b"video")
+        for path in (project_dir / "scene_4" / "video").iterdir():
+            path.unlink()
+        (project_dir / "scene_4" / "video").rmdir()
+        (project_dir / "scene_4").rmdir()
+        _bump_mtime(project_dir)
+
+        index = await manager.reconcile_project_index(PROJECT)
+
+        assert sorted(scanned) == ["scene_101/video", "scene_7/video"]
+        assert len(index.scenes["scene_7"]) == 2
+        assert "scene_4" not in index.scenes and "scene_101" in index.scenes
+        assert index.total_files == 101
+
+        scanned.clear()
+        assert await manager.reconcile_project_index(PROJECT)
+        assert scanned == []
+
+    @pytest.mark.asyncio
+    async def test_legacy_index_is_filled_in(self, manager, project_dir):
+        await manager.redis_client.set("scene_index:project:proj", json.dumps({
+            "project_id": PROJECT, "scenes": {}, "last_updated": 0, "total_files": 0,
+        }))
+
+        index = await manager.reconcile_project_index(PROJECT)
+
+        assert len(index.scenes) == 100 and index.dir_mtimes
+
+    @pytest.mark.asyncio
+    async def test_no_index(self, manager, project_dir):
+        assert await manager.reconcile_project_index(PROJECT) is None
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batched rasterization of repeated scene primitives.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services.scene_raster import (
+    add_glow, draw_segments, ellipse, grid_view, make_sprite, pack_rgb, packed_image,
+    paste_sprites, rectangle
+)
+
+
+BACKGROUND = (10, 20, 40)
+
+
+class TestSprites:
+
+    def test_pasted_sprites_match_direct_drawing(self):
+        shapes = (rectangle(-2, -20, 2, 0, (60, 40, 20)), ellipse(-10, -30, 10, -12, (20, 60, 20)))
+        batched = Image.new('RGB', (80, 50), BACKGROUND)
+        direct = Image.new('RGB', (80, 50), BACKGROUND)
+
+        paste_sprites(batched, make_sprite(shapes), [20, 50], [40, 45])
+
+        draw = ImageDraw.Draw(direct)
+        for x, y in [(20, 40), (50, 45)]:
+            draw.rectangle([(x - 2, y - 20), (x + 2, y)], fill=(60, 40, 20))
+            draw.ellipse([(x - 10, y - 30), (x + 10, y - 12)], fill=(20, 60, 20))
+
+        assert batched.tobytes() == direct.tobytes()
+
+    def test_sprites_are_clipped_and_later_instances_win(self):
+        img = Image.new('RGB', (20, 20), BACKGROUND)
+        red = make_sprite((rectangle(0, 0, 9, 9, (255, 0, 0)),))
+        blue = make_sprite((rectangle(0, 0, 9, 9, (0, 0, 255)),))
+
+        paste_sprites(img, red, [-5, 15], [-5, 15])
+        paste_sprites(img, blue, [2], [2])
+
+        assert img.getpixel((0, 0)) == (255, 0, 0)
+        assert img.getpixel((19, 19)) == (255, 0, 0)
+        assert img.getpixel((4, 4)) == (0, 0, 255)
+        assert img.getpixel((12, 1)) == BACKGROUND
+
+    def test_sprites_are_built_once(self):
+        shapes = (ellipse(-3, -3, 3, 3, (1, 2, 3)),)
+        assert make_sprite(shapes) is make_sprite(shapes)
+        assert make_sprite(shapes).offset == (-3, -3)
+
+
+class TestWindowGrids:
+
+    def test_grid_view_addresses_every_cell(self):
+        canvas = np.zeros((2 * 20, 3 * 15), dtype=np.uint32)
+
+        labels = np.arange(1, 7).reshape(2, 3)
+        grid_view(canvas, 0, 0, 2, 3, 15, 20, 9, 13)[:] = labels[:, None, :, None]
+
+        for row in range(2):
+            for col in range(3):
+                cell = canvas[row * 20:row * 20 + 20, col * 15:col * 15 + 15]
+                assert (cell[:13, :9] == row * 3 + col + 1).all()
+                assert cell[13:].sum() == 0 and cell[:, 9:].sum() == 0
+
+    def test_packed_pixels_round_trip(self):
+        colors = np.array([[(255, 0, 0), (0, 128, 0)], [(1, 2, 3), (200, 180, 160)]])
+
+        img = packed_image(pack_rgb(colors))
+
+        assert img.mode == 'RGB' and img.size == (2, 2)
+        assert (np.asarray(img) == colors).all()
+
+    def test_masked_cells_keep_their_color(self):
+        block = np.full((20, 20), pack_rgb((50, 50, 60)))
+        cells = grid_view(block, 0, 0, 2, 2, 10, 10, 4, 4)
+
+        blinds = np.array([[True, False], [False, True]])
+        np.copyto(cells, pack_rgb((60, 60, 70)), where=blinds[:, None, :, None])
+        pixels = np.asarray(packed_image(block))
+
+        assert tuple(pixels[0, 0]) == (60, 60, 70)
+        assert tuple(pixels[0, 10]) == (50, 50, 60)
+        assert tuple(pixels[12, 12]) == (60, 60, 70)
+        assert tuple(pixels[15, 15]) == (50, 50, 60)
+
+
+class TestSegmentsAndGlow:
+
+    def test_segments_are_continuous_and_clipped(self):
+        canvas = np.zeros((10, 10, 3), dtype=np.uint8)
+
+        draw_segments(canvas, np.array([2, 8]), np.array([9, 9]), np.array([2, 12]),
+                      np.array([3, 5]), (50, 70, 50))
+
+        assert (canvas[3:10, 2] == (50, 70, 50)).all()
+        assert (canvas[9, 8] == (50, 70, 50)).all()
+        assert canvas[:, 3:8].sum() == 0
+
+    def test_glow_spreads_light_around_emitters_only(self):
+        img = Image.new('RGB', (200, 100), BACKGROUND)
+        emission = Image.new('RGB', img.size)
+        emission.paste((120, 110, 100), (40, 40, 52, 52))
+
+        add_glow(img, emission, 6)
+
+        near = img.getpixel((56, 46))
+        assert all(lit > dark for lit, dark in zip(near, BACKGROUND))
+        assert img.getpixel((150, 46)) == BACKGROUND
+
+    def test_no_light_leaves_the_image_alone(self):
+        img = Image.new('RGB', (64, 36), BACKGROUND)
+        before = img.tobytes()
+
+        add_glow(img, Image.new('RGB', img.size), 6)
+
+        assert img.tobytes() == before
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the bounded image/video stage pipeline.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.stage_pipeline import PipelineStage, run_pipeline
+
+
+class Timeline:
+    """Records when each item enters and leaves each stage."""
+
+    def __init__(self):
+        self.events = []
+
+    def step(self, name, delay):
+        async def fn(item, value):
+            self.events.append((name, "start", item))
+            await asyncio.sleep(delay(item) if callable(delay) else delay)
+            self.events.append((name, "end", item))
+            return f"{value}>{name}"
+        return fn
+
+    def index(self, name, edge, item):
+        return self.events.index((name, edge, item))
+
+
+class TestRunPipeline:
+
+    @pytest.mark.asyncio
+    async def test_stages_overlap_and_results_keep_input_order(self):
+        timeline = Timeline()
+        image = PipelineStage("image", 2)
+        video = PipelineStage("video", 1)
+
+        results = await run_pipeline(
+            [0, 1, 2, 3],
+            [(image, timeline.step("image", lambda item: 0.04 if item == 0 else 0.01)),
+             (video, timeline.step("video", 0.02))]
+        )
+
+        assert results == [f"{item}>image>video" for item in range(4)]
+        # Video starts on the first finished image while image 0 is still running
+        assert timeline.index("video", "start", 1) < timeline.index("image", "end", 0)
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_pauses_the_upstream_stage(self):
+        timeline = Timeline()
+        image = PipelineStage("image", 1, buffer=1)
+        video = PipelineStage("video", 1, buffer=1)
+
+        await run_pipeline(
+            list(range(6)),
+            [(image, timeline.step("image", 0.0)), (video, timeline.step("video", 0.02))]
+        )
+
+        # Images never get more than one in the buffer plus one held by the
+        # blocked image worker ahead of the video stage
+        for item in range(6):
+            ahead = sum(1 for other in range(6)
+                        if timeline.index("image", "end", other) < timeline.index("video", "start", item)
+                        and other > item)
+            assert ahead <= 2
+
+    @pytest.mark.asyncio
+    async def test_failures_skip_later_stages(self):
+        image = PipelineStage("image", 2)
+        video = PipelineStage("video", 1)
+        rendered = []
+
+        async def generate_image(item, _):
+            if item == "broken":
+                raise RuntimeError("boom")
+            return {"success": item != "rejected"}
+
+        async def generate_video(item, _):
+            rendered.append(item)
+            return {"success": True, "video": item}
+
+        results = await run_pipeline(
+            ["ok", "broken", "rejected"],
+            [(image, generate_image), (video, generate_video)],
+            is_final=lambda result: not result["success"],
+            on_error=lambda item, error: {"success": False, "error": str(error)}
+        )
+
+        assert rendered == ["ok"]
+        assert results == [{"success": True, "video": "ok"}, {"success": False, "error": "boom"},
+                           {"success": False}]
+        assert image.get_stats()["failed"] == 1
+        assert video.get_stats()["processed"] == 1
+
+
+class TestPipelineStage:
+
+    @pytest.mark.asyncio
+    async def test_stats_report_queue_depth_and_utilization(self):
+        now = [0.0]
+        stage = PipelineStage("video", 2, clock=lambda: now[0])
+        release = asyncio.Event()
+
+        async def render():
+            await release.wait()
+
+        calls = [asyncio.ensure_future(stage.call(render)) for _ in range(3)]
+        await asyncio.sleep(0)
+        now[0] = 10.0
+        stats = stage.get_stats()
+        assert (stats["in_flight"], stats["queue_depth"]) == (2, 1)
+        assert stats["utilization"] == 1.0
+
+        release.set()
+        await asyncio.gather(*calls)
+        assert stage.get_stats()["processed"] == 3
+
+
+class TestUnifiedPipelineStages:
+
+    @pytest.mark.asyncio
+    async def test_batch_clips_run_through_the_provider_stages(self, monkeypatch):
+        from src.services.unified_pipeline import UnifiedPipelineManager
+
+        manager = UnifiedPipelineManager()
+        video_calls = []
+
+        async def fake_image(prompt, **kwargs):
+            return {"success": prompt != "fail", "resized_path": f"/tmp/{prompt}.jpg", "error": "nsfw"}
+
+        async def fake_video(prompt, image_result, duration, **kwargs):
+            video_calls.append(kwargs)
+            return {"success": True, "prompt": prompt, "image_path": image_result["resized_path"]}
+
+        monkeypatch.setattr(manager, "_generate_batch_image", fake_image)
+        monkeypatch.setattr(manager, "_generate_video_from_image_result", fake_video)
+
+        results = await manager.generate_batch_clips(
+            ["harbour crane", "fail", "server room"], duration=5, image_size="1024x1024", seed=7
+        )
+
+        assert [r["success"] for r in results] == [True, False, True]
+        assert results[1]["error"] == "Image generation failed: nsfw"
+        assert video_calls == [{"seed": 7}, {"seed": 7}]
+        stages = manager.get_pipeline_stats()["stages"]
+        assert stages["image"]["processed"] == 3
+        assert stages["video"]["processed"] == 2
+        assert stages["video"]["queue_depth"] == 0
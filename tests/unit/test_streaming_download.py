@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Unit tests for streaming, resumable downloads.
+
+A local server drops the first connection half way through the body so the
+downloader has to resume with a range request.
+"""
+
+import os
+import sys
+import asyncio
+import hashlib
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.file_manager import FileManager
+from src.utils.http_pool import AsyncHTTPPool
+from src.utils.streaming_download import (
+    StreamChecksum, download_resumable, download_resumable_sync, write_stream_atomic
+)
+
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 17)
+ETAG = '"clip-v1"'
+
+
+@pytest_asyncio.fixture
+async def flaky_server():
+    """Serves PAYLOAD, cutting the first full-body response short."""
+    state = {"requests": [], "drop_next": True, "honor_range": True}
+
+    async def video(request):
+        range_header = request.headers.get("Range")
+        state["requests"].append(range_header)
+
+        if range_header and state["honor_range"]:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if start >= len(PAYLOAD):
+                return web.Response(status=416, headers={"Content-Range": f"bytes */{len(PAYLOAD)}"})
+            assert request.headers.get("If-Range", ETAG) == ETAG
+            return web.Response(
+                status=206,
+                body=PAYLOAD[start:],
+                headers={
+                    "ETag": ETAG,
+                    "Content-Range": f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}",
+                },
+            )
+
+        if state["drop_next"]:
+            state["drop_next"] = False
+            response = web.StreamResponse(headers={"ETag": ETAG, "Content-Length": str(len(PAYLOAD))})
+            await response.prepare(request)
+            await response.write(PAYLOAD[: len(PAYLOAD) // 2])
+            request.transport.close()
+            return response
+
+        return web.Response(body=PAYLOAD, headers={"ETag": ETAG})
+
+    app = web.Application()
+    app.router.add_get("/clip.mp4", video)
+    server = TestServer(app)
+    await server.start_server()
+    yield str(server.make_url("/clip.mp4")), state
+    await server.close()
+
+
+class TestStreamChecksum:
+
+    def test_matches_hashlib(self):
+        checksum = StreamChecksum()
+        for i in range(0, len(PAYLOAD), 65536):
+            checksum.update(PAYLOAD[i:i + 65536])
+
+        result = checksum.as_dict()
+        assert result["md5"] == hashlib.md5(PAYLOAD).hexdigest()
+        assert result["sha256"] == hashlib.sha256(PAYLOAD).hexdigest()
+        assert checksum.size == len(PAYLOAD)
+
+
+class TestResumableDownload:
+
+    @pytest.mark.asyncio
+    async def test_async_download_resumes_after_drop(self, flaky_server, tmp_path):
+        url, state = flaky_server
+        pool = AsyncHTTPPool("test")
+        dest = tmp_path / "clip.mp4"
+
+        result = await download_resumable(url, dest, pool=pool, chunk_size=65536, retry_delay=0)
+
+        assert dest.read_bytes() == PAYLOAD
+        assert result.attempts == 2
+        assert result.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+        assert state["requests"][0] is None
+        assert state["requests"][1].startswith("bytes=")
+        assert not (tmp_path / "clip.mp4.part").exists()
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_sync_download_resumes_after_drop(self, flaky_server, tmp_path):
+        url, state = flaky_server
+        dest = tmp_path / "clip.mp4"
+
+        result = await asyncio.to_thread(
+            download_resumable_sync, url, dest, requests.Session(), None, 3, 65536, 0
+        )
+
+        assert dest.read_bytes() == PAYLOAD
+        assert result.attempts == 2
+        assert result.checksums["md5"] == hashlib.md5(PAYLOAD).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_restarts_when_server_ignores_range(self, flaky_server, tmp_path):
+        url, state = flaky_server
+        state["honor_range"] = False
+        pool = AsyncHTTPPool("test")
+        dest = tmp_path / "clip.mp4"
+
+        result = await download_resumable(url, dest, pool=pool, retry_delay=0)
+
+        assert dest.read_bytes() == PAYLOAD
+        assert result.resumed_bytes == 0
+        assert result.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_leftover_part_file_is_resumed(self, flaky_server, tmp_path):
+        url, state = flaky_server
+        state["drop_next"] = False
+        pool = AsyncHTTPPool("test")
+        dest = tmp_path / "clip.mp4"
+        (tmp_path / "clip.mp4.part").write_bytes(PAYLOAD[:1000])
+
+        result = await download_resumable(url, dest, pool=pool)
+
+        assert dest.read_bytes() == PAYLOAD
+        assert result.resumed_bytes == 1000
+        assert state["requests"] == ["bytes=1000-"]
+        await pool.close()
+
+
+class TestWriteStreamAtomic:
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_leaves_nothing_behind(self, tmp_path):
+        async def chunks():
+            yield b"abc"
+            raise RuntimeError("upstream failed")
+
+        with pytest.raises(RuntimeError):
+            await write_stream_atomic(chunks(), tmp_path / "out.mp4")
+
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_file_manager_streams_with_checksums(self, tmp_path):
+        async def chunks():
+            for start in range(0, len(PAYLOAD), 1024 * 1024):
+                yield PAYLOAD[start:start + 1024 * 1024]
+
+        manager = FileManager(base_output_dir=str(tmp_path))
+        result = await manager.save_video_stream("clip.mp4", chunks())
+
+        assert Path(result.path).read_bytes() == PAYLOAD
+        assert result.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+        assert [p.name for p in manager.video_dir.iterdir()] == ["clip.mp4"]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batched terminal UI overlay rendering.
+
+ffmpeg is replaced by a recorder that writes the segment files the
+command asks for, so the tests count processes instead of running them.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services.terminal_ui_service import TerminalUIService
+from src.utils.file_manager import FileManager
+
+SCRIPT = {
+    'total_duration': 40,
+    'scenes': [
+        {'timestamp': '0:00', 'timestamp_seconds': 0,
+         'onscreen_text': ['$ ls -la', 'ACCESS GRANTED']},
+        {'timestamp': '0:10', 'timestamp_seconds': 10, 'onscreen_text': ['   ']},
+        {'timestamp': '0:22', 'timestamp_seconds': 22, 'onscreen_text': ['SIGNAL LOST']},
+    ]
+}
+
+
+def recorder(calls, segments=None, ok=True):
+    async def fake_ffmpeg(cmd):
+        calls.append(cmd)
+        count = segments
+        if count is None:
+            count = 1
+            if '-segment_times' in cmd:
+                count += len(cmd[cmd.index('-segment_times') + 1].split(','))
+        for index in range(count):
+            Path(cmd[-1] % index).write_bytes(b"\x00" * 100)
+        return ok
+    return fake_ffmpeg
+
+
+@pytest.fixture
+def service(tmp_path):
+    return TerminalUIService(file_manager=FileManager(base_output_dir=str(tmp_path)))
+
+
+class TestOverlayBatch:
+
+    @pytest.mark.asyncio
+    async def test_all_overlays_render_in_one_process(self, service, monkeypatch):
+        calls = []
+        monkeypatch.setattr(service, "_run_ffmpeg", recorder(calls))
+
+        paths = await service.generate_animations(SCRIPT, {'job_id': 'job1'})
+
+        assert len(calls) == 1
+        assert [Path(p).name for p in paths] == [
+            'job1_ui_0_00_0.mp4', 'job1_ui_0_00_1.mp4', 'job1_ui_0_22_0.mp4'
+        ]
+        assert all(Path(p).exists() for p in paths)
+        assert service.active_jobs == {}
+
+    @pytest.mark.asyncio
+    async def test_cuts_fall_on_overlay_frame_boundaries(self, service, monkeypatch):
+        calls = []
+        monkeypatch.setattr(service, "_run_ffmpeg", recorder(calls))
+
+        await service.generate_animations(SCRIPT, {'job_id': 'job1'})
+
+        cmd = calls[0]
+        graph = cmd[cmd.index('-filter_complex') + 1]
+        # 10s, 10s and 18s at 24 fps
+        assert "between(n,0,239)" in graph and "between(n,240,479)" in graph
+        assert "between(n,480,911)" in graph
+        assert cmd[cmd.index('-segment_times') + 1] == "9.979167,19.979167"
+        assert cmd[cmd.index('-force_key_frames') + 1] == "9.979167,19.979167"
+        assert cmd.count('libx264') == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_falls_back_to_individual_renders(self, service, monkeypatch):
+        calls = []
+        fallback = []
+        monkeypatch.setattr(service, "_run_ffmpeg", recorder(calls, segments=1))
+
+        async def fake_create(job_id, timestamp, text_index, text, duration, theme):
+            fallback.append(text)
+            return f"/tmp/{job_id}_{timestamp}_{text_index}.mp4"
+
+        monkeypatch.setattr(service, "_create_typing_animation", fake_create)
+
+        paths = await service.generate_animations(SCRIPT, {'job_id': 'job1'})
+
+        assert len(calls) == 1
+        assert fallback == ['$ ls -la', 'ACCESS GRANTED', 'SIGNAL LOST']
+        assert len(paths) == 3
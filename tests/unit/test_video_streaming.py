@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Unit tests for range streaming in the video streamer.
+
+Responses are driven as raw ASGI apps so the zero-copy path can be
+exercised with a scope that advertises the extension.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.video_streaming import (
+    RangeRequest, StreamingConfig, VideoStreamer, VideoStreamingManager
+)
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+
+
+def _scope(headers=None, extensions=None):
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/video",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "extensions": extensions or {},
+    }
+
+
+async def _run(response, scope):
+    """Run a response and return (status, headers, body, messages)."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.zerocopysend":
+            # What a server would sendfile() from the descriptor
+            message["file"].seek(message["offset"])
+            chunks.append(message["file"].read(message["count"]))
+        elif message["type"] == "http.response.body":
+            chunks.append(message["body"])
+
+    chunks = []
+    await response(scope, receive, send)
+    start = messages[0]
+    headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    return start["status"], headers, b"".join(chunks), messages
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "scene_1.mp4"
+    path.write_bytes(CONTENT)
+    return str(path)
+
+
+@pytest.fixture
+def streamer():
+    return VideoStreamer(StreamingConfig(accel_redirect_prefix=None, max_bandwidth=0))
+
+
+class TestRangeRequest:
+
+    def test_suffix_range(self):
+        request = RangeRequest("bytes=-100", 1000)
+
+        assert request.ranges == [(900, 999)]
+
+    def test_multiple_ranges_are_coalesced(self):
+        request = RangeRequest("bytes=0-99,50-149,500-599", 1000)
+
+        assert request.ranges == [(0, 149), (500, 599)]
+        assert request.is_multipart
+
+    def test_range_past_end_is_unsatisfiable(self):
+        request = RangeRequest("bytes=2000-", 1000)
+
+        assert request.is_partial and not request.is_satisfiable()
+
+    def test_too_many_ranges_serve_full_file(self):
+        header = "bytes=" + ",".join(f"{i * 10}-{i * 10 + 1}" for i in range(20))
+
+        assert not RangeRequest(header, 1000, max_ranges=16).is_partial
+
+
+class TestVideoStreamer:
+
+    @pytest.mark.asyncio
+    async def test_single_range_uses_zero_copy_when_available(self, streamer, video):
+        scope = _scope({"Range": "bytes=100-199"}, {"http.response.zerocopysend": {}})
+        response = await streamer.stream_video(video, Request(scope))
+
+        status, headers, body, messages = await _run(response, scope)
+
+        assert status == 206
+        assert headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+        assert body == CONTENT[100:200]
+        assert any(m["type"] == "http.response.zerocopysend" for m in messages)
+        assert streamer.bytes_sent == 100
+
+    @pytest.mark.asyncio
+    async def test_multipart_byteranges(self, streamer, video):
+        scope = _scope({"Range": "bytes=0-9,1000-1009"})
+        response = await streamer.stream_video(video, Request(scope))
+
+        status, headers, body, _ = await _run(response, scope)
+
+        assert status == 206
+        assert headers["content-type"].startswith("multipart/byteranges; boundary=")
+        assert int(headers["content-length"]) == len(body)
+        assert f"Content-Range: bytes 1000-1009/{len(CONTENT)}".encode() in body
+        assert CONTENT[1000:1010] in body
+
+    @pytest.mark.asyncio
+    async def test_conditional_requests(self, streamer, video):
+        first = await streamer.stream_video(video, Request(_scope()))
+        etag = first.headers["etag"]
+
+        cached = await streamer.stream_video(video, Request(_scope({"If-None-Match": etag})))
+        assert cached.status_code == 304
+
+        stale_range = _scope({"Range": "bytes=0-9", "If-Range": '"other"'})
+        status, _, body, _ = await _run(await streamer.stream_video(video, Request(stale_range)), stale_range)
+        assert status == 200 and body == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_unsatisfiable_range(self, streamer, video):
+        with pytest.raises(HTTPException) as exc:
+            await streamer.stream_video(video, Request(_scope({"Range": "bytes=99999-"})))
+
+        assert exc.value.status_code == 416
+
+    @pytest.mark.asyncio
+    async def test_bandwidth_cap(self, video):
+        streamer = VideoStreamer(StreamingConfig(accel_redirect_prefix=None, max_bandwidth=100_000))
+        scope = _scope({"Range": "bytes=0-"})
+        response = await streamer.stream_video(video, Request(scope))
+        response.chunk_size = 2048
+
+        started = time.monotonic()
+        await _run(response, scope)
+
+        # First chunk is free, the remaining 8 KiB are paced at 100 KB/s
+        assert time.monotonic() - started >= 0.07
+
+    @pytest.mark.asyncio
+    async def test_accel_redirect(self, tmp_path, video):
+        streamer = VideoStreamer(StreamingConfig(accel_redirect_prefix="/internal-media/",
+                                                 accel_redirect_root=str(tmp_path)))
+
+        response = await streamer.stream_video(video, Request(_scope()))
+
+        assert response.headers["x-accel-redirect"] == "/internal-media/scene_1.mp4"
+        assert streamer.offloaded_streams == 1
+
+
+class TestStreamingStats:
+
+    @pytest.mark.asyncio
+    async def test_counts_bytes_actually_sent(self, video):
+        manager = VideoStreamingManager()
+        manager.streamer = VideoStreamer(StreamingConfig(accel_redirect_prefix=None))
+        scope = _scope({"Range": "bytes=0-99"})
+        response = await manager.streamer.stream_video(video, Request(scope), on_complete=manager._record_bytes)
+
+        assert (await manager.get_streaming_stats())["statistics"]["total_bytes_served"] == 0
+        await _run(response, scope)
+        assert (await manager.get_streaming_stats())["statistics"]["total_bytes_served"] == 100
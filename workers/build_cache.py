@@ -0,0 +1,366 @@
+"""
+Incremental build cache for the video generation pipeline.
+
+Works like a build system: every per-scene stage (voice, terminal UI,
+visuals) and every encoded scene segment is keyed by a hash of its inputs.
+Outputs are recorded in a per-project manifest, and later builds reuse any
+output whose key still matches and whose files are still intact. Editing one
+scene's narration changes that scene's voice key and segment key only, so a
+rebuild costs one TTS call and one segment encode. The final video is then
+re-muxed from cached segments without re-encoding.
+
+Stage keys cover the inputs that determine the output:
+- voice: narration text and voice settings
+- ui: on-screen text, terminal theme and the scene's length
+- visual: visual descriptions, style and the scene's length
+- segment: duration, content digests of the stage outputs, output settings
+
+The manifest also records which keys built each scene position, and
+entries no longer referenced by the latest build are dropped. Jobs of the
+same project may build concurrently: each one's changes are replayed onto
+the latest manifest under a per-project file lock, and dropped segment files
+are only deleted after a grace period, since another job may still be
+concatenating them.
+"""
+
+import os
+import json
+import time
+import fcntl
+import hashlib
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every cached output (e.g. after changing an encoder setting)
+BUILD_VERSION = 1
+
+# How long a segment dropped from the manifest stays on disk
+RETIRED_SEGMENT_TTL = 6 * 3600
+
+DEFAULT_CACHE_ROOT = os.getenv('RENDER_CACHE_DIR', '/app/output/cache')
+
+# Fallback files written by the stage helpers when a provider fails; these
+# are never cached so the next build tries the provider again
+PLACEHOLDER_MARKERS = (
+    b'MOCK_AUDIO', b'PLACEHOLDER_VIDEO', b'TIMEOUT_PLACEHOLDER', b'ERROR_PLACEHOLDER',
+    b'IMPORT_ERROR_PLACEHOLDER', b'TERMINAL_UI_PLACEHOLDER',
+)
+
+
+def hash_inputs(*parts: Any) -> str:
+    """Stable hash of JSON-serializable build inputs."""
+    payload = json.dumps([BUILD_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> Optional[str]:
+    """SHA256 of a file, or None if it does not exist."""
+    sha256 = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                sha256.update(chunk)
+    except FileNotFoundError:
+        return None
+    return sha256.hexdigest()
+
+
+def is_placeholder_asset(path: str) -> bool:
+    """Whether a stage output is one of the helpers' fallback placeholders."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(32)
+    except OSError:
+        return True
+    return head.startswith(PLACEHOLDER_MARKERS)
+
+
+def _fingerprint(path: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def scene_span(parsed_script: Dict, index: int) -> float:
+    """Seconds from a scene's timestamp to the next one (or the script's end)."""
+    scenes = parsed_script['scenes']
+    start = scenes[index]['timestamp_seconds']
+    if index + 1 < len(scenes):
+        end = scenes[index + 1]['timestamp_seconds']
+    else:
+        end = parsed_script.get('total_duration', 60)
+    return end - start
+
+
+def scene_window(parsed_script: Dict, index: int) -> Dict[str, float]:
+    """Start and duration of a scene on the timeline (matches VideoComposer)."""
+    return {
+        'start': parsed_script['scenes'][index]['timestamp_seconds'],
+        'duration': max(scene_span(parsed_script, index), 2.0)
+    }
+
+
+# Script field each stage renders; scenes without content skip the stage
+STAGE_FIELDS = {
+    'voice': 'narration',
+    'ui': 'onscreen_text',
+    'visual': 'visual_descriptions',
+}
+
+
+def scene_stage_keys(parsed_script: Dict, index: int, settings: Dict) -> Dict[str, str]:
+    """
+    Input keys for each stage one scene needs.
+
+    Args:
+        parsed_script: Full parsed script
+        index: Scene index
+        settings: Generation settings
+
+    Returns:
+        Mapping of stage name to input hash, for stages with content
+    """
+    scene = parsed_script['scenes'][index]
+    # Animations and clips are sized to the scene's length; where the scene
+    # starts only matters to the segment, so shifted scenes keep their outputs
+    span = scene_span(parsed_script, index)
+
+    keys = {
+        'voice': hash_inputs('voice', scene.get('narration', []),
+                             settings.get('voice_type', 'male_calm'),
+                             settings.get('voice_settings')),
+        'ui': hash_inputs('ui', scene.get('onscreen_text', []),
+                          settings.get('terminal_theme', 'dark'), span),
+        'visual': hash_inputs('visual', scene.get('visual_descriptions', []),
+                              settings.get('style', 'techwear'), span),
+    }
+    return {
+        stage: key for stage, key in keys.items()
+        if any(item.strip() for item in scene.get(STAGE_FIELDS[stage], []))
+    }
+
+
+class BuildCache:
+    """
+    Per-project manifest of stage outputs and encoded scene segments.
+
+    Outputs are content-addressed by input key. Keys hold a scene's length but
+    not its start, so scenes moved later by an insertion keep their outputs;
+    the scene before the insertion is shortened and rebuilds its UI and visuals.
+    """
+
+    def __init__(self, project_key: str, root: Optional[str] = None):
+        """
+        Initialize cache.
+
+        Args:
+            project_key: Stable project identifier (shared across jobs)
+            root: Cache root directory
+        """
+        self.project_key = project_key
+        self.directory = Path(root or DEFAULT_CACHE_ROOT) / project_key
+        self.segments_dir = self.directory / 'segments'
+        self.manifest_path = self.directory / 'manifest.json'
+        self.lock_path = self.directory / 'manifest.lock'
+        self.manifest = self._load()
+
+        # Changes made since the last save, replayed onto the latest manifest
+        self._changes: List[Callable[[Dict[str, Any]], None]] = []
+
+        # Build statistics
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_job(cls, job_id: str, settings: Dict, root: Optional[str] = None) -> 'BuildCache':
+        """Cache for a job, shared with earlier jobs of the same project."""
+        return cls(str(settings.get('project_id') or job_id), root)
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get('version') == BUILD_VERSION:
+                manifest.setdefault('retired', {})
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {'version': BUILD_VERSION, 'stages': {}, 'segments': {}, 'scenes': [], 'retired': {}}
+
+    @contextmanager
+    def _locked(self):
+        """Hold the project's manifest lock (shared by every worker process)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _change(self, apply: Callable[[Dict[str, Any]], None]):
+        apply(self.manifest)
+        self._changes.append(apply)
+
+    def _put(self, section: str, key: str, record: Dict[str, Any]):
+        def apply(manifest: Dict[str, Any]):
+            manifest[section][key] = record
+        self._change(apply)
+
+    def save(self):
+        """
+        Merge this build's changes into the manifest on disk.
+
+        The latest manifest is re-read under the project lock, so entries
+        recorded by concurrent jobs are kept, and written back atomically.
+        """
+        with self._locked():
+            manifest = self._load()
+            for apply in self._changes:
+                apply(manifest)
+            self._delete_retired(manifest)
+
+            tmp_path = self.manifest_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+
+        self.manifest = manifest
+        self._changes.clear()
+
+    @staticmethod
+    def _delete_retired(manifest: Dict[str, Any]):
+        """Delete dropped segment files once no running build can still use them."""
+        expired = time.time() - RETIRED_SEGMENT_TTL
+        for key, record in list(manifest['retired'].items()):
+            if key in manifest['segments']:
+                del manifest['retired'][key]
+            elif record['retired_at'] < expired:
+                for path in record['files']:
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                del manifest['retired'][key]
+
+    def _verify(self, record: Dict[str, Any]) -> bool:
+        """Check recorded files are unchanged; re-hash only if size/mtime moved."""
+        for path, digest, fingerprint in zip(record['files'], record['digests'], record['fingerprints']):
+            current = _fingerprint(path)
+            if current is None:
+                return False
+            if current != fingerprint and file_digest(path) != digest:
+                return False
+        return True
+
+    def _record(self, files: List[str]) -> Dict[str, Any]:
+        return {
+            'files': list(files),
+            'digests': [file_digest(path) for path in files],
+            'fingerprints': [_fingerprint(path) for path in files],
+        }
+
+    def lookup_stage(self, key: str) -> Optional[List[str]]:
+        """
+        Get cached outputs for a stage key.
+
+        Returns:
+            Output file paths, or None if the stage must be rebuilt
+        """
+        record = self.manifest['stages'].get(key)
+        if record and self._verify(record):
+            self.hits += 1
+            return list(record['files'])
+        self.misses += 1
+        return None
+
+    def record_stage(self, key: str, files: List[str]) -> bool:
+        """
+        Record stage outputs, unless any of them is a fallback placeholder.
+
+        Returns:
+            True if the outputs were cached
+        """
+        if not files or any(is_placeholder_asset(path) for path in files):
+            return False
+        self._put('stages', key, self._record(files))
+        return True
+
+    def stage_digest(self, key: str) -> Optional[str]:
+        """Digest of a stage's first output (what the composer uses)."""
+        record = self.manifest['stages'].get(key)
+        if record and record['digests']:
+            return record['digests'][0]
+        return None
+
+    def segment_path(self, key: str) -> str:
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        return str(self.segments_dir / f"{key}.mp4")
+
+    def lookup_segment(self, key: str) -> Optional[str]:
+        """Get a cached encoded segment, or None if it must be encoded."""
+        record = self.manifest['segments'].get(key)
+        if record and self._verify(record):
+            self.hits += 1
+            return record['files'][0]
+        self.misses += 1
+        return None
+
+    def record_segment(self, key: str, path: str):
+        self._put('segments', key, self._record([path]))
+
+    def record_build(self, scenes: List[Dict[str, Any]]):
+        """
+        Record which keys built each scene position and drop unused entries.
+
+        Dropped segments are retired rather than deleted; save() removes
+        their files after RETIRED_SEGMENT_TTL unless a build records them again.
+
+        Args:
+            scenes: Per-scene dicts with start, duration, stage keys and segment key
+        """
+        used_segments = {scene['segment'] for scene in scenes}
+        used_stages = {key for scene in scenes for key in scene['stages'].values()}
+        retired_at = time.time()
+
+        def apply(manifest: Dict[str, Any]):
+            manifest['scenes'] = scenes
+            for key in list(manifest['segments']):
+                if key not in used_segments:
+                    record = manifest['segments'].pop(key)
+                    manifest['retired'][key] = {'files': record['files'], 'retired_at': retired_at}
+            for key in list(manifest['stages']):
+                if key not in used_stages:
+                    del manifest['stages'][key]
+
+        self._change(apply)
+
+    def get_build_report(self, parsed_script: Dict, settings: Dict) -> List[Dict[str, Any]]:
+        """
+        Compare a script against the last build.
+
+        Returns:
+            Per-scene list of stages that would be rebuilt
+        """
+        report = []
+        for index, scene in enumerate(parsed_script.get('scenes', [])):
+            keys = scene_stage_keys(parsed_script, index, settings)
+            stale = [stage for stage, key in keys.items()
+                     if key not in self.manifest['stages']]
+            report.append({'scene_index': index, 'timestamp': scene['timestamp'], 'stale': stale})
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'project_key': self.project_key,
+            'hits': self.hits,
+            'misses': self.misses,
+            'cached_stages': len(self.manifest['stages']),
+            'cached_segments': len(self.manifest['segments']),
+        }
@@ -54,6 +54,17 @@ def task_retry_handler(sender=None, task_id=None, reason=None, **kw):
     """Log task retry attempts."""
     logger.warning(f"Task {sender.name} [{task_id}] retrying. Reason: {reason}")
 
+@signals.worker_process_shutdown.connect
+def close_http_pools_handler(**kwargs):
+    """Close the provider HTTP sessions held by this worker process."""
+    import asyncio
+    from src.utils.http_pool import close_http_pools
+
+    try:
+        asyncio.run(close_http_pools())
+    except Exception as e:
+        logger.error(f"Error closing HTTP pools: {e}")
+
 # Health check task
 @app.task(name='workers.health_check')
 def health_check():
@@ -0,0 +1,454 @@
+"""
+Completion tracker for remote generation jobs.
+
+Instead of every Celery task sleeping in a polling loop until Runway finishes,
+tasks register the remote job here and return. A single async poller process
+multiplexes status checks for all in-flight generations and, when a job
+reaches a terminal state, enqueues the follow-up task that continues the
+pipeline. Provider webhooks can short-circuit polling via ``handle_event``.
+
+State lives in Redis so registrations survive poller restarts:
+- ``generations:pending``: sorted set of entry keys scored by next check time
+- ``generations:entries``: hash of entry key -> JSON entry
+
+A poller claims a due entry by leasing it (pushing its score out by the
+visibility timeout) rather than removing it, and only deletes it once the
+follow-up task has been sent. If a poller dies mid-check or ``send_task``
+fails, the lease expires and the entry is picked up again, so follow-ups are
+delivered at least once and must tolerate duplicates.
+
+Run the poller with ``python -m workers.completion_tracker``.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'generations:pending'
+ENTRIES_KEY = 'generations:entries'
+
+TERMINAL_STATUSES = ('completed', 'failed', 'timeout')
+
+# Atomically lease every due entry: ZRANGEBYSCORE + ZADD XX in one step, so
+# two pollers never claim the same entry
+CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+for _, key in ipairs(due) do
+    redis.call('ZADD', KEYS[1], 'XX', ARGV[2], key)
+end
+return due
+"""
+
+# A checker takes an entry and returns a normalized status dict:
+# {'status': 'processing'|'completed'|'failed', 'progress': 0-100, 'video_url': ..., 'error': ...}
+StatusChecker = Callable[['PendingGeneration'], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class PendingGeneration:
+    """A remote generation job awaiting completion."""
+    provider: str
+    remote_id: str
+    follow_up_task: str
+    follow_up_args: List[Any] = field(default_factory=list)
+    follow_up_kwargs: Dict[str, Any] = field(default_factory=dict)
+    submitted_at: float = 0.0
+    deadline: float = 0.0
+    interval: float = 0.0
+    checks: int = 0
+    last_progress: float = 0.0
+    last_checked_at: float = 0.0
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}:{self.remote_id}"
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, data) -> 'PendingGeneration':
+        return cls(**json.loads(data))
+
+
+def _normalize_progress(value: Any) -> float:
+    """Runway reports progress either as 0-1 or 0-100."""
+    try:
+        progress = float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return progress * 100 if 0 < progress <= 1 else progress
+
+
+async def check_runway_generation(entry: PendingGeneration) -> Dict[str, Any]:
+    """Check a generation submitted through ``RunwayClient.generate_video``."""
+    from src.utils.http_pool import get_http_pool
+
+    base_url = entry.metadata.get('base_url') or os.getenv('RUNWAY_API_URL', 'https://api.runway.ml/v1')
+    headers = {
+        'Authorization': f"Bearer {os.getenv('RUNWAY_API_KEY', 'dummy_key')}",
+        'Accept': 'application/json'
+    }
+
+    async with get_http_pool('runway').request(
+        'GET', f"{base_url}/generations/{entry.remote_id}", headers=headers
+    ) as response:
+        response.raise_for_status()
+        data = await response.json()
+
+    return {
+        'status': data.get('status', 'processing'),
+        'progress': _normalize_progress(data.get('progress')),
+        'video_url': data.get('video_url'),
+        'duration': data.get('duration'),
+        'error': data.get('error')
+    }
+
+
+def normalize_runway_task(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Runway ``/tasks`` payload (SUCCEEDED/FAILED/...) to tracker statuses."""
+    status = (data.get('status') or '').upper()
+    result = {'status': 'processing', 'progress': _normalize_progress(data.get('progress'))}
+
+    if status == 'SUCCEEDED':
+        output = data.get('output') or []
+        result.update(status='completed', progress=100,
+                      video_url=output[0] if output else None)
+    elif status in ('FAILED', 'CANCELLED'):
+        result.update(status='failed', error=data.get('failure') or status.lower())
+
+    return result
+
+
+async def check_runway_ml_task(entry: PendingGeneration) -> Dict[str, Any]:
+    """Check a task submitted through ``AsyncRunwayMLClient``."""
+    from src.services.runway_ml_proper import AsyncRunwayMLClient
+
+    client = AsyncRunwayMLClient(
+        api_key=os.getenv('RUNWAY_API_KEY'),
+        base_url=entry.metadata.get('base_url')
+    )
+    return normalize_runway_task(await client.get_task_status(entry.remote_id))
+
+
+DEFAULT_CHECKERS: Dict[str, StatusChecker] = {
+    'runway': check_runway_generation,
+    'runway_ml': check_runway_ml_task,
+}
+
+
+class CompletionTracker:
+    """
+    Tracks in-flight remote generations and dispatches follow-up tasks.
+
+    Check intervals adapt per job: when progress is reported the next check is
+    scheduled around half the estimated remaining time, otherwise the interval
+    backs off geometrically between ``min_interval`` and ``max_interval``.
+    """
+
+    def __init__(self, redis_client=None, celery_app=None,
+                 checkers: Optional[Dict[str, StatusChecker]] = None,
+                 min_interval: float = 2.0, max_interval: float = 30.0,
+                 backoff: float = 1.5, max_in_flight: int = 50,
+                 visibility_timeout: float = 120.0):
+        """
+        Initialize tracker.
+
+        Args:
+            redis_client: Sync Redis client (defaults to ``REDIS_URL``)
+            celery_app: Celery app used to enqueue follow-ups
+            checkers: Provider name -> async status checker
+            min_interval: Shortest delay between checks of one job (seconds)
+            max_interval: Longest delay between checks of one job (seconds)
+            backoff: Interval multiplier when no progress is reported
+            max_in_flight: Maximum concurrent status requests
+            visibility_timeout: Seconds a claimed entry stays hidden from
+                other polls before it is checked again
+        """
+        self.redis = redis_client or redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+        self._celery_app = celery_app
+        self.checkers = dict(DEFAULT_CHECKERS)
+        self.checkers.update(checkers or {})
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.visibility_timeout = visibility_timeout
+        self._claim = self.redis.register_script(CLAIM_SCRIPT)
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._running = False
+
+        # Statistics
+        self.checks_made = 0
+        self.completions_dispatched = 0
+
+    @property
+    def celery_app(self):
+        if self._celery_app is None:
+            from workers.celery_app import app
+            self._celery_app = app
+        return self._celery_app
+
+    def register(self, provider: str, remote_id: str, follow_up_task: str,
+                 args: Optional[List[Any]] = None, kwargs: Optional[Dict[str, Any]] = None,
+                 timeout: float = 1800, initial_delay: Optional[float] = None,
+                 metadata: Optional[Dict[str, Any]] = None) -> PendingGeneration:
+        """
+        Register a remote job; the follow-up task runs once it finishes.
+
+        The follow-up is called with ``args`` and ``kwargs`` plus a
+        ``generation_result`` keyword holding the normalized final status.
+
+        Args:
+            provider: Checker name ('runway', 'runway_ml', ...)
+            remote_id: Provider job/task ID
+            follow_up_task: Registered Celery task name
+            args: Positional arguments for the follow-up
+            kwargs: Keyword arguments for the follow-up
+            timeout: Seconds before the job is reported as timed out
+            initial_delay: Delay before the first check (defaults to min_interval)
+            metadata: Extra data passed to the checker (e.g. base_url)
+
+        Returns:
+            The registered entry
+        """
+        if provider not in self.checkers:
+            raise ValueError(f"No status checker registered for provider {provider!r}")
+
+        now = time.time()
+        entry = PendingGeneration(
+            provider=provider,
+            remote_id=remote_id,
+            follow_up_task=follow_up_task,
+            follow_up_args=list(args or []),
+            follow_up_kwargs=dict(kwargs or {}),
+            submitted_at=now,
+            deadline=now + timeout,
+            interval=self.min_interval,
+            last_checked_at=now,
+            metadata=metadata or {}
+        )
+        first_check = now + max(self.min_interval, min(initial_delay or 0, self.max_interval))
+
+        pipe = self.redis.pipeline()
+        pipe.hset(ENTRIES_KEY, entry.key, entry.to_json())
+        pipe.zadd(PENDING_KEY, {entry.key: first_check})
+        pipe.execute()
+
+        logger.info(f"Tracking {entry.key} -> {follow_up_task}")
+        return entry
+
+    def pending_count(self) -> int:
+        return self.redis.zcard(PENDING_KEY)
+
+    def next_interval(self, entry: PendingGeneration, progress: float, now: float) -> float:
+        """
+        Pick the delay before the next check of a job.
+
+        Args:
+            entry: Entry as of the previous check
+            progress: Progress reported by this check (0-100)
+            now: Time of this check
+
+        Returns:
+            Seconds until the next check
+        """
+        elapsed = now - entry.last_checked_at
+        gained = progress - entry.last_progress
+
+        if gained > 0 and elapsed > 0:
+            remaining = (100 - progress) / (gained / elapsed)
+            interval = remaining / 2
+        else:
+            interval = entry.interval * self.backoff
+
+        return max(self.min_interval, min(interval, self.max_interval))
+
+    def _claim_due(self, now: float) -> List[PendingGeneration]:
+        """Lease entries due for a check until ``now + visibility_timeout``."""
+        claimed = self._claim(keys=[PENDING_KEY], args=[now, now + self.visibility_timeout])
+        if not claimed:
+            return []
+
+        entries = []
+        for key, raw in zip(claimed, self.redis.hmget(ENTRIES_KEY, claimed)):
+            if raw is not None:
+                entries.append(PendingGeneration.from_json(raw))
+        return entries
+
+    async def _check(self, entry: PendingGeneration) -> Optional[Dict[str, Any]]:
+        checker = self.checkers.get(entry.provider)
+        async with self._semaphore:
+            self.checks_made += 1
+            try:
+                return await checker(entry)
+            except Exception as e:
+                logger.warning(f"Status check for {entry.key} failed: {e}")
+                return None
+
+    async def poll_due(self) -> int:
+        """
+        Check every job whose next check is due, concurrently.
+
+        Returns:
+            Number of jobs that reached a terminal state
+        """
+        now = time.time()
+        entries = self._claim_due(now)
+        if not entries:
+            return 0
+
+        statuses = await asyncio.gather(*(self._check(entry) for entry in entries))
+
+        finished = 0
+        rescheduled = []
+        for entry, status in zip(entries, statuses):
+            checked_at = time.time()
+
+            if checked_at >= entry.deadline and not (status and status.get('status') in TERMINAL_STATUSES):
+                status = {
+                    'status': 'timeout',
+                    'error': f'Generation timed out after {int(entry.deadline - entry.submitted_at)} seconds'
+                }
+
+            if status is not None and status.get('status') in TERMINAL_STATUSES:
+                try:
+                    self._finish(entry, status)
+                    finished += 1
+                except Exception as e:
+                    # The lease runs out and the next claim retries the dispatch
+                    logger.error(f"Failed to dispatch follow-up for {entry.key}: {e}")
+                continue
+
+            progress = _normalize_progress(status.get('progress')) if status else entry.last_progress
+            entry.interval = self.next_interval(entry, progress, checked_at)
+            entry.checks += 1
+            if progress > entry.last_progress:
+                entry.last_progress = progress
+                entry.last_checked_at = checked_at
+
+            rescheduled.append((entry, checked_at + entry.interval))
+
+        if rescheduled:
+            # XX: an entry finished by a webhook meanwhile is not brought back
+            pipe = self.redis.pipeline()
+            for entry, next_check in rescheduled:
+                pipe.zadd(PENDING_KEY, {entry.key: next_check}, xx=True, ch=True)
+            updated = pipe.execute()
+
+            pipe = self.redis.pipeline()
+            for (entry, _), still_pending in zip(rescheduled, updated):
+                if still_pending:
+                    pipe.hset(ENTRIES_KEY, entry.key, entry.to_json())
+            pipe.execute()
+
+        return finished
+
+    def _finish(self, entry: PendingGeneration, status: Dict[str, Any]):
+        """Enqueue the entry's follow-up task, then drop the entry."""
+        result = dict(status)
+        result.setdefault('remote_id', entry.remote_id)
+        result.setdefault('provider', entry.provider)
+        kwargs = dict(entry.follow_up_kwargs, generation_result=result)
+
+        self.celery_app.send_task(entry.follow_up_task, args=entry.follow_up_args, kwargs=kwargs)
+
+        pipe = self.redis.pipeline()
+        pipe.zrem(PENDING_KEY, entry.key)
+        pipe.hdel(ENTRIES_KEY, entry.key)
+        pipe.execute()
+        self.completions_dispatched += 1
+        logger.info(f"{entry.key} {result['status']} after {entry.checks + 1} checks, "
+                    f"dispatched {entry.follow_up_task}")
+
+    async def handle_event(self, provider: str, remote_id: str, status: Dict[str, Any]) -> bool:
+        """
+        Apply a pushed status update (e.g. from a provider webhook).
+
+        Args:
+            provider: Checker name
+            remote_id: Provider job/task ID
+            status: Normalized status dict
+
+        Returns:
+            True if the event finished a tracked job
+        """
+        if status.get('status') not in TERMINAL_STATUSES:
+            return False
+
+        key = f"{provider}:{remote_id}"
+        # Whoever removes the key from the schedule owns the completion
+        if not self.redis.zrem(PENDING_KEY, key):
+            return False
+
+        raw = self.redis.hget(ENTRIES_KEY, key)
+        if raw is None:
+            return False
+
+        try:
+            self._finish(PendingGeneration.from_json(raw), status)
+        except Exception:
+            # Put the entry back so the poller delivers the completion instead
+            self.redis.zadd(PENDING_KEY, {key: time.time()})
+            raise
+        return True
+
+    async def run_forever(self, tick: float = 1.0):
+        """
+        Poll until ``stop`` is called.
+
+        Args:
+            tick: Seconds between scans for due jobs
+        """
+        self._running = True
+        logger.info("Completion tracker started")
+        while self._running:
+            try:
+                await self.poll_due()
+            except Exception as e:
+                logger.error(f"Completion tracker poll failed: {e}")
+            await asyncio.sleep(tick)
+
+    def stop(self):
+        self._running = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'pending': self.pending_count(),
+            'checks_made': self.checks_made,
+            'completions_dispatched': self.completions_dispatched,
+        }
+
+
+_tracker: Optional[CompletionTracker] = None
+
+
+def get_completion_tracker() -> CompletionTracker:
+    """Get the process-wide completion tracker."""
+    global _tracker
+    if _tracker is None:
+        _tracker = CompletionTracker(
+            min_interval=float(os.getenv('COMPLETION_TRACKER_MIN_INTERVAL', '2')),
+            max_interval=float(os.getenv('COMPLETION_TRACKER_MAX_INTERVAL', '30')),
+            visibility_timeout=float(os.getenv('COMPLETION_TRACKER_VISIBILITY_TIMEOUT', '120')),
+        )
+    return _tracker
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(get_completion_tracker().run_forever(
+        tick=float(os.getenv('COMPLETION_TRACKER_TICK', '1'))
+    ))
+
+
+if __name__ == '__main__':
+    main()
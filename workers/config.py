@@ -86,6 +86,23 @@ CELERY_CONFIG: Dict[str, Any] = {
             'queue': 'assembly',
             'routing_key': 'assembly.media'
         },
+        # Per-scene stages of the generation pipeline
+        'video_generation.scene_voice': {
+            'queue': 'voice',
+            'routing_key': 'voice.synthesis'
+        },
+        'video_generation.scene_ui': {
+            'queue': 'video',
+            'routing_key': 'video.generation'
+        },
+        'video_generation.scene_visuals': {
+            'queue': 'video',
+            'routing_key': 'video.generation'
+        },
+        'video_generation.assemble': {
+            'queue': 'assembly',
+            'routing_key': 'assembly.media'
+        },
     },
     
     # Beat schedule for periodic tasks
@@ -12,7 +12,7 @@ from celery import Task
 from celery.utils.log import get_task_logger
 from sqlalchemy.orm import Session
 from workers.celery_app import app
-from src.core.database.connection import get_db
+from src.core.database.connection import get_sync_db
 from src.core.database.models import Job, JobStatus
 
 logger = get_task_logger(__name__)
@@ -33,7 +33,7 @@ def cleanup_expired_jobs(days_to_keep: int = 7) -> Dict[str, Any]:
     """
     logger.info(f"Starting cleanup of jobs older than {days_to_keep} days")
     
-    db: Session = next(get_db())
+    db: Session = next(get_sync_db())
     stats = {
         'jobs_deleted': 0,
         'files_deleted': 0,
@@ -277,7 +277,7 @@ def generate_usage_report(days: int = 30) -> Dict[str, Any]:
     """
     logger.info(f"Generating usage report for last {days} days")
     
-    db: Session = next(get_db())
+    db: Session = next(get_sync_db())
     report = {
         'period_days': days,
         'start_date': (datetime.utcnow() - timedelta(days=days)).isoformat(),
@@ -1,12 +1,21 @@
 """
 Video generation tasks
 """
-import re
 import json
 import os
 from typing import Dict, List, Any, Optional
-from celery import Task
+from celery import Task, chord
 from workers.celery_app import app
+from workers.build_cache import (
+    BuildCache, scene_stage_keys, scene_window, hash_inputs, file_digest,
+    is_placeholder_asset
+)
+from src.services.script_parser_service import parse_script_cached
+from src.prompts.prompt_similarity import (
+    DEFAULT_REUSE_THRESHOLD, PromptSimilarityIndex, RedisPromptIndex
+)
+import redis
+import shutil
 import structlog
 
 logger = structlog.get_logger()
@@ -22,87 +31,9 @@ class VideoGenerationTask(Task):
 class ScriptParser:
     """Parse LOG script format for video generation"""
     
-    def __init__(self):
-        self.timestamp_pattern = r'\[(\d+:\d+)[^\]]*\]'
-        self.visual_pattern = r'Visual:\s*(.+?)(?=\n(?:Audio|Narration|ON-SCREEN|Visual|\[|$))'
-        self.narration_pattern = r'(?:Narration|Audio)\s*\([^)]+\):\s*(.+?)(?=\n(?:Audio|Narration|Visual|ON-SCREEN|\[|$))'
-        self.onscreen_pattern = r'ON-SCREEN[^:]*:\s*(.+?)(?=\n(?:Audio|Narration|Visual|ON-SCREEN|\[|$))'
-    
     def parse_script(self, script_content: str) -> Dict[str, Any]:
-        """Parse script content into structured data"""
-        try:
-            # Extract basic metadata
-            title_match = re.search(r'SCRIPT:\s*(.+)', script_content)
-            title = title_match.group(1).strip() if title_match else "Unknown"
-            
-            # Split script into timestamp sections
-            sections = re.split(self.timestamp_pattern, script_content)
-            
-            scenes = []
-            total_duration = 0
-            
-            # Process each timestamp section
-            for i in range(1, len(sections), 2):
-                if i + 1 < len(sections):
-                    timestamp = sections[i]
-                    content = sections[i + 1]
-                    
-                    scene = self._parse_scene(timestamp, content)
-                    scenes.append(scene)
-                    
-                    # Calculate duration (rough estimate)
-                    total_duration = max(total_duration, self._timestamp_to_seconds(timestamp) + 30)
-            
-            return {
-                "title": title,
-                "scenes": scenes,
-                "total_duration": total_duration,
-                "scene_count": len(scenes),
-                "metadata": {
-                    "parsed_at": "now",
-                    "parser_version": "1.0"
-                }
-            }
-            
-        except Exception as e:
-            logger.error(f"Script parsing failed: {str(e)}")
-            raise
-    
-    def _parse_scene(self, timestamp: str, content: str) -> Dict[str, Any]:
-        """Parse individual scene content"""
-        # Extract scene title/description
-        title_match = re.search(r'([^|]+)', content.split('\n')[0])
-        title = title_match.group(1).strip() if title_match else f"Scene {timestamp}"
-        
-        # Extract visual descriptions
-        visuals = re.findall(self.visual_pattern, content, re.DOTALL | re.MULTILINE)
-        visual_descriptions = [v.strip().replace('\n', ' ') for v in visuals]
-        
-        # Extract narration/audio
-        narrations = re.findall(self.narration_pattern, content, re.DOTALL | re.MULTILINE)
-        narration_text = [n.strip().replace('\n', ' ') for n in narrations]
-        
-        # Extract on-screen text
-        onscreen_texts = re.findall(self.onscreen_pattern, content, re.DOTALL | re.MULTILINE)
-        onscreen_elements = [t.strip().replace('\n', ' ') for t in onscreen_texts]
-        
-        return {
-            "timestamp": timestamp,
-            "timestamp_seconds": self._timestamp_to_seconds(timestamp),
-            "title": title,
-            "visual_descriptions": visual_descriptions,
-            "narration": narration_text,
-            "onscreen_text": onscreen_elements,
-            "raw_content": content.strip()
-        }
-    
-    def _timestamp_to_seconds(self, timestamp: str) -> int:
-        """Convert MM:SS timestamp to seconds"""
-        try:
-            parts = timestamp.split(':')
-            return int(parts[0]) * 60 + int(parts[1])
-        except:
-            return 0
+        """Parse script content into structured data, reusing the canonical parse"""
+        return parse_script_cached(script_content)["log"]
 
 
 @app.task(bind=True, base=VideoGenerationTask, name="video_generation.process")
@@ -110,6 +41,10 @@ def process_video_generation(self, job_id: str, story_file: str, settings: dict)
     """
     Main video generation task
     
+    Parses the script and launches the generation pipeline: voice, terminal UI
+    and visuals for every scene run as independent tasks, and assembly runs as
+    a chord callback once all of them have produced their assets.
+    
     Args:
         job_id: Unique job identifier
         story_file: Script content string or file path
@@ -142,46 +77,9 @@ def process_video_generation(self, job_id: str, story_file: str, settings: dict)
             duration=parsed_script.get("total_duration")
         )
         
-        # Step 2: Generate voice narration (placeholder for now)
-        logger.info("Generating voice narration", job_id=job_id)
-        voice_files = _generate_voice_narration(job_id, parsed_script, settings)
-        
-        # Step 3: Create terminal UI effects (placeholder for now)
-        logger.info("Creating terminal UI effects", job_id=job_id)
-        ui_elements = _create_terminal_ui(job_id, parsed_script, settings)
-        
-        # Step 4: Generate visual scenes (placeholder for now)
-        logger.info("Generating visual scenes", job_id=job_id)
-        visual_assets = _generate_visual_scenes(job_id, parsed_script, settings)
-        
-        # Step 5: Assemble final video (placeholder for now)
-        logger.info("Assembling final video", job_id=job_id)
-        output_file = _assemble_video(job_id, parsed_script, voice_files, ui_elements, visual_assets, settings)
-        
-        result = {
-            "job_id": job_id,
-            "status": "completed",
-            "output_file": output_file,
-            "duration": parsed_script.get("total_duration", 180),
-            "size_mb": 250,  # Placeholder
-            "parsed_script": {
-                "title": parsed_script.get("title"),
-                "scenes": parsed_script.get("scene_count"),
-                "total_duration": parsed_script.get("total_duration")
-            },
-            "assets_generated": {
-                "voice_files": len(voice_files),
-                "ui_elements": len(ui_elements),
-                "visual_assets": len(visual_assets)
-            }
-        }
-        
-        logger.info("Video generation completed successfully", result=result)
-        return result
-        
     except Exception as e:
         logger.error(
-            "Video generation failed",
+            "Script parsing failed",
             job_id=job_id,
             error=str(e),
             exc_info=True
@@ -189,6 +87,251 @@ def process_video_generation(self, job_id: str, story_file: str, settings: dict)
         
         # Retry with exponential backoff
         raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+    
+    # Steps 2-5: fan out per-scene work, assemble when every input exists
+    pipeline = build_generation_pipeline(job_id, parsed_script, settings)
+    pipeline_result = pipeline.apply_async()
+    
+    logger.info(
+        "Video generation pipeline started",
+        job_id=job_id,
+        pipeline_id=pipeline_result.id,
+        scene_tasks=len(pipeline.tasks)
+    )
+    
+    return {
+        "job_id": job_id,
+        "status": "processing",
+        "pipeline_id": pipeline_result.id,
+        "scene_tasks": len(pipeline.tasks),
+        "parsed_script": {
+            "title": parsed_script.get("title"),
+            "scenes": parsed_script.get("scene_count"),
+            "total_duration": parsed_script.get("total_duration")
+        }
+    }
+
+
+# Per-scene stages: (stage name, task name)
+SCENE_STAGES = [
+    ("voice", "video_generation.scene_voice"),
+    ("ui", "video_generation.scene_ui"),
+    ("visual", "video_generation.scene_visuals"),
+]
+
+
+def _scene_script(parsed_script: Dict, index: int) -> Dict[str, Any]:
+    """
+    Single-scene view of a parsed script.
+    
+    ``total_duration`` is set to the scene's end so duration calculations in
+    the stage helpers match what they compute for the full script.
+    """
+    scenes = parsed_script["scenes"]
+    scene = scenes[index]
+    
+    if index + 1 < len(scenes):
+        scene_end = scenes[index + 1]["timestamp_seconds"]
+    else:
+        scene_end = parsed_script.get("total_duration", scene["timestamp_seconds"] + 10)
+    
+    return {
+        "title": parsed_script.get("title"),
+        "scenes": [scene],
+        "total_duration": scene_end,
+        "scene_count": 1,
+    }
+
+
+def build_generation_pipeline(job_id: str, parsed_script: Dict, settings: Dict,
+                              build_cache: Optional[BuildCache] = None):
+    """
+    Build the generation DAG for a parsed script.
+    
+    Each scene gets one task per stage it has content for, unless the
+    project's build cache already holds outputs for the same stage inputs.
+    Stages only depend on the parsed script, so they all run in parallel
+    across the voice and video queues; assembly is the chord callback.
+    
+    Args:
+        job_id: Unique job identifier
+        parsed_script: Output of ScriptParser.parse_script
+        settings: Generation settings
+        build_cache: Cache of earlier builds (defaults to the project's cache)
+    
+    Returns:
+        Celery chord ready to apply
+    """
+    build_cache = build_cache or BuildCache.for_job(job_id, settings)
+    header, cached_results = [], []
+    
+    for index in range(len(parsed_script.get("scenes", []))):
+        scene_script = _scene_script(parsed_script, index)
+        stage_keys = scene_stage_keys(parsed_script, index, settings)
+        
+        for stage, task_name in SCENE_STAGES:
+            if stage not in stage_keys:
+                continue
+            
+            files = build_cache.lookup_stage(stage_keys[stage])
+            if files is not None:
+                cached_results.append({"stage": stage, "scene_index": index,
+                                       "files": files, "cached": True})
+            else:
+                header.append(app.signature(task_name, args=(job_id, scene_script, settings, index)))
+    
+    logger.info(
+        "Generation pipeline planned",
+        job_id=job_id,
+        stages_to_build=len(header),
+        stages_cached=len(cached_results)
+    )
+    
+    callback = assemble_generated_video.s(job_id, parsed_script, settings, cached_results)
+    return chord(header, callback)
+
+
+def _run_scene_stage(task: Task, stage: str, generator, job_id: str,
+                     scene_script: Dict, settings: Dict, scene_index: int) -> Dict[str, Any]:
+    """
+    Run one stage helper for one scene, retrying just this scene on failure.
+    
+    The helpers write placeholder files when a provider fails, so placeholder
+    (or missing) outputs count as a failure too. Once retries are exhausted
+    the failure is reported in the result instead of raised, together with
+    any placeholders, so the rest of the job still assembles.
+    """
+    files = []
+    try:
+        files = generator(job_id, scene_script, settings)
+        fallbacks = [path for path in files if is_placeholder_asset(path)]
+        if fallbacks:
+            raise RuntimeError(f"{len(fallbacks)} {stage} output(s) fell back to placeholders")
+        return {"stage": stage, "scene_index": scene_index, "files": files}
+    
+    except Exception as e:
+        if task.request.retries < task.max_retries:
+            logger.warning(
+                f"Scene {stage} generation failed, retrying",
+                job_id=job_id,
+                scene_index=scene_index,
+                error=str(e)
+            )
+            raise task.retry(exc=e, countdown=task.default_retry_delay * (2 ** task.request.retries))
+        
+        logger.error(
+            f"Scene {stage} generation failed permanently",
+            job_id=job_id,
+            scene_index=scene_index,
+            error=str(e)
+        )
+        return {"stage": stage, "scene_index": scene_index, "files": files, "error": str(e)}
+
+
+class SceneStageTask(VideoGenerationTask):
+    """Base class for per-scene pipeline stages"""
+    name = "video_generation.scene_stage"
+    max_retries = 3
+    default_retry_delay = 30
+
+
+@app.task(bind=True, base=SceneStageTask, name="video_generation.scene_voice")
+def generate_scene_voice(self, job_id: str, scene_script: dict, settings: dict, scene_index: int):
+    """Generate narration audio for one scene"""
+    return _run_scene_stage(self, "voice", _generate_voice_narration,
+                            job_id, scene_script, settings, scene_index)
+
+
+@app.task(bind=True, base=SceneStageTask, name="video_generation.scene_ui")
+def create_scene_ui(self, job_id: str, scene_script: dict, settings: dict, scene_index: int):
+    """Render terminal UI animations for one scene"""
+    return _run_scene_stage(self, "ui", _create_terminal_ui,
+                            job_id, scene_script, settings, scene_index)
+
+
+@app.task(bind=True, base=SceneStageTask, name="video_generation.scene_visuals")
+def generate_scene_visuals(self, job_id: str, scene_script: dict, settings: dict, scene_index: int):
+    """Generate visual clips for one scene"""
+    return _run_scene_stage(self, "visual", _generate_visual_scenes,
+                            job_id, scene_script, settings, scene_index)
+
+
+@app.task(bind=True, base=VideoGenerationTask, name="video_generation.assemble")
+def assemble_generated_video(self, stage_results: List[Dict], job_id: str,
+                             parsed_script: dict, settings: dict,
+                             cached_results: Optional[List[Dict]] = None):
+    """
+    Assemble the final video from per-scene stage results
+    
+    Newly built stage outputs are recorded in the project's build cache, and
+    only scenes whose inputs changed are re-encoded before the re-mux.
+    
+    Args:
+        stage_results: Results of the per-scene stage tasks (chord header)
+        job_id: Unique job identifier
+        parsed_script: Full parsed script
+        settings: Generation settings
+        cached_results: Stage outputs reused from earlier builds
+    """
+    build_cache = BuildCache.for_job(job_id, settings)
+    assets = {stage: [] for stage, _ in SCENE_STAGES}
+    scene_assets: Dict[int, Dict[str, List[str]]] = {}
+    stage_keys: Dict[int, Dict[str, str]] = {}
+    failed_stages = []
+    stages_rebuilt = 0
+    
+    all_results = list(stage_results) + list(cached_results or [])
+    for stage_result in sorted(all_results, key=lambda r: r["scene_index"]):
+        index, stage = stage_result["scene_index"], stage_result["stage"]
+        assets[stage].extend(stage_result["files"])
+        scene_assets.setdefault(index, {})[stage] = stage_result["files"]
+        
+        if stage_result.get("error"):
+            failed_stages.append({
+                "stage": stage,
+                "scene_index": index,
+                "error": stage_result["error"]
+            })
+        elif not stage_result.get("cached"):
+            if index not in stage_keys:
+                stage_keys[index] = scene_stage_keys(parsed_script, index, settings)
+            build_cache.record_stage(stage_keys[index][stage], stage_result["files"])
+            stages_rebuilt += 1
+    
+    # Keep finished stage outputs even if assembly fails below
+    build_cache.save()
+    
+    logger.info("Assembling final video", job_id=job_id, failed_stages=len(failed_stages))
+    output_file = _assemble_video(job_id, parsed_script, assets["voice"], assets["ui"],
+                                  assets["visual"], settings,
+                                  build_cache=build_cache, scene_assets=scene_assets)
+    
+    result = {
+        "job_id": job_id,
+        "status": "completed",
+        "output_file": output_file,
+        "duration": parsed_script.get("total_duration", 180),
+        "size_mb": 250,  # Placeholder
+        "parsed_script": {
+            "title": parsed_script.get("title"),
+            "scenes": parsed_script.get("scene_count"),
+            "total_duration": parsed_script.get("total_duration")
+        },
+        "assets_generated": {
+            "voice_files": len(assets["voice"]),
+            "ui_elements": len(assets["ui"]),
+            "visual_assets": len(assets["visual"])
+        },
+        "failed_stages": failed_stages,
+        "build": {
+            "stages_rebuilt": stages_rebuilt,
+            "stages_reused": len(cached_results or []),
+            **build_cache.get_stats()
+        }
+    }
+    
+    logger.info("Video generation completed successfully", result=result)
+    return result
 
 
 def _generate_voice_narration(job_id: str, parsed_script: Dict, settings: Dict) -> List[str]:
@@ -377,6 +520,9 @@ def _create_terminal_ui(job_id: str, parsed_script: Dict, settings: Dict) -> Lis
                         if i + 1 < len(parsed_script.get("scenes", [])):
                             next_scene = parsed_script["scenes"][i + 1]
                             scene_duration = next_scene["timestamp_seconds"] - scene["timestamp_seconds"]
+                        elif parsed_script.get("total_duration", 0) > scene["timestamp_seconds"]:
+                            # Last scene (or a single-scene slice) runs to the end of the script
+                            scene_duration = parsed_script["total_duration"] - scene["timestamp_seconds"]
                         
                         # Create animation sequence
                         sequence = AnimationSequence(renderer)
@@ -447,6 +593,57 @@ def _create_terminal_ui(job_id: str, parsed_script: Dict, settings: Dict) -> Lis
     return ui_elements
 
 
+VISUAL_RESOLUTION = "1920x1080"
+
+
+def _visual_size_key(duration: float) -> str:
+    """Reuse key of a clip's resolution and length; a shorter clip can't fill a longer scene."""
+    return f"{VISUAL_RESOLUTION}/{duration}"
+
+
+def _visual_prompt_index(job_id: str, settings: Dict) -> Optional[RedisPromptIndex]:
+    """
+    Near-duplicate index of generated clips, shared by every job of the same
+    series (or project) so a shot that was already generated is copied
+    instead of paid for again. None when reuse is off or Redis is down.
+    """
+    if not DEFAULT_REUSE_THRESHOLD:
+        return None
+    try:
+        client = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+        client.ping()
+    except (redis.RedisError, OSError) as e:
+        logger.warning("Visual reuse index unavailable", job_id=job_id, error=str(e))
+        return None
+    scope = settings.get("series_id") or settings.get("project_id") or job_id
+    return RedisPromptIndex(client, f"visual:{scope}")
+
+
+def _reusable_visual(reuse_index: Optional[RedisPromptIndex], description: str, style: str,
+                     size_key: str) -> Optional[str]:
+    """Existing, real clip generated for a near-identical visual description."""
+    if reuse_index is None:
+        return None
+    try:
+        match = reuse_index.find(description, style, size_key)
+    except (redis.RedisError, OSError):
+        return None
+    if match is None or not os.path.exists(match.asset) or is_placeholder_asset(match.asset):
+        return None
+    return match.asset
+
+
+def _copy_to_duplicates(job_id: str, job_info: Dict, visual_file: str) -> List[str]:
+    """Copy a finished clip to the visuals whose prompts were near-duplicates of it."""
+    copies = []
+    for scene, visual_index in job_info['duplicates']:
+        timestamp_clean = scene['timestamp'].replace(':', '_')
+        duplicate_file = f"/app/output/visuals/{job_id}_visual_{timestamp_clean}_{visual_index}.mp4"
+        shutil.copyfile(visual_file, duplicate_file)
+        copies.append(duplicate_file)
+    return copies
+
+
 def _generate_visual_scenes(job_id: str, parsed_script: Dict, settings: Dict) -> List[str]:
     """Generate visual scenes using Runway API"""
     visual_assets = []
@@ -497,6 +694,9 @@ def _generate_visual_scenes(job_id: str, parsed_script: Dict, settings: Dict) ->
         
         # Process each visual description
         generation_jobs = []
+        reuse_index = _visual_prompt_index(job_id, settings)
+        # Jobs submitted by this call, so duplicates within it wait for one
+        submitted = PromptSimilarityIndex()
         
         for scene in parsed_script.get("scenes", []):
             scene_duration = 10.0  # Default duration
@@ -520,6 +720,31 @@ def _generate_visual_scenes(job_id: str, parsed_script: Dict, settings: Dict) ->
                     
                     # Determine video duration (max 16 seconds for Runway Gen-2)
                     video_duration = min(scene_duration, 16.0)
+                    size_key = _visual_size_key(video_duration)
+                    
+                    # Copy a clip already generated for a near-identical shot. Match
+                    # on the description itself: the shared style and quality suffix
+                    # would make different shots look alike
+                    existing = _reusable_visual(reuse_index, visual, style, size_key)
+                    if existing is not None:
+                        timestamp_clean = scene['timestamp'].replace(':', '_')
+                        visual_file = f"/app/output/visuals/{job_id}_visual_{timestamp_clean}_{i}.mp4"
+                        os.makedirs(os.path.dirname(visual_file), exist_ok=True)
+                        if os.path.abspath(existing) != os.path.abspath(visual_file):
+                            shutil.copyfile(existing, visual_file)
+                        visual_assets.append(visual_file)
+                        logger.info(
+                            "Reused visual for near-duplicate prompt",
+                            job_id=job_id,
+                            file=visual_file,
+                            source=existing
+                        )
+                        continue
+                    
+                    pending = submitted.find(visual, style, size_key)
+                    if pending is not None:
+                        generation_jobs[pending.asset]['duplicates'].append((scene, i))
+                        continue
                     
                     logger.info(
                         "Submitting visual generation request",
@@ -540,11 +765,15 @@ def _generate_visual_scenes(job_id: str, parsed_script: Dict, settings: Dict) ->
                             camera_movement="smooth" if "motion" in visual.lower() else "static"
                         )
                         
+                        submitted.add(visual, len(generation_jobs), style, size_key)
                         generation_jobs.append({
                             'job': generation_job,
                             'scene': scene,
                             'visual_index': i,
-                            'description': visual
+                            'description': visual,
+                            'prompt': enhanced_prompt,
+                            'size_key': size_key,
+                            'duplicates': []
                         })
                         
                         logger.info(
@@ -605,6 +834,15 @@ def _generate_visual_scenes(job_id: str, parsed_script: Dict, settings: Dict) ->
                             file=visual_file,
                             size=len(video_data)
                         )
+                        
+                        visual_assets.extend(_copy_to_duplicates(job_id, job_info, visual_file))
+                        
+                        if reuse_index is not None:
+                            try:
+                                reuse_index.add(job_info['description'], visual_file, style,
+                                                job_info['size_key'])
+                            except (redis.RedisError, OSError) as e:
+                                logger.warning("Failed to index visual for reuse", job_id=job_id, error=str(e))
                         break
                         
                     elif status['status'] == 'failed':
@@ -642,6 +880,8 @@ def _generate_visual_scenes(job_id: str, parsed_script: Dict, settings: Dict) ->
                     f.write(b"TIMEOUT_PLACEHOLDER_VIDEO")
                 
                 visual_assets.append(visual_file)
+                
+                visual_assets.extend(_copy_to_duplicates(job_id, job_info, visual_file))
     
     except ImportError as e:
         logger.error(f"Failed to import RunwayClient: {e}")
@@ -677,8 +917,15 @@ def _generate_visual_scenes(job_id: str, parsed_script: Dict, settings: Dict) ->
 
 
 def _assemble_video(job_id: str, parsed_script: Dict, voice_files: List[str], 
-                   ui_elements: List[str], visual_assets: List[str], settings: Dict) -> str:
-    """Assemble final video using FFmpeg"""
+                   ui_elements: List[str], visual_assets: List[str], settings: Dict,
+                   build_cache: Optional[BuildCache] = None,
+                   scene_assets: Optional[Dict[int, Dict[str, List[str]]]] = None) -> str:
+    """
+    Assemble final video using FFmpeg
+    
+    With a build cache and per-scene assets, scenes are encoded as separate
+    segments (reusing cached ones) and the output is re-muxed from them.
+    """
     output_file = f"/app/output/exports/{job_id}.mp4"
     
     try:
@@ -700,18 +947,22 @@ def _assemble_video(job_id: str, parsed_script: Dict, voice_files: List[str],
         # Create video composer
         composer = VideoComposer(job_id, parsed_script, settings)
         
-        # Build timeline mapping assets to scenes
-        timeline = composer.build_timeline(voice_files, ui_elements, visual_assets)
-        
-        logger.info(
-            "Timeline built",
-            job_id=job_id,
-            timeline_entries=len(timeline),
-            total_duration=composer.total_duration
-        )
-        
-        # Generate and execute FFmpeg command
-        success = composer.assemble_video(timeline, output_file)
+        if build_cache is not None and scene_assets is not None:
+            timeline = composer.build_scene_timeline(scene_assets)
+            success = composer.assemble_incremental(timeline, output_file, build_cache)
+        else:
+            # Build timeline mapping assets to scenes
+            timeline = composer.build_timeline(voice_files, ui_elements, visual_assets)
+            
+            logger.info(
+                "Timeline built",
+                job_id=job_id,
+                timeline_entries=len(timeline),
+                total_duration=composer.total_duration
+            )
+            
+            # Generate and execute FFmpeg command
+            success = composer.assemble_video(timeline, output_file)
         
         if success and os.path.exists(output_file):
             # Get file size
@@ -740,6 +991,20 @@ def _assemble_video(job_id: str, parsed_script: Dict, voice_files: List[str],
         return output_file
 
 
+# Codec parameters shared by every scene segment so they concatenate losslessly
+SEGMENT_FORMAT = {"width": 1920, "height": 1080, "fps": 30, "sample_rate": 44100}
+
+
+def _run_ffmpeg(cmd: List[str]) -> bool:
+    """Run an FFmpeg command, logging stderr on failure"""
+    import subprocess
+    
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        logger.error("FFmpeg command failed", stderr=result.stderr[-2000:])
+    return result.returncode == 0
+
+
 class VideoComposer:
     """Handles video composition and FFmpeg assembly"""
     
@@ -842,6 +1107,172 @@ class VideoComposer:
             # Audio-only (podcast style)
             return self._assemble_audio_only(timeline, output_file)
     
+    def build_scene_timeline(self, scene_assets: Dict[int, Dict[str, List[str]]]) -> List[Dict]:
+        """
+        Build timeline entries from assets already grouped by scene index
+        
+        Unlike build_timeline this does not rely on timestamps in asset
+        filenames, so cached assets from earlier builds map correctly even
+        when scenes have moved.
+        """
+        timeline = []
+        
+        for index, scene in enumerate(self.parsed_script.get("scenes", [])):
+            assets = scene_assets.get(index, {})
+            window = scene_window(self.parsed_script, index)
+            
+            timeline.append({
+                "scene": scene,
+                "start": window["start"],
+                "duration": window["duration"],
+                "voice": assets.get("voice", []),
+                "ui": assets.get("ui", []),
+                "visual": assets.get("visual", []),
+                "keys": scene_stage_keys(self.parsed_script, index, self.settings)
+            })
+        
+        return timeline
+    
+    def segment_key(self, entry: Dict, cache: BuildCache) -> str:
+        """Input hash of one scene's encoded segment"""
+        digests = {}
+        for stage in ("voice", "ui", "visual"):
+            if entry[stage]:
+                digests[stage] = (cache.stage_digest(entry["keys"].get(stage, ""))
+                                  or file_digest(entry[stage][0]))
+        
+        return hash_inputs("segment", entry["duration"], digests,
+                           self.settings.get("quality", "high"), SEGMENT_FORMAT)
+    
+    def _segment_command(self, entry: Dict, output_file: str) -> List[str]:
+        """FFmpeg command encoding one scene with uniform codec parameters"""
+        duration = entry["duration"]
+        width, height = SEGMENT_FORMAT["width"], SEGMENT_FORMAT["height"]
+        fps, sample_rate = SEGMENT_FORMAT["fps"], SEGMENT_FORMAT["sample_rate"]
+        fit = (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+               f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,fps={fps},format=yuv420p")
+        
+        inputs, filters = [], []
+        
+        def add_input(*args) -> int:
+            inputs.extend(args)
+            return inputs.count("-i") - 1
+        
+        # Audio: narration padded with silence to the scene length
+        if entry["voice"]:
+            voice = add_input("-i", entry["voice"][0])
+            filters.append(f"[{voice}:a]aresample={sample_rate},"
+                           f"aformat=channel_layouts=stereo,apad,asplit[aout][wave]")
+        else:
+            silence = add_input("-f", "lavfi", "-i", f"anullsrc=r={sample_rate}:cl=stereo")
+            filters.append(f"[{silence}:a]anull[aout]")
+        
+        # Video base: visual clip, else terminal UI full-frame, else waveform/black
+        if entry["visual"]:
+            visual = add_input("-stream_loop", "-1", "-i", entry["visual"][0])
+            fade = 0.5
+            filters.append(f"[{visual}:v]{fit},fade=t=in:st=0:d={fade},"
+                           f"fade=t=out:st={max(duration - fade, 0)}:d={fade}[base]")
+        elif entry["ui"]:
+            ui = add_input("-i", entry["ui"][0])
+            filters.append(f"[{ui}:v]{fit},tpad=stop_mode=clone:stop=-1[base]")
+        elif entry["voice"]:
+            filters.append(f"[wave]showwaves=s={width}x{height}:mode=cline:rate={fps}:"
+                           f"colors=white,format=yuv420p[base]")
+        else:
+            black = add_input("-f", "lavfi", "-i", f"color=c=black:s={width}x{height}:r={fps}")
+            filters.append(f"[{black}:v]{fit}[base]")
+        
+        if entry["voice"] and (entry["visual"] or entry["ui"]):
+            # Waveform branch unused
+            filters.append("[wave]anullsink")
+        
+        video_out = "[base]"
+        if entry["visual"] and entry["ui"]:
+            # Terminal UI as picture-in-picture, as in _build_overlay_filter
+            ui = add_input("-i", entry["ui"][0])
+            filters.append(f"[{ui}:v]scale=640:360[ui];[base][ui]overlay=x=W-w-50:y=H-h-50[outv]")
+            video_out = "[outv]"
+        
+        return ["ffmpeg"] + inputs + [
+            "-filter_complex", ";".join(filters),
+            "-map", video_out, "-map", "[aout]",
+            "-t", str(duration),
+            "-c:v", "libx264", "-preset", "fast", "-r", str(fps),
+            "-c:a", "aac", "-b:a", "192k",
+            "-f", "mp4", "-y", output_file
+        ]
+    
+    def render_scene_segment(self, entry: Dict, output_file: str) -> bool:
+        """Encode one scene to a standalone segment, atomically"""
+        tmp_file = f"{output_file}.tmp"
+        if not _run_ffmpeg(self._segment_command(entry, tmp_file)):
+            if os.path.exists(tmp_file):
+                os.unlink(tmp_file)
+            return False
+        os.replace(tmp_file, output_file)
+        return True
+    
+    def assemble_incremental(self, timeline: List[Dict], output_file: str, cache: BuildCache) -> bool:
+        """
+        Assemble from per-scene segments, encoding only scenes whose inputs changed
+        
+        Segments share codec parameters, so the final video is a stream copy
+        of the segment list.
+        """
+        import tempfile
+        
+        segment_files, scene_records = [], []
+        self.segments_encoded = 0
+        
+        for entry in timeline:
+            key = self.segment_key(entry, cache)
+            segment_file = cache.lookup_segment(key)
+            
+            if segment_file is None:
+                segment_file = cache.segment_path(key)
+                if not self.render_scene_segment(entry, segment_file):
+                    logger.error("Failed to encode scene segment", job_id=self.job_id,
+                                 timestamp=entry["scene"]["timestamp"])
+                    return False
+                cache.record_segment(key, segment_file)
+                self.segments_encoded += 1
+            
+            segment_files.append(segment_file)
+            scene_records.append({
+                "timestamp": entry["scene"]["timestamp"],
+                "start": entry["start"],
+                "duration": entry["duration"],
+                "stages": entry["keys"],
+                "segment": key
+            })
+        
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as concat_list:
+            for segment_file in segment_files:
+                concat_list.write(f"file '{segment_file}'\n")
+        
+        try:
+            success = _run_ffmpeg([
+                "ffmpeg", "-f", "concat", "-safe", "0", "-i", concat_list.name,
+                "-c", "copy", "-movflags", "+faststart",
+                "-y", output_file
+            ])
+        finally:
+            os.unlink(concat_list.name)
+        
+        if success:
+            cache.record_build(scene_records)
+            cache.save()
+        
+        logger.info(
+            "Incremental assembly finished",
+            job_id=self.job_id,
+            scenes=len(timeline),
+            segments_encoded=self.segments_encoded,
+            success=success
+        )
+        return success
+    
     def _assemble_with_overlay(self, timeline: List[Dict], output_file: str) -> bool:
         """Assemble video with terminal UI overlaid on visual scenes"""
         import subprocess
@@ -12,10 +12,14 @@ from celery.utils.log import get_task_logger
 from workers.celery_app import app
 from workers.utils import (
     ProgressReporter, update_job_status, exponential_backoff_retry,
-    TaskMetrics, get_redis_lock, release_redis_lock
+    TaskMetrics, get_redis_lock, release_redis_lock, redis_client
 )
+from workers.completion_tracker import get_completion_tracker
 from src.core.database.models import JobStatus
 from src.services.runway_client import RunwayClient
+from src.services.preview_assets import get_preview_asset_service
+from src.services.ffmpeg_service import FFmpegService
+from src.utils.streaming_download import write_chunks_atomic
 
 logger = get_task_logger(__name__)
 
@@ -71,10 +75,25 @@ def generate_video(self, job_id: str, scene_data: Dict[str, Any],
         video_segments = []
         total_prompts = len(prompts)
         
+        # This task holds one count until every segment is dispatched, so a
+        # remote segment that finishes early cannot bring the count to zero.
+        # A retry keeps the hold (and the counts) its earlier attempt left.
+        pending_key = pending_segments_key(job_id)
+        dispatched_key = dispatched_segments_key(job_id)
+        if redis_client.set(dispatch_hold_key(job_id), 1, nx=True, ex=3600):
+            redis_client.incr(pending_key)
+            redis_client.expire(pending_key, 3600)
+        
         for idx, prompt in enumerate(prompts):
             progress_pct = 10 + (80 * idx // total_prompts)
             progress.update(progress_pct, f"Generating segment {idx + 1}/{total_prompts}")
             
+            # Segments an earlier attempt already submitted are not paid for twice
+            dispatched = redis_client.hget(dispatched_key, idx)
+            if dispatched:
+                video_segments.append(json.loads(dispatched))
+                continue
+            
             try:
                 # Generate video segment
                 segment_result = generate_video_segment(
@@ -86,8 +105,28 @@ def generate_video(self, job_id: str, scene_data: Dict[str, Any],
                 )
                 video_segments.append(segment_result)
                 
-                # Poll for completion if async
-                if segment_result.get('status') == 'processing':
+                if segment_result.get('status') == 'processing' and segment_result.get('runway_id'):
+                    # Remote generation: hand off to the completion tracker
+                    # instead of holding this worker while Runway renders.
+                    # Counted before registering, a fast callback may run at once
+                    redis_client.incr(pending_key)
+                    try:
+                        get_completion_tracker().register(
+                            'runway',
+                            segment_result['runway_id'],
+                            'workers.tasks.video_tasks.finalize_video_segment',
+                            args=[job_id, segment_result],
+                            timeout=600,
+                            initial_delay=segment_result.get('estimated_time'),
+                            metadata={'base_url': self.client.base_url}
+                        )
+                    except Exception:
+                        redis_client.decr(pending_key)
+                        raise
+                    segment_result['status'] = 'pending'
+                
+                # Locally simulated jobs only exist in this process, poll inline
+                elif segment_result.get('status') == 'processing':
                     segment_result = wait_for_video_completion(
                         self.client,
                         segment_result['generation_id'],
@@ -95,29 +134,51 @@ def generate_video(self, job_id: str, scene_data: Dict[str, Any],
                         progress_pct
                     )
                     video_segments[-1] = segment_result
+                
+                redis_client.hset(dispatched_key, idx, json.dumps(video_segments[-1]))
+                redis_client.expire(dispatched_key, 3600)
                     
             except Exception as e:
                 logger.error(f"Error generating segment {idx}: {str(e)}")
-                video_segments.append({
-                    'id': f"segment_{idx}",
+                failed = {
+                    'id': f"{job_id}_segment_{idx}",
                     'status': 'failed',
                     'error': str(e)
-                })
+                }
+                # Replace the segment's entry if it was appended before failing
+                if len(video_segments) > idx:
+                    video_segments[idx] = failed
+                else:
+                    video_segments.append(failed)
         
         # Compile results
         successful_segments = [s for s in video_segments if s.get('status') == 'completed']
+        pending_segments = [s for s in video_segments if s.get('status') == 'pending']
         
         result = {
             'job_id': job_id,
             'scene_id': scene_data.get('scene_id'),
             'video_segments': video_segments,
             'success_count': len(successful_segments),
-            'failure_count': len(video_segments) - len(successful_segments),
+            'failure_count': len(video_segments) - len(successful_segments) - len(pending_segments),
+            'pending_count': len(pending_segments),
             'total_duration': sum(s.get('duration', 0) for s in successful_segments),
             'generation_settings': generation_settings
         }
         
-        progress.complete("Video generation completed")
+        for segment in video_segments:
+            if segment.get('status') != 'pending':
+                record_segment_result(job_id, segment)
+        
+        # finalize_video_segment reports the job when the last remote segment lands
+        redis_client.delete(dispatch_hold_key(job_id))
+        if redis_client.decr(pending_key) > 0:
+            progress.update(90, f"Waiting for {len(pending_segments)} remote segment(s)")
+            metrics.record_execution(success=True, duration=progress.current_step)
+            return result
+        
+        redis_client.delete(pending_key)
+        report_video_outcome(job_id, progress)
         metrics.record_execution(success=True, duration=progress.current_step)
         
         return result
@@ -141,6 +202,62 @@ def generate_video(self, job_id: str, scene_data: Dict[str, Any],
         countdown = 120 * (2 ** self.request.retries)
         raise self.retry(exc=e, countdown=countdown)
 
+@app.task(bind=True, base=VideoTask, name='workers.tasks.video_tasks.finalize_video_segment',
+          max_retries=3, default_retry_delay=30)
+def finalize_video_segment(self, job_id: str, segment: Dict[str, Any],
+                           generation_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Continue a video job once the completion tracker sees a segment finish.
+    
+    Args:
+        job_id: Unique job identifier
+        segment: Segment info returned by generate_video_segment
+        generation_result: Final status reported by the tracker
+    
+    Returns:
+        Finished segment metadata
+    """
+    logger.info(f"Finalizing segment {segment['id']} for job {job_id}: {generation_result['status']}")
+    
+    try:
+        if generation_result['status'] == 'completed':
+            download = self.client.download_video_to_file(
+                generation_result['video_url'],
+                get_video_output_path(job_id, segment['generation_id'], 'mp4')
+            )
+            result = {
+                **segment,
+                'status': 'completed',
+                'video_path': download.path,
+                'duration': generation_result.get('duration') or segment.get('duration', 0),
+                'file_size': download.size,
+                'checksums': download.checksums
+            }
+        else:
+            result = {
+                **segment,
+                'status': generation_result['status'],
+                'error': generation_result.get('error', 'Unknown error')
+            }
+    except Exception as e:
+        logger.error(f"Failed to finalize segment {segment['id']}: {str(e)}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+        # Out of retries: count the segment as failed so the job still finishes
+        result = {**segment, 'status': 'failed', 'error': str(e)}
+    
+    # The tracker delivers at least once; only the first delivery counts
+    if not record_segment_result(job_id, result):
+        logger.info(f"Segment {segment['id']} for job {job_id} was already finalized")
+        return result
+    
+    remaining = redis_client.decr(pending_segments_key(job_id))
+    if remaining <= 0:
+        redis_client.delete(pending_segments_key(job_id))
+        report_video_outcome(job_id, ProgressReporter(job_id, total_steps=100))
+    
+    return result
+
 @app.task(bind=True, base=VideoTask, name='workers.tasks.video_tasks.generate_transition',
           max_retries=3)
 def generate_transition(self, job_id: str, from_scene: Dict[str, Any],
@@ -184,16 +301,15 @@ def generate_transition(self, job_id: str, from_scene: Dict[str, Any],
         progress.update(80, "Saving transition video")
         
         # Save transition video
-        output_path = save_video_file(
-            transition_result['video_data'],
-            job_id,
-            f"transition_{from_scene['id']}_{to_scene['id']}",
-            'mp4'
+        saved = write_chunks_atomic(
+            [transition_result['video_data']],
+            get_video_output_path(job_id, f"transition_{from_scene['id']}_{to_scene['id']}", 'mp4')
         )
         
         result = {
             'job_id': job_id,
-            'transition_path': output_path,
+            'transition_path': saved.path,
+            'checksums': saved.checksums,
             'duration': transition_settings['duration'],
             'type': transition_type,
             'from_scene': from_scene['id'],
@@ -279,7 +395,11 @@ def apply_video_effects(self, job_id: str, video_path: str,
 def generate_thumbnail(self, job_id: str, video_path: str,
                       timestamp: float = None) -> Dict[str, Any]:
     """
-    Generate thumbnail image from video.
+    Generate thumbnail image and scrub previews from video.
+    
+    The thumbnail is a full-resolution frame extracted at the exact
+    timestamp. Scrub previews (sprite sheets and a WebVTT thumbnail track)
+    come from the shared preview pass.
     
     Args:
         job_id: Unique job identifier
@@ -292,33 +412,26 @@ def generate_thumbnail(self, job_id: str, video_path: str,
     logger.info(f"Generating thumbnail for job {job_id}")
     
     try:
-        client = RunwayClient()
-        
-        # Auto-select timestamp if not provided
-        if timestamp is None:
-            # Select frame at 10% of video duration
-            video_info = client.get_video_info(video_path)
-            timestamp = video_info['duration'] * 0.1
-        
-        # Generate thumbnail
-        thumbnail_data = client.extract_frame(
-            video_path=video_path,
-            timestamp=timestamp,
-            format='jpg'
-        )
+        service = get_preview_asset_service()
+        previews = service.get(video_path)
         
         # Save thumbnail
         output_dir = os.path.dirname(video_path)
         thumbnail_path = os.path.join(output_dir, f"thumbnail_{job_id}.jpg")
         
-        with open(thumbnail_path, 'wb') as f:
-            f.write(thumbnail_data)
+        # Auto-select timestamp if not provided: 10% of the video duration
+        if timestamp is None:
+            timestamp = previews.duration * previews.settings.poster_position
+        
+        FFmpegService().generate_thumbnail(video_path, thumbnail_path, timestamp)
         
         return {
             'job_id': job_id,
             'thumbnail_path': thumbnail_path,
             'timestamp': timestamp,
-            'file_size': len(thumbnail_data)
+            'file_size': os.path.getsize(thumbnail_path),
+            'sprites': [os.path.join(previews.directory, name) for name in previews.sprites],
+            'thumbnails_vtt': os.path.join(previews.directory, previews.vtt)
         }
         
     except Exception as e:
@@ -461,6 +574,8 @@ def generate_video_segment(client: RunwayClient, prompt: Dict[str, Any],
         return {
             'id': f"{job_id}_segment_{segment_idx}",
             'generation_id': generation_result.get('id'),
+            'runway_id': generation_result.get('runway_id'),
+            'estimated_time': generation_result.get('estimated_time'),
             'status': generation_result.get('status', 'processing'),
             'prompt': prompt['text'],
             'duration': prompt['duration'],
@@ -484,21 +599,23 @@ def wait_for_video_completion(client: RunwayClient, generation_id: str,
             status = client.get_generation_status(generation_id)
             
             if status['status'] == 'completed':
-                # Download video
-                video_data = client.download_video(status['video_url'])
-                video_path = save_video_file(
-                    video_data,
-                    generation_id.split('_')[0],  # job_id
-                    generation_id,
-                    'mp4'
+                # Stream video to disk instead of buffering the whole clip
+                download = client.download_video_to_file(
+                    status['video_url'],
+                    get_video_output_path(
+                        generation_id.split('_')[0],  # job_id
+                        generation_id,
+                        'mp4'
+                    )
                 )
                 
                 return {
                     'id': generation_id,
                     'status': 'completed',
-                    'video_path': video_path,
+                    'video_path': download.path,
                     'duration': status.get('duration', 0),
-                    'file_size': len(video_data)
+                    'file_size': download.size,
+                    'checksums': download.checksums
                 }
                 
             elif status['status'] == 'failed':
@@ -557,15 +674,49 @@ def wait_for_processing(client: RunwayClient, job_id: str, progress: ProgressRep
     
     raise Exception(f"Processing timed out after {max_wait} seconds")
 
-def save_video_file(video_data: bytes, job_id: str, video_id: str,
-                   format: str = 'mp4') -> str:
-    """Save video data to file."""
+def pending_segments_key(job_id: str) -> str:
+    """Redis key counting a job's segments still waiting on the tracker."""
+    return f"job:pending_segments:{job_id}"
+
+def dispatch_hold_key(job_id: str) -> str:
+    """Redis flag set while generate_video holds its count on pending segments."""
+    return f"job:dispatching:{job_id}"
+
+def dispatched_segments_key(job_id: str) -> str:
+    """Redis hash of segments generate_video has submitted or finished, by index."""
+    return f"job:dispatched:{job_id}"
+
+def segment_results_key(job_id: str) -> str:
+    """Redis hash of a job's finished segments, by segment id."""
+    return f"job:segments:{job_id}"
+
+def record_segment_result(job_id: str, segment: Dict[str, Any]) -> bool:
+    """Store the final result of one segment of a job; False if already stored."""
+    stored = redis_client.hsetnx(segment_results_key(job_id), segment['id'], json.dumps(segment))
+    redis_client.expire(segment_results_key(job_id), 3600)
+    return bool(stored)
+
+def report_video_outcome(job_id: str, progress: ProgressReporter):
+    """Report a job as completed, partially completed or failed from its segments."""
+    segments = [json.loads(value) for value in redis_client.hvals(segment_results_key(job_id))]
+    completed = sum(1 for segment in segments if segment.get('status') == 'completed')
+    failed = len(segments) - completed
+    metadata = {'completed_segments': completed, 'failed_segments': failed}
+    
+    if segments and not completed:
+        update_job_status(job_id, JobStatus.FAILED,
+                          error_message=f"All {len(segments)} video segment(s) failed")
+        progress.update(progress.total_steps, "Video generation failed", metadata)
+    elif failed:
+        progress.update(progress.total_steps,
+                        f"Video generation partially completed: {failed} of "
+                        f"{len(segments)} segment(s) failed or timed out", metadata)
+    else:
+        progress.complete("Video generation completed")
+
+def get_video_output_path(job_id: str, video_id: str, format: str = 'mp4') -> str:
+    """Get the output path for a job's video file, creating its directory."""
     output_dir = f"/mnt/c/Users/holla/OneDrive/Desktop/CodeProjects/Evergreen/output/projects/{job_id}/video"
     os.makedirs(output_dir, exist_ok=True)
     
-    file_path = os.path.join(output_dir, f"{video_id}.{format}")
-    
-    with open(file_path, 'wb') as f:
-        f.write(video_data)
-    
-    return file_path
\ No newline at end of file
+    return os.path.join(output_dir, f"{video_id}.{format}")
\ No newline at end of file
@@ -13,9 +13,10 @@ from functools import wraps
 from celery import Task, current_task
 from celery.utils.log import get_task_logger
 from sqlalchemy.orm import Session
-from src.core.database.connection import get_db
+from src.core.database.connection import get_sync_db
 from src.core.database.models import Job
 from api.validators import JobStatus
+from src.services.event_bus import topic_channel
 
 logger = get_task_logger(__name__)
 
@@ -23,7 +24,12 @@ logger = get_task_logger(__name__)
 redis_client = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
 
 class ProgressReporter:
-    """Utility class for reporting task progress to Redis."""
+    """
+    Utility class for reporting task progress to Redis.
+    
+    Each update is stored for polling and published on the job's event
+    topic, from which every API process pushes it to subscribed WebSockets.
+    """
     
     def __init__(self, job_id: str, total_steps: int = 100):
         self.job_id = job_id
@@ -43,12 +49,26 @@ class ProgressReporter:
             'metadata': metadata or {}
         }
         
-        # Store in Redis with 1 hour expiry
-        redis_client.setex(
-            self.redis_key,
-            3600,
-            json.dumps(progress_data)
-        )
+        event = {
+            'type': 'job_update',
+            'jobId': self.job_id,
+            'data': {
+                'status': JobStatus.PROCESSING.value,
+                'progress': progress_data['percentage'],
+                'message': message,
+                'metadata': progress_data['metadata'],
+                'timestamp': progress_data['updated_at']
+            }
+        }
+        
+        # Store in Redis with 1 hour expiry and notify subscribers, in one round trip
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.setex(self.redis_key, 3600, json.dumps(progress_data))
+            pipe.publish(topic_channel(f"job:{self.job_id}"), json.dumps(event))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Failed to report progress for job {self.job_id}: {e}")
         
         # Also update Celery task state
         if current_task:
@@ -71,7 +91,7 @@ class ProgressReporter:
 def update_job_status(job_id: str, status: JobStatus, error_message: str = None,
                      result_data: Dict[str, Any] = None):
     """Update job status in the database."""
-    db: Session = next(get_db())
+    db: Session = next(get_sync_db())
     try:
         job = db.query(Job).filter(Job.id == job_id).first()
         if job: